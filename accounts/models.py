@@ -2,6 +2,9 @@
 Accounts app models - User authentication, profiles, and subscriptions
 """
 
+import operator
+from functools import reduce
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils import timezone
@@ -38,6 +41,29 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def pilot_users(self):
+        """
+        Users with premium access through the pilot program.
+
+        Queryset equivalent of User.is_pilot_user, so pilot users can be
+        selected (or joined against) without loading every user.
+        """
+        from django.conf import settings
+
+        if getattr(settings, 'PILOT_PREMIUM_ACCESS', False):
+            return self.all()
+
+        rules = [
+            models.Q(email__iexact=email)
+            for email in getattr(settings, 'PILOT_PREMIUM_EMAILS', [])
+        ] + [
+            models.Q(email__iendswith=f'@{domain}')
+            for domain in getattr(settings, 'PILOT_PREMIUM_DOMAINS', [])
+        ]
+        if not rules:
+            return self.none()
+        return self.filter(reduce(operator.or_, rules))
+
 
 class User(AbstractUser):
     """
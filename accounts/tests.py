@@ -227,6 +227,28 @@ class TestPilotModePremiumAccess(TestCase):
         with self.settings(PILOT_PREMIUM_DOMAINS=['pilotcompany.com']):
             self.assertTrue(user.is_premium)
 
+    def test_pilot_users_queryset_matches_is_pilot_user(self):
+        """User.objects.pilot_users() selects exactly the users is_pilot_user accepts."""
+        User.objects.create_user(email="Listed@Tester.COM", password="TestPass123!")
+        User.objects.create_user(email="staff@PilotCompany.com", password="TestPass123!")
+        User.objects.create_user(email="other@example.com", password="TestPass123!")
+        User.objects.create_user(email="pilotcompany.com@example.com", password="TestPass123!")
+
+        with self.settings(
+            PILOT_PREMIUM_EMAILS=['listed@tester.com'],
+            PILOT_PREMIUM_DOMAINS=['pilotcompany.com'],
+        ):
+            expected = {u.email for u in User.objects.all() if u.is_pilot_user}
+            selected = set(User.objects.pilot_users().values_list('email', flat=True))
+            self.assertEqual(selected, expected)
+            self.assertEqual(selected, {"Listed@tester.com", "staff@pilotcompany.com"})
+
+        with self.settings(PILOT_PREMIUM_EMAILS=[], PILOT_PREMIUM_DOMAINS=[]):
+            self.assertFalse(User.objects.pilot_users().exists())
+
+        with self.settings(PILOT_PREMIUM_ACCESS=True):
+            self.assertEqual(User.objects.pilot_users().count(), User.objects.count())
+
     def test_is_pilot_user_false_without_pilot_settings(self):
         """is_pilot_user is False when no pilot settings are enabled."""
         user = User.objects.create_user(
@@ -0,0 +1,315 @@
+"""
+Condition Discovery Data and Scoring
+
+Common claimable conditions with the branches, service eras and risk factors
+they are associated with, and the scoring behind the condition discovery tool.
+
+Lookups go through indexes built once at import (branch, era, normalised risk
+factor and primary condition to the conditions they relate to), so scoring a
+service profile only touches the buckets it selects instead of every
+condition's lists.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+
+# Common conditions by service era and branch
+CONDITION_DATABASE = {
+    'hearing_loss': {
+        'name': 'Hearing Loss / Tinnitus',
+        'description': 'Noise-induced hearing damage common in military service',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['vietnam', 'gulf', 'oef_oif', 'peacetime'],
+        'risk_factors': ['artillery', 'aviation', 'infantry', 'vehicle crew', 'shipboard'],
+        'secondary_to': [],
+        'avg_rating': '10-50%',
+    },
+    'ptsd': {
+        'name': 'PTSD / Anxiety / Depression',
+        'description': 'Mental health conditions from combat or military stress',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['vietnam', 'gulf', 'oef_oif'],
+        'risk_factors': ['combat', 'mst', 'deployment', 'trauma exposure'],
+        'secondary_to': [],
+        'avg_rating': '30-100%',
+    },
+    'back_conditions': {
+        'name': 'Back / Spine Conditions',
+        'description': 'Degenerative disc disease, herniated discs, chronic pain',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['all'],
+        'risk_factors': ['infantry', 'parachute', 'heavy lifting', 'vehicle accidents'],
+        'secondary_to': [],
+        'avg_rating': '10-40%',
+    },
+    'knee_conditions': {
+        'name': 'Knee Conditions',
+        'description': 'Patellofemoral syndrome, meniscus tears, arthritis',
+        'common_for': ['army', 'marines'],
+        'service_eras': ['all'],
+        'risk_factors': ['infantry', 'parachute', 'running', 'ruck marches'],
+        'secondary_to': ['back_conditions'],
+        'avg_rating': '10-30%',
+    },
+    'sleep_apnea': {
+        'name': 'Sleep Apnea',
+        'description': 'Obstructive sleep apnea, often secondary to PTSD or weight gain',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['all'],
+        'risk_factors': ['ptsd', 'weight gain', 'neck injury'],
+        'secondary_to': ['ptsd'],
+        'avg_rating': '50%',
+    },
+    'migraines': {
+        'name': 'Migraines / Headaches',
+        'description': 'Chronic headaches, often secondary to TBI or PTSD',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['oef_oif', 'gulf'],
+        'risk_factors': ['tbi', 'blast exposure', 'ptsd'],
+        'secondary_to': ['ptsd', 'tbi'],
+        'avg_rating': '10-50%',
+    },
+    'tbi': {
+        'name': 'Traumatic Brain Injury (TBI)',
+        'description': 'Brain injury from blast exposure, accidents, or combat',
+        'common_for': ['army', 'marines'],
+        'service_eras': ['oef_oif', 'gulf'],
+        'risk_factors': ['blast exposure', 'vehicle accidents', 'combat'],
+        'secondary_to': [],
+        'avg_rating': '10-100%',
+    },
+    'gerd': {
+        'name': 'GERD / Acid Reflux',
+        'description': 'Gastroesophageal reflux disease, common secondary condition',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['all'],
+        'risk_factors': ['stress', 'medication use', 'ptsd'],
+        'secondary_to': ['ptsd'],
+        'avg_rating': '10-30%',
+    },
+    'radiculopathy': {
+        'name': 'Radiculopathy (Nerve Pain)',
+        'description': 'Nerve pain radiating from spine to extremities',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['all'],
+        'risk_factors': ['back injury', 'neck injury'],
+        'secondary_to': ['back_conditions'],
+        'avg_rating': '10-40%',
+    },
+    'erectile_dysfunction': {
+        'name': 'Erectile Dysfunction',
+        'description': 'Sexual dysfunction, often secondary to PTSD or medication',
+        'common_for': ['army', 'marines', 'navy', 'air_force'],
+        'service_eras': ['all'],
+        'risk_factors': ['ptsd', 'medication', 'diabetes'],
+        'secondary_to': ['ptsd', 'diabetes'],
+        'avg_rating': 'SMC-K',
+    },
+}
+
+SERVICE_ERA_LABELS = {
+    'vietnam': 'Vietnam Era (1964-1975)',
+    'gulf': 'Gulf War Era (1990-2001)',
+    'oef_oif': 'OEF/OIF/OND (2001-Present)',
+    'peacetime': 'Peacetime Service',
+}
+
+
+BRANCH_CHOICES = [
+    ('army', 'Army'),
+    ('marines', 'Marines'),
+    ('navy', 'Navy'),
+    ('air_force', 'Air Force'),
+    ('coast_guard', 'Coast Guard'),
+]
+
+RISK_FACTOR_CHOICES = [
+    ('combat', 'Combat/Direct Fire'),
+    ('blast_exposure', 'Blast Exposure/IEDs'),
+    ('artillery', 'Artillery/Heavy Weapons'),
+    ('aviation', 'Aviation/Flight Line'),
+    ('infantry', 'Infantry/Ground Forces'),
+    ('vehicle_crew', 'Vehicle Crew/Driver'),
+    ('parachute', 'Airborne/Parachute'),
+    ('mst', 'Military Sexual Trauma'),
+    ('deployment', 'Multiple Deployments'),
+    ('tbi', 'Head Injury/Concussion'),
+]
+
+# Scoring weights and thresholds
+BRANCH_SCORE = 2
+ERA_SCORE = 2
+RISK_FACTOR_SCORE = 3
+MIN_MATCH_SCORE = 4
+
+# Results shown per list
+MAX_MATCHED_CONDITIONS = 8
+MAX_SECONDARY_CONDITIONS = 5
+
+# Service era value meaning "any era"
+ALL_ERAS = 'all'
+
+
+def normalize_risk_factor(factor: str) -> str:
+    """Normalise a risk factor value ('blast_exposure') to its text form."""
+    return " ".join(factor.replace('_', ' ').lower().split())
+
+
+class ConditionDiscoveryIndex:
+    """
+    Indexes over CONDITION_DATABASE, built once at import.
+
+    Each index maps a value to the frozenset of condition keys it applies to;
+    order holds each condition's position in CONDITION_DATABASE, used to keep
+    results in database order on ties.
+    """
+
+    def __init__(self, database: Dict[str, Dict[str, Any]]):
+        self.database = database
+        self.order = {key: position for position, key in enumerate(database)}
+
+        by_branch = defaultdict(set)
+        by_era = defaultdict(set)
+        by_risk_factor = defaultdict(set)
+        secondaries = defaultdict(list)
+        for key, condition in database.items():
+            for branch in condition['common_for']:
+                by_branch[branch].add(key)
+            for era in condition['service_eras']:
+                by_era[era].add(key)
+            for risk_factor in condition['risk_factors']:
+                by_risk_factor[normalize_risk_factor(risk_factor)].add(key)
+            for primary in condition['secondary_to']:
+                secondaries[primary].append(key)
+
+        self.by_branch = {branch: frozenset(keys) for branch, keys in by_branch.items()}
+        self.all_era_conditions = frozenset(by_era.pop(ALL_ERAS, ()))
+        self.by_era = {era: frozenset(keys) for era, keys in by_era.items()}
+        self.by_risk_factor = {rf: frozenset(keys) for rf, keys in by_risk_factor.items()}
+
+        self.secondaries = {primary: tuple(keys) for primary, keys in secondaries.items()}
+        # Free-text spellings of each primary checked against existing conditions
+        self.primary_spellings = {
+            primary: {primary, primary.replace('_', ' ')} for primary in self.secondaries
+        }
+
+    def branch_conditions(self, branch: str) -> FrozenSet[str]:
+        return self.by_branch.get(branch, frozenset())
+
+    def era_conditions(self, era: str) -> FrozenSet[str]:
+        """Conditions associated with an era, including those common to all eras."""
+        return self.all_era_conditions | self.by_era.get(era, frozenset())
+
+    def risk_factor_conditions(self, factor: str) -> FrozenSet[str]:
+        """
+        Conditions with a risk factor related to factor.
+
+        Related means either normalised text contains the other ('vehicle
+        crew' and 'vehicle crew', 'tbi' and 'tbi', 'blast' and 'blast
+        exposure').
+        """
+        factor = normalize_risk_factor(factor)
+        if not factor:
+            return frozenset()
+        keys = set()
+        for risk_factor, conditions in self.by_risk_factor.items():
+            if factor in risk_factor or risk_factor in factor:
+                keys |= conditions
+        return frozenset(keys)
+
+
+CONDITION_DISCOVERY_INDEX = ConditionDiscoveryIndex(CONDITION_DATABASE)
+
+
+@lru_cache(maxsize=256)
+def _risk_factor_conditions(factor: str) -> FrozenSet[str]:
+    return CONDITION_DISCOVERY_INDEX.risk_factor_conditions(factor)
+
+
+# Warm the cache for the factors the form offers
+for _factor, _ in RISK_FACTOR_CHOICES:
+    _risk_factor_conditions(_factor)
+
+
+def discover_conditions(
+    branch: str = '',
+    service_era: str = '',
+    risk_factors: Iterable[str] = (),
+    existing_conditions: str = '',
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Score conditions against a service profile.
+
+    Args:
+        branch: Branch value (e.g. 'army')
+        service_era: Era value (e.g. 'oef_oif')
+        risk_factors: Selected risk factor values (e.g. ['combat', 'tbi'])
+        existing_conditions: Free text listing already service-connected conditions
+
+    Returns:
+        Dict with 'matched_conditions' (best first, each with key, condition,
+        score and reasons) and 'secondary_conditions' (each with key,
+        condition and secondary_to), truncated for display.
+    """
+    index = CONDITION_DISCOVERY_INDEX
+    scores = defaultdict(int)
+    reasons = defaultdict(list)
+
+    def add(keys, points, reason):
+        for key in keys:
+            scores[key] += points
+            reasons[key].append(reason)
+
+    add(index.branch_conditions(branch), BRANCH_SCORE,
+        f"Common in {branch.replace('_', ' ').title()}")
+    add(index.era_conditions(service_era), ERA_SCORE,
+        f"Associated with {SERVICE_ERA_LABELS.get(service_era, service_era)}")
+    for factor in risk_factors:
+        add(_risk_factor_conditions(factor), RISK_FACTOR_SCORE,
+            f"Related to {factor.replace('_', ' ')}")
+
+    matched = sorted(
+        (key for key, score in scores.items() if score >= MIN_MATCH_SCORE),
+        key=lambda key: (-scores[key], index.order[key]),
+    )
+
+    # Primaries the veteran has, by name in their list or by a strong match
+    existing_text = existing_conditions.lower()
+    matched_keys = set(matched)
+    primaries = [
+        primary for primary, spellings in index.primary_spellings.items()
+        if primary in matched_keys or any(s in existing_text for s in spellings)
+    ]
+    secondary_pairs: List[Tuple[str, str]] = sorted(
+        (
+            (key, primary)
+            for primary in primaries
+            for key in index.secondaries[primary]
+        ),
+        key=lambda pair: (
+            index.order[pair[0]],
+            CONDITION_DATABASE[pair[0]]['secondary_to'].index(pair[1]),
+        ),
+    )
+
+    return {
+        'matched_conditions': [
+            {
+                'key': key,
+                'condition': CONDITION_DATABASE[key],
+                'score': scores[key],
+                'reasons': reasons[key],
+            }
+            for key in matched[:MAX_MATCHED_CONDITIONS]
+        ],
+        'secondary_conditions': [
+            {
+                'key': key,
+                'condition': CONDITION_DATABASE[key],
+                'secondary_to': CONDITION_DATABASE.get(primary, {}).get('name', primary),
+            }
+            for key, primary in secondary_pairs[:MAX_SECONDARY_CONDITIONS]
+        ],
+    }
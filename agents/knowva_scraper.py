@@ -8,21 +8,127 @@ Usage:
 
     scraper = KnowVAScraper()
     section_data = scraper.scrape_section(article_id='554400000181474')
+
+    # Session mode: one browser, several concurrent pages
+    for article_id, data in scraper.scrape_session(article_ids, concurrency=4):
+        ...
+
+    # Keep the raw HTML so the parse stage can be re-run offline
+    scraper = KnowVAScraper(archive=M21HtmlArchive.from_settings())
 """
 
+import asyncio
+import queue
+import threading
 import time
 import re
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from urllib.parse import quote
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment, NavigableString
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeoutError
 
+if TYPE_CHECKING:
+    from agents.m21_archive import M21HtmlArchive
+
 logger = logging.getLogger(__name__)
 
 
+# Elements rendered as blocks; innerText puts a line break around each one.
+_BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'pre',
+    'section', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+})
+_SKIPPED_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'head'})
+
+
+def _inner_text(element) -> str:
+    """
+    Approximate the browser's innerText for a parsed element.
+
+    Topic parsing relies on rendered line breaks, so this mirrors the
+    innerText rules that matter for KnowVA markup: block elements sit on
+    their own lines, paragraphs are separated by a blank line, <br> breaks
+    a line and other whitespace collapses to a single space.
+    """
+    parts = []  # strings, or ints giving a required number of line breaks
+
+    def walk(node, preformatted):
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                text = str(child) if preformatted else re.sub(r'\s+', ' ', str(child))
+                if text:
+                    parts.append(text)
+                continue
+            name = child.name
+            if name in _SKIPPED_TAGS:
+                continue
+            if name == 'br':
+                parts.append('\n')
+                continue
+            breaks = 2 if name == 'p' else 1 if name in _BLOCK_TAGS else 0
+            if breaks:
+                parts.append(breaks)
+            walk(child, preformatted or name == 'pre')
+            if breaks:
+                parts.append(breaks)
+
+    walk(element, element.name == 'pre')
+
+    lines = []
+    pending_breaks = 0
+    for part in parts:
+        if isinstance(part, int):
+            pending_breaks = max(pending_breaks, part)
+            continue
+        if not part.strip() and (pending_breaks or not lines):
+            # Collapsible whitespace between blocks is not rendered
+            continue
+        if pending_breaks and lines:
+            lines.append('\n' * pending_breaks)
+        pending_breaks = 0
+        lines.append(part)
+
+    text = ''.join(lines)
+    # Whitespace at the edge of a line is not rendered
+    text = re.sub(r' *\n *', '\n', text)
+    return text.strip()
+
+
+class AsyncRateLimiter:
+    """
+    Politeness limiter shared by all pages in a scrape session.
+
+    Spaces request starts at least `interval` seconds apart no matter how
+    many pages are waiting, so concurrency overlaps page rendering with the
+    wait rather than increasing load on VA servers.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_allowed = 0.0
+        self._lock = None
+
+    async def wait(self):
+        """Block until the next request slot is available."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_allowed - now
+            if delay > 0:
+                logger.debug(f"Rate limiting: sleeping {delay:.2f}s")
+                await asyncio.sleep(delay)
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+
+
 class KnowVAScraper:
     """
     Scraper for VA KnowVA M21-1 manual sections.
@@ -42,19 +148,51 @@ class KnowVAScraper:
     RETRY_ATTEMPTS = 3
     RETRY_DELAY = 5.0
     PAGE_LOAD_TIMEOUT = 30000  # 30 seconds
-
-    def __init__(self, headless: bool = True, rate_limit: float = None):
+    CONTENT_WAIT_TIMEOUT = 10000  # 10 seconds for JS-rendered content
+    DEFAULT_CONCURRENCY = 4
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    VIEWPORT = {'width': 1920, 'height': 1080}
+
+    # Candidate selectors, in priority order
+    TITLE_SELECTORS = ['h1', '.article-title', '.page-title', 'title']
+    CONTENT_SELECTORS = [
+        '.article-content',
+        '.article-body',
+        '.content-body',
+        'article',
+        '#content',
+        'main'
+    ]
+    DATE_SELECTORS = ['.last-updated', '.update-date', '.modified-date']
+
+    def __init__(
+        self,
+        headless: bool = True,
+        rate_limit: float = None,
+        base_url: str = None,
+        archive: Optional['M21HtmlArchive'] = None
+    ):
         """
         Initialize scraper.
 
         Args:
             headless: Run browser in headless mode
             rate_limit: Override default rate limit (seconds)
+            base_url: Override the KnowVA URL pattern (e.g. a local fixture server)
+            archive: Raw HTML archive to store every fetched page in
         """
         self.headless = headless
         self.rate_limit = rate_limit or self.RATE_LIMIT
+        self.base_url = base_url or self.BASE_URL
+        self.archive = archive
         self.last_request_time = 0
 
+    @property
+    def content_wait_selector(self) -> str:
+        """Selector matching any element the content parser can use."""
+        return ', '.join(self.CONTENT_SELECTORS)
+
     def _wait_for_rate_limit(self):
         """Ensure we don't exceed rate limit."""
         elapsed = time.time() - self.last_request_time
@@ -88,31 +226,32 @@ class KnowVAScraper:
                 with sync_playwright() as p:
                     browser = p.chromium.launch(headless=self.headless)
                     context = browser.new_context(
-                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        viewport={'width': 1920, 'height': 1080}
+                        user_agent=self.USER_AGENT,
+                        viewport=self.VIEWPORT
                     )
                     page = context.new_page()
 
                     # Construct URL
-                    url = self.BASE_URL.format(article_id=article_id)
+                    url = self.base_url.format(article_id=article_id)
                     logger.info(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
 
                     # Navigate to page
-                    response = page.goto(url, wait_until='networkidle', timeout=self.PAGE_LOAD_TIMEOUT)
+                    response = page.goto(url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
 
                     if response and response.status >= 400:
                         logger.error(f"HTTP {response.status} for article {article_id}")
                         browser.close()
-                        if attempt < max_retries - 1:
+                        # Client errors won't change on retry
+                        if response.status >= 500 and attempt < max_retries - 1:
                             time.sleep(self.RETRY_DELAY)
                             continue
                         return None
 
                     # Wait for content to render
-                    time.sleep(2)
+                    self._wait_for_content(page, article_id)
 
                     # Extract content
-                    data = self._parse_page(page, article_id, url)
+                    data = self._parse_page(page.content(), article_id, url)
 
                     browser.close()
 
@@ -143,12 +282,77 @@ class KnowVAScraper:
         logger.error(f"Failed to scrape article {article_id} after {max_retries} attempts")
         return None
 
-    def _parse_page(self, page: Page, article_id: str, url: str) -> Optional[Dict]:
+    def _wait_for_content(self, page: Page, article_id: str):
+        """Wait until a content element is attached instead of sleeping."""
+        try:
+            page.wait_for_selector(
+                self.content_wait_selector,
+                state='attached',
+                timeout=self.CONTENT_WAIT_TIMEOUT
+            )
+        except PlaywrightTimeoutError:
+            logger.warning(f"No content element rendered for article {article_id}")
+
+    def _parse_page(self, html: str, article_id: str, url: str) -> Optional[Dict]:
         """
-        Parse M21-1 content from KnowVA page.
+        Archive a fetched page, then parse it.
+
+        Fetching and parsing are separate stages: the rendered HTML is all the
+        parser needs, so archived pages can be re-parsed later without a browser.
+        """
+        if self.archive is not None:
+            try:
+                self.archive.store(article_id, url, html)
+            except OSError as e:
+                logger.error(f"Could not archive HTML for article {article_id}: {e}")
+        return self.parse_html(html, article_id, url)
+
+    def parse_html(self, html: str, article_id: str, url: str) -> Optional[Dict]:
+        """
+        Parse M21-1 content from rendered page HTML.
+
+        Args:
+            html: Rendered page HTML (e.g. from page.content() or the archive)
+            article_id: Article ID
+            url: Full URL
+
+        Returns:
+            Dict with parsed content
+        """
+        try:
+            snapshot = self._snapshot_html(html)
+        except Exception as e:
+            logger.error(f"Error reading HTML for article {article_id}: {e}", exc_info=True)
+            return None
+        return self._parse_snapshot(snapshot, article_id, url)
+
+    def _snapshot_html(self, html: str) -> Dict:
+        """Collect the text (and content HTML) of every candidate selector."""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        def pick(selectors, with_html):
+            elems = []
+            for selector in selectors:
+                el = soup.select_one(selector)
+                if el is None:
+                    elems.append(None)
+                    continue
+                text = el.get_text() if el.name == 'title' else _inner_text(el)
+                elems.append({'text': text, 'html': el.decode_contents() if with_html else None})
+            return elems
+
+        return {
+            'titles': pick(self.TITLE_SELECTORS, False),
+            'contents': pick(self.CONTENT_SELECTORS, True),
+            'dates': pick(self.DATE_SELECTORS, False),
+        }
+
+    def _parse_snapshot(self, snapshot: Dict, article_id: str, url: str) -> Optional[Dict]:
+        """
+        Parse M21-1 content from a page snapshot.
 
         Args:
-            page: Playwright page object
+            snapshot: Dict of per-selector text/HTML from _snapshot_html
             article_id: Article ID
             url: Full URL
 
@@ -158,15 +362,11 @@ class KnowVAScraper:
         try:
             # Get page title - try multiple selectors
             title = None
-            for selector in ['h1', '.article-title', '.page-title', 'title']:
-                try:
-                    title_elem = page.query_selector(selector)
-                    if title_elem:
-                        title = title_elem.inner_text().strip()
-                        if title and not title.startswith('KnowVA'):
-                            break
-                except:
-                    continue
+            for elem in snapshot.get('titles', []):
+                if elem:
+                    title = elem['text'].strip()
+                    if title and not title.startswith('KnowVA'):
+                        break
 
             # Parse title to extract M21 reference
             reference_data = self._parse_m21_reference(title) if title else {}
@@ -174,23 +374,12 @@ class KnowVAScraper:
             # Get main content - try multiple selectors
             content_html = None
             content_text = None
-            for selector in [
-                '.article-content',
-                '.article-body',
-                '.content-body',
-                'article',
-                '#content',
-                'main'
-            ]:
-                try:
-                    content_elem = page.query_selector(selector)
-                    if content_elem:
-                        content_html = content_elem.inner_html()
-                        content_text = content_elem.inner_text()
-                        if content_text and len(content_text.strip()) > 100:
-                            break
-                except:
-                    continue
+            for elem in snapshot.get('contents', []):
+                if elem:
+                    content_html = elem['html']
+                    content_text = elem['text']
+                    if content_text and len(content_text.strip()) > 100:
+                        break
 
             if not content_text or len(content_text.strip()) < 50:
                 logger.warning(f"Insufficient content for article {article_id}")
@@ -203,16 +392,11 @@ class KnowVAScraper:
 
             # Try to find last updated date
             last_updated = None
-            for selector in ['.last-updated', '.update-date', '.modified-date']:
-                try:
-                    date_elem = page.query_selector(selector)
-                    if date_elem:
-                        date_text = date_elem.inner_text()
-                        last_updated = self._parse_date(date_text)
-                        if last_updated:
-                            break
-                except:
-                    continue
+            for elem in snapshot.get('dates', []):
+                if elem:
+                    last_updated = self._parse_date(elem['text'])
+                    if last_updated:
+                        break
 
             # Extract overview (typically first paragraph or section before topics)
             overview = self._extract_overview(content_text, topics)
@@ -412,14 +596,17 @@ class KnowVAScraper:
     def scrape_multiple(
         self,
         article_ids: List[str],
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        concurrency: int = None
     ) -> Tuple[List[Dict], List[str]]:
         """
-        Scrape multiple sections.
+        Scrape multiple sections in a single browser session.
 
         Args:
             article_ids: List of article IDs to scrape
-            progress_callback: Optional callback(current, total, article_id)
+            progress_callback: Optional callback(current, total, article_id),
+                called as each article finishes
+            concurrency: Number of pages to drive at once
 
         Returns:
             Tuple of (successful_data_list, failed_article_ids)
@@ -428,12 +615,10 @@ class KnowVAScraper:
         failed = []
 
         total = len(article_ids)
-        for idx, article_id in enumerate(article_ids, 1):
+        for idx, (article_id, data) in enumerate(self.scrape_session(article_ids, concurrency), 1):
             if progress_callback:
                 progress_callback(idx, total, article_id)
 
-            data = self.scrape_section(article_id)
-
             if data:
                 successful.append(data)
             else:
@@ -443,6 +628,160 @@ class KnowVAScraper:
 
         return successful, failed
 
+    def scrape_session(
+        self,
+        article_ids: List[str],
+        concurrency: int = None
+    ) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Scrape many articles reusing one browser and context.
+
+        Pages run concurrently under a shared AsyncRateLimiter. The event loop
+        runs on a worker thread and results are yielded here as they complete,
+        so callers can safely use the Django ORM between results.
+
+        Args:
+            article_ids: List of article IDs to scrape
+            concurrency: Number of pages to drive at once
+
+        Yields:
+            (article_id, data) tuples in completion order; data is None on failure
+        """
+        article_ids = list(article_ids)
+        if not article_ids:
+            return
+
+        results = queue.Queue()
+        done = object()
+        stop = threading.Event()
+        session = {}
+
+        async def main():
+            session['loop'] = asyncio.get_running_loop()
+            session['task'] = asyncio.current_task()
+            if stop.is_set():
+                return
+            await self._run_session(article_ids, concurrency, results.put)
+
+        def run():
+            try:
+                asyncio.run(main())
+            except asyncio.CancelledError:
+                pass  # Stopped by the consumer
+            except BaseException as e:  # Surface in the consuming thread
+                results.put(e)
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(target=run, name='knowva-scrape-session', daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # The consumer may stop early (break, close, exception): cancel the
+            # session so the browser is closed instead of scraping on unseen.
+            stop.set()
+            if thread.is_alive() and 'task' in session:
+                try:
+                    session['loop'].call_soon_threadsafe(session['task'].cancel)
+                except RuntimeError:
+                    pass  # Loop already finished
+            thread.join()
+
+    async def _run_session(
+        self,
+        article_ids: List[str],
+        concurrency: Optional[int],
+        emit: Callable[[Tuple[str, Optional[Dict]]], None]
+    ):
+        """Drive `concurrency` pages over a shared work queue."""
+        concurrency = max(1, min(concurrency or self.DEFAULT_CONCURRENCY, len(article_ids)))
+        limiter = AsyncRateLimiter(self.rate_limit)
+
+        pending = asyncio.Queue()
+        for article_id in article_ids:
+            pending.put_nowait(article_id)
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=self.headless)
+            try:
+                context = await browser.new_context(
+                    user_agent=self.USER_AGENT,
+                    viewport=self.VIEWPORT
+                )
+
+                async def worker():
+                    page = await context.new_page()
+                    try:
+                        while True:
+                            try:
+                                article_id = pending.get_nowait()
+                            except asyncio.QueueEmpty:
+                                return
+                            data = await self._scrape_in_session(page, article_id, limiter)
+                            emit((article_id, data))
+                    finally:
+                        await page.close()
+
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+                await context.close()
+            finally:
+                await browser.close()
+
+    async def _scrape_in_session(self, page, article_id: str, limiter: AsyncRateLimiter) -> Optional[Dict]:
+        """Scrape one article on an already-open page, with retries."""
+        max_retries = self.RETRY_ATTEMPTS
+        url = self.base_url.format(article_id=article_id)
+
+        for attempt in range(max_retries):
+            try:
+                await limiter.wait()
+                logger.info(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
+
+                response = await page.goto(url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+
+                if response and response.status >= 500:
+                    logger.error(f"HTTP {response.status} for article {article_id}")
+                elif response and response.status >= 400:
+                    # Client errors won't change on retry
+                    logger.error(f"HTTP {response.status} for article {article_id}")
+                    return None
+                else:
+                    try:
+                        await page.wait_for_selector(
+                            self.content_wait_selector,
+                            state='attached',
+                            timeout=self.CONTENT_WAIT_TIMEOUT
+                        )
+                    except PlaywrightTimeoutError:
+                        logger.warning(f"No content element rendered for article {article_id}")
+
+                    # Archiving and parsing are blocking; keep them off the event loop
+                    html = await page.content()
+                    data = await asyncio.to_thread(self._parse_page, html, article_id, url)
+                    if data:
+                        logger.info(f"Successfully scraped article {article_id}: {data.get('title', 'Unknown')}")
+                        return data
+                    logger.warning(f"No data extracted from article {article_id}")
+
+            except PlaywrightTimeoutError as e:
+                logger.error(f"Timeout scraping article {article_id}: {e}")
+            except Exception as e:
+                logger.error(f"Error scraping article {article_id}: {e}", exc_info=True)
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(self.RETRY_DELAY)
+
+        logger.error(f"Failed to scrape article {article_id} after {max_retries} attempts")
+        return None
+
 
 # Predefined article IDs from KnowVA
 # These can be discovered by browsing KnowVA and inspecting URLs
@@ -0,0 +1,176 @@
+"""
+Raw HTML archive for M21-1 scrapes.
+
+The fetch stage stores each rendered KnowVA page here; the parse stage reads
+it back, so changes to the parser can be re-run over the whole manual
+without a browser or network access.
+
+Layout (under the archive root):
+    objects/ab/abcdef...html.gz   gzip-compressed HTML, named by SHA-256
+    articles/<article_id>.json    latest fetch: digest, url, fetched_at
+
+Identical pages share one object, so re-fetching unchanged articles costs no
+extra space.
+
+Usage:
+    from agents.m21_archive import M21HtmlArchive, reparse_archive
+
+    archive = M21HtmlArchive.from_settings()
+    for article_id, data in reparse_archive(archive, workers=8):
+        ...
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class M21HtmlArchive:
+    """Content-addressed, gzip-compressed store of rendered KnowVA pages."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.articles_dir = self.root / 'articles'
+
+    @classmethod
+    def from_settings(cls) -> 'M21HtmlArchive':
+        """Archive at settings.M21_HTML_ARCHIVE_DIR."""
+        from django.conf import settings
+        return cls(settings.M21_HTML_ARCHIVE_DIR)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f'{digest}.html.gz'
+
+    def _article_path(self, article_id: str) -> Path:
+        return self.articles_dir / f'{article_id}.json'
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """Write via a temp file and rename so readers never see partial files."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def store(self, article_id: str, url: str, html: str) -> str:
+        """
+        Archive a fetched page.
+
+        Args:
+            article_id: KnowVA article ID
+            url: URL the page was fetched from
+            html: Rendered page HTML
+
+        Returns:
+            SHA-256 hex digest of the HTML
+        """
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            # mtime=0 keeps the compressed bytes deterministic
+            self._write_atomic(object_path, gzip.compress(raw, mtime=0))
+
+        record = {
+            'article_id': article_id,
+            'url': url,
+            'digest': digest,
+            'fetched_at': datetime.now(timezone.utc).isoformat(),
+        }
+        self._write_atomic(self._article_path(article_id), json.dumps(record).encode('utf-8'))
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Return the HTML stored under a digest."""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def get(self, article_id: str) -> Optional[Dict]:
+        """Latest fetch record for an article, or None."""
+        try:
+            with open(self._article_path(article_id), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def article_records(self, article_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Fetch records for the given articles (all archived articles if None)."""
+        if article_ids is None:
+            if not self.articles_dir.exists():
+                return []
+            paths = sorted(self.articles_dir.glob('*.json'))
+            records = []
+            for path in paths:
+                with open(path, 'r') as f:
+                    records.append(json.load(f))
+            return records
+
+        records = []
+        for article_id in article_ids:
+            record = self.get(article_id)
+            if record:
+                records.append(record)
+            else:
+                logger.warning(f"Article {article_id} is not in the M21 HTML archive")
+        return records
+
+
+def _parse_archived_article(job: Tuple[str, Dict]) -> Tuple[str, Optional[Dict]]:
+    """Process-pool worker: parse one archived page. Needs no browser or DB."""
+    from agents.knowva_scraper import KnowVAScraper
+
+    root, record = job
+    article_id = record['article_id']
+    try:
+        html = M21HtmlArchive(root).load(record['digest'])
+        return article_id, KnowVAScraper().parse_html(html, article_id, record['url'])
+    except Exception as e:
+        logger.error(f"Error re-parsing archived article {article_id}: {e}", exc_info=True)
+        return article_id, None
+
+
+def reparse_archive(
+    archive: M21HtmlArchive,
+    article_ids: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """
+    Re-run the parse stage over archived pages.
+
+    Args:
+        archive: Archive to read from
+        article_ids: Articles to parse (all archived articles if None)
+        workers: Worker processes; 1 parses in-process, None uses all CPUs
+
+    Yields:
+        (article_id, data) tuples in archive order; data is None if parsing failed
+    """
+    jobs = [(str(archive.root), record) for record in archive.article_records(article_ids)]
+    if not jobs:
+        return
+
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            yield _parse_archived_article(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        yield from executor.map(_parse_archived_article, jobs, chunksize=chunksize)
@@ -7,6 +7,7 @@ Usage:
     python manage.py scrape_m21 --reference I.i.1.A
     python manage.py scrape_m21 --parts I II III --force
     python manage.py scrape_m21 --dry-run
+    python manage.py scrape_m21 --reparse-archive --workers 8
 """
 
 import json
@@ -20,6 +21,7 @@ from django.utils import timezone
 
 from agents.models import M21ManualSection, M21ScrapeJob
 from agents.knowva_scraper import KnowVAScraper, KNOWN_ARTICLE_IDS
+from agents.m21_archive import M21HtmlArchive
 
 logger = logging.getLogger(__name__)
 
@@ -81,8 +83,22 @@ class Command(BaseCommand):
             type=str,
             help='Import article IDs from JSON file'
         )
+        parser.add_argument(
+            '--reparse-archive',
+            action='store_true',
+            help='Re-parse archived HTML instead of fetching (no browser needed)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Parser processes for --reparse-archive (default: all CPUs)'
+        )
 
     def handle(self, *args, **options):
+        if options['reparse_archive']:
+            return self._reparse_archive(options)
+
         # Determine what to scrape
         article_ids_to_scrape = self._determine_articles(options)
 
@@ -117,7 +133,8 @@ class Command(BaseCommand):
         # Initialize scraper
         scraper = KnowVAScraper(
             headless=options['headless'],
-            rate_limit=options['rate_limit']
+            rate_limit=options['rate_limit'],
+            archive=M21HtmlArchive.from_settings()
         )
 
         # Track results
@@ -215,6 +232,27 @@ class Command(BaseCommand):
             if len(errors) > 10:
                 self.stdout.write(f'  ... and {len(errors) - 10} more')
 
+    def _reparse_archive(self, options):
+        """Run the parse stage over the raw HTML archive."""
+        from agents.tasks import reparse_m21_archive
+
+        # With no selection flags, re-parse everything in the archive
+        selected = any(options.get(key) for key in ('article_id', 'reference', 'all', 'parts', 'import_from_file'))
+        article_ids = self._determine_articles(options) if selected else None
+
+        self.stdout.write(self.style.HTTP_INFO('\n=== M21-1 Archive Re-parse ==='))
+        self.stdout.write(f'Archive: {M21HtmlArchive.from_settings().root}')
+        self.stdout.write(f'Articles: {len(article_ids) if article_ids is not None else "all archived"}')
+
+        result = reparse_m21_archive(article_ids, workers=options['workers'])
+
+        self.stdout.write(self.style.SUCCESS(f'Successful: {result["successful"]}'))
+        self.stdout.write(f'Changed: {len(result["changed_section_ids"])}')
+        if result['failed']:
+            self.stdout.write(self.style.ERROR(f'Failed: {result["failed"]}'))
+            for error in result['errors'][:10]:
+                self.stdout.write(f'  - {error}')
+
     def _determine_articles(self, options) -> list:
         """Determine which article IDs to scrape based on options."""
         article_ids = []
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0009_add_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='m21manualsection',
+            name='content_hash',
+            field=models.CharField(
+                blank=True,
+                help_text='SHA-256 of normalized scraped content; unchanged hash means nothing to rewrite',
+                max_length=64,
+                verbose_name='Content Hash',
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+"""
+Data migration to backfill content_hash on existing M21 sections.
+
+Without it every section's stored hash is blank after 0010, so the first
+incremental refresh would rewrite and reindex every row.
+"""
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def backfill_content_hash(apps, schema_editor):
+    """
+    Compute content_hash for sections that don't have one yet.
+
+    Historical models lack custom methods, so the hash is computed with the
+    current model's compute_content_hash over the historical instance.
+    """
+    from agents.models import M21ManualSection as CurrentSection
+
+    M21ManualSection = apps.get_model('agents', 'M21ManualSection')
+    sections = (
+        M21ManualSection.objects
+        .filter(content_hash='')
+        .only('id', 'reference', 'title', 'overview', 'content', 'topics', 'references')
+        .order_by('id')
+    )
+
+    batch = []
+    for section in sections.iterator(chunk_size=BATCH_SIZE):
+        section.content_hash = CurrentSection.compute_content_hash(section)
+        batch.append(section)
+        if len(batch) >= BATCH_SIZE:
+            M21ManualSection.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+
+    if batch:
+        M21ManualSection.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0010_m21_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
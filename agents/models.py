@@ -4,6 +4,9 @@ AI Agents for VA Benefits Navigator
 Models for storing agent interactions, analyses, and generated content.
 """
 
+import hashlib
+import json
+
 from django.db import models
 from django.conf import settings
 from core.models import TimeStampedModel
@@ -705,6 +708,14 @@ class M21ManualSection(TimeStampedModel):
         help_text='Denormalized full text for search'
     )
 
+    # Change detection for incremental refresh
+    content_hash = models.CharField(
+        'Content Hash',
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 of normalized scraped content; unchanged hash means nothing to rewrite'
+    )
+
     class Meta:
         verbose_name = 'M21-1 Manual Section'
         verbose_name_plural = 'M21-1 Manual Sections'
@@ -718,21 +729,53 @@ class M21ManualSection(TimeStampedModel):
     def __str__(self):
         return f"{self.reference} - {self.title}"
 
+    def build_search_text(self) -> str:
+        """Denormalized text used for keyword search."""
+        search_parts = [
+            self.reference,
+            self.title,
+            self.overview,
+            self.content,
+        ]
+        # Add topic content
+        for topic in self.topics:
+            search_parts.append(topic.get('title', ''))
+            search_parts.append(topic.get('content', ''))
+
+        return ' '.join(filter(None, search_parts))
+
+    def compute_content_hash(self) -> str:
+        """
+        Hash the scraped content with whitespace normalized.
+
+        Re-scrapes that only differ in layout whitespace hash the same, so
+        they don't count as changes.
+        """
+        def normalize(value):
+            return ' '.join(str(value or '').split())
+
+        payload = json.dumps(
+            [
+                normalize(self.reference),
+                normalize(self.title),
+                normalize(self.overview),
+                normalize(self.content),
+                [
+                    {key: normalize(value) for key, value in sorted(topic.items())}
+                    for topic in (self.topics or [])
+                ],
+                [normalize(ref) for ref in (self.references or [])],
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
     def save(self, *args, **kwargs):
-        # Auto-populate search_text for full-text search
-        if not self.search_text:
-            search_parts = [
-                self.reference,
-                self.title,
-                self.overview,
-                self.content,
-            ]
-            # Add topic content
-            for topic in self.topics:
-                search_parts.append(topic.get('title', ''))
-                search_parts.append(topic.get('content', ''))
-
-            self.search_text = ' '.join(filter(None, search_parts))
+        # Keep search_text in step with content; only rebuilt when content changed
+        content_hash = self.compute_content_hash()
+        if not self.search_text or content_hash != self.content_hash:
+            self.search_text = self.build_search_text()
+        self.content_hash = content_hash
 
         super().save(*args, **kwargs)
 
@@ -5,11 +5,13 @@ Provides access to M21-1 Adjudication Procedures Manual and other reference mate
 Now supports both JSON files and database queries for M21 data.
 """
 
+import copy
 import json
 import os
+import re
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from functools import lru_cache
 
 logger = logging.getLogger(__name__)
@@ -584,16 +586,17 @@ def load_dbq(condition: str) -> Optional[Dict]:
         return None
 
 
-def list_available_dbqs() -> List[Dict]:
+@lru_cache(maxsize=1)
+def _load_dbq_catalog() -> tuple:
     """
-    List all available DBQs.
+    Load summary info for every DBQ file once.
 
     Returns:
-        List of dicts with DBQ name, condition, and category
+        Tuple of DBQ info dicts sorted by name
     """
     dbqs = []
     if not DBQ_DIR.exists():
-        return dbqs
+        return tuple(dbqs)
 
     for file in DBQ_DIR.glob('*.json'):
         try:
@@ -609,7 +612,17 @@ def list_available_dbqs() -> List[Dict]:
         except (json.JSONDecodeError, KeyError):
             continue
 
-    return sorted(dbqs, key=lambda x: x['name'])
+    return tuple(sorted(dbqs, key=lambda x: x['name']))
+
+
+def list_available_dbqs() -> List[Dict]:
+    """
+    List all available DBQs.
+
+    Returns:
+        List of dicts with DBQ name, condition, and category
+    """
+    return copy.deepcopy(list(_load_dbq_catalog()))
 
 
 def get_dbq_rating_criteria(condition: str) -> Optional[Dict]:
@@ -654,11 +667,10 @@ def search_dbqs_by_diagnostic_code(code: str) -> List[Dict]:
     Returns:
         List of matching DBQs
     """
-    matches = []
-    for dbq_info in list_available_dbqs():
-        if code in dbq_info.get('diagnostic_codes', []):
-            matches.append(dbq_info)
-    return matches
+    entry = load_diagnostic_code_index().get(str(code).strip())
+    if not entry:
+        return []
+    return copy.deepcopy(entry['dbqs'])
 
 
 def search_dbqs_by_category(category: str) -> List[Dict]:
@@ -856,67 +868,19 @@ def get_rating_criteria_by_code(diagnostic_code: str) -> Optional[Dict]:
     """
     Get rating criteria for a specific diagnostic code.
 
+    Served from the diagnostic code index, so every code defined in a CFR
+    schedule or listed on a DBQ resolves regardless of body system.
+
     Args:
         diagnostic_code: VA diagnostic code (e.g., '9411', '5260', '8100')
 
     Returns:
         Rating criteria dict or None
     """
-    code = str(diagnostic_code)
-
-    # Determine which schedule to check based on code range
-    if code.startswith('9'):
-        schedule = load_cfr_schedule('mental_disorders')
-        if schedule:
-            codes = schedule.get('diagnostic_codes', {})
-            if code in codes:
-                return {
-                    'code': code,
-                    'name': codes[code],
-                    'rating_formula': schedule.get('general_rating_formula'),
-                    'cfr_reference': schedule.get('cfr_reference')
-                }
-    elif code.startswith('52') or code.startswith('50'):
-        # Knee and musculoskeletal
-        schedule = load_cfr_schedule('knee')
-        if schedule:
-            codes = schedule.get('diagnostic_codes', {})
-            if code in codes:
-                return {
-                    'code': code,
-                    'data': codes[code],
-                    'cfr_reference': schedule.get('cfr_reference')
-                }
-    elif code.startswith('81'):
-        schedule = load_cfr_schedule('neurological')
-        if schedule:
-            return {
-                'code': code,
-                'cfr_reference': schedule.get('cfr_reference'),
-                'headaches': schedule.get('headaches') if code == '8100' else None
-            }
-    elif code.startswith('66') or code.startswith('68'):
-        schedule = load_cfr_schedule('respiratory')
-        if schedule:
-            codes = schedule.get('diagnostic_codes', {})
-            if code in codes:
-                return {
-                    'code': code,
-                    'data': codes[code],
-                    'cfr_reference': schedule.get('cfr_reference')
-                }
-    elif code.startswith('70') or code.startswith('71'):
-        schedule = load_cfr_schedule('cardiovascular')
-        if schedule:
-            codes = schedule.get('diagnostic_codes', {})
-            if code in codes:
-                return {
-                    'code': code,
-                    'data': codes[code],
-                    'cfr_reference': schedule.get('cfr_reference')
-                }
-
-    return None
+    entry = load_diagnostic_code_index().get(str(diagnostic_code).strip())
+    if not entry:
+        return None
+    return copy.deepcopy(entry)
 
 
 def get_combined_rating(ratings: List[int]) -> int:
@@ -1031,3 +995,130 @@ CFR_SCHEDULES = [
     'endocrine',
     'special_provisions',
 ]
+
+
+# ============================================================================
+# Diagnostic Code Index (all CFR schedules and DBQs)
+# ============================================================================
+
+_DIAGNOSTIC_CODE_RE = re.compile(r'^\d{4}$')
+_DIAGNOSTIC_CODE_RANGE_RE = re.compile(r'^(\d{4})-(\d{4})$')
+
+
+def _split_diagnostic_codes(codes: List[str]) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Split a DBQ code list into single codes and inclusive ranges.
+
+    Ranges like '8510-8730' are kept as (start, end) intervals rather than
+    expanded, since most integers in a span are not real diagnostic codes.
+    """
+    singles, ranges = [], []
+    for code in codes:
+        code = str(code).strip()
+        match = _DIAGNOSTIC_CODE_RANGE_RE.match(code)
+        if match:
+            ranges.append((int(match.group(1)), int(match.group(2))))
+        elif _DIAGNOSTIC_CODE_RE.match(code):
+            singles.append(code)
+    return singles, ranges
+
+
+def _iter_cfr_code_definitions(node, section: Optional[str] = None):
+    """
+    Yield (code, section, value) for every diagnostic code defined in a schedule.
+
+    Codes are defined either as 4-digit keys (``{"7000": {...}}`` or
+    ``{"9411": "Post-traumatic stress disorder"}``) or as a section carrying a
+    ``diagnostic_code`` field (e.g. ``hypertension``). Codes mentioned inside
+    lists are cross-references (e.g. diabetes complications) and are skipped.
+    """
+    if not isinstance(node, dict):
+        return
+
+    for key, value in node.items():
+        current_section = section or key
+        if _DIAGNOSTIC_CODE_RE.match(str(key)):
+            yield str(key), current_section, value
+        elif isinstance(value, dict):
+            code = str(value.get('diagnostic_code', ''))
+            if _DIAGNOSTIC_CODE_RE.match(code):
+                yield code, current_section, value
+            yield from _iter_cfr_code_definitions(value, current_section)
+
+
+@lru_cache(maxsize=1)
+def load_diagnostic_code_index() -> Dict[str, Dict]:
+    """
+    Build a diagnostic code -> rating criteria index over all reference data.
+
+    Walks every CFR schedule in ``data/cfr`` and every DBQ in ``data/dbqs``
+    once, so lookups by code are a single dict access.
+
+    Returns:
+        Dict keyed by diagnostic code. Each entry has code, name, data,
+        rating_formula, cfr_reference, schedule, section and dbqs.
+    """
+    index: Dict[str, Dict] = {}
+
+    if CFR_DIR.exists():
+        for file in sorted(CFR_DIR.glob('*.json')):
+            try:
+                with open(file, 'r') as f:
+                    schedule = json.load(f)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable CFR schedule: {file.name}")
+                continue
+
+            for code, section, value in _iter_cfr_code_definitions(schedule):
+                data = value if isinstance(value, dict) else None
+                name = value if isinstance(value, str) else (data or {}).get('name', '')
+
+                entry = index.get(code)
+                if entry is None:
+                    index[code] = {
+                        'code': code,
+                        'name': name,
+                        'data': data,
+                        'rating_formula': schedule.get('general_rating_formula'),
+                        'cfr_reference': schedule.get('cfr_reference'),
+                        'schedule': file.stem,
+                        'section': section,
+                        'dbqs': [],
+                    }
+                else:
+                    # Later definitions only fill in what earlier ones lacked
+                    if entry['data'] is None and data is not None:
+                        entry['data'] = data
+                    # Plain-string definitions are the canonical code titles
+                    if isinstance(value, str) or not entry['name']:
+                        entry['name'] = name or entry['name']
+
+    dbq_ranges = []
+    for dbq in _load_dbq_catalog():
+        singles, ranges = _split_diagnostic_codes(dbq.get('diagnostic_codes', []))
+        dbq_ranges.extend((start, end, dbq) for start, end in ranges)
+        for code in singles:
+            entry = index.get(code)
+            if entry is None:
+                with open(DBQ_DIR / f"{dbq['file']}.json", 'r') as f:
+                    dbq_data = json.load(f)
+                entry = index[code] = {
+                    'code': code,
+                    'name': dbq.get('condition', ''),
+                    'data': dbq_data.get('rating_criteria'),
+                    'rating_formula': None,
+                    'cfr_reference': dbq_data.get('cfr_reference'),
+                    'schedule': None,
+                    'section': None,
+                    'dbqs': [],
+                }
+            entry['dbqs'].append(dbq)
+
+    # Ranges only attach to codes defined elsewhere; they never invent codes
+    for start, end, dbq in dbq_ranges:
+        for code, entry in index.items():
+            if start <= int(code) <= end and dbq not in entry['dbqs']:
+                entry['dbqs'].append(dbq)
+
+    return index
+
@@ -16,6 +16,7 @@ from django.db import transaction
 
 from agents.models import M21ManualSection, M21ScrapeJob, M21TopicIndex
 from agents.knowva_scraper import KnowVAScraper, KNOWN_ARTICLE_IDS
+from agents.m21_archive import M21HtmlArchive, reparse_archive
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +48,7 @@ def scrape_m21_section(self, article_id: str, force_update: bool = False):
                 }
 
         # Scrape
-        scraper = KnowVAScraper(headless=True, rate_limit=3.0)
+        scraper = KnowVAScraper(headless=True, rate_limit=3.0, archive=M21HtmlArchive.from_settings())
         data = scraper.scrape_section(article_id)
 
         if not data:
@@ -58,15 +59,21 @@ def scrape_m21_section(self, article_id: str, force_update: bool = False):
             }
 
         # Save to database
-        section = _save_section_data(data, force_update)
+        section, changed = _save_section_data(data, force_update)
 
         if section:
+            if changed:
+                update_m21_topic_indices([section.id])
+            else:
+                M21ManualSection.objects.filter(id=section.id).update(last_scraped=timezone.now())
+
             logger.info(f"Successfully scraped and saved article {article_id}: {section.reference}")
             return {
                 'status': 'success',
                 'section_id': section.id,
                 'reference': section.reference,
-                'title': section.title
+                'title': section.title,
+                'changed': changed
             }
         else:
             logger.error(f"Failed to save section for article {article_id}")
@@ -84,13 +91,16 @@ def scrape_m21_section(self, article_id: str, force_update: bool = False):
 
 
 @shared_task
-def scrape_m21_bulk(article_ids: list, force_update: bool = False):
+def scrape_m21_bulk(article_ids: list, force_update: bool = False, concurrency: int = None):
     """
     Scrape multiple M21-1 sections in bulk.
 
+    Uses the scraper's session mode: one browser, several concurrent pages.
+
     Args:
         article_ids: List of KnowVA article IDs
         force_update: Whether to update existing sections
+        concurrency: Number of pages to scrape at once (scraper default if None)
 
     Returns:
         Dict with summary of results
@@ -109,47 +119,69 @@ def scrape_m21_bulk(article_ids: list, force_update: bool = False):
     failed = 0
     skipped = 0
     errors = []
+    changed_ids = []
+    unchanged_ids = []
+
+    # Skip existing sections up front so the browser session only sees real work
+    to_scrape = list(article_ids)
+    if not force_update:
+        existing_ids = set(
+            M21ManualSection.objects.filter(article_id__in=to_scrape)
+            .values_list('article_id', flat=True)
+        )
+        to_scrape = [a for a in to_scrape if a not in existing_ids]
+        skipped = len(article_ids) - len(to_scrape)
+        if skipped:
+            scrape_job.sections_completed += skipped
+            scrape_job.save()
 
-    scraper = KnowVAScraper(headless=True, rate_limit=3.0)
+    scraper = KnowVAScraper(headless=True, rate_limit=3.0, archive=M21HtmlArchive.from_settings())
 
-    for article_id in article_ids:
-        try:
-            # Check if exists
-            if not force_update:
-                existing = M21ManualSection.objects.filter(article_id=article_id).first()
-                if existing:
-                    skipped += 1
-                    scrape_job.sections_completed += 1
+    try:
+        # One browser for the whole batch, several pages in flight
+        for article_id, data in scraper.scrape_session(to_scrape, concurrency=concurrency):
+            try:
+                if not data:
+                    failed += 1
+                    scrape_job.sections_failed += 1
+                    errors.append(f"Article {article_id}: No data returned")
                     scrape_job.save()
                     continue
 
-            # Scrape
-            data = scraper.scrape_section(article_id)
+                # Save
+                section, changed = _save_section_data(data, force_update)
 
-            if not data:
+                if section:
+                    successful += 1
+                    scrape_job.sections_completed += 1
+                    (changed_ids if changed else unchanged_ids).append(section.id)
+                else:
+                    failed += 1
+                    scrape_job.sections_failed += 1
+                    errors.append(f"Article {article_id}: Save failed")
+
+            except Exception as e:
+                logger.error(f"Error saving article {article_id}: {e}", exc_info=True)
                 failed += 1
                 scrape_job.sections_failed += 1
-                errors.append(f"Article {article_id}: No data returned")
-                continue
-
-            # Save
-            section = _save_section_data(data, force_update)
+                errors.append(f"Article {article_id}: {str(e)}")
 
-            if section:
-                successful += 1
-                scrape_job.sections_completed += 1
-            else:
-                failed += 1
-                scrape_job.sections_failed += 1
-                errors.append(f"Article {article_id}: Save failed")
+            scrape_job.save()
+    except Exception as e:
+        # Browser session failed; everything not yet reported counts as failed
+        logger.error(f"M21 scrape session failed: {e}", exc_info=True)
+        remaining = len(to_scrape) - (successful + failed)
+        failed += remaining
+        scrape_job.sections_failed += remaining
+        errors.append(f"Scrape session failed: {str(e)}")
 
-        except Exception as e:
-            logger.error(f"Error scraping article {article_id}: {e}", exc_info=True)
-            failed += 1
-            scrape_job.sections_failed += 1
-            errors.append(f"Article {article_id}: {str(e)}")
+    # Unchanged sections were verified fresh; bump last_scraped without rewriting them
+    if unchanged_ids:
+        M21ManualSection.objects.filter(id__in=unchanged_ids).update(last_scraped=timezone.now())
 
-        scrape_job.save()
+    # Rebuild derived indexes only for what changed
+    if changed_ids:
+        update_m21_topic_indices(changed_ids)
 
     # Finalize job
     scrape_job.completed_at = timezone.now()
@@ -167,18 +199,26 @@ def scrape_m21_bulk(article_ids: list, force_update: bool = False):
         'total': len(article_ids),
         'successful': successful,
         'failed': failed,
-        'skipped': skipped
+        'skipped': skipped,
+        'changed': len(changed_ids),
+        'unchanged': len(unchanged_ids),
+        'changed_section_ids': changed_ids
     }
     scrape_job.error_log = '\n'.join(errors)
     scrape_job.save()
 
-    logger.info(f"Bulk scrape complete: {successful} success, {failed} failed, {skipped} skipped")
+    logger.info(
+        f"Bulk scrape complete: {successful} success ({len(changed_ids)} changed), "
+        f"{failed} failed, {skipped} skipped"
+    )
 
     return {
         'job_id': scrape_job.id,
         'successful': successful,
         'failed': failed,
         'skipped': skipped,
+        'changed_section_ids': changed_ids,
+        'unchanged': len(unchanged_ids),
         'duration': duration
     }
 
@@ -197,7 +237,10 @@ def scrape_m21_all_known():
 @shared_task
 def update_stale_m21_sections(days_old: int = 30):
     """
-    Update M21 sections that haven't been updated in X days.
+    Re-check M21 sections that haven't been scraped in X days.
+
+    Sections whose content hash is unchanged are not rewritten; only changed
+    sections are saved and reindexed (see scrape_m21_bulk).
 
     Args:
         days_old: Number of days after which a section is considered stale
@@ -219,129 +262,231 @@ def update_stale_m21_sections(days_old: int = 30):
         return {'status': 'no_updates_needed'}
 
 
+@shared_task
+def reparse_m21_archive(article_ids: list = None, workers: int = 1):
+    """
+    Re-run the parse stage over archived KnowVA HTML without re-fetching.
+
+    Use after changing the parser: every archived page is parsed again and
+    saved, and only sections whose content hash changed are reindexed.
+
+    Args:
+        article_ids: Article IDs to re-parse (all archived articles if None)
+        workers: Parser processes; keep 1 inside Celery prefork workers,
+            which cannot spawn child processes
+
+    Returns:
+        Dict with summary of results
+    """
+    archive = M21HtmlArchive.from_settings()
+    logger.info(f"Re-parsing archived M21 HTML from {archive.root}")
+
+    successful = 0
+    failed = 0
+    errors = []
+    changed_ids = []
+
+    for article_id, data in reparse_archive(archive, article_ids, workers=workers):
+        if not data:
+            failed += 1
+            errors.append(f"Article {article_id}: No data parsed")
+            continue
+        try:
+            section, changed = _save_section_data(data, force_update=True)
+        except Exception as e:
+            logger.error(f"Error saving re-parsed article {article_id}: {e}", exc_info=True)
+            failed += 1
+            errors.append(f"Article {article_id}: {str(e)}")
+            continue
+        if section:
+            successful += 1
+            if changed:
+                changed_ids.append(section.id)
+        else:
+            failed += 1
+            errors.append(f"Article {article_id}: Save failed")
+
+    if changed_ids:
+        update_m21_topic_indices(changed_ids)
+
+    logger.info(
+        f"Archive re-parse complete: {successful} success ({len(changed_ids)} changed), {failed} failed"
+    )
+
+    return {
+        'successful': successful,
+        'failed': failed,
+        'changed_section_ids': changed_ids,
+        'errors': errors
+    }
+
+
+# Topic indices built over M21 sections by keyword (case-insensitive substring)
+M21_TOPIC_CONFIGS = [
+    {
+        'topic': 'service_connection',
+        'title': 'Service Connection',
+        'description': 'How VA establishes service connection for disabilities',
+        'keywords': [
+            'service connection', 'service-connection', 'nexus', 'in-service',
+            'direct service', 'secondary service', 'presumptive', 'aggravation'
+        ],
+        'priority': 100
+    },
+    {
+        'topic': 'rating_process',
+        'title': 'Rating Process',
+        'description': 'How VA rates disabilities and assigns percentages',
+        'keywords': [
+            'rating', 'evaluation', 'diagnostic code', 'schedule for rating',
+            'percentage', 'combined rating'
+        ],
+        'priority': 90
+    },
+    {
+        'topic': 'evidence',
+        'title': 'Evidence Requirements',
+        'description': 'What evidence VA needs and how it weighs evidence',
+        'keywords': [
+            'evidence', 'medical records', 'lay evidence', 'buddy statement',
+            'nexus letter', 'weighing evidence', 'credibility'
+        ],
+        'priority': 85
+    },
+    {
+        'topic': 'examinations',
+        'title': 'C&P Examinations',
+        'description': 'Compensation & Pension exam procedures',
+        'keywords': [
+            'examination', 'C&P', 'DBQ', 'medical opinion', 'examiner', 'exam request'
+        ],
+        'priority': 80
+    },
+    {
+        'topic': 'effective_dates',
+        'title': 'Effective Dates',
+        'description': 'How VA determines effective dates for benefits',
+        'keywords': [
+            'effective date', 'date of claim', 'date entitlement', 'earlier effective date'
+        ],
+        'priority': 75
+    },
+    {
+        'topic': 'tdiu',
+        'title': 'TDIU - Individual Unemployability',
+        'description': 'Unemployability due to service-connected disabilities',
+        'keywords': [
+            'TDIU', 'unemployability', 'individual unemployability', 'unable to work',
+            'substantially gainful'
+        ],
+        'priority': 70
+    },
+    {
+        'topic': 'special_monthly_compensation',
+        'title': 'Special Monthly Compensation (SMC)',
+        'description': 'Additional compensation for severe disabilities',
+        'keywords': [
+            'special monthly compensation', 'SMC', 'aid and attendance', 'housebound'
+        ],
+        'priority': 65
+    },
+]
+
+
+def _build_topic_matcher(topic_configs: list) -> dict:
+    """
+    Merge all topics' keywords into one keyword -> topics table.
+
+    Keywords shared between topics are checked once per section instead of
+    once per topic.
+    """
+    topics_by_keyword = {}
+    for config in topic_configs:
+        for keyword in config['keywords']:
+            topics_by_keyword.setdefault(keyword.lower(), set()).add(config['topic'])
+    return topics_by_keyword
+
+
+def _match_section_topics(text: str, topics_by_keyword: dict) -> set:
+    """Return the set of topics whose keywords appear in text."""
+    text = text.lower()
+    matched = set()
+    for keyword, topics in topics_by_keyword.items():
+        # Skip the substring scan when every topic for this keyword already matched
+        if not topics <= matched and keyword in text:
+            matched |= topics
+    return matched
+
+
+def _sync_topic_index_row(config: dict):
+    """Create or update the M21TopicIndex row for a configured topic."""
+    topic_index, created = M21TopicIndex.objects.get_or_create(
+        topic=config['topic'],
+        defaults={
+            'title': config['title'],
+            'description': config['description'],
+            'keywords': config['keywords'],
+            'priority': config['priority']
+        }
+    )
+
+    if not created:
+        # Update if changed
+        topic_index.title = config['title']
+        topic_index.description = config['description']
+        topic_index.keywords = config['keywords']
+        topic_index.priority = config['priority']
+        topic_index.save()
+
+    return topic_index
+
+
+def _match_sections_to_topics(sections) -> dict:
+    """Single pass over a section queryset: topic -> matching section IDs."""
+    topics_by_keyword = _build_topic_matcher(M21_TOPIC_CONFIGS)
+    section_ids_by_topic = {config['topic']: [] for config in M21_TOPIC_CONFIGS}
+
+    rows = sections.values_list('id', 'title', 'overview', 'content').order_by('id')
+    for section_id, title, overview, content in rows.iterator(chunk_size=500):
+        search_text = ' '.join([title, overview, content])
+        for topic in _match_section_topics(search_text, topics_by_keyword):
+            section_ids_by_topic[topic].append(section_id)
+
+    return section_ids_by_topic
+
+
+def _topic_links(topic_index, section_ids: list) -> list:
+    Through = M21TopicIndex.sections.through
+    return [
+        Through(m21topicindex_id=topic_index.id, m21manualsection_id=section_id)
+        for section_id in section_ids
+    ]
+
+
 @shared_task
 def build_m21_topic_indices():
     """
     Build/rebuild topic-based indices for M21 sections.
 
-    Scans all M21 sections and associates them with topics based on keywords.
+    Scans all M21 sections once, matching every topic's keywords in a single
+    pass, then replaces each topic's section links with one bulk insert.
     """
     logger.info("Building M21 topic indices")
 
-    # Get or create topic indices
-    topic_configs = [
-        {
-            'topic': 'service_connection',
-            'title': 'Service Connection',
-            'description': 'How VA establishes service connection for disabilities',
-            'keywords': [
-                'service connection', 'service-connection', 'nexus', 'in-service',
-                'direct service', 'secondary service', 'presumptive', 'aggravation'
-            ],
-            'priority': 100
-        },
-        {
-            'topic': 'rating_process',
-            'title': 'Rating Process',
-            'description': 'How VA rates disabilities and assigns percentages',
-            'keywords': [
-                'rating', 'evaluation', 'diagnostic code', 'schedule for rating',
-                'percentage', 'combined rating'
-            ],
-            'priority': 90
-        },
-        {
-            'topic': 'evidence',
-            'title': 'Evidence Requirements',
-            'description': 'What evidence VA needs and how it weighs evidence',
-            'keywords': [
-                'evidence', 'medical records', 'lay evidence', 'buddy statement',
-                'nexus letter', 'weighing evidence', 'credibility'
-            ],
-            'priority': 85
-        },
-        {
-            'topic': 'examinations',
-            'title': 'C&P Examinations',
-            'description': 'Compensation & Pension exam procedures',
-            'keywords': [
-                'examination', 'C&P', 'DBQ', 'medical opinion', 'examiner', 'exam request'
-            ],
-            'priority': 80
-        },
-        {
-            'topic': 'effective_dates',
-            'title': 'Effective Dates',
-            'description': 'How VA determines effective dates for benefits',
-            'keywords': [
-                'effective date', 'date of claim', 'date entitlement', 'earlier effective date'
-            ],
-            'priority': 75
-        },
-        {
-            'topic': 'tdiu',
-            'title': 'TDIU - Individual Unemployability',
-            'description': 'Unemployability due to service-connected disabilities',
-            'keywords': [
-                'TDIU', 'unemployability', 'individual unemployability', 'unable to work',
-                'substantially gainful'
-            ],
-            'priority': 70
-        },
-        {
-            'topic': 'special_monthly_compensation',
-            'title': 'Special Monthly Compensation (SMC)',
-            'description': 'Additional compensation for severe disabilities',
-            'keywords': [
-                'special monthly compensation', 'SMC', 'aid and attendance', 'housebound'
-            ],
-            'priority': 65
-        },
-    ]
-
+    section_ids_by_topic = _match_sections_to_topics(M21ManualSection.objects.all())
+    Through = M21TopicIndex.sections.through
     updated_count = 0
 
-    for config in topic_configs:
-        topic_index, created = M21TopicIndex.objects.get_or_create(
-            topic=config['topic'],
-            defaults={
-                'title': config['title'],
-                'description': config['description'],
-                'keywords': config['keywords'],
-                'priority': config['priority']
-            }
-        )
+    for config in M21_TOPIC_CONFIGS:
+        with transaction.atomic():
+            topic_index = _sync_topic_index_row(config)
+
+            # Replace existing associations
+            section_ids = section_ids_by_topic[config['topic']]
+            Through.objects.filter(m21topicindex=topic_index).delete()
+            Through.objects.bulk_create(_topic_links(topic_index, section_ids), batch_size=1000)
 
-        if not created:
-            # Update if changed
-            topic_index.title = config['title']
-            topic_index.description = config['description']
-            topic_index.keywords = config['keywords']
-            topic_index.priority = config['priority']
-            topic_index.save()
-
-        # Clear existing associations
-        topic_index.sections.clear()
-
-        # Find matching sections
-        keywords_lower = [k.lower() for k in config['keywords']]
-
-        for section in M21ManualSection.objects.all():
-            # Build searchable text
-            search_text = ' '.join([
-                section.title,
-                section.overview,
-                section.content
-            ]).lower()
-
-            # Check for keyword matches
-            for keyword in keywords_lower:
-                if keyword in search_text:
-                    topic_index.sections.add(section)
-                    break
-
-        section_count = topic_index.sections.count()
-        logger.info(f"Topic '{config['title']}': {section_count} sections")
+        logger.info(f"Topic '{config['title']}': {len(section_ids)} sections")
         updated_count += 1
 
     logger.info(f"Built {updated_count} topic indices")
@@ -352,17 +497,61 @@ def build_m21_topic_indices():
     }
 
 
+@shared_task
+def update_m21_topic_indices(section_ids: list):
+    """
+    Re-match only the given sections against the topic indices.
+
+    Used after a refresh with the changed-sections list, so index
+    maintenance scales with what changed rather than corpus size. Falls back
+    to a full build if the topic indices don't exist yet.
+
+    Args:
+        section_ids: IDs of M21 sections whose content changed
+    """
+    topics = [config['topic'] for config in M21_TOPIC_CONFIGS]
+    topic_indices = {t.topic: t for t in M21TopicIndex.objects.filter(topic__in=topics)}
+    if len(topic_indices) < len(topics):
+        return build_m21_topic_indices()
+
+    section_ids = list(section_ids)
+    section_ids_by_topic = _match_sections_to_topics(
+        M21ManualSection.objects.filter(id__in=section_ids)
+    )
+
+    Through = M21TopicIndex.sections.through
+    with transaction.atomic():
+        Through.objects.filter(
+            m21topicindex__in=topic_indices.values(),
+            m21manualsection_id__in=section_ids
+        ).delete()
+        links = []
+        for topic, matched_ids in section_ids_by_topic.items():
+            links.extend(_topic_links(topic_indices[topic], matched_ids))
+        Through.objects.bulk_create(links, batch_size=1000)
+
+    logger.info(f"Updated M21 topic indices for {len(section_ids)} changed sections")
+
+    return {
+        'status': 'success',
+        'sections_updated': len(section_ids)
+    }
+
+
 @transaction.atomic
 def _save_section_data(data: dict, force_update: bool = False):
     """
     Helper function to save scraped section data.
 
+    Existing rows whose normalized content hash is unchanged are not
+    rewritten, so nothing derived from them needs rebuilding.
+
     Args:
         data: Scraped section data
         force_update: Whether to update existing records
 
     Returns:
-        M21ManualSection instance or None
+        Tuple of (M21ManualSection instance or None, whether content changed)
     """
     section_data = {
         'article_id': data.get('article_id'),
@@ -389,16 +578,25 @@ def _save_section_data(data: dict, force_update: bool = False):
         })
 
     if data.get('article_id'):
-        section, created = M21ManualSection.objects.update_or_create(
-            article_id=data['article_id'],
-            defaults=section_data
-        )
+        lookup = {'article_id': data['article_id']}
     elif data.get('reference'):
-        section, created = M21ManualSection.objects.update_or_create(
-            reference=data['reference'],
-            defaults=section_data
-        )
+        lookup = {'reference': data['reference']}
     else:
         section = M21ManualSection.objects.create(**section_data)
+        return section, True
+
+    section = M21ManualSection.objects.select_for_update().filter(**lookup).first()
+    if section is None:
+        section = M21ManualSection.objects.create(**section_data)
+        return section, True
+
+    previous_hash = section.content_hash
+    previous_status = section.scrape_status
+    for field, value in section_data.items():
+        setattr(section, field, value)
+
+    if previous_hash and section.compute_content_hash() == previous_hash and previous_status == 'success':
+        return section, False
 
-    return section
+    section.save()
+    return section, True
@@ -19,6 +19,7 @@ Covers:
 import json
 import pytest
 from datetime import date, timedelta
+from pathlib import Path
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
 
@@ -506,6 +507,47 @@ class TestM21ManualSectionModel(TestCase):
         )
         self.assertEqual(len(section.topics), 3)
 
+    def test_content_hash_ignores_whitespace(self):
+        """Layout-only whitespace changes don't change the content hash."""
+        section = M21ManualSection.objects.create(
+            part="V",
+            part_number=5,
+            subpart="ii",
+            chapter="2",
+            section="A",
+            reference="M21-1.V.ii.2.A.hash",
+            title="Service Connection",
+            content="Service connection\nrequires a nexus.",
+        )
+        original = section.content_hash
+        self.assertEqual(len(original), 64)
+
+        section.content = "  Service connection   requires a nexus.  "
+        self.assertEqual(section.compute_content_hash(), original)
+
+        section.content = "Service connection requires a current disability."
+        self.assertNotEqual(section.compute_content_hash(), original)
+
+    def test_search_text_follows_content_changes(self):
+        """search_text is rebuilt when content changes."""
+        section = M21ManualSection.objects.create(
+            part="V",
+            part_number=5,
+            subpart="ii",
+            chapter="2",
+            section="A",
+            reference="M21-1.V.ii.2.A.search",
+            title="Service Connection",
+            content="Original wording.",
+        )
+        self.assertIn("Original wording", section.search_text)
+
+        section.content = "Revised wording."
+        section.save()
+
+        self.assertIn("Revised wording", section.search_text)
+        self.assertNotIn("Original wording", section.search_text)
+
 
 # =============================================================================
 # M21 SCRAPE JOB MODEL TESTS
@@ -656,6 +698,120 @@ class TestStatementGeneratorViews:
         assert response.status_code == 200
 
 
+# =============================================================================
+# CONDITION DISCOVERY TESTS
+# =============================================================================
+
+class TestConditionDiscoveryScoring(TestCase):
+    """Tests for the indexed condition discovery scoring."""
+
+    def test_index_buckets_cover_database(self):
+        """Branch, era and risk factor indexes agree with the condition lists."""
+        from agents.condition_discovery_data import (
+            CONDITION_DATABASE,
+            CONDITION_DISCOVERY_INDEX,
+        )
+
+        for key, condition in CONDITION_DATABASE.items():
+            for branch in condition['common_for']:
+                self.assertIn(key, CONDITION_DISCOVERY_INDEX.branch_conditions(branch))
+            if 'all' in condition['service_eras']:
+                self.assertIn(key, CONDITION_DISCOVERY_INDEX.era_conditions('vietnam'))
+            for primary in condition['secondary_to']:
+                self.assertIn(key, CONDITION_DISCOVERY_INDEX.secondaries[primary])
+
+    def test_risk_factor_matches_related_text(self):
+        """Risk factor values match condition risk factors by contained text."""
+        from agents.condition_discovery_data import CONDITION_DISCOVERY_INDEX
+
+        self.assertIn('hearing_loss', CONDITION_DISCOVERY_INDEX.risk_factor_conditions('vehicle_crew'))
+        self.assertEqual(
+            CONDITION_DISCOVERY_INDEX.risk_factor_conditions('blast_exposure'),
+            {'migraines', 'tbi'},
+        )
+        self.assertEqual(CONDITION_DISCOVERY_INDEX.risk_factor_conditions(''), set())
+
+    def test_scores_and_reasons(self):
+        """Matches are scored by branch, era and each related risk factor."""
+        from agents.condition_discovery_data import discover_conditions
+
+        results = discover_conditions('army', 'oef_oif', ['combat', 'blast_exposure'])
+        matched = {item['key']: item for item in results['matched_conditions']}
+
+        self.assertEqual(results['matched_conditions'][0]['key'], 'tbi')
+        self.assertEqual(matched['tbi']['score'], 10)
+        self.assertEqual(matched['tbi']['reasons'], [
+            'Common in Army',
+            'Associated with OEF/OIF/OND (2001-Present)',
+            'Related to combat',
+            'Related to blast exposure',
+        ])
+        self.assertEqual(matched['hearing_loss']['score'], 4)
+        scores = [item['score'] for item in results['matched_conditions']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_secondaries_from_existing_and_matched(self):
+        """Secondaries come from listed conditions and from strong matches."""
+        from agents.condition_discovery_data import discover_conditions
+
+        results = discover_conditions(existing_conditions='Rated for PTSD')
+        self.assertEqual(results['matched_conditions'], [])
+        self.assertEqual(
+            [item['key'] for item in results['secondary_conditions']],
+            ['sleep_apnea', 'migraines', 'gerd', 'erectile_dysfunction'],
+        )
+
+        # TBI is listed after migraines in the database but still counts
+        results = discover_conditions('marines', 'gulf', ['blast_exposure'])
+        self.assertIn(
+            ('migraines', 'Traumatic Brain Injury (TBI)'),
+            [(item['key'], item['secondary_to']) for item in results['secondary_conditions']],
+        )
+
+
+@pytest.mark.django_db
+class TestConditionDiscoveryViews:
+    """Tests for the condition discovery page and HTMX results endpoint."""
+
+    def test_discovery_requires_login(self, client):
+        """Condition discovery requires authentication."""
+        response = client.get(reverse('agents:condition_discovery'))
+        assert response.status_code == 302
+
+    def test_discovery_post_shows_results(self, authenticated_client):
+        """Submitting the form renders matched conditions."""
+        response = authenticated_client.post(reverse('agents:condition_discovery'), {
+            'branch': 'army',
+            'service_era': 'oef_oif',
+            'risk_factors': ['combat'],
+        })
+        assert response.status_code == 200
+        assert response.context['results'] is True
+        assert 'PTSD / Anxiety / Depression' in response.content.decode()
+
+    def test_results_endpoint_returns_partial(self, authenticated_client):
+        """The HTMX endpoint renders just the results."""
+        response = authenticated_client.post(reverse('agents:condition_discovery_results'), {
+            'branch': 'marines',
+            'risk_factors': ['parachute'],
+        })
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert 'Knee Conditions' in content
+        assert '<form' not in content
+
+    def test_results_endpoint_empty_without_selection(self, authenticated_client):
+        """Nothing is rendered until something is selected."""
+        response = authenticated_client.post(reverse('agents:condition_discovery_results'), {})
+        assert response.status_code == 200
+        assert response.content == b''
+
+    def test_results_endpoint_requires_post(self, authenticated_client):
+        """The results endpoint only accepts POST."""
+        response = authenticated_client.get(reverse('agents:condition_discovery_results'))
+        assert response.status_code == 405
+
+
 # =============================================================================
 # AGENT SERVICE TESTS (MOCKED)
 # =============================================================================
@@ -833,6 +989,655 @@ class TestM21ReferenceData(TestCase):
         self.assertEqual(stats['total'], 2)
 
 
+# =============================================================================
+# KNOWVA SCRAPER TESTS
+# =============================================================================
+
+KNOWVA_FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'knowva'
+
+
+class TestKnowVAScraperParsing(TestCase):
+    """Tests for parsing page snapshots (no browser needed)."""
+
+    def _snapshot(self, title, content, date_text=None):
+        from agents.knowva_scraper import KnowVAScraper
+
+        scraper = KnowVAScraper()
+        titles = [None] * len(scraper.TITLE_SELECTORS)
+        titles[0] = {'text': title, 'html': None}
+        contents = [None] * len(scraper.CONTENT_SELECTORS)
+        contents[0] = {'text': content, 'html': f'<div>{content}</div>'}
+        dates = [None] * len(scraper.DATE_SELECTORS)
+        if date_text:
+            dates[0] = {'text': date_text, 'html': None}
+        return scraper, {'titles': titles, 'contents': contents, 'dates': dates}
+
+    def test_parse_snapshot_extracts_structure(self):
+        """Reference, topics, references and date are parsed from a snapshot."""
+        content = (
+            "Overview\nThis section covers effective dates for compensation awards.\n"
+            "V.ii.4.A.1.a. General Rule\nSee 38 CFR 3.400 for the general rule.\n"
+            "V.ii.4.A.1.b. Separation Claims\nSee 38 CFR 3.400(b)(2).\n"
+        )
+        scraper, snapshot = self._snapshot(
+            "M21-1, Part V, Subpart ii, Chapter 4, Section A - Effective Dates",
+            content,
+            "Last Updated: March 14, 2024",
+        )
+
+        data = scraper._parse_snapshot(snapshot, '554400000180492', 'http://example/')
+
+        self.assertEqual(data['reference'], 'M21-1.V.ii.4.A')
+        self.assertEqual(data['section_title'], 'Effective Dates')
+        self.assertEqual([t['code'] for t in data['topics']], ['V.ii.4.A.1.a', 'V.ii.4.A.1.b'])
+        self.assertIn('38 CFR 3.400', data['references'])
+        self.assertEqual(data['last_updated'], 'March 14, 2024')
+
+    def test_parse_snapshot_rejects_thin_content(self):
+        """Pages without real content return None so the caller retries."""
+        scraper, snapshot = self._snapshot("M21-1 Loading", "Loading...")
+
+        self.assertIsNone(scraper._parse_snapshot(snapshot, '1', 'http://example/'))
+
+    def test_parse_html_matches_rendered_text(self):
+        """Rendered HTML parses the same way the browser's innerText would."""
+        from agents.knowva_scraper import KnowVAScraper
+
+        html = (KNOWVA_FIXTURE_DIR / '554400000180492.html').read_text()
+
+        data = KnowVAScraper().parse_html(html, '554400000180492', 'http://example/')
+
+        self.assertEqual(data['reference'], 'M21-1.V.ii.4.A')
+        self.assertEqual(len(data['topics']), 3)
+        self.assertEqual(data['last_updated'], 'March 14, 2024')
+        self.assertTrue(data['content'].startswith(
+            'Overview\n\nThis section contains information on assigning effective dates'
+        ))
+        self.assertIn('\n\nV.ii.4.A.1.b. Claims Received Within One Year of Separation\n\n', data['content'])
+
+
+class TestM21HtmlArchive(TestCase):
+    """Tests for the raw HTML archive and the offline parse stage."""
+
+    def setUp(self):
+        import tempfile
+        from agents.m21_archive import M21HtmlArchive
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archive = M21HtmlArchive(self.tmp.name)
+        self.html = (KNOWVA_FIXTURE_DIR / '554400000180492.html').read_text()
+
+    def test_store_and_load_round_trip(self):
+        """Stored pages are gzip objects addressed by SHA-256."""
+        import hashlib
+
+        digest = self.archive.store('554400000180492', 'http://example/', self.html)
+
+        self.assertEqual(digest, hashlib.sha256(self.html.encode('utf-8')).hexdigest())
+        self.assertEqual(self.archive.load(digest), self.html)
+        self.assertEqual(self.archive.get('554400000180492')['digest'], digest)
+        self.assertIsNone(self.archive.get('missing'))
+
+    def test_identical_pages_share_one_object(self):
+        """Re-fetching unchanged HTML does not add objects."""
+        self.archive.store('1', 'http://example/1', self.html)
+        self.archive.store('2', 'http://example/2', self.html)
+        self.archive.store('1', 'http://example/1', self.html)
+
+        objects = list(self.archive.objects_dir.glob('*/*.html.gz'))
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(len(self.archive.article_records()), 2)
+
+    def test_scraper_archives_fetched_html(self):
+        """The fetch stage stores raw HTML before parsing it."""
+        from agents.knowva_scraper import KnowVAScraper
+
+        scraper = KnowVAScraper(archive=self.archive)
+        data = scraper._parse_page(self.html, '554400000180492', 'http://example/')
+
+        self.assertEqual(data['reference'], 'M21-1.V.ii.4.A')
+        record = self.archive.get('554400000180492')
+        self.assertEqual(self.archive.load(record['digest']), self.html)
+
+    def test_reparse_archive_in_worker_processes(self):
+        """Archived pages parse identically inline and in a process pool."""
+        from agents.m21_archive import reparse_archive
+
+        self.archive.store('554400000180492', 'http://example/a', self.html)
+        self.archive.store('554400000180493', 'http://example/b', '<html><body>Loading...</body></html>')
+
+        inline = dict(reparse_archive(self.archive, workers=1))
+        pooled = dict(reparse_archive(self.archive, workers=2))
+
+        self.assertEqual(inline, pooled)
+        self.assertEqual(inline['554400000180492']['reference'], 'M21-1.V.ii.4.A')
+        self.assertIsNone(inline['554400000180493'])
+
+    def test_reparse_task_saves_sections(self):
+        """reparse_m21_archive saves re-parsed sections and reindexes changes."""
+        from agents import tasks
+
+        self.archive.store('554400000180492', 'http://example/a', self.html)
+
+        with patch.object(tasks.M21HtmlArchive, 'from_settings', return_value=self.archive):
+            result = tasks.reparse_m21_archive()
+            again = tasks.reparse_m21_archive(['554400000180492'])
+
+        section = M21ManualSection.objects.get(article_id='554400000180492')
+        self.assertEqual(section.reference, 'M21-1.V.ii.4.A')
+        self.assertEqual(result['changed_section_ids'], [section.id])
+        self.assertEqual(again['successful'], 1)
+        self.assertEqual(again['changed_section_ids'], [])
+
+
+class TestAsyncRateLimiter(TestCase):
+    """Tests for the shared politeness limiter."""
+
+    def test_spaces_concurrent_requests(self):
+        """Concurrent waiters are released at least one interval apart."""
+        import asyncio
+        import time
+        from agents.knowva_scraper import AsyncRateLimiter
+
+        limiter = AsyncRateLimiter(0.05)
+        released = []
+
+        async def request():
+            await limiter.wait()
+            released.append(time.monotonic())
+
+        async def run():
+            await asyncio.gather(*(request() for _ in range(4)))
+
+        asyncio.run(run())
+
+        gaps = [b - a for a, b in zip(released, released[1:])]
+        self.assertEqual(len(released), 4)
+        self.assertTrue(all(gap >= 0.045 for gap in gaps), gaps)
+
+
+class TestKnowVAScrapeSessionLifecycle(TestCase):
+    """Tests for stopping session mode and its retry policy, without a browser."""
+
+    def test_closing_generator_cancels_session(self):
+        """Stopping iteration early cancels the session and joins its thread."""
+        import asyncio
+        import threading
+        from agents.knowva_scraper import KnowVAScraper
+
+        cancelled = threading.Event()
+
+        async def fake_session(article_ids, concurrency, emit):
+            try:
+                for article_id in article_ids:
+                    emit((article_id, {'article_id': article_id}))
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        scraper = KnowVAScraper()
+        with patch.object(scraper, '_run_session', side_effect=fake_session):
+            for article_id, _ in scraper.scrape_session(['1', '2', '3']):
+                break
+
+        self.assertEqual(article_id, '1')
+        self.assertTrue(cancelled.is_set())
+        self.assertFalse(any(
+            t.name == 'knowva-scrape-session' for t in threading.enumerate()
+        ))
+
+    def _scrape_with_status(self, status):
+        import asyncio
+        from unittest.mock import AsyncMock, MagicMock
+        from agents.knowva_scraper import AsyncRateLimiter, KnowVAScraper
+
+        scraper = KnowVAScraper()
+        scraper.RETRY_DELAY = 0
+        page = MagicMock()
+        page.goto = AsyncMock(return_value=MagicMock(status=status))
+
+        result = asyncio.run(scraper._scrape_in_session(page, '1', AsyncRateLimiter(0)))
+        return result, page.goto.await_count
+
+    def test_client_errors_are_not_retried(self):
+        """A 4xx response fails the article without retrying."""
+        result, attempts = self._scrape_with_status(404)
+
+        self.assertIsNone(result)
+        self.assertEqual(attempts, 1)
+
+    def test_server_errors_are_retried(self):
+        """A 5xx response is retried up to RETRY_ATTEMPTS times."""
+        from agents.knowva_scraper import KnowVAScraper
+
+        result, attempts = self._scrape_with_status(503)
+
+        self.assertIsNone(result)
+        self.assertEqual(attempts, KnowVAScraper.RETRY_ATTEMPTS)
+
+    def test_pages_parsed_off_the_event_loop(self):
+        """Archiving and parsing a fetched page run in a worker thread."""
+        import asyncio
+        import threading
+        from unittest.mock import AsyncMock, MagicMock
+        from agents.knowva_scraper import AsyncRateLimiter, KnowVAScraper
+
+        scraper = KnowVAScraper()
+        page = MagicMock()
+        page.goto = AsyncMock(return_value=MagicMock(status=200))
+        page.wait_for_selector = AsyncMock()
+        page.content = AsyncMock(return_value='<html></html>')
+        parsed_on = []
+
+        def parse_page(html, article_id, url):
+            parsed_on.append(threading.get_ident())
+            return {'article_id': article_id}
+
+        async def run():
+            with patch.object(scraper, '_parse_page', side_effect=parse_page):
+                data = await scraper._scrape_in_session(page, '1', AsyncRateLimiter(0))
+            return data, threading.get_ident()
+
+        data, loop_thread = asyncio.run(run())
+
+        self.assertEqual(data, {'article_id': '1'})
+        self.assertEqual(len(parsed_on), 1)
+        self.assertNotEqual(parsed_on[0], loop_thread)
+
+
+@pytest.fixture
+def knowva_fixture_server():
+    """Serve recorded KnowVA pages at /content/<article_id>/ on localhost."""
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            article_id = self.path.strip('/').split('/')[-1]
+            page = KNOWVA_FIXTURE_DIR / f'{article_id}.html'
+            if not page.exists():
+                self.send_error(404)
+                return
+            body = page.read_bytes()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/content/{{article_id}}/'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def chromium_available():
+    """Skip when no Playwright Chromium build is installed."""
+    from playwright.sync_api import sync_playwright
+
+    try:
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+    except Exception as e:
+        pytest.skip(f"Chromium not available: {e}")
+
+
+@pytest.mark.slow
+class TestKnowVAScrapeSession:
+    """Session-mode scraping against a local server of recorded pages."""
+
+    def test_session_scrapes_fixture_pages(self, knowva_fixture_server, chromium_available):
+        """One browser scrapes static and JS-rendered pages concurrently."""
+        from agents.knowva_scraper import KnowVAScraper
+
+        scraper = KnowVAScraper(rate_limit=0.01, base_url=knowva_fixture_server)
+        scraper.RETRY_ATTEMPTS = 1
+
+        results = dict(scraper.scrape_session(
+            ['554400000180492', '554400000181474', '999'],
+            concurrency=3,
+        ))
+
+        assert results['554400000180492']['reference'] == 'M21-1.V.ii.4.A'
+        assert len(results['554400000180492']['topics']) == 3
+        # Rendered by script after load: found by waiting on the content selector
+        assert results['554400000181474']['reference'] == 'M21-1.I.i.1.A'
+        assert '38 CFR 3.159' in results['554400000181474']['references']
+        assert results['999'] is None
+
+    def test_scrape_m21_bulk_uses_session(self, db, knowva_fixture_server, chromium_available):
+        """The bulk task saves sections scraped in session mode."""
+        from agents import tasks
+        from agents.knowva_scraper import KnowVAScraper
+
+        def make_scraper(**kwargs):
+            return KnowVAScraper(rate_limit=0.01, base_url=knowva_fixture_server)
+
+        with patch.object(tasks, 'KnowVAScraper', side_effect=make_scraper):
+            result = tasks.scrape_m21_bulk(['554400000180492', '554400000181474'])
+
+        assert result['successful'] == 2
+        assert M21ManualSection.objects.filter(reference='M21-1.V.ii.4.A').exists()
+
+
+# =============================================================================
+# M21 TOPIC INDEX TASK TESTS
+# =============================================================================
+
+class TestBuildM21TopicIndices(TestCase):
+    """Tests for the build_m21_topic_indices task."""
+
+    def _create_section(self, ref, title, content, overview=''):
+        return M21ManualSection.objects.create(
+            part="V",
+            part_number=5,
+            subpart="ii",
+            chapter="1",
+            section=ref,
+            reference=f"M21-1.V.ii.1.{ref}",
+            title=title,
+            overview=overview,
+            content=content,
+        )
+
+    def test_sections_linked_to_matching_topics(self):
+        """Sections are linked to every topic whose keywords they contain."""
+        from agents.models import M21TopicIndex
+        from agents.tasks import build_m21_topic_indices
+
+        sc = self._create_section("A", "Direct Service Connection", "Requires a NEXUS.")
+        tdiu = self._create_section("B", "Unemployability", "Substantially gainful employment.")
+        both = self._create_section("C", "Misc", "Evidence", overview="See the DBQ for TDIU.")
+        self._create_section("D", "Unrelated", "Nothing to see here.")
+
+        result = build_m21_topic_indices()
+
+        self.assertEqual(result['topics_updated'], 7)
+        topics = {t.topic: set(t.sections.values_list('id', flat=True))
+                  for t in M21TopicIndex.objects.all()}
+        self.assertEqual(topics['service_connection'], {sc.id})
+        self.assertEqual(topics['tdiu'], {tdiu.id, both.id})
+        self.assertEqual(topics['examinations'], {both.id})
+        self.assertEqual(topics['evidence'], {both.id})
+
+    def test_prefix_keywords_still_match(self):
+        """A longer keyword match also credits shorter keywords it starts with."""
+        from agents.models import M21TopicIndex
+        from agents.tasks import build_m21_topic_indices
+
+        section = self._create_section("A", "Opinions", "Submit a nexus letter.")
+
+        build_m21_topic_indices()
+
+        self.assertIn(section, M21TopicIndex.objects.get(topic='evidence').sections.all())
+        self.assertIn(section, M21TopicIndex.objects.get(topic='service_connection').sections.all())
+
+    def test_rebuild_replaces_stale_links(self):
+        """Rebuilding drops links for sections that no longer match."""
+        from agents.models import M21TopicIndex
+        from agents.tasks import build_m21_topic_indices
+
+        section = self._create_section("A", "TDIU", "Individual unemployability.")
+        build_m21_topic_indices()
+
+        section.title = "Other"
+        section.content = "No longer relevant."
+        section.save()
+        build_m21_topic_indices()
+
+        self.assertEqual(M21TopicIndex.objects.get(topic='tdiu').sections.count(), 0)
+
+
+# =============================================================================
+# INCREMENTAL M21 REFRESH TESTS
+# =============================================================================
+
+class TestIncrementalM21Refresh(TestCase):
+    """Tests for content-hash based M21 refreshes."""
+
+    def _scraped(self, article_id, ref, content):
+        return {
+            'article_id': article_id,
+            'url': f'https://example.test/{article_id}/',
+            'title': f'M21-1, Part V, Subpart ii, Chapter 1, Section {ref} - Title',
+            'section_title': f'Section {ref}',
+            'content': content,
+            'overview': '',
+            'topics': [],
+            'references': [],
+            'part': 'V',
+            'part_number': 5,
+            'subpart': 'ii',
+            'chapter': '1',
+            'section': ref,
+            'reference': f'M21-1.V.ii.1.{ref}',
+        }
+
+    def test_unchanged_content_is_not_rewritten(self):
+        """Saving identical content reports no change and skips the write."""
+        from agents.tasks import _save_section_data
+
+        data = self._scraped('100', 'A', 'Service connection requires a nexus.')
+        section, changed = _save_section_data(data, force_update=True)
+        self.assertTrue(changed)
+        updated_at = section.updated_at
+
+        data['content'] = 'Service connection   requires a nexus.\n'
+        section, changed = _save_section_data(data, force_update=True)
+
+        self.assertFalse(changed)
+        section.refresh_from_db()
+        self.assertEqual(section.updated_at, updated_at)
+
+    def test_backfill_migration_lets_first_refresh_skip_unchanged(self):
+        """Rows saved before content_hash existed are hashed by the data migration."""
+        from importlib import import_module
+        from django.apps import apps
+        from agents.tasks import _save_section_data
+
+        data = self._scraped('100', 'A', 'Service connection requires a nexus.')
+        section, _ = _save_section_data(data)
+        M21ManualSection.objects.filter(id=section.id).update(content_hash='')
+
+        migration = import_module('agents.migrations.0011_backfill_m21_content_hash')
+        migration.backfill_content_hash(apps, None)
+
+        section.refresh_from_db()
+        self.assertEqual(section.content_hash, section.compute_content_hash())
+        _, changed = _save_section_data(data, force_update=True)
+        self.assertFalse(changed)
+
+    def test_changed_content_is_saved(self):
+        """Saving different content reports a change and persists it."""
+        from agents.tasks import _save_section_data
+
+        _save_section_data(self._scraped('100', 'A', 'Old text.'), force_update=True)
+        section, changed = _save_section_data(
+            self._scraped('100', 'A', 'New text about TDIU.'), force_update=True
+        )
+
+        self.assertTrue(changed)
+        section.refresh_from_db()
+        self.assertEqual(section.content, 'New text about TDIU.')
+        self.assertIn('TDIU', section.search_text)
+
+    def test_bulk_refresh_reports_and_reindexes_only_changed(self):
+        """A forced refresh emits changed IDs and updates their topic links only."""
+        from agents import tasks
+        from agents.models import M21TopicIndex
+
+        same = self._scraped('100', 'A', 'Effective date rules.')
+        changing = self._scraped('200', 'B', 'General procedures.')
+        tasks._save_section_data(same)
+        tasks._save_section_data(changing)
+        tasks.build_m21_topic_indices()
+
+        changed_data = dict(changing, content='Individual unemployability (TDIU) rules.')
+        scraper = MagicMock()
+        scraper.scrape_session.return_value = iter([('100', same), ('200', changed_data)])
+
+        with patch.object(tasks, 'KnowVAScraper', return_value=scraper), \
+                patch.object(tasks, 'update_m21_topic_indices',
+                             wraps=tasks.update_m21_topic_indices) as update_indices:
+            result = tasks.scrape_m21_bulk(['100', '200'], force_update=True)
+
+        changed_id = M21ManualSection.objects.get(article_id='200').id
+        self.assertEqual(result['changed_section_ids'], [changed_id])
+        self.assertEqual(result['unchanged'], 1)
+        update_indices.assert_called_once_with([changed_id])
+
+        tdiu = M21TopicIndex.objects.get(topic='tdiu')
+        self.assertEqual(list(tdiu.sections.values_list('id', flat=True)), [changed_id])
+        effective = M21TopicIndex.objects.get(topic='effective_dates')
+        self.assertEqual(effective.sections.count(), 1)
+
+    def test_incremental_topic_update_drops_stale_links(self):
+        """update_m21_topic_indices replaces links only for the given sections."""
+        from agents import tasks
+        from agents.models import M21TopicIndex
+
+        a, _ = tasks._save_section_data(self._scraped('100', 'A', 'TDIU overview.'))
+        b, _ = tasks._save_section_data(self._scraped('200', 'B', 'TDIU details.'))
+        tasks.build_m21_topic_indices()
+
+        M21ManualSection.objects.filter(id=a.id).update(content='Nothing relevant.')
+        tasks.update_m21_topic_indices([a.id])
+
+        tdiu = M21TopicIndex.objects.get(topic='tdiu')
+        self.assertEqual(list(tdiu.sections.values_list('id', flat=True)), [b.id])
+
+
+
+
+class TestDiagnosticCodeIndex(TestCase):
+    """Tests for the diagnostic code index over CFR schedules and DBQs."""
+
+    def test_codes_resolve_across_all_schedules(self):
+        """Codes from every body system resolve, not just the routed prefixes."""
+        from agents.reference_data import get_rating_criteria_by_code
+
+        expected = {
+            '9411': 'cfr_4_130_mental_disorders',
+            '5260': 'cfr_4_71a_knee',
+            '5243': 'cfr_4_71a_spine',
+            '8100': 'cfr_4_124a_neurological',
+            '8520': 'cfr_4_124a_neurological',
+            '6847': 'cfr_4_97_respiratory',
+            '7101': 'cfr_4_104_cardiovascular',
+            '7913': 'cfr_4_119_endocrine',
+        }
+        for code, schedule in expected.items():
+            criteria = get_rating_criteria_by_code(code)
+            self.assertIsNotNone(criteria, code)
+            self.assertEqual(criteria['schedule'], schedule)
+            self.assertTrue(criteria['cfr_reference'])
+
+    def test_string_definitions_keep_name_and_formula(self):
+        """Mental disorder codes carry their name and the general rating formula."""
+        from agents.reference_data import get_rating_criteria_by_code
+
+        criteria = get_rating_criteria_by_code('9411')
+        self.assertEqual(criteria['name'], 'Post-traumatic stress disorder')
+        self.assertIsNotNone(criteria['rating_formula'])
+
+    def test_dbq_only_codes_are_indexed(self):
+        """Codes listed only on a DBQ fall back to the DBQ's rating criteria."""
+        from agents.reference_data import get_rating_criteria_by_code
+
+        criteria = get_rating_criteria_by_code('8045')
+        self.assertIsNotNone(criteria)
+        self.assertIsNone(criteria['schedule'])
+        self.assertEqual([d['file'] for d in criteria['dbqs']], ['dbq_tbi'])
+
+    def test_cross_references_are_not_definitions(self):
+        """Diabetes complication cross-references don't claim other codes."""
+        from agents.reference_data import get_rating_criteria_by_code
+
+        criteria = get_rating_criteria_by_code('7005')
+        self.assertEqual(criteria['schedule'], 'cfr_4_104_cardiovascular')
+
+    def test_unknown_code_returns_none(self):
+        """Unknown codes return None."""
+        from agents.reference_data import get_rating_criteria_by_code
+
+        self.assertIsNone(get_rating_criteria_by_code('1234'))
+
+    def test_search_dbqs_by_diagnostic_code(self):
+        """DBQ search is served from the index, including code ranges."""
+        from agents.reference_data import search_dbqs_by_diagnostic_code
+
+        knee = search_dbqs_by_diagnostic_code('5260')
+        self.assertEqual([d['file'] for d in knee], ['dbq_knee'])
+
+        shared = search_dbqs_by_diagnostic_code('5003')
+        self.assertEqual({d['file'] for d in shared}, {'dbq_knee', 'dbq_shoulder'})
+
+        nerves = search_dbqs_by_diagnostic_code('8520')
+        self.assertEqual([d['file'] for d in nerves], ['dbq_peripheral_nerves'])
+
+        self.assertEqual(search_dbqs_by_diagnostic_code('1234'), [])
+
+    def test_code_ranges_only_match_defined_codes(self):
+        """DBQ ranges attach to codes in the schedules, not every integer in the span."""
+        from agents.reference_data import (
+            get_rating_criteria_by_code,
+            search_dbqs_by_diagnostic_code,
+        )
+
+        self.assertIsNone(get_rating_criteria_by_code('8600'))
+        self.assertEqual(search_dbqs_by_diagnostic_code('8600'), [])
+
+        criteria = get_rating_criteria_by_code('8510')
+        self.assertEqual(criteria['schedule'], 'cfr_4_124a_neurological')
+        self.assertIn('dbq_peripheral_nerves', [d['file'] for d in criteria['dbqs']])
+
+    def test_results_are_copies(self):
+        """Mutating a result doesn't corrupt the shared index."""
+        from agents.reference_data import (
+            get_rating_criteria_by_code,
+            search_dbqs_by_diagnostic_code,
+        )
+
+        get_rating_criteria_by_code('5260')['name'] = 'changed'
+        get_rating_criteria_by_code('5260')['dbqs'].clear()
+        search_dbqs_by_diagnostic_code('5260')[0]['name'] = 'changed'
+        search_dbqs_by_diagnostic_code('5260')[0]['diagnostic_codes'].append('9999')
+
+        self.assertEqual(
+            get_rating_criteria_by_code('5260')['name'],
+            'Limitation of flexion of the leg',
+        )
+        self.assertEqual(search_dbqs_by_diagnostic_code('5260')[0]['name'], 'Knee and Lower Leg')
+        self.assertEqual(len(get_rating_criteria_by_code('5260')['dbqs']), 1)
+        self.assertNotIn('9999', search_dbqs_by_diagnostic_code('5260')[0]['diagnostic_codes'])
+
+    @patch('agents.services.get_gateway')
+    def test_rating_analyzer_identifies_types_by_code(self, mock_gateway):
+        """Condition types are identified from diagnostic codes alone."""
+        from claims.services.rating_analysis_service import RatingDecisionAnalyzer
+
+        analyzer = RatingDecisionAnalyzer()
+        condition_types = analyzer._identify_condition_types({
+            'conditions': [
+                {'name': 'Condition A', 'diagnostic_code': '5256'},
+                {'name': 'Condition B', 'diagnostic_code': '9400'},
+                {'name': 'Condition C', 'diagnostic_code': '5010-5238'},
+                {'name': 'Condition D', 'diagnostic_code': '5003'},
+            ]
+        })
+
+        self.assertEqual(condition_types, ['knee', 'mental_health', 'back'])
+
+
 # =============================================================================
 # ACCESS CONTROL TESTS
 # =============================================================================
@@ -30,4 +30,5 @@ urlpatterns = [
 
     # Condition Discovery Tool
     path('condition-discovery/', views.condition_discovery, name='condition_discovery'),
+    path('condition-discovery/results/', views.condition_discovery_results, name='condition_discovery_results'),
 ]
@@ -70,6 +70,11 @@ if not FIELD_ENCRYPTION_KEY:
             "Generate one with: python -c \"from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())\""
         )
 
+# Previous encryption keys (comma-separated, newest first). Values encrypted
+# with them still decrypt, so FIELD_ENCRYPTION_KEY can change without
+# downtime; run rotate_encryption_key to re-encrypt, then drop the old key.
+FIELD_ENCRYPTION_RETIRED_KEYS = env.list('FIELD_ENCRYPTION_RETIRED_KEYS', default=[])
+
 # ALLOWED_HOSTS - MUST be explicitly set in staging/production
 # Never use '*' in any deployed environment
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS')
@@ -264,10 +269,29 @@ if CELERY_BROKER_URL.startswith('rediss://'):
         'ssl_cert_reqs': ssl.CERT_NONE,
     }
 
+# Full health snapshot (core.health): computed by a periodic task and cached,
+# served with its age by /health/?full=1
+HEALTH_SNAPSHOT_INTERVAL = env.int('HEALTH_SNAPSHOT_INTERVAL', default=30)
+# Older snapshots are reported as stale (503) and refreshed in the background
+HEALTH_SNAPSHOT_MAX_AGE = env.int('HEALTH_SNAPSHOT_MAX_AGE', default=120)
+# Seconds to wait for Celery workers to answer the health check broadcast
+HEALTH_CELERY_TIMEOUT = env.float('HEALTH_CELERY_TIMEOUT', default=1.0)
+# Shared secret for monitoring: /health/?full=1 is served to staff users and
+# to requests with this value in the X-Health-Token header (empty: staff only)
+HEALTH_CHECK_TOKEN = env('HEALTH_CHECK_TOKEN', default='')
+# Health metric rollups (core.metric_rollups) kept per resolution; day
+# rollups are kept indefinitely
+HEALTH_METRIC_MINUTE_RETENTION_DAYS = env.int('HEALTH_METRIC_MINUTE_RETENTION_DAYS', default=7)
+HEALTH_METRIC_HOUR_RETENTION_DAYS = env.int('HEALTH_METRIC_HOUR_RETENTION_DAYS', default=180)
+
 # Celery Beat Schedule for periodic tasks
 from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
     # Health monitoring
+    'refresh-health-snapshot': {
+        'task': 'core.tasks.refresh_health_snapshot',
+        'schedule': HEALTH_SNAPSHOT_INTERVAL,
+    },
     'record-health-metrics': {
         'task': 'core.tasks.record_health_metrics',
         'schedule': 300,  # every 5 minutes
@@ -276,6 +300,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.check_processing_health',
         'schedule': 900,  # every 15 minutes
     },
+    'maintain-audit-log-partitions': {
+        'task': 'core.tasks.maintain_audit_log_partitions',
+        'schedule': crontab(hour=1, minute=30),  # daily at 1:30 AM
+    },
     'cleanup-old-health-metrics': {
         'task': 'core.tasks.cleanup_old_health_metrics',
         'schedule': crontab(hour=3, minute=0),  # daily at 3 AM
@@ -308,6 +336,15 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.check_download_anomalies_task',
         'schedule': crontab(minute=0),  # hourly (every hour at :00)
     },
+    # Rating calculator (no-op unless the compensation rate table changed)
+    'recalculate-stale-rating-calculations': {
+        'task': 'examprep.tasks.recalculate_stale_rating_calculations',
+        'schedule': crontab(hour=4, minute=0),  # daily at 4 AM
+    },
+    'flush-shared-calculation-views': {
+        'task': 'examprep.tasks.flush_shared_calculation_views',
+        'schedule': 60,  # every minute
+    },
 }
 
 # ==============================================================================
@@ -518,6 +555,13 @@ MAX_DOCUMENT_PAGES = 100
 USE_X_SENDFILE = env.bool('USE_X_SENDFILE', default=False)
 SENDFILE_ROOT = env('SENDFILE_ROOT', default='')
 
+# ==============================================================================
+# M21 SCRAPER SETTINGS
+# ==============================================================================
+# Raw KnowVA HTML from every scrape is kept here (gzip, content-addressed) so
+# the parser can be re-run with `scrape_m21 --reparse-archive` without re-fetching.
+M21_HTML_ARCHIVE_DIR = env('M21_HTML_ARCHIVE_DIR', default=str(BASE_DIR / 'data' / 'm21_html_archive'))
+
 # ==============================================================================
 # LOGGING CONFIGURATION
 # ==============================================================================
@@ -573,6 +617,36 @@ LOGGING = {
 # Create logs directory if it doesn't exist
 (BASE_DIR / 'logs').mkdir(exist_ok=True)
 
+# ==============================================================================
+# AUDIT LOG BUFFERING
+# ==============================================================================
+# Request-path audit entries (AuditLog.enqueue) are queued in-process and
+# written with bulk_create by core.audit. Disabled in DEBUG by default so
+# entries appear immediately during development.
+AUDIT_BUFFER_ENABLED = env.bool('AUDIT_BUFFER_ENABLED', default=not DEBUG)
+AUDIT_BUFFER_SIZE = env.int('AUDIT_BUFFER_SIZE', default=100)
+AUDIT_BUFFER_FLUSH_INTERVAL = env.float('AUDIT_BUFFER_FLUSH_INTERVAL', default=2.0)
+AUDIT_BUFFER_BATCH_SIZE = env.int('AUDIT_BUFFER_BATCH_SIZE', default=500)
+# Entries that can't be written to the database are kept here until replayed
+AUDIT_SPOOL_PATH = env('AUDIT_SPOOL_PATH', default=str(BASE_DIR / 'logs' / 'audit_spool.jsonl'))
+# Entries the database rejects for good (constraint errors, bad values) go here
+AUDIT_DEAD_LETTER_PATH = env(
+    'AUDIT_DEAD_LETTER_PATH', default=str(BASE_DIR / 'logs' / 'audit_dead_letter.jsonl')
+)
+# Monthly audit log partitions created ahead of time (PostgreSQL only)
+AUDIT_LOG_PARTITION_MONTHS_AHEAD = env.int('AUDIT_LOG_PARTITION_MONTHS_AHEAD', default=3)
+
+# ==============================================================================
+# RETENTION PURGES
+# ==============================================================================
+# Retention purges (core.purge) delete in primary key order, one transaction
+# per batch, and checkpoint after each batch so an interrupted run resumes.
+PURGE_BATCH_SIZE = env.int('PURGE_BATCH_SIZE', default=500)
+# Pause between batches (seconds) to leave the database room for other writers
+PURGE_BATCH_SLEEP = env.float('PURGE_BATCH_SLEEP', default=0.1)
+# Threads deleting stored files (S3 or local) for purged documents
+PURGE_STORAGE_WORKERS = env.int('PURGE_STORAGE_WORKERS', default=8)
+
 # ==============================================================================
 # SENTRY CONFIGURATION (Error Tracking)
 # ==============================================================================
@@ -592,6 +666,13 @@ if SENTRY_DSN and not DEBUG:
         send_default_pii=False,  # Don't send user data
     )
 
+# ==============================================================================
+# DOWNLOAD MONITORING
+# ==============================================================================
+# Sliding window (seconds) for the per-user and per-IP download counters
+# (core.download_monitor) checked against the download alert thresholds
+DOWNLOAD_MONITOR_WINDOW = env.int('DOWNLOAD_MONITOR_WINDOW', default=3600)
+
 # ==============================================================================
 # RATE LIMITING
 # ==============================================================================
@@ -6,26 +6,29 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.core.exceptions import PermissionDenied
 from django.contrib.sitemaps.views import sitemap
 from django.views.generic import TemplateView
-from django.http import JsonResponse
 from api.graphql import JWTAuthGraphQLView
 
 from core import views
 
 
 def health_check(request):
-    """Health check endpoint for load balancers and monitoring."""
-    # Simple liveness check - just confirm app is running
-    # Use ?full=1 for detailed status
-    if request.GET.get('full') != '1':
-        return JsonResponse({"status": "ok"}, status=200)
-
-    # Full health check (for monitoring dashboards)
-    from core.health import get_full_health_status
-    health = get_full_health_status()
-    status_code = 200 if health['status'] == 'healthy' else 503
-    return JsonResponse(health, status=status_code)
+    """
+    Full health status for monitoring (/health/?full=1).
+
+    Liveness and readiness probes, including plain /health/, are answered
+    by HealthCheckMiddleware and never reach this view.
+    """
+    from core.health import snapshot_allowed, snapshot_response
+
+    # The snapshot exposes worker counts, queue length and error text
+    if not snapshot_allowed(request):
+        raise PermissionDenied
+    return snapshot_response()
+
+
 from accounts.views import (
     RateLimitedLoginView,
     RateLimitedSignupView,
@@ -29,6 +29,7 @@ from agents.reference_data import (
     get_rating_guidance,
     get_musculoskeletal_guidance,
     get_service_connection_guidance,
+    load_diagnostic_code_index,
 )
 # Use centralized sanitization from the AI gateway
 from agents.ai_gateway import sanitize_input
@@ -308,6 +309,17 @@ CONDITION_SPECIFIC_PROMPTS = {
 }
 
 
+# CFR schedules whose diagnostic codes map to a condition-specific prompt
+CONDITION_TYPE_BY_SCHEDULE = {
+    "cfr_4_71a_knee": "knee",
+    "cfr_4_130_mental_disorders": "mental_health",
+    "cfr_4_71a_spine": "back",
+}
+
+# Schedule sections listing codes that apply to any joint, not just that schedule
+SHARED_DIAGNOSTIC_SECTIONS = {"arthritis_rules"}
+
+
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
@@ -520,15 +532,26 @@ class RatingDecisionAnalyzer(BaseAgent):
             "back": ["spine", "back", "lumbar", "thoracic", "cervical", "disc", "5237", "5242", "5243"]
         }
 
+        code_index = load_diagnostic_code_index()
+
         for condition in conditions:
             name = condition.get("name", "").lower()
-            dc = condition.get("diagnostic_code", "").lower()
+            dc = str(condition.get("diagnostic_code") or "").lower()
 
             for condition_type, words in keywords.items():
                 if any(word in name or word in dc for word in words):
                     if condition_type not in condition_types:
                         condition_types.append(condition_type)
 
+            # Hyphenated codes (e.g. "5003-5260") name each schedule used
+            for code in dc.replace(" ", "").split("-"):
+                entry = code_index.get(code)
+                if not entry or entry["section"] in SHARED_DIAGNOSTIC_SECTIONS:
+                    continue
+                condition_type = CONDITION_TYPE_BY_SCHEDULE.get(entry["schedule"])
+                if condition_type and condition_type not in condition_types:
+                    condition_types.append(condition_type)
+
         return condition_types
 
     def _generate_analysis(self, extracted_data: dict, condition_types: list) -> tuple[dict, int]:
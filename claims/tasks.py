@@ -590,6 +590,7 @@ def cleanup_old_documents():
     Can be scheduled via Celery Beat
     """
     from datetime import timedelta
+    from core.purge import run_batched_purge
 
     threshold_date = timezone.now() - timedelta(days=90)
 
@@ -599,17 +600,10 @@ def cleanup_old_documents():
         deleted_at__lt=threshold_date
     )
 
-    count = deleted_docs.count()
-
-    # Permanently delete each document (hard_delete is an instance method)
-    for doc in deleted_docs:
-        try:
-            # Delete the file from storage if it exists
-            if doc.file:
-                doc.file.delete(save=False)
-            doc.hard_delete()
-        except Exception as e:
-            logger.error(f"Failed to hard delete document {doc.id}: {e}")
+    # Permanently delete in batches, removing stored files in parallel
+    count = run_batched_purge(
+        'claims:cleanup_old_documents', deleted_docs, file_fields=('file',)
+    ).deleted
 
     logger.info(f"Cleaned up {count} old documents")
     return f"Cleaned up {count} documents"
@@ -13,6 +13,7 @@ from django.conf import settings
 from django_ratelimit.decorators import ratelimit
 
 from core.models import AuditLog
+from core.download_monitor import record_download
 from agents.views import require_ai_consent_view
 from .models import Document
 from .forms import DocumentUploadForm, DenialLetterUploadForm
@@ -441,7 +442,7 @@ def document_download(request, pk):
         raise Http404("Document file not found on disk")
 
     # Audit log the download
-    AuditLog.log(
+    entry = AuditLog.enqueue(
         action='document_download',
         request=request,
         resource_type='Document',
@@ -451,6 +452,8 @@ def document_download(request, pk):
             'file_size': document.file_size,
         }
     )
+    # Sliding-window counters alert on exfiltration-like bursts right away
+    record_download(request.user, entry.ip_address)
 
     # Determine content type
     content_type, _ = mimetypes.guess_type(file_path)
@@ -512,7 +515,7 @@ def document_view_inline(request, pk):
         raise Http404("Document file not found on disk")
 
     # Audit log the view
-    AuditLog.log(
+    AuditLog.enqueue(
         action='document_view',
         request=request,
         resource_type='Document',
@@ -595,7 +598,7 @@ def document_download_signed(request, token):
         raise Http404("Document file not found on disk")
 
     # Audit log the download (use document owner since token-based access)
-    AuditLog.log(
+    entry = AuditLog.enqueue(
         action='document_download',
         request=request,
         user=document.user,
@@ -607,6 +610,7 @@ def document_download_signed(request, token):
             'access_type': 'signed_url',
         }
     )
+    record_download(document.user, entry.ip_address)
 
     # Determine content type
     content_type, _ = mimetypes.guess_type(file_path)
@@ -676,7 +680,7 @@ def document_view_signed(request, token):
         raise Http404("Document file not found on disk")
 
     # Audit log the view (use document owner since token-based access)
-    AuditLog.log(
+    AuditLog.enqueue(
         action='document_view',
         request=request,
         user=document.user,
@@ -773,6 +773,12 @@ def disable_rate_limiting(settings):
     settings.RATELIMIT_ENABLE = False
 
 
+@pytest.fixture(autouse=True)
+def disable_audit_buffering(settings):
+    """Save audit entries immediately, so tests see them without a flush (CI runs with DEBUG off)."""
+    settings.AUDIT_BUFFER_ENABLED = False
+
+
 @pytest.fixture(autouse=True)
 def use_test_file_storage(settings, tmp_path):
     """Use temporary directory for file storage in tests."""
@@ -13,6 +13,7 @@ from .models import (
     Feedback,
     SupportRequest,
     SystemHealthMetric,
+    SystemHealthMetricRollup,
     ProcessingFailure,
 )
 
@@ -326,6 +327,26 @@ class SystemHealthMetricAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(SystemHealthMetricRollup)
+class SystemHealthMetricRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        'bucket_start', 'resolution', 'metric_type', 'count',
+        'min_value', 'avg_value', 'p95_value', 'max_value'
+    ]
+    list_filter = ['resolution', 'metric_type']
+    date_hierarchy = 'bucket_start'
+    readonly_fields = [
+        'metric_type', 'resolution', 'bucket_start', 'count',
+        'min_value', 'max_value', 'avg_value', 'p95_value'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(ProcessingFailure)
 class ProcessingFailureAdmin(admin.ModelAdmin):
     list_display = [
@@ -4,7 +4,7 @@ Alerting and monitoring infrastructure.
 Provides:
 - Configurable alert thresholds
 - Multiple alert channels (email, Slack, Sentry)
-- Download anomaly detection
+- Download anomaly detection (inline via core.download_monitor, and periodic)
 - Task age monitoring
 - Health status alerting
 """
@@ -52,9 +52,10 @@ class AlertThresholds:
     task_age_warning: int = 300  # 5 minutes
     task_age_critical: int = 600  # 10 minutes
 
-    # Download anomaly detection
+    # Download anomaly detection (per DOWNLOAD_MONITOR_WINDOW, an hour by default)
     downloads_per_hour_warning: int = 50  # Per user
     downloads_per_hour_critical: int = 100
+    max_users_per_ip: int = 3  # Distinct users downloading from one IP
 
 
 # Default thresholds (can be overridden in settings)
@@ -305,92 +306,189 @@ def check_and_alert_health():
     return alerts_sent
 
 
+def _user_download_anomaly(user_id, user_email, count, hours, thresholds):
+    """(anomaly, title, message) if a user's download count crosses a threshold."""
+    if count >= thresholds.downloads_per_hour_critical:
+        anomaly_type, severity, title = 'high_download_volume', AlertSeverity.CRITICAL, "Anomalous Download Activity"
+    elif count >= thresholds.downloads_per_hour_warning:
+        anomaly_type, severity, title = 'elevated_download_volume', AlertSeverity.WARNING, "Elevated Download Activity"
+    else:
+        return None
+
+    anomaly = {
+        'type': anomaly_type,
+        'severity': severity,
+        'user_id': user_id,
+        'user_email': user_email,
+        'download_count': count,
+        'period_hours': hours,
+    }
+    return anomaly, title, f"User {user_email} downloaded {count} documents in {hours} hour(s)"
+
+
+def _ip_download_anomaly(ip_address, user_count, download_count, thresholds):
+    """(anomaly, title, message) if too many users download from one IP."""
+    if user_count <= thresholds.max_users_per_ip:
+        return None
+
+    anomaly = {
+        'type': 'multi_user_ip',
+        'severity': AlertSeverity.WARNING,
+        'ip_address': ip_address,
+        'user_count': user_count,
+        'download_count': download_count,
+    }
+    return anomaly, "Multiple Users Same IP", (
+        f"IP {ip_address} used by {user_count} users for {download_count} downloads"
+    )
+
+
+def _alert_once(key, window, anomaly, title, message, queue=False) -> bool:
+    """
+    Send a download alert unless one was sent for key within window seconds.
+
+    With queue, the alert is sent by a Celery task so the calling request
+    isn't held up; if it can't be queued the key is released so the next
+    reconciliation retries. Returns whether an alert was sent or queued.
+    """
+    from django.core.cache import cache
+
+    dedupe_key = f'downloads:alerted:{key}'
+    if not cache.add(dedupe_key, 1, window):
+        return False
+
+    if not queue:
+        send_alert(title=title, message=message, severity=anomaly['severity'], details=anomaly)
+        return True
+
+    try:
+        from core.tasks import send_download_alert
+        send_download_alert.delay(
+            title, message, anomaly['severity'].value,
+            {**anomaly, 'severity': anomaly['severity'].value},
+        )
+        return True
+    except Exception as e:
+        cache.delete(dedupe_key)
+        logger.warning(f"Failed to queue download alert {key}: {e}")
+        return False
+
+
+def _alert_user_anomaly(found, window, queue=False):
+    anomaly, title, message = found
+    return _alert_once(
+        f"user:{anomaly['user_id']}:{anomaly['severity'].value}", window, anomaly, title, message, queue
+    )
+
+
+def _alert_ip_anomaly(found, window, queue=False):
+    anomaly, title, message = found
+    return _alert_once(f"ip:{anomaly['ip_address']}", window, anomaly, title, message, queue)
+
+
+def check_download_counts(user_id, user_email, ip_address, counts, window) -> List[Dict]:
+    """
+    Check one download's sliding-window counts (core.download_monitor) inline.
+
+    Each user/IP and severity alerts at most once per window; alerts are
+    queued so the download isn't held up. Returns the anomalies found.
+    """
+    thresholds = get_thresholds()
+    hours = window // 3600 if window % 3600 == 0 else round(window / 3600, 2)
+    anomalies = []
+
+    found = _user_download_anomaly(user_id, user_email, counts.user_downloads, hours, thresholds)
+    if found:
+        anomalies.append(found[0])
+        _alert_user_anomaly(found, window, queue=True)
+
+    if ip_address:
+        found = _ip_download_anomaly(ip_address, counts.ip_users, counts.ip_downloads, thresholds)
+        if found:
+            anomalies.append(found[0])
+            _alert_ip_anomaly(found, window, queue=True)
+
+    return anomalies
+
+
+def _download_counts_from_audit_log(since):
+    """
+    ({user_id: downloads}, {ip: (downloads, distinct users)}) from the audit log.
+
+    Only used when the sliding-window counters aren't shared between
+    processes or don't cover the period asked for.
+    """
+    from core.models import AuditLog
+
+    # Every query is bounded on timestamp, so on the partitioned audit table
+    # (core.partitioning) PostgreSQL prunes the scan to the latest partition
+    recent_downloads = AuditLog.objects.filter(
+        action='document_download',
+        timestamp__gte=since,
+    )
+
+    user_counts = dict(
+        recent_downloads.filter(user__isnull=False).order_by()
+        .values('user_id').annotate(download_count=Count('id'))
+        .values_list('user_id', 'download_count')
+    )
+    ip_counts = {
+        entry['ip_address']: (entry['download_count'], entry['user_count'])
+        for entry in recent_downloads.filter(ip_address__isnull=False).order_by()
+        .values('ip_address').annotate(
+            user_count=Count('user_id', distinct=True),
+            download_count=Count('id'),
+        )
+    }
+    return user_counts, ip_counts
+
+
 def check_download_anomalies(hours: int = 1) -> List[Dict]:
     """
     Detect unusual download patterns that may indicate data exfiltration.
 
     Checks for:
     - High download volume per user
-    - Unusual download times
-    - Bulk sequential downloads
+    - Multiple users downloading from the same IP
+
+    Downloads are checked as they happen (check_download_counts); this is
+    the periodic reconciliation. It reads the shared sliding-window counters
+    when they cover the period, and only falls back to aggregating the audit
+    log otherwise. Alerts already sent inline aren't repeated.
 
     Returns list of detected anomalies.
     """
-    from core.models import AuditLog
+    from accounts.models import User
+    from core import download_monitor
 
     thresholds = get_thresholds()
-    since = timezone.now() - timedelta(hours=hours)
-    anomalies = []
+    window = download_monitor.window_seconds()
 
-    # Check downloads per user in the time window
-    user_downloads = AuditLog.objects.filter(
-        action='document_download',
-        timestamp__gte=since,
-        user__isnull=False
-    ).values('user_id', 'user__email').annotate(
-        download_count=Count('id')
-    ).order_by('-download_count')
-
-    for entry in user_downloads:
-        count = entry['download_count']
-        if count >= thresholds.downloads_per_hour_critical:
-            anomaly = {
-                'type': 'high_download_volume',
-                'severity': AlertSeverity.CRITICAL,
-                'user_id': entry['user_id'],
-                'user_email': entry['user__email'],
-                'download_count': count,
-                'period_hours': hours,
-            }
-            anomalies.append(anomaly)
-            send_alert(
-                title="Anomalous Download Activity",
-                message=f"User {entry['user__email']} downloaded {count} documents in {hours} hour(s)",
-                severity=AlertSeverity.CRITICAL,
-                details=anomaly
-            )
-        elif count >= thresholds.downloads_per_hour_warning:
-            anomaly = {
-                'type': 'elevated_download_volume',
-                'severity': AlertSeverity.WARNING,
-                'user_id': entry['user_id'],
-                'user_email': entry['user__email'],
-                'download_count': count,
-                'period_hours': hours,
-            }
-            anomalies.append(anomaly)
-            send_alert(
-                title="Elevated Download Activity",
-                message=f"User {entry['user__email']} downloaded {count} documents in {hours} hour(s)",
-                severity=AlertSeverity.WARNING,
-                details=anomaly
-            )
-
-    # Check for downloads from unusual IPs (multiple users same IP)
-    ip_downloads = AuditLog.objects.filter(
-        action='document_download',
-        timestamp__gte=since,
-        ip_address__isnull=False
-    ).values('ip_address').annotate(
-        user_count=Count('user_id', distinct=True),
-        download_count=Count('id')
-    ).filter(user_count__gt=3)  # More than 3 users from same IP
-
-    for entry in ip_downloads:
-        anomaly = {
-            'type': 'multi_user_ip',
-            'severity': AlertSeverity.WARNING,
-            'ip_address': entry['ip_address'],
-            'user_count': entry['user_count'],
-            'download_count': entry['download_count'],
-        }
-        anomalies.append(anomaly)
-        send_alert(
-            title="Multiple Users Same IP",
-            message=f"IP {entry['ip_address']} used by {entry['user_count']} users for {entry['download_count']} downloads",
-            severity=AlertSeverity.WARNING,
-            details=anomaly
+    if download_monitor.counters_shared() and hours * 3600 == window:
+        user_counts, ip_counts = download_monitor.active_counts()
+    else:
+        user_counts, ip_counts = _download_counts_from_audit_log(
+            timezone.now() - timedelta(hours=hours)
         )
+    alert_window = max(window, hours * 3600)
+
+    flagged = {
+        int(user_id): count for user_id, count in user_counts.items()
+        if count >= thresholds.downloads_per_hour_warning
+    }
+    emails = dict(User.objects.filter(pk__in=flagged).values_list('pk', 'email'))
+
+    anomalies = []
+    for user_id, count in sorted(flagged.items(), key=lambda item: -item[1]):
+        found = _user_download_anomaly(user_id, emails.get(user_id, ''), count, hours, thresholds)
+        anomalies.append(found[0])
+        _alert_user_anomaly(found, alert_window)
+
+    for ip_address, (download_count, user_count) in ip_counts.items():
+        found = _ip_download_anomaly(ip_address, user_count, download_count, thresholds)
+        if found:
+            anomalies.append(found[0])
+            _alert_ip_anomaly(found, alert_window)
 
     return anomalies
 
@@ -0,0 +1,383 @@
+"""
+Buffered audit log writer.
+
+AuditLog.enqueue() hands entries to an in-process buffer instead of saving
+them in the request path. The buffer writes them with bulk_create:
+- when it holds AUDIT_BUFFER_SIZE entries
+- when its oldest entry is AUDIT_BUFFER_FLUSH_INTERVAL seconds old
+  (checked by a background thread and at the end of each request)
+- when the process shuts down (atexit, Celery worker_process_shutdown)
+
+If the database can't be written, entries are appended to a local spool file
+(AUDIT_SPOOL_PATH, JSON lines) and replayed by the next successful flush, so
+audit entries survive a database outage as well as a graceful restart.
+
+A batch that fails is retried row by row, so one bad entry doesn't hold back
+the others. Entries that can never be written (rejected by a constraint, or
+not serialisable) go to a dead-letter file (AUDIT_DEAD_LETTER_PATH) for
+inspection instead of the spool, where they would block every replay.
+
+With AUDIT_BUFFER_ENABLED off (the default in DEBUG), enqueue() saves
+immediately like AuditLog.log().
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    DataError,
+    IntegrityError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Defaults when not configured in settings
+DEFAULT_BUFFER_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_BATCH_SIZE = 500
+
+
+def _get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def buffering_enabled() -> bool:
+    return _get_setting('AUDIT_BUFFER_ENABLED', False)
+
+
+def spool_path() -> Path:
+    return Path(_get_setting(
+        'AUDIT_SPOOL_PATH', Path(settings.BASE_DIR) / 'logs' / 'audit_spool.jsonl'
+    ))
+
+
+def dead_letter_path() -> Path:
+    return Path(_get_setting(
+        'AUDIT_DEAD_LETTER_PATH', Path(settings.BASE_DIR) / 'logs' / 'audit_dead_letter.jsonl'
+    ))
+
+
+def _append_entries(path: Path, entries):
+    """Append entries to a JSON lines file, synced to disk."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = ''.join(
+        json.dumps(serialize_entry(entry), default=str) + '\n' for entry in entries
+    )
+    # One append per batch so lines from concurrent processes don't interleave
+    with open(path, 'a', encoding='utf-8') as output:
+        output.write(payload)
+        output.flush()
+        os.fsync(output.fileno())
+
+
+def serialize_entry(entry) -> dict:
+    """AuditLog instance to a JSON-safe dict of its column values."""
+    data = {}
+    for field in entry._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        value = getattr(entry, field.attname)
+        if field.name == 'timestamp' and value is not None:
+            value = value.isoformat()
+        data[field.attname] = value
+    return data
+
+
+def deserialize_entry(data: dict):
+    """Rebuild an unsaved AuditLog from serialize_entry() output."""
+    from .models import AuditLog
+
+    data = dict(data)
+    if data.get('timestamp'):
+        data['timestamp'] = parse_datetime(data['timestamp'])
+    return AuditLog(**data)
+
+
+class AuditBuffer:
+    """
+    Thread-safe in-process queue of unsaved AuditLog entries.
+
+    One instance (audit_buffer) is shared per process. The background flusher
+    thread is started lazily on the first add() and again after a fork.
+    """
+
+    def __init__(self):
+        self._entries: List = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        # Serialises flushes so entries are written in order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+
+    @property
+    def size(self) -> int:
+        return _get_setting('AUDIT_BUFFER_SIZE', DEFAULT_BUFFER_SIZE)
+
+    @property
+    def flush_interval(self) -> float:
+        return _get_setting('AUDIT_BUFFER_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def add(self, entry):
+        """Queue an unsaved AuditLog entry."""
+        with self._lock:
+            if not self._entries:
+                self._oldest = time.monotonic()
+            self._entries.append(entry)
+            full = len(self._entries) >= self.size
+
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def is_due(self) -> bool:
+        """Whether the buffer has reached its size or age threshold."""
+        with self._lock:
+            if not self._entries:
+                return False
+            return (
+                len(self._entries) >= self.size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+
+    def flush(self) -> int:
+        """
+        Write all queued entries (and any spooled ones) to the database.
+
+        Entries that can't be written yet are spooled, and ones that never
+        can be are dead-lettered. Returns the number of entries written to
+        the database.
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+                self._oldest = None
+
+            written = 0
+            if entries:
+                written, retry = self._write(entries)
+                if retry:
+                    self._spool_or_requeue(retry)
+                    return written
+
+            written += self.replay_spool()
+            return written
+
+    def flush_if_due(self) -> int:
+        return self.flush() if self.is_due() else 0
+
+    def shutdown(self, write: bool = True):
+        """
+        Stop the background flusher and write everything still queued.
+
+        With write=False the queued entries are spooled instead, for when
+        the database can't be reached; the next process replays them.
+        """
+        self._stopped = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread() and self._pid == os.getpid():
+            thread.join(timeout=max(self.flush_interval, 1.0) * 2)
+        if write:
+            self.flush()
+        else:
+            with self._flush_lock:
+                with self._lock:
+                    entries, self._entries = self._entries, []
+                    self._oldest = None
+                if entries:
+                    self._spool_or_requeue(entries)
+        self._stopped = False
+
+    def replay_spool(self) -> int:
+        """Write entries spooled during a database outage. Returns the count written."""
+        path = spool_path()
+        if not path.exists():
+            return 0
+
+        # Claim the spool by renaming it, so concurrent processes don't replay it twice
+        claimed = path.with_name(f'{path.name}.{os.getpid()}.replay')
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return 0
+
+        entries = []
+        with open(claimed, encoding='utf-8') as spool:
+            for line in spool:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(deserialize_entry(json.loads(line)))
+                    except (ValueError, TypeError) as e:
+                        logger.error(f"Skipping unreadable audit spool line: {e}")
+
+        written, retry = self._write(entries) if entries else (0, [])
+        if retry:
+            # Still failing - put them back for the next flush
+            self._spool_or_requeue(retry)
+
+        claimed.unlink()
+        if written:
+            logger.info(f"Replayed {written} spooled audit log entries")
+        return written
+
+    def _write(self, entries) -> Tuple[int, List]:
+        """
+        Write entries to the database.
+
+        Returns (entries written, entries to spool for a retry). A failed
+        batch is retried row by row; rows that fail for good are
+        dead-lettered, and a connection-level error spools the row that hit
+        it and everything after it.
+        """
+        from .models import AuditLog
+
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(
+                    entries,
+                    batch_size=_get_setting('AUDIT_BUFFER_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+                )
+            return len(entries), []
+        except Exception as e:
+            logger.warning(f"Audit log flush of {len(entries)} entries failed, retrying row by row: {e}")
+
+        written = 0
+        dead = []
+        for index, entry in enumerate(entries):
+            # The failed batch may have assigned primary keys before rolling back
+            entry.pk = None
+            try:
+                with transaction.atomic():
+                    AuditLog.objects.bulk_create([entry])
+                written += 1
+            except (IntegrityError, DataError) as e:
+                logger.error(f"Audit log entry rejected by the database, dead-lettering it: {e}")
+                dead.append(entry)
+            except DatabaseError as e:
+                logger.error(f"Audit log flush failed, spooling {len(entries) - index} entries: {e}")
+                self._dead_letter(dead)
+                return written, entries[index:]
+            except Exception as e:
+                logger.error(f"Audit log entry can't be written, dead-lettering it: {e}")
+                dead.append(entry)
+
+        self._dead_letter(dead)
+        return written, []
+
+    def _dead_letter(self, entries):
+        if not entries:
+            return
+        try:
+            _append_entries(dead_letter_path(), entries)
+        except OSError as e:
+            logger.error(
+                f"Audit log dead letter failed, dropping {len(entries)} entries: {e}; "
+                f"{[serialize_entry(entry) for entry in entries]!r}"
+            )
+
+    def _spool_or_requeue(self, entries):
+        """Spool entries, or keep them queued if the spool can't be written either."""
+        try:
+            self._spool(entries)
+        except OSError as e:
+            logger.error(f"Audit log spool failed, keeping {len(entries)} entries queued: {e}")
+            with self._lock:
+                self._entries[:0] = entries
+                self._oldest = self._oldest or time.monotonic()
+
+    def _spool(self, entries):
+        _append_entries(spool_path(), entries)
+
+    def _ensure_thread(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name='audit-log-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            try:
+                self.flush_if_due()
+            except Exception as e:
+                # Never let the flusher thread die
+                logger.error(f"Audit log flusher error: {e}")
+            finally:
+                close_old_connections()
+
+
+audit_buffer = AuditBuffer()
+
+
+def flush_on_request_finished(sender, **kwargs):
+    """request_finished handler: flush once the buffer is due."""
+    if len(audit_buffer):
+        audit_buffer.flush_if_due()
+
+
+def _database_available() -> bool:
+    try:
+        connection.ensure_connection()
+        return True
+    except Exception:
+        return False
+
+
+def flush_on_shutdown(*args, **kwargs):
+    """
+    atexit / worker shutdown handler: write everything still queued.
+
+    If the database can't be reached (or access is blocked, as after a test
+    run) queued entries are spooled without touching it.
+    """
+    if not (len(audit_buffer) or spool_path().exists()):
+        return
+    try:
+        audit_buffer.shutdown(write=_database_available())
+    except Exception as e:
+        logger.error(f"Audit log shutdown flush failed: {e}")
+
+
+def connect_signals():
+    """Wire the buffer's flush points (called from CoreConfig.ready)."""
+    from django.core.signals import request_finished
+
+    request_finished.connect(flush_on_request_finished, dispatch_uid='audit_buffer_request_finished')
+    atexit.register(flush_on_shutdown)
+
+    try:
+        from celery.signals import worker_process_shutdown, worker_shutdown
+    except ImportError:
+        return
+    worker_process_shutdown.connect(flush_on_shutdown, weak=False, dispatch_uid='audit_buffer_worker_process')
+    worker_shutdown.connect(flush_on_shutdown, weak=False, dispatch_uid='audit_buffer_worker')
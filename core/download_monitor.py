@@ -0,0 +1,245 @@
+"""
+Sliding-window download counters for exfiltration detection.
+
+document_download and document_download_signed call record_download() for
+every file served. It counts, over the last DOWNLOAD_MONITOR_WINDOW seconds:
+- downloads per user
+- downloads per IP address, and the distinct users downloading from it
+
+The counts are checked against the alert thresholds straight away
+(core.alerting.check_download_counts), so anomalous activity alerts within
+seconds rather than at the next hourly check. The hourly
+check_download_anomalies task only reconciles: it rechecks every user and IP
+active in the window from the same counters.
+
+With Redis behind the default cache each window is a sorted set scored by
+timestamp, updated in one pipelined round trip per download and shared by
+every process (client and key prefixing from core.shared_redis). Otherwise
+(local development, tests) the windows are kept in process memory, so they
+only see that process's downloads.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from core.shared_redis import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+USER_KEY = 'downloads:user:{}'
+IP_KEY = 'downloads:ip:{}'
+IP_USERS_KEY = 'downloads:ip_users:{}'
+ACTIVE_USERS_KEY = 'downloads:active_users'
+ACTIVE_IPS_KEY = 'downloads:active_ips'
+
+# Default when not configured in settings
+DEFAULT_WINDOW = 3600
+
+# The in-process fallback drops idle windows every this many downloads
+MEMORY_PRUNE_EVERY = 1000
+
+
+@dataclass
+class DownloadCounts:
+    """Downloads in the current window for one download's user and IP."""
+    user_downloads: int
+    ip_downloads: int = 0
+    ip_users: int = 0
+
+
+def window_seconds() -> int:
+    return getattr(settings, 'DOWNLOAD_MONITOR_WINDOW', DEFAULT_WINDOW)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RedisWindows:
+    """Sliding windows in Redis sorted sets (member per event, scored by time)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _key(template: str, *args) -> str:
+        return redis_key(template.format(*args))
+
+    def record(self, user_id, ip_address, now, window) -> DownloadCounts:
+        cutoff = now - window
+        # Unique member per event so simultaneous downloads all count
+        event = f'{now:.6f}:{uuid.uuid4().hex[:8]}'
+        user_key = self._key(USER_KEY, user_id)
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(user_key, {event: now})
+        pipe.zremrangebyscore(user_key, '-inf', cutoff)
+        pipe.zcard(user_key)
+        pipe.expire(user_key, window)
+        pipe.zadd(self._key(ACTIVE_USERS_KEY), {str(user_id): now})
+        if ip_address:
+            ip_key = self._key(IP_KEY, ip_address)
+            ip_users_key = self._key(IP_USERS_KEY, ip_address)
+            pipe.zadd(ip_key, {event: now})
+            pipe.zremrangebyscore(ip_key, '-inf', cutoff)
+            pipe.zcard(ip_key)
+            pipe.expire(ip_key, window)
+            # One member per user, scored by their latest download
+            pipe.zadd(ip_users_key, {str(user_id): now})
+            pipe.zremrangebyscore(ip_users_key, '-inf', cutoff)
+            pipe.zcard(ip_users_key)
+            pipe.expire(ip_users_key, window)
+            pipe.zadd(self._key(ACTIVE_IPS_KEY), {ip_address: now})
+        results = pipe.execute()
+
+        counts = DownloadCounts(user_downloads=results[2])
+        if ip_address:
+            counts.ip_downloads = results[7]
+            counts.ip_users = results[11]
+        return counts
+
+    def active_counts(self, now, window) -> Tuple[Dict[str, int], Dict[str, Tuple[int, int]]]:
+        cutoff = now - window
+        active_users_key, active_ips_key = self._key(ACTIVE_USERS_KEY), self._key(ACTIVE_IPS_KEY)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zremrangebyscore(active_users_key, '-inf', cutoff)
+        pipe.zrange(active_users_key, 0, -1)
+        pipe.zremrangebyscore(active_ips_key, '-inf', cutoff)
+        pipe.zrange(active_ips_key, 0, -1)
+        _, users, _, ips = pipe.execute()
+        users = [_decode(user) for user in users]
+        ips = [_decode(ip) for ip in ips]
+
+        pipe = self.client.pipeline(transaction=False)
+        for user in users:
+            pipe.zcount(self._key(USER_KEY, user), f'({cutoff}', '+inf')
+        for ip in ips:
+            pipe.zcount(self._key(IP_KEY, ip), f'({cutoff}', '+inf')
+            pipe.zcount(self._key(IP_USERS_KEY, ip), f'({cutoff}', '+inf')
+        results = pipe.execute() if users or ips else []
+
+        user_counts = dict(zip(users, results[:len(users)]))
+        ip_results = results[len(users):]
+        ip_counts = {
+            ip: (ip_results[2 * i], ip_results[2 * i + 1]) for i, ip in enumerate(ips)
+        }
+        return user_counts, ip_counts
+
+
+class MemoryWindows:
+    """Per-process fallback with the same interface as RedisWindows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = defaultdict(deque)
+        self._ips = defaultdict(deque)
+        self._ip_users = defaultdict(dict)
+        self._recorded = 0
+
+    @staticmethod
+    def _trim(events, cutoff):
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def _prune(self, cutoff):
+        """Drop windows with no events left, so idle keys don't accumulate."""
+        for windows in (self._users, self._ips):
+            for key in [k for k, events in windows.items() if not events or events[-1] <= cutoff]:
+                del windows[key]
+        for ip in list(self._ip_users):
+            users = self._ip_users[ip]
+            for user in [u for u, last in users.items() if last <= cutoff]:
+                del users[user]
+            if not users:
+                del self._ip_users[ip]
+
+    def record(self, user_id, ip_address, now, window) -> DownloadCounts:
+        cutoff = now - window
+        user_id = str(user_id)
+        with self._lock:
+            self._recorded += 1
+            if self._recorded % MEMORY_PRUNE_EVERY == 0:
+                self._prune(cutoff)
+            events = self._users[user_id]
+            events.append(now)
+            self._trim(events, cutoff)
+            counts = DownloadCounts(user_downloads=len(events))
+            if ip_address:
+                events = self._ips[ip_address]
+                events.append(now)
+                self._trim(events, cutoff)
+                users = self._ip_users[ip_address]
+                users[user_id] = now
+                counts.ip_downloads = len(events)
+                counts.ip_users = sum(1 for last in users.values() if last > cutoff)
+        return counts
+
+    def active_counts(self, now, window) -> Tuple[Dict[str, int], Dict[str, Tuple[int, int]]]:
+        cutoff = now - window
+        with self._lock:
+            self._prune(cutoff)
+            for events in list(self._users.values()) + list(self._ips.values()):
+                self._trim(events, cutoff)
+            user_counts = {user: len(events) for user, events in self._users.items()}
+            ip_counts = {
+                ip: (len(events), len(self._ip_users.get(ip, ())))
+                for ip, events in self._ips.items()
+            }
+        return user_counts, ip_counts
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._ips.clear()
+            self._ip_users.clear()
+
+
+memory_windows = MemoryWindows()
+
+
+def get_windows():
+    """Redis windows when the default cache is Redis, else the in-process ones."""
+    client = get_redis_client()
+    if client is not None:
+        return RedisWindows(client)
+    return memory_windows
+
+
+def counters_shared() -> bool:
+    """Whether the counters see every process's downloads (Redis)."""
+    return get_redis_client() is not None
+
+
+def record_download(user, ip_address: Optional[str]) -> Optional[DownloadCounts]:
+    """
+    Count a download and alert at once if it crosses a threshold.
+
+    Never raises: a counter failure is logged and must not break the
+    download. Returns the counts, or None if they couldn't be updated.
+    """
+    from core.alerting import check_download_counts
+
+    try:
+        window = window_seconds()
+        counts = get_windows().record(user.pk, ip_address, time.time(), window)
+        check_download_counts(user.pk, user.email, ip_address, counts, window)
+        return counts
+    except Exception as e:
+        logger.error(f"Failed to record download for user {user.pk}: {e}")
+        return None
+
+
+def active_counts() -> Tuple[Dict[str, int], Dict[str, Tuple[int, int]]]:
+    """
+    Current window for every active user and IP.
+
+    Returns ({user_id: downloads}, {ip: (downloads, distinct users)}).
+    """
+    return get_windows().active_counts(time.time(), window_seconds())
@@ -6,21 +6,41 @@ Security Notes:
 - FIELD_ENCRYPTION_KEY should be set in environment for all deployments
 - Key must be a 32-byte base64-encoded string (Fernet format)
 - Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
-- Key rotation requires data migration - see encrypt_existing_data() utility
+- Key rotation: put the old key in FIELD_ENCRYPTION_RETIRED_KEYS when
+  FIELD_ENCRYPTION_KEY changes. New values are encrypted with the primary key
+  and existing values still decrypt with a retired key, so rotation needs no
+  downtime; re-encrypt old rows with the rotate_encryption_key command.
 """
 
 import base64
 import hashlib
 import logging
 import warnings
+from typing import Iterable, List
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from django.conf import settings
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 
 logger = logging.getLogger(__name__)
 
 
+def _validate_key(key, setting_name: str) -> bytes:
+    """Check a configured key is a proper Fernet key and return it as bytes."""
+    try:
+        # Fernet keys are 32 bytes, base64-encoded (44 chars with padding)
+        decoded = base64.urlsafe_b64decode(key)
+        if len(decoded) != 32:
+            raise ValueError(f"{setting_name} must be 32 bytes when decoded")
+        return key.encode() if isinstance(key, str) else key
+    except Exception as e:
+        raise ValueError(
+            f"Invalid {setting_name}: {e}. "
+            "Generate with: python -c \"from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())\""
+        )
+
+
 def _get_encryption_key() -> bytes:
     """
     Get the encryption key from settings.
@@ -36,18 +56,7 @@ def _get_encryption_key() -> bytes:
     encryption_key = getattr(settings, 'FIELD_ENCRYPTION_KEY', None)
 
     if encryption_key:
-        # Validate it's a proper Fernet key
-        try:
-            # Fernet keys are 32 bytes, base64-encoded (44 chars with padding)
-            decoded = base64.urlsafe_b64decode(encryption_key)
-            if len(decoded) != 32:
-                raise ValueError("FIELD_ENCRYPTION_KEY must be 32 bytes when decoded")
-            return encryption_key.encode() if isinstance(encryption_key, str) else encryption_key
-        except Exception as e:
-            raise ValueError(
-                f"Invalid FIELD_ENCRYPTION_KEY: {e}. "
-                "Generate with: python -c \"from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())\""
-            )
+        return _validate_key(encryption_key, 'FIELD_ENCRYPTION_KEY')
 
     # Fallback to SECRET_KEY derivation (legacy)
     if not getattr(settings, 'DEBUG', False):
@@ -62,34 +71,78 @@ def _get_encryption_key() -> bytes:
     return base64.urlsafe_b64encode(key)
 
 
+def _get_retired_keys() -> List[bytes]:
+    """
+    Keys from FIELD_ENCRYPTION_RETIRED_KEYS, newest first.
+
+    Retired keys only decrypt; values are always encrypted with the primary key.
+    """
+    return [
+        _validate_key(key, 'FIELD_ENCRYPTION_RETIRED_KEYS')
+        for key in getattr(settings, 'FIELD_ENCRYPTION_RETIRED_KEYS', None) or []
+    ]
+
+
 class FieldEncryption:
     """
     Handles encryption/decryption of field values using Fernet.
 
     Uses FIELD_ENCRYPTION_KEY if set, otherwise derives from SECRET_KEY.
+    Values encrypted with a key in FIELD_ENCRYPTION_RETIRED_KEYS still decrypt.
+
+    The key ring (a MultiFernet) is built once and reused until the key
+    settings change, so encrypting or decrypting a value does no key lookup,
+    derivation or hashing.
     """
 
-    _fernet = None
-    _key_hash = None  # Track key changes for cache invalidation
+    # (key settings, MultiFernet) - one attribute so threads never see a mismatched pair
+    _key_ring = None
 
-    @classmethod
-    def _get_fernet(cls) -> Fernet:
-        """Get or create Fernet instance."""
-        key = _get_encryption_key()
-        key_hash = hashlib.md5(key).hexdigest()
-
-        # Invalidate cache if key changed (useful for testing)
-        if cls._fernet is None or cls._key_hash != key_hash:
-            cls._fernet = Fernet(key)
-            cls._key_hash = key_hash
+    @staticmethod
+    def _key_settings() -> tuple:
+        return (
+            getattr(settings, 'FIELD_ENCRYPTION_KEY', None),
+            tuple(getattr(settings, 'FIELD_ENCRYPTION_RETIRED_KEYS', None) or ()),
+            settings.SECRET_KEY,
+        )
 
-        return cls._fernet
+    @classmethod
+    def _get_fernet(cls) -> MultiFernet:
+        """Get the cached key ring, rebuilding it if the key settings changed."""
+        key_settings = cls._key_settings()
+        key_ring = cls._key_ring
+        if key_ring is None or key_ring[0] != key_settings:
+            primary = _get_encryption_key()
+            keys = [primary] + [key for key in _get_retired_keys() if key != primary]
+            key_ring = (key_settings, MultiFernet([Fernet(key) for key in keys]))
+            cls._key_ring = key_ring
+        return key_ring[1]
 
     @classmethod
     def reset(cls):
-        """Reset the cached Fernet instance. Useful for testing."""
-        cls._fernet = None
-        cls._key_hash = None
+        """Reset the cached key ring. Useful for testing."""
+        cls._key_ring = None
+
+    @staticmethod
+    def _encrypt_with(fernet, value: str) -> str:
+        if not value:
+            return ''
+        encrypted = fernet.encrypt(value.encode('utf-8'))
+        return base64.urlsafe_b64encode(encrypted).decode('utf-8')
+
+    @staticmethod
+    def _decrypt_with(fernet, encrypted_value: str) -> str:
+        if not encrypted_value:
+            return ''
+        try:
+            decoded = base64.urlsafe_b64decode(encrypted_value.encode('utf-8'))
+            decrypted = fernet.decrypt(decoded)
+            return decrypted.decode('utf-8')
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"Decryption failed: {e}")
+            # Return empty string on decryption failure
+            # This handles cases where data was stored unencrypted
+            return ''
 
     @classmethod
     def encrypt(cls, value: str) -> str:
@@ -104,10 +157,7 @@ class FieldEncryption:
         """
         if not value:
             return ''
-
-        fernet = cls._get_fernet()
-        encrypted = fernet.encrypt(value.encode('utf-8'))
-        return base64.urlsafe_b64encode(encrypted).decode('utf-8')
+        return cls._encrypt_with(cls._get_fernet(), value)
 
     @classmethod
     def decrypt(cls, encrypted_value: str) -> str:
@@ -118,21 +168,156 @@ class FieldEncryption:
             encrypted_value: Base64-encoded encrypted string
 
         Returns:
-            Decrypted plain text string
+            Decrypted plain text string ('' if it can't be decrypted)
         """
         if not encrypted_value:
             return ''
+        return cls._decrypt_with(cls._get_fernet(), encrypted_value)
 
-        try:
-            fernet = cls._get_fernet()
-            decoded = base64.urlsafe_b64decode(encrypted_value.encode('utf-8'))
-            decrypted = fernet.decrypt(decoded)
-            return decrypted.decode('utf-8')
-        except (InvalidToken, ValueError) as e:
-            logger.warning(f"Decryption failed: {e}")
-            # Return empty string on decryption failure
-            # This handles cases where data was stored unencrypted
-            return ''
+    @classmethod
+    def encrypt_many(cls, values: Iterable[str]) -> List[str]:
+        """Encrypt several values with one key ring lookup (see encrypt())."""
+        fernet = cls._get_fernet()
+        return [cls._encrypt_with(fernet, value) for value in values]
+
+    @classmethod
+    def decrypt_many(cls, encrypted_values: Iterable[str]) -> List[str]:
+        """Decrypt several values with one key ring lookup (see decrypt())."""
+        fernet = cls._get_fernet()
+        return [cls._decrypt_with(fernet, value) for value in encrypted_values]
+
+
+class LazyDecrypted:
+    """
+    An encrypted value loaded from the database, decrypted on first use.
+
+    Fields using LazyDecryptionMixin return this from from_db_value, so rows
+    whose encrypted field is never read (list pages, counts, exports of
+    other columns) skip decryption and JSON parsing entirely.
+
+    Model instances never expose it: the field's descriptor swaps it for the
+    plaintext on first attribute access and keeps that on the instance.
+    values()/values_list() return it as is; it compares equal to its
+    plaintext, supports indexing, iteration and get(), and .value gives the
+    decrypted object.
+    """
+
+    __slots__ = ('ciphertext', '_decode', '_value', '_resolved')
+
+    def __init__(self, ciphertext: str, decode):
+        self.ciphertext = ciphertext
+        self._decode = decode
+        self._value = None
+        self._resolved = False
+
+    @property
+    def value(self):
+        if not self._resolved:
+            self._value = self._decode(self.ciphertext)
+            self._resolved = True
+        return self._value
+
+    @property
+    def resolved(self) -> bool:
+        return self._resolved
+
+    def __eq__(self, other):
+        if isinstance(other, LazyDecrypted):
+            other = other.value
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        # Never put plaintext in logs or tracebacks
+        return f"<LazyDecrypted {'resolved' if self._resolved else 'pending'}>"
+
+    def get(self, key, default=None):
+        return self.value.get(key, default)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __reduce__(self):
+        # Pickle (e.g. into a cache) as ciphertext, never as plaintext
+        return (LazyDecrypted, (self.ciphertext, self._decode))
+
+
+class DecryptOnAccess(DeferredAttribute):
+    """
+    Field descriptor that resolves a LazyDecrypted value on first access
+    and caches the plaintext on the instance.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, LazyDecrypted):
+            value = value.value
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class LazyDecryptionMixin:
+    """
+    Defers decryption of an encrypted field until the value is used.
+
+    Subclasses implement decode_db_value(ciphertext) (decrypt a stored value)
+    and encrypt_prep_value(value) (encrypt a value for saving). Saving an
+    instance whose value was never read writes the stored ciphertext back
+    unchanged.
+    """
+
+    descriptor_class = DecryptOnAccess
+
+    def decode_db_value(self, value):
+        raise NotImplementedError
+
+    def encrypt_prep_value(self, value):
+        raise NotImplementedError
+
+    def empty_db_value(self, value):
+        return value
+
+    def from_db_value(self, value, expression, connection):
+        """Wrap the stored ciphertext; it is decrypted when first used."""
+        if value is None or value == '':
+            return self.empty_db_value(value)
+        return LazyDecrypted(value, self.decode_db_value)
+
+    def pre_save(self, model_instance, add):
+        # Read past the descriptor so saving doesn't decrypt a value nobody used
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, LazyDecrypted):
+            return value
+        return super().pre_save(model_instance, add)
+
+    def get_prep_value(self, value):
+        if isinstance(value, LazyDecrypted):
+            if not value.resolved:
+                return value.ciphertext
+            value = value.value
+        return self.encrypt_prep_value(value)
 
 
 class EncryptedCharField(models.CharField):
@@ -177,30 +362,32 @@ class EncryptedCharField(models.CharField):
         return value
 
 
-class EncryptedTextField(models.TextField):
+class EncryptedTextField(LazyDecryptionMixin, models.TextField):
     """
     TextField that transparently encrypts/decrypts values.
 
+    Values are decrypted lazily, on first access (see LazyDecrypted).
+
     Usage:
         notes = EncryptedTextField(blank=True)
     """
 
     description = "An encrypted TextField"
 
-    def get_prep_value(self, value):
+    def encrypt_prep_value(self, value):
         """Encrypt value before saving to database."""
         if value is None or value == '':
             return value
         return FieldEncryption.encrypt(str(value))
 
-    def from_db_value(self, value, expression, connection):
-        """Decrypt value when reading from database."""
-        if value is None or value == '':
-            return value
+    def decode_db_value(self, value):
+        """Decrypt a value read from the database."""
         return FieldEncryption.decrypt(value)
 
     def to_python(self, value):
         """Handle value conversion from form input."""
+        if isinstance(value, LazyDecrypted):
+            return value.value
         if isinstance(value, str) and value:
             # Try to decrypt - if it fails, it's probably plain text from a form
             decrypted = FieldEncryption.decrypt(value)
@@ -209,7 +396,7 @@ class EncryptedTextField(models.TextField):
         return value
 
 
-class EncryptedJSONField(models.TextField):
+class EncryptedJSONField(LazyDecryptionMixin, models.TextField):
     """
     TextField that transparently encrypts/decrypts JSON values.
 
@@ -223,11 +410,13 @@ class EncryptedJSONField(models.TextField):
     Trade-off: Loses database-level JSON querying (PostgreSQL -> operator).
     Only use when you read ai_summary after fetching the object — no
     JSON path queries in WHERE clauses.
+
+    Values are decrypted and parsed lazily, on first access (see LazyDecrypted).
     """
 
     description = "An encrypted JSON field"
 
-    def get_prep_value(self, value):
+    def encrypt_prep_value(self, value):
         """Serialize to JSON string, then encrypt before saving."""
         import json
 
@@ -239,12 +428,13 @@ class EncryptedJSONField(models.TextField):
             json_str = str(value)
         return FieldEncryption.encrypt(json_str)
 
-    def from_db_value(self, value, expression, connection):
-        """Decrypt, then deserialize JSON when reading from database."""
+    def empty_db_value(self, value):
+        return None
+
+    def decode_db_value(self, value):
+        """Decrypt, then deserialize JSON read from the database."""
         import json
 
-        if value is None or value == '':
-            return None
         decrypted = FieldEncryption.decrypt(value)
         if not decrypted:
             return None
@@ -259,6 +449,8 @@ class EncryptedJSONField(models.TextField):
 
         if value is None:
             return None
+        if isinstance(value, LazyDecrypted):
+            return value.value
         if isinstance(value, (dict, list)):
             return value
         if isinstance(value, str) and value:
@@ -377,41 +569,35 @@ def encrypt_existing_data(model_class, field_name: str, dry_run: bool = True):
     """
     Utility function to encrypt existing unencrypted data.
 
-    Use this in a data migration or management command.
+    Use this in a data migration or management command. Rows are processed
+    in checkpointed primary key batches (see core.key_rotation), so a large
+    table can be encrypted in one pass and an interrupted run resumes.
 
     Args:
         model_class: Django model class
         field_name: Name of the field to encrypt
         dry_run: If True, only report what would be done
     """
-    from django.db import connection
-
-    # Get raw values directly from database to avoid model decryption
-    table_name = model_class._meta.db_table
-    pk_name = model_class._meta.pk.name
+    from .key_rotation import SkipValue, key_fingerprint, reencrypt_column
 
-    with connection.cursor() as cursor:
-        cursor.execute(f"SELECT {pk_name}, {field_name} FROM {table_name} WHERE {field_name} IS NOT NULL AND {field_name} != ''")
-        rows = cursor.fetchall()
+    fernet = FieldEncryption._get_fernet()
 
-    count = 0
-    for pk, value in rows:
+    def encrypt_plaintext(value):
         # Skip already encrypted values (they start with base64 pattern)
-        if value and len(value) > 100 and value.startswith('Z0FB'):
-            continue
-
-        encrypted = FieldEncryption.encrypt(value)
-
-        if dry_run:
-            logger.info(f"Would encrypt {model_class.__name__} pk={pk} {field_name}")
-        else:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    f"UPDATE {table_name} SET {field_name} = %s WHERE {pk_name} = %s",
-                    [encrypted, pk]
-                )
-        count += 1
+        if len(value) > 100 and value.startswith('Z0FB'):
+            raise SkipValue
+        return FieldEncryption._encrypt_with(fernet, value)
+
+    column = model_class._meta.get_field(field_name).column
+    stats = reencrypt_column(
+        model_class._meta.db_table,
+        model_class._meta.pk.column,
+        column,
+        encrypt_plaintext,
+        execute=not dry_run,
+        fingerprint=key_fingerprint(_get_encryption_key().decode()),
+    )
 
     action = "Would encrypt" if dry_run else "Encrypted"
-    logger.info(f"{action} {count} {model_class.__name__} records")
-    return count
+    logger.info(f"{action} {stats.rotated} {model_class.__name__} records")
+    return stats.rotated
@@ -7,17 +7,59 @@ Provides health checks for:
 - Celery worker status
 - Queue length
 - Processing success rates
+
+The full set of checks is too slow to run per request (the Celery check
+broadcasts to every worker and waits for replies), so it is computed by the
+refresh_health_snapshot task every HEALTH_SNAPSHOT_INTERVAL seconds and
+cached. The endpoints are:
+- /health/, /health/live/: liveness - the process is serving requests
+- /health/ready/: readiness - this instance can reach the database and cache
+- /health/?full=1: the cached snapshot and its age; a missing or stale
+  snapshot (older than HEALTH_SNAPSHOT_MAX_AGE) is refreshed in a background
+  thread and reported with a 503 meanwhile. The snapshot exposes internals,
+  so it goes through the full middleware stack and is only served to staff
+  or with the HEALTH_CHECK_TOKEN (see snapshot_allowed)
 """
 
+import functools
+import hmac
 import logging
+import threading
+import time
 from datetime import timedelta
 from django.utils import timezone
-from django.db import connection
+from django.db import connection, connections
+from django.db.models import Count, Q
 from django.conf import settings
 from django.core.cache import cache
+from django.http import JsonResponse
 
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_CACHE_KEY = 'health:snapshot'
+REFRESH_LOCK_KEY = 'health:snapshot:refreshing'
+
+# Defaults when not configured in settings
+DEFAULT_SNAPSHOT_INTERVAL = 30
+DEFAULT_SNAPSHOT_MAX_AGE = 120
+DEFAULT_CELERY_TIMEOUT = 1.0
+
+# Keep an expired snapshot around long enough to report how stale it is
+SNAPSHOT_CACHE_TIMEOUT = 24 * 60 * 60
+
+_refresh_lock = threading.Lock()
+
+
+def _get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+@functools.lru_cache(maxsize=None)
+def _broker_client(url):
+    """Redis client for the Celery broker, shared so probes reuse its connection pool."""
+    import redis
+    return redis.from_url(url)
+
 
 def check_database():
     """Check database connectivity."""
@@ -49,9 +91,11 @@ def check_celery():
         from benefits_navigator.celery import app
 
         # Check if we can connect to broker
-        inspect = app.control.inspect()
+        inspect = app.control.inspect(
+            timeout=_get_setting('HEALTH_CELERY_TIMEOUT', DEFAULT_CELERY_TIMEOUT)
+        )
 
-        # Get active workers (with timeout)
+        # Get active workers (waits up to the timeout for replies)
         active = inspect.active()
 
         if active is None:
@@ -69,11 +113,9 @@ def check_celery():
         # Get queue length (if using Redis)
         queue_length = None
         try:
-            import redis
             redis_url = getattr(settings, 'CELERY_BROKER_URL', None)
             if redis_url and 'redis' in redis_url:
-                r = redis.from_url(redis_url)
-                queue_length = r.llen('celery')
+                queue_length = _broker_client(redis_url).llen('celery')
         except Exception:
             pass
 
@@ -103,9 +145,14 @@ def check_document_processing(hours=24):
         from claims.models import Document
 
         since = timezone.now() - timedelta(hours=hours)
-        recent_docs = Document.objects.filter(created_at__gte=since)
+        counts = Document.objects.filter(created_at__gte=since).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+            failed=Count('id', filter=Q(status='failed')),
+            processing=Count('id', filter=Q(status__in=['processing', 'analyzing'])),
+        )
 
-        total = recent_docs.count()
+        total = counts['total']
         if total == 0:
             return {
                 'status': 'healthy',
@@ -114,9 +161,9 @@ def check_document_processing(hours=24):
                 'success_rate': None,
             }
 
-        completed = recent_docs.filter(status='completed').count()
-        failed = recent_docs.filter(status='failed').count()
-        processing = recent_docs.filter(status__in=['processing', 'analyzing']).count()
+        completed = counts['completed']
+        failed = counts['failed']
+        processing = counts['processing']
 
         success_rate = (completed / total) * 100 if total > 0 else 0
 
@@ -212,11 +259,123 @@ def get_full_health_status():
     }
 
 
+def refresh_health_snapshot():
+    """Run every check and cache the result as the current snapshot."""
+    health = get_full_health_status()
+    cache.set(
+        SNAPSHOT_CACHE_KEY,
+        {'health': health, 'computed_at': time.time()},
+        SNAPSHOT_CACHE_TIMEOUT,
+    )
+    return health
+
+
+def get_health_snapshot():
+    """
+    The cached snapshot with its age, or None if none has been computed.
+
+    Adds age_seconds and stale (older than HEALTH_SNAPSHOT_MAX_AGE) to the
+    get_full_health_status() result.
+    """
+    cached = cache.get(SNAPSHOT_CACHE_KEY)
+    if cached is None:
+        return None
+    age = max(time.time() - cached['computed_at'], 0.0)
+    return {
+        **cached['health'],
+        'age_seconds': round(age, 1),
+        'stale': age > _get_setting('HEALTH_SNAPSHOT_MAX_AGE', DEFAULT_SNAPSHOT_MAX_AGE),
+    }
+
+
+def _refresh_in_thread():
+    try:
+        refresh_health_snapshot()
+    except Exception as e:
+        logger.error(f"Background health snapshot refresh failed: {e}")
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+        connections.close_all()
+        _refresh_lock.release()
+
+
+def start_background_refresh():
+    """
+    Refresh the snapshot in a background thread, unless a refresh is running.
+
+    The cache lock keeps processes from refreshing at the same time; it
+    expires on its own if a refreshing process dies. Returns whether a
+    refresh was started.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        timeout = _get_setting('HEALTH_SNAPSHOT_MAX_AGE', DEFAULT_SNAPSHOT_MAX_AGE)
+        if not cache.add(REFRESH_LOCK_KEY, 1, timeout):
+            _refresh_lock.release()
+            return False
+        threading.Thread(target=_refresh_in_thread, name='health-snapshot-refresh', daemon=True).start()
+        return True
+    except Exception as e:
+        logger.error(f"Could not start health snapshot refresh: {e}")
+        _refresh_lock.release()
+        return False
+
+
+def liveness_response():
+    """Liveness probe: answers without touching any backing service."""
+    return JsonResponse({'status': 'ok', 'message': 'Service is running'})
+
+
+def readiness_response():
+    """
+    Readiness probe: can this instance reach the database and cache?
+
+    Celery and processing checks are left to the snapshot, so a worker
+    outage doesn't take every web instance out of the load balancer.
+    """
+    checks = {
+        'database': check_database(),
+        'redis': check_redis(),
+    }
+    ready = all(c['status'] == 'healthy' for c in checks.values())
+    return JsonResponse(
+        {'status': 'ready' if ready else 'not_ready', 'checks': checks},
+        status=200 if ready else 503,
+    )
+
+
+def snapshot_allowed(request) -> bool:
+    """Whether a request may see the full snapshot: staff, or the shared token."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return True
+    token = _get_setting('HEALTH_CHECK_TOKEN', '')
+    supplied = request.headers.get('X-Health-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def snapshot_response():
+    """Full health from the cached snapshot; 503 unless healthy and fresh."""
+    snapshot = get_health_snapshot()
+    if snapshot is None or snapshot['stale']:
+        start_background_refresh()
+    if snapshot is None:
+        return JsonResponse({
+            'status': 'unknown',
+            'message': 'Health snapshot not computed yet',
+            'age_seconds': None,
+        }, status=503)
+    ok = snapshot['status'] == 'healthy' and not snapshot['stale']
+    return JsonResponse(snapshot, status=200 if ok else 503)
+
+
 def record_metrics():
     """Record current metrics to database for historical tracking."""
     from core.models import SystemHealthMetric
 
-    health = get_full_health_status()
+    # Refreshes the snapshot too, since the checks have been run anyway
+    health = refresh_health_snapshot()
 
     # Record Celery metrics
     celery = health['checks']['celery']
@@ -0,0 +1,325 @@
+"""
+Batched, resumable re-encryption of encrypted columns.
+
+Used by the rotate_encryption_key command and encrypt_existing_data():
+- rows are read in primary key order, a batch at a time (keyset pagination),
+  so memory stays flat however large the table is
+- each batch is written with one executemany UPDATE in its own transaction;
+  the UPDATE only matches rows whose stored value is unchanged, so values the
+  application rewrites meanwhile are never clobbered
+- progress is saved in a KeyRotationCheckpoint row per column and primary key
+  range after every batch, so an interrupted run resumes where it stopped
+- primary key ranges can be processed by several worker processes
+
+With the new key deployed as FIELD_ENCRYPTION_KEY and the old one kept in
+FIELD_ENCRYPTION_RETIRED_KEYS, the application reads both while a rotation
+runs, so it can run online.
+"""
+
+import base64
+import hashlib
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# (lower, upper]: exclusive lower bound, inclusive upper bound; None is open
+PkRange = Tuple[Optional[int], Optional[int]]
+
+
+@dataclass
+class RotationStats:
+    """Row counts and timing for one column (or one range of it)."""
+    rotated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    failed_pks: List = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return self.rotated + self.skipped + self.failed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add(self, other: 'RotationStats'):
+        self.rotated += other.rotated
+        self.skipped += other.skipped
+        self.failed += other.failed
+        self.batches += other.batches
+        self.failed_pks.extend(other.failed_pks)
+
+
+class SkipValue(Exception):
+    """Raised by a transform for a value that needs no change."""
+
+
+class Reencryptor:
+    """
+    Transform for key rotation: decrypt with any old key, encrypt with the new one.
+
+    Values already encrypted with the new key are skipped, so reruns and
+    resumed runs are harmless. Holds key strings only, so it can be passed
+    to worker processes.
+    """
+
+    def __init__(self, new_key: str, old_keys: Sequence[str]):
+        self.new_key = new_key
+        self.old_keys = list(old_keys)
+        self._fernets = None
+
+    def __getstate__(self):
+        return {'new_key': self.new_key, 'old_keys': self.old_keys, '_fernets': None}
+
+    def _get_fernets(self):
+        if self._fernets is None:
+            self._fernets = (
+                Fernet(self.new_key.encode()),
+                MultiFernet([Fernet(key.encode()) for key in self.old_keys]),
+            )
+        return self._fernets
+
+    def __call__(self, raw_value: str) -> str:
+        new_fernet, old_fernets = self._get_fernets()
+        token = base64.urlsafe_b64decode(raw_value.encode('utf-8'))
+        try:
+            new_fernet.decrypt(token)
+        except InvalidToken:
+            pass
+        else:
+            raise SkipValue
+        plaintext = old_fernets.decrypt(token)
+        return base64.urlsafe_b64encode(new_fernet.encrypt(plaintext)).decode('utf-8')
+
+
+def key_fingerprint(key: str) -> str:
+    """Short non-reversible identifier for a key, to tie checkpoints to it."""
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def split_pk_range(table: str, pk_column: str, column: str, parts: int) -> List[PkRange]:
+    """Split the primary keys of rows with a value in column into parts ranges."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT MIN("{pk_column}"), MAX("{pk_column}") FROM "{table}" '
+            f'WHERE "{column}" IS NOT NULL AND "{column}" != %s',
+            [''],
+        )
+        low, high = cursor.fetchone()
+
+    if low is None or parts <= 1:
+        return [(None, None)]
+
+    step = max((high - low + 1) // parts, 1)
+    bounds = list(range(low - 1, high, step))[:parts] + [high]
+    ranges = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+    # Open the ends so rows inserted outside [low, high] meanwhile are covered
+    ranges[0] = (None, ranges[0][1])
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def _fetch_batch(table, pk_column, column, after, upper, batch_size):
+    conditions = [f'"{column}" IS NOT NULL', f'"{column}" != %s']
+    params = ['']
+    if after is not None:
+        conditions.append(f'"{pk_column}" > %s')
+        params.append(after)
+    if upper is not None:
+        conditions.append(f'"{pk_column}" <= %s')
+        params.append(upper)
+    params.append(batch_size)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT "{pk_column}", "{column}" FROM "{table}" '
+            f'WHERE {" AND ".join(conditions)} ORDER BY "{pk_column}" LIMIT %s',
+            params,
+        )
+        return cursor.fetchall()
+
+
+def reencrypt_range(
+    table: str,
+    pk_column: str,
+    column: str,
+    transform: Callable[[str], str],
+    pk_range: PkRange = (None, None),
+    execute: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_name: str = None,
+) -> RotationStats:
+    """
+    Re-encrypt the values of column for rows in pk_range.
+
+    transform(stored value) returns the new stored value, raises SkipValue
+    to leave a row alone, or raises any other exception to count the row as
+    failed. With checkpoint_name, progress is resumed from and saved to the
+    KeyRotationCheckpoint for this range, which is deleted when it completes.
+    """
+    from .models import KeyRotationCheckpoint
+
+    lower, upper = pk_range
+    after = lower
+    checkpoint = None
+    if execute and checkpoint_name:
+        checkpoint = KeyRotationCheckpoint.objects.filter(
+            name=checkpoint_name, range_start=lower
+        ).first()
+        if checkpoint is not None and checkpoint.last_pk is not None:
+            after = checkpoint.last_pk
+
+    stats = RotationStats()
+    started = time.monotonic()
+
+    while True:
+        batch_started = time.monotonic()
+        rows = _fetch_batch(table, pk_column, column, after, upper, batch_size)
+        if not rows:
+            break
+
+        updates = []
+        failed = 0
+        for pk, raw_value in rows:
+            try:
+                updates.append((transform(raw_value), pk, raw_value))
+            except SkipValue:
+                stats.skipped += 1
+            except Exception as e:
+                failed += 1
+                stats.failed_pks.append(pk)
+                logger.warning(f"{table}.{column} pk={pk}: re-encryption failed ({e.__class__.__name__})")
+
+        after = rows[-1][0]
+        if execute:
+            with transaction.atomic():
+                if updates:
+                    with connection.cursor() as cursor:
+                        # Matching on the old value leaves rows rewritten meanwhile alone
+                        cursor.executemany(
+                            f'UPDATE "{table}" SET "{column}" = %s '
+                            f'WHERE "{pk_column}" = %s AND "{column}" = %s',
+                            updates,
+                        )
+                if checkpoint is not None:
+                    checkpoint.last_pk = after
+                    checkpoint.rows_rotated += len(updates)
+                    checkpoint.rows_failed += failed
+                    checkpoint.save(update_fields=['last_pk', 'rows_rotated', 'rows_failed', 'updated_at'])
+
+        stats.rotated += len(updates)
+        stats.failed += failed
+        stats.batches += 1
+
+        batch_elapsed = time.monotonic() - batch_started
+        logger.info(
+            f"{table}.{column}: batch {stats.batches} up to pk {after}, "
+            f"{len(rows)} rows in {batch_elapsed:.3f}s "
+            f"({len(rows) / batch_elapsed if batch_elapsed else 0:.0f} rows/s)"
+        )
+        if len(rows) < batch_size:
+            break
+
+    if checkpoint is not None:
+        checkpoint.delete()
+
+    stats.elapsed = time.monotonic() - started
+    return stats
+
+
+def _reencrypt_range_in_worker(kwargs) -> RotationStats:
+    # Forked workers must not share the parent's database connection
+    connections.close_all()
+    try:
+        return reencrypt_range(**kwargs)
+    finally:
+        connections.close_all()
+
+
+def reencrypt_column(
+    table: str,
+    pk_column: str,
+    column: str,
+    transform: Callable[[str], str],
+    execute: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    fingerprint: str = '',
+    restart: bool = False,
+) -> RotationStats:
+    """
+    Re-encrypt a whole column, resuming an interrupted run if there is one.
+
+    The column's primary keys are split into one range per worker; with
+    workers > 1 the ranges are processed by forked worker processes (the
+    transform must then be picklable, like Reencryptor). A resumed run keeps
+    the ranges of the original run. Checkpoints record fingerprint (see
+    key_fingerprint()); resuming checkpoints written for a different key
+    raises ValueError unless restart is set.
+    """
+    from .models import KeyRotationCheckpoint
+
+    name = f'{table}.{column}'
+    ranges = None
+    if execute:
+        checkpoints = KeyRotationCheckpoint.objects.filter(name=name)
+        if restart:
+            checkpoints.delete()
+        elif checkpoints.exists():
+            if checkpoints.exclude(key_fingerprint=fingerprint).exists():
+                raise ValueError(
+                    f"{name} has checkpoints from a rotation to a different key; "
+                    "restart the rotation to discard them"
+                )
+            ranges = [(c.range_start, c.range_end) for c in checkpoints]
+            logger.info(f"{name}: resuming {len(ranges)} interrupted range(s)")
+
+    if ranges is None:
+        ranges = split_pk_range(table, pk_column, column, workers)
+        if execute:
+            KeyRotationCheckpoint.objects.bulk_create([
+                KeyRotationCheckpoint(
+                    name=name, range_start=lower, range_end=upper, key_fingerprint=fingerprint
+                )
+                for lower, upper in ranges
+            ])
+
+    jobs = [
+        dict(
+            table=table, pk_column=pk_column, column=column, transform=transform,
+            pk_range=pk_range, execute=execute, batch_size=batch_size, checkpoint_name=name,
+        )
+        for pk_range in ranges
+    ]
+
+    stats = RotationStats()
+    started = time.monotonic()
+    if workers > 1 and len(jobs) > 1:
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)), mp_context=get_context('fork')
+        ) as pool:
+            for part in pool.map(_reencrypt_range_in_worker, jobs):
+                stats.add(part)
+    else:
+        for job in jobs:
+            stats.add(reencrypt_range(**job))
+    stats.elapsed = time.monotonic() - started
+
+    logger.info(
+        f"{name}: {stats.rotated} rotated, {stats.skipped} skipped, {stats.failed} failed "
+        f"in {stats.elapsed:.2f}s ({stats.rows_per_second:.0f} rows/s)"
+    )
+    return stats
@@ -2,7 +2,17 @@
 Management command to rotate the FIELD_ENCRYPTION_KEY.
 
 Decrypts all PII fields with the old key, then re-encrypts with the new key.
-Must be run BEFORE updating FIELD_ENCRYPTION_KEY in your environment.
+Rows are streamed in primary key batches and updated with one executemany
+per batch; progress is checkpointed, so an interrupted run picks up where it
+stopped when run again (see core.key_rotation).
+
+Online rotation (no downtime):
+    1. Deploy the new key as FIELD_ENCRYPTION_KEY and the old one in
+       FIELD_ENCRYPTION_RETIRED_KEYS. The app now writes with the new key
+       and still reads values encrypted with the old one.
+    2. python manage.py rotate_encryption_key --execute
+       (keys are taken from settings when --old-key/--new-key are omitted)
+    3. Remove the old key from FIELD_ENCRYPTION_RETIRED_KEYS.
 
 Usage:
     # Dry run (see what would change, no writes):
@@ -11,16 +21,25 @@ Usage:
     # Actually rotate:
     python manage.py rotate_encryption_key --old-key <OLD> --new-key <NEW> --execute
 
+    # Large tables: 4 worker processes over primary key ranges
+    python manage.py rotate_encryption_key --execute --workers 4
+
     # Generate a new Fernet key:
     python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
 """
 
 import base64
-import json
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import connection
+
+from core.key_rotation import (
+    DEFAULT_BATCH_SIZE,
+    Reencryptor,
+    key_fingerprint,
+    reencrypt_column,
+)
 
 
 # Every encrypted field in the codebase.
@@ -33,15 +52,18 @@ ENCRYPTED_FIELDS = [
 ]
 
 
-def _validate_fernet_key(key_str: str, label: str) -> Fernet:
-    """Validate and return a Fernet instance for the given key string."""
+def _validate_fernet_key(key_str: str, label: str) -> str:
+    """Validate a Fernet key string and return it."""
     try:
         decoded = base64.urlsafe_b64decode(key_str.encode())
         if len(decoded) != 32:
             raise CommandError(
                 f"{label} must be 32 bytes when base64-decoded (got {len(decoded)})"
             )
-        return Fernet(key_str.encode())
+        Fernet(key_str.encode())
+        return key_str
+    except CommandError:
+        raise
     except Exception as e:
         raise CommandError(f"Invalid {label}: {e}")
 
@@ -51,28 +73,42 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument(
-            '--old-key', required=True,
-            help='Current FIELD_ENCRYPTION_KEY (the one data is encrypted with now)',
+            '--old-key',
+            help='Current FIELD_ENCRYPTION_KEY (the one data is encrypted with now). '
+                 'Defaults to FIELD_ENCRYPTION_RETIRED_KEYS.',
         )
         parser.add_argument(
-            '--new-key', required=True,
-            help='New FIELD_ENCRYPTION_KEY to re-encrypt data with',
+            '--new-key',
+            help='New FIELD_ENCRYPTION_KEY to re-encrypt data with. '
+                 'Defaults to FIELD_ENCRYPTION_KEY.',
         )
         parser.add_argument(
             '--execute', action='store_true',
             help='Actually perform the rotation. Without this flag, dry-run only.',
         )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Rows read and updated per batch (default {DEFAULT_BATCH_SIZE}).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Worker processes per table, each rotating one primary key range (default 1).',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Discard checkpoints of an interrupted run and start over.',
+        )
 
     def handle(self, **options):
-        old_key_str = options['old_key']
-        new_key_str = options['new_key']
+        new_key, old_keys = self._resolve_keys(options['old_key'], options['new_key'])
         execute = options['execute']
+        batch_size = options['batch_size']
+        workers = options['workers']
+        if batch_size < 1 or workers < 1:
+            raise CommandError("--batch-size and --workers must be at least 1.")
 
-        if old_key_str == new_key_str:
-            raise CommandError("Old and new keys are identical. Nothing to do.")
-
-        old_fernet = _validate_fernet_key(old_key_str, 'old-key')
-        new_fernet = _validate_fernet_key(new_key_str, 'new-key')
+        transform = Reencryptor(new_key, old_keys)
+        fingerprint = key_fingerprint(new_key)
 
         mode = 'EXECUTING' if execute else 'DRY RUN'
         self.stdout.write(self.style.WARNING(f'\n=== Key Rotation ({mode}) ===\n'))
@@ -80,25 +116,49 @@ class Command(BaseCommand):
         total_rotated = 0
         total_failed = 0
         total_skipped = 0
+        total_rows = 0
+        total_elapsed = 0.0
 
         for table, pk_col, field_col, is_json in ENCRYPTED_FIELDS:
-            rotated, failed, skipped = self._rotate_field(
-                table, pk_col, field_col, is_json,
-                old_fernet, new_fernet, execute,
+            self.stdout.write(f'  {table}.{field_col}:')
+            try:
+                stats = reencrypt_column(
+                    table, pk_col, field_col, transform,
+                    execute=execute, batch_size=batch_size, workers=workers,
+                    fingerprint=fingerprint, restart=options['restart'],
+                )
+            except ValueError as e:
+                raise CommandError(f"{e} (use --restart)")
+
+            for pk in stats.failed_pks[:20]:
+                self.stdout.write(self.style.WARNING(f'    pk={pk}: decrypt failed'))
+            if len(stats.failed_pks) > 20:
+                self.stdout.write(self.style.WARNING(
+                    f'    ... and {len(stats.failed_pks) - 20} more'
+                ))
+
+            action = 'rotated' if execute else 'would rotate'
+            self.stdout.write(
+                f'    {stats.rows} rows: {stats.rotated} {action}, {stats.skipped} skipped '
+                f'(already on new key), {stats.failed} failed '
+                f'in {stats.elapsed:.2f}s ({stats.rows_per_second:.0f} rows/s)'
             )
-            total_rotated += rotated
-            total_failed += failed
-            total_skipped += skipped
+            total_rotated += stats.rotated
+            total_failed += stats.failed
+            total_skipped += stats.skipped
+            total_rows += stats.rows
+            total_elapsed += stats.elapsed
 
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS(
-            f'Summary: {total_rotated} rotated, {total_skipped} skipped (null/empty), '
-            f'{total_failed} failed'
+            f'Summary: {total_rotated} rotated, {total_skipped} skipped (already on new key), '
+            f'{total_failed} failed; {total_rows} rows in {total_elapsed:.2f}s '
+            f'({total_rows / total_elapsed if total_elapsed else 0:.0f} rows/s)'
         ))
 
         if total_failed > 0:
             self.stdout.write(self.style.ERROR(
-                'Some rows failed decryption. They may be plaintext, already rotated, '
+                'Some rows failed decryption. They may be plaintext '
                 'or encrypted with a different key. Review the output above.'
             ))
 
@@ -107,57 +167,22 @@ class Command(BaseCommand):
                 '\nThis was a dry run. Add --execute to perform the rotation.'
             ))
 
-    def _rotate_field(self, table, pk_col, field_col, is_json, old_fernet, new_fernet, execute):
-        """Rotate one encrypted field. Returns (rotated, failed, skipped)."""
-        self.stdout.write(f'  {table}.{field_col}:')
-
-        with connection.cursor() as cursor:
-            cursor.execute(
-                f'SELECT "{pk_col}", "{field_col}" FROM "{table}" '
-                f'WHERE "{field_col}" IS NOT NULL AND "{field_col}" != %s',
-                [''],
-            )
-            rows = cursor.fetchall()
-
-        if not rows:
-            self.stdout.write(f'    0 rows (empty)')
-            return 0, 0, 0
-
-        rotated = 0
-        failed = 0
-        skipped = 0
-
-        for pk, raw_value in rows:
-            if not raw_value or not raw_value.strip():
-                skipped += 1
-                continue
-
-            # Decrypt with old key
-            try:
-                decoded = base64.urlsafe_b64decode(raw_value.encode('utf-8'))
-                plaintext_bytes = old_fernet.decrypt(decoded)
-                plaintext = plaintext_bytes.decode('utf-8')
-            except (InvalidToken, ValueError, Exception) as e:
-                failed += 1
-                self.stdout.write(self.style.WARNING(
-                    f'    pk={pk}: decrypt failed ({e.__class__.__name__})'
-                ))
-                continue
-
-            # Re-encrypt with new key
-            new_encrypted = new_fernet.encrypt(plaintext.encode('utf-8'))
-            new_value = base64.urlsafe_b64encode(new_encrypted).decode('utf-8')
-
-            if execute:
-                with connection.cursor() as cursor:
-                    cursor.execute(
-                        f'UPDATE "{table}" SET "{field_col}" = %s WHERE "{pk_col}" = %s',
-                        [new_value, pk],
-                    )
-            rotated += 1
-
-        action = 'rotated' if execute else 'would rotate'
-        self.stdout.write(
-            f'    {len(rows)} rows: {rotated} {action}, {skipped} skipped, {failed} failed'
-        )
-        return rotated, failed, skipped
+    def _resolve_keys(self, old_key, new_key):
+        """New key and old keys from the options, falling back to the key ring settings."""
+        if new_key is None:
+            new_key = getattr(settings, 'FIELD_ENCRYPTION_KEY', None)
+            if not new_key:
+                raise CommandError("Pass --new-key or set FIELD_ENCRYPTION_KEY.")
+        if old_key is not None:
+            old_keys = [old_key]
+        else:
+            old_keys = list(getattr(settings, 'FIELD_ENCRYPTION_RETIRED_KEYS', None) or [])
+            if not old_keys:
+                raise CommandError("Pass --old-key or set FIELD_ENCRYPTION_RETIRED_KEYS.")
+
+        new_key = _validate_fernet_key(new_key, 'new-key')
+        old_keys = [_validate_fernet_key(key, 'old-key') for key in old_keys]
+        old_keys = [key for key in old_keys if key != new_key]
+        if not old_keys:
+            raise CommandError("Old and new keys are identical. Nothing to do.")
+        return new_key, old_keys
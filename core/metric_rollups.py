@@ -0,0 +1,235 @@
+"""
+Minute, hour and day rollups of SystemHealthMetric.
+
+rollup_health_metrics() (run by record_health_metrics after every sample)
+summarises raw metrics into SystemHealthMetricRollup rows - count, min, max,
+average and 95th percentile per metric type and bucket:
+- only buckets that have closed since the last rollup of each resolution are
+  computed, so each run reads just the raw rows recorded since then
+- rows are upserted on (metric_type, resolution, bucket_start), so a rerun
+  over the same buckets is harmless
+
+Each resolution keeps its rollups for a retention period
+(HEALTH_METRIC_MINUTE_RETENTION_DAYS, HEALTH_METRIC_HOUR_RETENTION_DAYS; day
+rollups are kept indefinitely), pruned with the raw rows by
+cleanup_old_health_metrics.
+
+get_metric_series() answers a time window from the finest resolution that
+covers it in at most max_points buckets.
+"""
+
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Finest first
+RESOLUTIONS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+# Defaults when not configured in settings (None: kept indefinitely)
+DEFAULT_RETENTION_DAYS = {
+    'minute': 7,
+    'hour': 180,
+    'day': None,
+}
+DEFAULT_MAX_POINTS = 500
+
+# Raw rows are timestamped when saved, so leave a closed bucket a little time
+# for samples still being written before summarising it
+ROLLUP_DELAY = timedelta(seconds=30)
+
+
+@dataclass
+class MetricSeries:
+    """Rolled-up points of one metric type over a window, oldest first."""
+    metric_type: str
+    resolution: str
+    start: datetime
+    end: datetime
+    points: List[Dict] = field(default_factory=list)
+
+
+def retention_days(resolution: str) -> Optional[int]:
+    """Days rollups of resolution are kept, or None if kept indefinitely."""
+    if resolution == 'day':
+        return None
+    return getattr(
+        settings,
+        f'HEALTH_METRIC_{resolution.upper()}_RETENTION_DAYS',
+        DEFAULT_RETENTION_DAYS[resolution],
+    )
+
+
+def bucket_start(value: datetime, resolution: str) -> datetime:
+    """Start (UTC) of the resolution bucket containing value."""
+    value = value.astimezone(dt_timezone.utc)
+    if resolution == 'minute':
+        return value.replace(second=0, microsecond=0)
+    if resolution == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty sorted list."""
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _summarise(metric_type, resolution, start, values):
+    from .models import SystemHealthMetricRollup
+
+    values.sort()
+    return SystemHealthMetricRollup(
+        metric_type=metric_type,
+        resolution=resolution,
+        bucket_start=start,
+        count=len(values),
+        min_value=values[0],
+        max_value=values[-1],
+        avg_value=sum(values) / len(values),
+        p95_value=percentile(values, 0.95),
+    )
+
+
+def rollup_resolution(resolution: str, now: datetime = None) -> int:
+    """
+    Summarise the buckets of resolution that closed since its last rollup.
+
+    Returns the number of rollup rows written.
+    """
+    from .models import SystemHealthMetric, SystemHealthMetricRollup
+
+    now = now or timezone.now()
+    step = RESOLUTIONS[resolution]
+    end = bucket_start(now - ROLLUP_DELAY, resolution)
+
+    last = SystemHealthMetricRollup.objects.filter(
+        resolution=resolution
+    ).aggregate(last=Max('bucket_start'))['last']
+    if last is not None:
+        start = last + step
+    else:
+        first = SystemHealthMetric.objects.aggregate(first=Min('timestamp'))['first']
+        if first is None:
+            return 0
+        start = bucket_start(first, resolution)
+
+    days = retention_days(resolution)
+    if days is not None:
+        # Nothing older than the retention period would be kept anyway
+        start = max(start, bucket_start(now - timedelta(days=days), resolution))
+    if start >= end:
+        return 0
+
+    buckets = defaultdict(list)
+    rows = SystemHealthMetric.objects.filter(
+        timestamp__gte=start, timestamp__lt=end
+    ).order_by().values_list('metric_type', 'timestamp', 'value')
+    for metric_type, timestamp, value in rows.iterator(chunk_size=2000):
+        buckets[(metric_type, bucket_start(timestamp, resolution))].append(value)
+
+    rollups = [
+        _summarise(metric_type, resolution, start_of_bucket, values)
+        for (metric_type, start_of_bucket), values in buckets.items()
+    ]
+    if rollups:
+        SystemHealthMetricRollup.objects.bulk_create(
+            rollups,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['metric_type', 'resolution', 'bucket_start'],
+            update_fields=['count', 'min_value', 'max_value', 'avg_value', 'p95_value'],
+        )
+
+    logger.info(
+        f"Rolled up {len(rollups)} {resolution} buckets of health metrics "
+        f"from {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}"
+    )
+    return len(rollups)
+
+
+def rollup_health_metrics(now: datetime = None) -> Dict[str, int]:
+    """Bring every resolution up to date; returns rollup rows written per resolution."""
+    now = now or timezone.now()
+    return {resolution: rollup_resolution(resolution, now) for resolution in RESOLUTIONS}
+
+
+def prune_rollups(now: datetime = None) -> int:
+    """Delete rollups past their resolution's retention period; returns rows deleted."""
+    from .models import SystemHealthMetricRollup
+
+    now = now or timezone.now()
+    deleted = 0
+    for resolution in RESOLUTIONS:
+        days = retention_days(resolution)
+        if days is None:
+            continue
+        count, _ = SystemHealthMetricRollup.objects.filter(
+            resolution=resolution,
+            bucket_start__lt=now - timedelta(days=days),
+        ).delete()
+        deleted += count
+    return deleted
+
+
+def choose_resolution(
+    start: datetime, end: datetime, max_points: int = DEFAULT_MAX_POINTS, now: datetime = None
+) -> str:
+    """
+    Finest resolution that covers start..end in at most max_points buckets
+    and whose rollups are still kept back to start.
+    """
+    now = now or timezone.now()
+    window = end - start
+    for resolution, step in RESOLUTIONS.items():
+        days = retention_days(resolution)
+        if days is not None and start < now - timedelta(days=days):
+            continue
+        if window / step <= max_points:
+            return resolution
+    return 'day'
+
+
+def get_metric_series(
+    metric_type: str,
+    start: datetime,
+    end: datetime = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+    resolution: str = None,
+) -> MetricSeries:
+    """
+    Rolled-up values of metric_type between start and end (default now).
+
+    The resolution is picked by choose_resolution() unless given. Only closed
+    buckets are rolled up, so the most recent bucket of the resolution is
+    not included yet.
+    """
+    from .models import SystemHealthMetricRollup
+
+    end = end or timezone.now()
+    resolution = resolution or choose_resolution(start, end, max_points)
+
+    points = list(
+        SystemHealthMetricRollup.objects.filter(
+            metric_type=metric_type,
+            resolution=resolution,
+            bucket_start__gte=bucket_start(start, resolution),
+            bucket_start__lt=end,
+        ).order_by('bucket_start').values(
+            'bucket_start', 'count', 'min_value', 'max_value', 'avg_value', 'p95_value'
+        )
+    )
+    return MetricSeries(metric_type, resolution, start, end, points)
@@ -3,7 +3,6 @@ Custom middleware for the VA Benefits Navigator.
 """
 
 import logging
-from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
@@ -18,18 +17,26 @@ class HealthCheckMiddleware:
 
     DigitalOcean App Platform uses internal IPs (e.g., 10.244.x.x) for health checks,
     which would fail ALLOWED_HOSTS validation.
+
+    Only the liveness and readiness probes are answered here. The full
+    snapshot (/health/?full=1) is passed on to the health_check view, behind
+    ALLOWED_HOSTS, the security middleware and its access check.
     """
 
+    LIVENESS_PATHS = ('/health/', '/health', '/health/live/')
+    READINESS_PATHS = ('/health/ready/',)
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Respond to health check without checking ALLOWED_HOSTS
-        if request.path == '/health/' or request.path == '/health':
-            return JsonResponse({
-                'status': 'ok',
-                'message': 'Service is running'
-            })
+        # Respond to health checks without checking ALLOWED_HOSTS
+        if request.path in self.LIVENESS_PATHS and request.GET.get('full') != '1':
+            from core.health import liveness_response
+            return liveness_response()
+        if request.path in self.READINESS_PATHS:
+            from core.health import readiness_response
+            return readiness_response()
 
         return self.get_response(request)
 
@@ -100,7 +107,12 @@ class AuditMiddleware(MiddlewareMixin):
         return response
 
     def _audit_request(self, request, response):
-        """Determine and create appropriate audit log entries."""
+        """
+        Determine and queue appropriate audit log entries.
+
+        Entries go through the buffered writer (core.audit), so the response
+        doesn't wait on an INSERT.
+        """
         from .models import AuditLog
 
         path = request.path
@@ -108,7 +120,7 @@ class AuditMiddleware(MiddlewareMixin):
 
         # Document upload (POST to upload endpoint)
         if '/document/upload/' in path and method == 'POST' and response.status_code in [200, 201, 302]:
-            AuditLog.log(
+            AuditLog.enqueue(
                 action='document_upload',
                 request=request,
                 details={'upload_path': path},
@@ -120,7 +132,7 @@ class AuditMiddleware(MiddlewareMixin):
             # Try to extract document ID from path
             doc_id = self._extract_id_from_path(path, 'document')
             if doc_id:
-                AuditLog.log(
+                AuditLog.enqueue(
                     action='document_view',
                     request=request,
                     resource_type='Document',
@@ -132,7 +144,7 @@ class AuditMiddleware(MiddlewareMixin):
         if '/document/' in path and '/download/' in path and method == 'GET':
             doc_id = self._extract_id_from_path(path, 'document')
             if doc_id:
-                AuditLog.log(
+                AuditLog.enqueue(
                     action='document_download',
                     request=request,
                     resource_type='Document',
@@ -144,7 +156,7 @@ class AuditMiddleware(MiddlewareMixin):
         if '/document/' in path and '/delete/' in path and method == 'POST':
             doc_id = self._extract_id_from_path(path, 'document')
             if doc_id:
-                AuditLog.log(
+                AuditLog.enqueue(
                     action='document_delete',
                     request=request,
                     resource_type='Document',
@@ -154,7 +166,7 @@ class AuditMiddleware(MiddlewareMixin):
 
         # Denial decoder (AI analysis)
         if '/decode/' in path and method == 'POST' and response.status_code in [200, 201, 302]:
-            AuditLog.log(
+            AuditLog.enqueue(
                 action='denial_decode',
                 request=request,
                 details={'decode_path': path},
@@ -163,7 +175,7 @@ class AuditMiddleware(MiddlewareMixin):
 
         # AI analysis endpoints
         if '/agents/' in path and '/analyze' in path and method == 'POST':
-            AuditLog.log(
+            AuditLog.enqueue(
                 action='ai_analysis',
                 request=request,
                 details={'analysis_path': path},
@@ -172,7 +184,7 @@ class AuditMiddleware(MiddlewareMixin):
 
         # Profile update
         if '/accounts/profile/' in path and method == 'POST':
-            AuditLog.log(
+            AuditLog.enqueue(
                 action='profile_update',
                 request=request,
             )
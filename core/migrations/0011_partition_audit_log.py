@@ -0,0 +1,191 @@
+# Monthly range partitioning for core_auditlog on PostgreSQL.
+#
+# The existing table is renamed to core_auditlog_legacy and attached as the
+# partition covering everything before next month (or after its latest row),
+# so no rows are copied.
+# A new partitioned core_auditlog takes over the original index and foreign
+# key names, with a primary key of (id, timestamp) as PostgreSQL requires the
+# partition key in unique constraints. Django still treats id as the primary
+# key. Monthly partitions are then maintained by core.partitioning.
+#
+# The legacy primary key is rebuilt as (id, timestamp) and the ATTACH
+# validates the legacy rows, both under an ACCESS EXCLUSIVE lock; on very
+# large tables run this migration in a maintenance window.
+#
+# Other databases keep the plain table.
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLE = "core_auditlog"
+LEGACY = "core_auditlog_legacy"
+SEQUENCE = "core_auditlog_id_seq"
+MONTHS_AHEAD = 3
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value, months):
+    index = value.month - 1 + months
+    return value.replace(year=value.year + index // 12, month=index % 12 + 1)
+
+
+def _indexes(cursor, table):
+    """(name, definition, is_primary) for each index on table."""
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid), x.indisprimary
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+        """,
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _constraints(cursor, table, contype):
+    """(name, definition) for each constraint of a type on table."""
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = %s
+        """,
+        [table, contype],
+    )
+    return cursor.fetchall()
+
+
+def _rename_indexes_and_constraints(cursor, table, suffix):
+    """Free the original names so the replacement table can reuse them."""
+    for name, _ in _constraints(cursor, table, "p") + _constraints(cursor, table, "f"):
+        cursor.execute(
+            f'ALTER TABLE "{table}" RENAME CONSTRAINT "{name}" TO "{name[:63 - len(suffix)]}{suffix}"'
+        )
+    for name, _, is_primary in _indexes(cursor, table):
+        if not is_primary:
+            cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:63 - len(suffix)]}{suffix}"')
+
+
+def partition_audit_log(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+
+        indexes = [d for _, d, is_primary in _indexes(cursor, TABLE) if not is_primary]
+        foreign_keys = _constraints(cursor, TABLE, "f")
+
+        # Next id, from the old identity/serial sequence and the data
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        old_sequence = cursor.fetchone()[0]
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0), MAX("timestamp") FROM "{TABLE}"')
+        last_id, last_timestamp = cursor.fetchone()
+        if old_sequence:
+            cursor.execute(f"SELECT last_value FROM {old_sequence}")
+            last_id = max(last_id, cursor.fetchone()[0])
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY}"')
+        _rename_indexes_and_constraints(cursor, LEGACY, "_legacy")
+
+        # Partitions can't carry their own identity/serial default
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+            [LEGACY],
+        )
+        if cursor.fetchone()[0]:
+            cursor.execute(f'ALTER TABLE "{LEGACY}" ALTER COLUMN id DROP IDENTITY')
+        elif old_sequence:
+            cursor.execute(f'ALTER TABLE "{LEGACY}" ALTER COLUMN id DROP DEFAULT')
+            cursor.execute(f"DROP SEQUENCE {old_sequence}")
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".id')
+        cursor.execute("SELECT setval(%s, %s)", [SEQUENCE, max(last_id, 1)])
+        cursor.execute(
+            f"ALTER TABLE \"{TABLE}\" ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}'::regclass)"
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id, "timestamp")'
+        )
+
+        # Index definitions still name "core_auditlog", now the partitioned table
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+        # A partition's primary key must match the parent's (id, timestamp)
+        for name, _ in _constraints(cursor, LEGACY, "p"):
+            cursor.execute(f'ALTER TABLE "{LEGACY}" DROP CONSTRAINT "{name}"')
+        cursor.execute(
+            f'ALTER TABLE "{LEGACY}" ADD CONSTRAINT "{LEGACY}_pkey" PRIMARY KEY (id, "timestamp")'
+        )
+
+        # The legacy partition must also cover any future-dated rows
+        boundary = _add_months(_month_start(datetime.now(timezone.utc)), 1)
+        if last_timestamp is not None:
+            last_timestamp = last_timestamp.astimezone(timezone.utc)
+            boundary = max(boundary, _add_months(_month_start(last_timestamp), 1))
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{LEGACY}" FOR VALUES FROM (MINVALUE) TO (%s)',
+            [boundary],
+        )
+        for offset in range(MONTHS_AHEAD):
+            lower = _add_months(boundary, offset)
+            cursor.execute(
+                f'CREATE TABLE "{TABLE}_p{lower:%Y_%m}" PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                [lower, _add_months(lower, 1)],
+            )
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+
+def unpartition_audit_log(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+        row = cursor.fetchone()
+        if not row or row[0] != "p":
+            return
+
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        indexes = [d for _, d, is_primary in _indexes(cursor, TABLE) if not is_primary]
+        foreign_keys = _constraints(cursor, TABLE, "f")
+
+        partitioned = f"{TABLE}_partitioned"
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{partitioned}"')
+        _rename_indexes_and_constraints(cursor, partitioned, "_part")
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{partitioned}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(f'ALTER SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".id')
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{partitioned}"')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id)')
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+        cursor.execute(f'DROP TABLE "{partitioned}" CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_audit_log_timestamp_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_log, unpartition_audit_log),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_partition_audit_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PurgeCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, unique=True, verbose_name="Purge"),
+                ),
+                (
+                    "last_pk",
+                    models.CharField(max_length=64, verbose_name="Last Primary Key"),
+                ),
+                (
+                    "rows_deleted",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Rows Deleted"
+                    ),
+                ),
+                (
+                    "batches",
+                    models.PositiveIntegerField(default=0, verbose_name="Batches"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Started"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated"),
+                ),
+            ],
+            options={
+                "verbose_name": "Purge Checkpoint",
+                "verbose_name_plural": "Purge Checkpoints",
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_purge_checkpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KeyRotationCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="table.column", max_length=150, verbose_name="Column"
+                    ),
+                ),
+                (
+                    "range_start",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Range Start"
+                    ),
+                ),
+                (
+                    "range_end",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Range End"
+                    ),
+                ),
+                (
+                    "last_pk",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Last Primary Key"
+                    ),
+                ),
+                (
+                    "key_fingerprint",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="Key Fingerprint"
+                    ),
+                ),
+                (
+                    "rows_rotated",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Rows Rotated"
+                    ),
+                ),
+                (
+                    "rows_failed",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Rows Failed"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Started"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated"),
+                ),
+            ],
+            options={
+                "verbose_name": "Key Rotation Checkpoint",
+                "verbose_name_plural": "Key Rotation Checkpoints",
+                "ordering": ["name", "range_start"],
+            },
+        ),
+    ]
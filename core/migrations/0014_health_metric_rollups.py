@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_key_rotation_checkpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SystemHealthMetricRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "metric_type",
+                    models.CharField(
+                        choices=[
+                            ("celery_queue", "Celery Queue Length"),
+                            ("celery_workers", "Celery Active Workers"),
+                            ("document_processing", "Document Processing"),
+                            ("ocr_success", "OCR Success Rate"),
+                            ("ai_analysis", "AI Analysis Success Rate"),
+                            ("response_time", "Response Time"),
+                        ],
+                        max_length=30,
+                        verbose_name="Metric Type",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[
+                            ("minute", "Minute"),
+                            ("hour", "Hour"),
+                            ("day", "Day"),
+                        ],
+                        max_length=10,
+                        verbose_name="Resolution",
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField(verbose_name="Bucket Start")),
+                ("count", models.PositiveIntegerField(verbose_name="Samples")),
+                ("min_value", models.FloatField(verbose_name="Minimum")),
+                ("max_value", models.FloatField(verbose_name="Maximum")),
+                ("avg_value", models.FloatField(verbose_name="Average")),
+                ("p95_value", models.FloatField(verbose_name="95th Percentile")),
+            ],
+            options={
+                "verbose_name": "System Health Metric Rollup",
+                "verbose_name_plural": "System Health Metric Rollups",
+                "ordering": ["-bucket_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["resolution", "bucket_start"],
+                        name="core_system_resolut_d58d47_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("metric_type", "resolution", "bucket_start"),
+                        name="unique_health_metric_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
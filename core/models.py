@@ -421,7 +421,8 @@ class AuditLog(models.Model):
         ('other', 'Other'),
     ]
 
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set when the entry is built, not when a buffered entry is flushed
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     # User info (preserved even if user deleted)
     user = models.ForeignKey(
@@ -516,6 +517,50 @@ class AuditLog(models.Model):
             success: Whether action succeeded
             error_message: Error message if failed
         """
+        log_entry = cls.build(
+            action,
+            request=request,
+            user=user,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            details=details,
+            success=success,
+            error_message=error_message,
+        )
+        log_entry.save()
+        return log_entry
+
+    @classmethod
+    def enqueue(cls, action: str, request=None, **kwargs):
+        """
+        Like log(), but hands the entry to the buffered writer (core.audit)
+        so the INSERT happens outside the request path.
+
+        Returns the unsaved entry. Saves immediately when
+        AUDIT_BUFFER_ENABLED is off.
+        """
+        from .audit import audit_buffer, buffering_enabled
+
+        log_entry = cls.build(action, request=request, **kwargs)
+        if buffering_enabled():
+            audit_buffer.add(log_entry)
+        else:
+            log_entry.save()
+        return log_entry
+
+    @classmethod
+    def build(
+        cls,
+        action: str,
+        request=None,
+        user=None,
+        resource_type: str = '',
+        resource_id: int = None,
+        details: dict = None,
+        success: bool = True,
+        error_message: str = '',
+    ):
+        """Build an unsaved audit log entry (see log() for arguments)."""
         log_entry = cls(
             action=action,
             resource_type=resource_type,
@@ -540,7 +585,6 @@ class AuditLog(models.Model):
             log_entry.user = user
             log_entry.user_email = user.email
 
-        log_entry.save()
         return log_entry
 
     @staticmethod
@@ -949,6 +993,55 @@ class SystemHealthMetric(models.Model):
         return f"{self.get_metric_type_display()}: {self.value} at {self.timestamp}"
 
 
+class SystemHealthMetricRollup(models.Model):
+    """
+    Summary of the SystemHealthMetric rows of one metric type in one time
+    bucket (see core.metric_rollups).
+
+    Buckets are a minute, an hour or a day (UTC); each is written once it has
+    closed, so history outlives the raw rows.
+    """
+
+    RESOLUTION_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    metric_type = models.CharField(
+        'Metric Type',
+        max_length=30,
+        choices=SystemHealthMetric.METRIC_TYPE_CHOICES
+    )
+    resolution = models.CharField('Resolution', max_length=10, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField('Bucket Start')
+    count = models.PositiveIntegerField('Samples')
+    min_value = models.FloatField('Minimum')
+    max_value = models.FloatField('Maximum')
+    avg_value = models.FloatField('Average')
+    p95_value = models.FloatField('95th Percentile')
+
+    class Meta:
+        verbose_name = 'System Health Metric Rollup'
+        verbose_name_plural = 'System Health Metric Rollups'
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric_type', 'resolution', 'bucket_start'],
+                name='unique_health_metric_rollup_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.get_metric_type_display()} {self.resolution} "
+            f"{self.bucket_start:%Y-%m-%d %H:%M}: avg {self.avg_value:.2f}"
+        )
+
+
 class ProcessingFailure(TimeStampedModel):
     """
     Tracks document processing failures for monitoring and alerting.
@@ -1107,3 +1200,55 @@ class DataRetentionPolicy(models.Model):
 
     def __str__(self):
         return f"{self.get_data_type_display()} - {self.retention_days} days"
+
+
+class PurgeCheckpoint(models.Model):
+    """
+    Progress of a batched retention purge (see core.purge).
+
+    Saved after every batch so a purge killed part-way resumes after the
+    last primary key it processed; deleted when the purge completes.
+    """
+
+    name = models.CharField('Purge', max_length=100, unique=True)
+    last_pk = models.CharField('Last Primary Key', max_length=64)
+    rows_deleted = models.PositiveBigIntegerField('Rows Deleted', default=0)
+    batches = models.PositiveIntegerField('Batches', default=0)
+    started_at = models.DateTimeField('Started', default=timezone.now)
+    updated_at = models.DateTimeField('Updated', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Purge Checkpoint'
+        verbose_name_plural = 'Purge Checkpoints'
+
+    def __str__(self):
+        return f"{self.name} after pk {self.last_pk} ({self.rows_deleted} deleted)"
+
+
+class KeyRotationCheckpoint(models.Model):
+    """
+    Progress of re-encrypting one primary key range of an encrypted column
+    (see core.key_rotation).
+
+    Created for every range when a rotation starts and saved after every
+    batch, so an interrupted run resumes with the same ranges; deleted as
+    each range completes.
+    """
+
+    name = models.CharField('Column', max_length=150, help_text='table.column')
+    range_start = models.BigIntegerField('Range Start', null=True, blank=True)
+    range_end = models.BigIntegerField('Range End', null=True, blank=True)
+    last_pk = models.BigIntegerField('Last Primary Key', null=True, blank=True)
+    key_fingerprint = models.CharField('Key Fingerprint', max_length=64, blank=True)
+    rows_rotated = models.PositiveBigIntegerField('Rows Rotated', default=0)
+    rows_failed = models.PositiveBigIntegerField('Rows Failed', default=0)
+    started_at = models.DateTimeField('Started', default=timezone.now)
+    updated_at = models.DateTimeField('Updated', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Key Rotation Checkpoint'
+        verbose_name_plural = 'Key Rotation Checkpoints'
+        ordering = ['name', 'range_start']
+
+    def __str__(self):
+        return f"{self.name} ({self.range_start}, {self.range_end}] at pk {self.last_pk}"
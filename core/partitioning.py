@@ -0,0 +1,252 @@
+"""
+Monthly range partitioning for the audit log table.
+
+On PostgreSQL, migration 0011 turns core_auditlog into a table partitioned by
+month on "timestamp". The pre-existing rows stay in place as one partition
+(core_auditlog_legacy) that covers everything before the first monthly
+partition. Other databases (SQLite in development and tests) keep a plain
+table; every function here is a no-op there.
+
+- ensure_audit_log_partitions() creates the monthly partitions for the
+  current month and AUDIT_LOG_PARTITION_MONTHS_AHEAD months ahead (daily task)
+- drop_audit_log_partitions_before() detaches and drops every partition that
+  ends before a retention cutoff, so retention never DELETEs a whole month
+  row by row
+- A DEFAULT partition catches rows outside the created ranges, so inserts
+  never fail if maintenance falls behind
+
+Rows in the DEFAULT partition block a plain CREATE TABLE ... PARTITION OF
+for their month, and retention never drops them. ensure_audit_log_partitions()
+therefore also creates the partition for every month found in DEFAULT,
+moving its rows over: in one transaction it detaches DEFAULT, creates the
+month, moves the rows and reattaches DEFAULT. Inserts wait on the lock for
+the duration. If that fails, the maintenance task alerts; the same steps
+can be run by hand (see docs/TROUBLESHOOTING.md).
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_TABLE = 'core_auditlog'
+LEGACY_PARTITION = 'core_auditlog_legacy'
+DEFAULT_PARTITION = 'core_auditlog_default'
+
+# Monthly partitions are named core_auditlog_pYYYY_MM
+MONTHLY_PARTITION_PREFIX = 'core_auditlog_p'
+
+DEFAULT_MONTHS_AHEAD = 3
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass
+class Partition:
+    """One partition of the audit log table; None bounds are MINVALUE/MAXVALUE."""
+    name: str
+    lower: Optional[datetime]
+    upper: Optional[datetime]
+    is_default: bool = False
+    estimated_rows: int = 0
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant (UTC) of the month containing value."""
+    value = value.astimezone(dt_timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def monthly_partition_name(month: datetime) -> str:
+    return f'{MONTHLY_PARTITION_PREFIX}{month:%Y_%m}'
+
+
+def is_audit_log_partitioned(using=None) -> bool:
+    """Whether core_auditlog is a partitioned table (PostgreSQL after migration 0011)."""
+    conn = using or connection
+    if conn.vendor != 'postgresql':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [AUDIT_LOG_TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def _parse_bound(text: str) -> Optional[datetime]:
+    text = text.strip()
+    if text in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(text.strip("'"))
+
+
+def list_audit_log_partitions() -> List[Partition]:
+    """Partitions of core_auditlog ordered by lower bound (empty if not partitioned)."""
+    if not is_audit_log_partitioned():
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [AUDIT_LOG_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound, reltuples in rows:
+        estimated = max(int(reltuples), 0)
+        if bound == 'DEFAULT':
+            partitions.append(Partition(name, None, None, is_default=True, estimated_rows=estimated))
+            continue
+        match = _BOUND_RE.search(bound)
+        if not match:
+            logger.warning(f"Unrecognised audit log partition bound for {name}: {bound}")
+            continue
+        partitions.append(Partition(
+            name,
+            _parse_bound(match.group(1)),
+            _parse_bound(match.group(2)),
+            estimated_rows=estimated,
+        ))
+
+    partitions.sort(key=lambda p: (p.is_default, p.lower or datetime.min.replace(tzinfo=dt_timezone.utc)))
+    return partitions
+
+
+def _default_partition_months(default: str) -> List[datetime]:
+    """Months (UTC) that have rows in the DEFAULT partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""SELECT DISTINCT date_trunc('month', "timestamp" AT TIME ZONE 'UTC') """
+            f'FROM "{default}"'
+        )
+        return [row[0].replace(tzinfo=dt_timezone.utc) for row in cursor.fetchall()]
+
+
+def _create_partition_from_default(name: str, lower: datetime, upper: datetime, default: str) -> int:
+    """
+    Create a monthly partition and move its rows out of DEFAULT.
+
+    PostgreSQL refuses to add a partition while DEFAULT holds rows in its
+    range, so DEFAULT is detached for the move and reattached after.
+    Returns the number of rows moved.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(f'ALTER TABLE "{AUDIT_LOG_TABLE}" DETACH PARTITION "{default}"')
+            cursor.execute(
+                f'CREATE TABLE "{name}" PARTITION OF "{AUDIT_LOG_TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                [lower, upper],
+            )
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM "{default}" '
+                f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+                f'INSERT INTO "{name}" SELECT * FROM moved',
+                [lower, upper],
+            )
+            moved = cursor.rowcount
+            cursor.execute(f'ALTER TABLE "{AUDIT_LOG_TABLE}" ATTACH PARTITION "{default}" DEFAULT')
+    return moved
+
+
+def ensure_audit_log_partitions(months_ahead: int = None, now: datetime = None) -> List[str]:
+    """
+    Create missing monthly partitions from the current month to months_ahead.
+
+    Months already covered by an existing partition (including the legacy
+    one) are skipped. Any other month with rows in the DEFAULT partition
+    gets its partition too, with the rows moved into it. Returns the names
+    of partitions created.
+    """
+    if not is_audit_log_partitioned():
+        return []
+
+    if months_ahead is None:
+        months_ahead = getattr(settings, 'AUDIT_LOG_PARTITION_MONTHS_AHEAD', DEFAULT_MONTHS_AHEAD)
+    current = month_start(now or timezone.now())
+
+    partitions = list_audit_log_partitions()
+    ranged = [p for p in partitions if not p.is_default]
+    default = next((p.name for p in partitions if p.is_default), None)
+    stranded = set(_default_partition_months(default)) if default else set()
+
+    created = []
+    months = {add_months(current, offset) for offset in range(months_ahead + 1)} | stranded
+    for lower in sorted(months):
+        upper = add_months(lower, 1)
+        if any(
+            (p.lower is None or p.lower < upper) and (p.upper is None or p.upper > lower)
+            for p in ranged
+        ):
+            continue
+
+        name = monthly_partition_name(lower)
+        if lower in stranded:
+            moved = _create_partition_from_default(name, lower, upper, default)
+            logger.warning(
+                f"Created audit log partition {name} and moved {moved} rows into it "
+                f"from {default}; partition maintenance had fallen behind"
+            )
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{AUDIT_LOG_TABLE}" '
+                    f'FOR VALUES FROM (%s) TO (%s)',
+                    [lower, upper],
+                )
+            logger.info(f"Created audit log partition {name}")
+        created.append(name)
+
+    return created
+
+
+def drop_audit_log_partitions_before(cutoff: datetime) -> int:
+    """
+    Detach and drop partitions that hold only rows older than cutoff.
+
+    The DEFAULT partition is never dropped. Returns the estimated number of
+    rows removed (from planner statistics, to avoid counting whole months).
+    """
+    dropped_rows = 0
+    for partition in list_audit_log_partitions():
+        if partition.is_default or partition.upper is None or partition.upper > cutoff:
+            continue
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Deferred FK checks queued earlier in an enclosing transaction
+                # would otherwise block the DROP ("pending trigger events")
+                cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+                cursor.execute(
+                    f'ALTER TABLE "{AUDIT_LOG_TABLE}" DETACH PARTITION "{partition.name}"'
+                )
+                cursor.execute(f'DROP TABLE "{partition.name}"')
+
+        dropped_rows += partition.estimated_rows
+        logger.info(
+            f"Dropped audit log partition {partition.name} "
+            f"(~{partition.estimated_rows} rows before {partition.upper:%Y-%m-%d})"
+        )
+
+    return dropped_rows
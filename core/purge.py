@@ -0,0 +1,214 @@
+"""
+Batched, resumable purge engine for data retention.
+
+run_batched_purge() deletes the rows of a queryset in primary key order, one
+batch per transaction, instead of a single DELETE over the whole set or a
+round trip per row:
+- keyset pagination (pk > last pk of the previous batch), so every batch is
+  an index range scan however far the purge has got
+- PURGE_BATCH_SIZE rows per batch, with PURGE_BATCH_SLEEP seconds between
+  batches to leave the database room for other writers
+- files in the given FileFields are deleted from storage by a pool of
+  PURGE_STORAGE_WORKERS threads before their rows are removed
+- a PurgeCheckpoint row records the last pk after each batch, so a purge that
+  is killed part-way resumes where it stopped on the next run
+
+Every batch logs its timing and throughput (rows/second).
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+logger = logging.getLogger(__name__)
+
+# Defaults when not configured in settings
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_SLEEP = 0.1
+DEFAULT_STORAGE_WORKERS = 8
+
+
+def _get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+@dataclass
+class PurgeResult:
+    """Totals for one run of a purge (rows deleted before a resume aren't included)."""
+    name: str
+    deleted: int = 0
+    failed: int = 0
+    batches: int = 0
+    files_deleted: int = 0
+    resumed_after: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+
+def _delete_stored_file(field_file):
+    field_file.storage.delete(field_file.name)
+
+
+def _delete_files(pool, instances, file_fields) -> Tuple[Set, int]:
+    """
+    Delete the stored files of a batch in parallel.
+
+    Returns the pks whose files couldn't all be deleted (their rows are kept
+    so the next run retries them) and the number of files deleted.
+    """
+    futures = []
+    for instance in instances:
+        for field_name in file_fields:
+            field_file = getattr(instance, field_name)
+            if field_file:
+                futures.append((instance.pk, field_file.name, pool.submit(_delete_stored_file, field_file)))
+
+    failed = set()
+    for pk, file_name, future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            failed.add(pk)
+            logger.error(f"Failed to delete stored file {file_name} for pk {pk}: {e}")
+    return failed, len(futures) - len(failed)
+
+
+def _delete_rows(model, pks) -> int:
+    """Delete rows by pk (cascading as Model.delete does); returns rows of model deleted."""
+    _, per_model = model._base_manager.filter(pk__in=pks).delete()
+    return per_model.get(model._meta.label, 0)
+
+
+def _save_checkpoint(checkpoint, name, last_pk, deleted):
+    from .models import PurgeCheckpoint
+
+    if checkpoint is None:
+        checkpoint = PurgeCheckpoint(name=name)
+    checkpoint.last_pk = str(last_pk)
+    checkpoint.rows_deleted += deleted
+    checkpoint.batches += 1
+    checkpoint.save()
+    return checkpoint
+
+
+def run_batched_purge(
+    name: str,
+    queryset,
+    file_fields: Sequence[str] = (),
+    batch_size: int = None,
+    sleep_seconds: float = None,
+    workers: int = None,
+) -> PurgeResult:
+    """
+    Delete every row of queryset in keyset-paginated batches.
+
+    name identifies the purge's checkpoint; use a stable name per queryset so
+    a killed run resumes after the last batch it committed. Rows that fail to
+    delete (or whose files fail to delete) are logged, skipped and retried by
+    the next run.
+    """
+    from .models import PurgeCheckpoint
+
+    if batch_size is None:
+        batch_size = _get_setting('PURGE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    if sleep_seconds is None:
+        sleep_seconds = _get_setting('PURGE_BATCH_SLEEP', DEFAULT_BATCH_SLEEP)
+    if workers is None:
+        workers = _get_setting('PURGE_STORAGE_WORKERS', DEFAULT_STORAGE_WORKERS)
+
+    model = queryset.model
+    result = PurgeResult(name)
+
+    last_pk = None
+    checkpoint = PurgeCheckpoint.objects.filter(name=name).first()
+    if checkpoint is not None:
+        last_pk = model._meta.pk.to_python(checkpoint.last_pk)
+        result.resumed_after = checkpoint.last_pk
+        logger.info(
+            f"Purge {name}: resuming after pk {last_pk} "
+            f"({checkpoint.rows_deleted} rows deleted in {checkpoint.batches} earlier batches)"
+        )
+
+    queryset = queryset.order_by('pk')
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='purge-storage') if file_fields else None
+    started = time.monotonic()
+
+    try:
+        while True:
+            batch_started = time.monotonic()
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+
+            if file_fields:
+                instances = list(page.only('pk', *file_fields)[:batch_size])
+                pks = [instance.pk for instance in instances]
+            else:
+                pks = list(page.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+
+            skipped = set()
+            files_deleted = 0
+            if file_fields:
+                skipped, files_deleted = _delete_files(pool, instances, file_fields)
+            to_delete = [pk for pk in pks if pk not in skipped]
+            failed = len(skipped)
+
+            try:
+                with transaction.atomic():
+                    deleted = _delete_rows(model, to_delete) if to_delete else 0
+                    checkpoint = _save_checkpoint(checkpoint, name, pks[-1], deleted)
+            except DatabaseError as e:
+                # Find the offending rows one at a time so the rest of the batch still goes
+                logger.warning(f"Purge {name}: batch delete failed, retrying row by row: {e}")
+                deleted = 0
+                for pk in to_delete:
+                    try:
+                        with transaction.atomic():
+                            deleted += _delete_rows(model, [pk])
+                    except DatabaseError as row_error:
+                        failed += 1
+                        logger.error(f"Purge {name}: failed to delete pk {pk}: {row_error}")
+                with transaction.atomic():
+                    checkpoint = _save_checkpoint(checkpoint, name, pks[-1], deleted)
+
+            last_pk = pks[-1]
+            result.batches += 1
+            result.deleted += deleted
+            result.failed += failed
+            result.files_deleted += files_deleted
+
+            batch_elapsed = time.monotonic() - batch_started
+            rate = deleted / batch_elapsed if batch_elapsed else 0.0
+            logger.info(
+                f"Purge {name}: batch {result.batches} deleted {deleted} rows"
+                f"{f' and {files_deleted} files' if file_fields else ''} "
+                f"in {batch_elapsed:.3f}s ({rate:.0f} rows/s)"
+                f"{f', {failed} failed' if failed else ''}"
+            )
+
+            if len(pks) < batch_size:
+                break
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # Completed: the next run starts from the beginning again
+    PurgeCheckpoint.objects.filter(name=name).delete()
+
+    result.elapsed = time.monotonic() - started
+    logger.info(
+        f"Purge {name}: deleted {result.deleted} rows in {result.batches} batches "
+        f"in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s)"
+        f"{f', {result.failed} failed' if result.failed else ''}"
+    )
+    return result
@@ -0,0 +1,41 @@
+"""
+Direct Redis access for counters that need more than the cache API.
+
+Some counters (hashes, sorted sets, atomic renames) can't be expressed
+through django.core.cache. They use a dedicated client for REDIS_URL
+instead of reaching into the cache backend, and only when the default
+cache is Redis, so every process and worker sees the same counters.
+
+Raw keys are namespaced with the default cache's KEY_PREFIX and VERSION
+(cache.make_key), so environments sharing one Redis instance don't collide.
+"""
+
+import functools
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+@functools.lru_cache(maxsize=None)
+def _client_for(url: str, ssl_cert_reqs=None):
+    """Client per URL, shared so callers reuse its connection pool."""
+    import redis
+
+    if ssl_cert_reqs is not None:
+        return redis.from_url(url, ssl_cert_reqs=ssl_cert_reqs)
+    return redis.from_url(url)
+
+
+def get_redis_client():
+    """Redis client for REDIS_URL, or None when the default cache isn't Redis."""
+    from django.core.cache.backends.redis import RedisCache
+
+    if not isinstance(caches['default'], RedisCache):
+        return None
+    options = settings.CACHES['default'].get('OPTIONS', {})
+    return _client_for(settings.REDIS_URL, options.get('ssl_cert_reqs'))
+
+
+def redis_key(key: str) -> str:
+    """Raw Redis key for `key`, prefixed and versioned like cache keys."""
+    return caches['default'].make_key(key)
@@ -59,13 +59,51 @@ def enforce_data_retention():
 
 
 def _purge_audit_logs(cutoff_date):
-    """Purge audit logs older than cutoff date."""
+    """
+    Purge audit logs older than cutoff date.
+
+    On a partitioned table (PostgreSQL, see core.partitioning) whole monthly
+    partitions older than the cutoff are dropped; the DELETE then only touches
+    the partition the cutoff falls in.
+    """
     from .models import AuditLog
+    from .partitioning import drop_audit_log_partitions_before
 
-    old_logs = AuditLog.objects.filter(timestamp__lt=cutoff_date)
-    count = old_logs.count()
-    old_logs.delete()
-    return count
+    dropped = drop_audit_log_partitions_before(cutoff_date)
+    deleted, _ = AuditLog.objects.filter(timestamp__lt=cutoff_date).delete()
+    return dropped + deleted
+
+
+@shared_task
+def maintain_audit_log_partitions():
+    """
+    Create upcoming monthly audit log partitions (no-op unless partitioned).
+
+    Also moves rows stranded in the DEFAULT partition into their month's
+    partition. Alerts if that fails, since those rows are never dropped by
+    retention. Should be scheduled via Celery Beat (daily).
+    """
+    from core.alerting import AlertSeverity, send_alert
+    from .partitioning import ensure_audit_log_partitions
+
+    try:
+        created = ensure_audit_log_partitions()
+    except Exception as e:
+        logger.error(f"Audit log partition maintenance failed: {e}")
+        send_alert(
+            title='Audit log partition maintenance failed',
+            message=(
+                'Monthly audit log partitions could not be created; new rows go to the '
+                'DEFAULT partition and are not dropped by retention. See '
+                '"Audit Log Rows in the DEFAULT Partition" in docs/TROUBLESHOOTING.md.'
+            ),
+            severity=AlertSeverity.CRITICAL,
+            details={'error': str(e)},
+        )
+        raise
+    if created:
+        logger.info(f"Created audit log partitions: {', '.join(created)}")
+    return {'created': created}
 
 
 def _purge_old_documents(cutoff_date):
@@ -74,57 +112,46 @@ def _purge_old_documents(cutoff_date):
     Note: This only handles documents that are already soft-deleted.
     """
     from claims.models import Document
+    from .purge import run_batched_purge
 
     # Only purge documents that were soft-deleted before the cutoff
-    old_docs = Document.objects.filter(
+    # (all_objects, as the default manager hides soft-deleted documents)
+    old_docs = Document.all_objects.filter(
         is_deleted=True,
         deleted_at__lt=cutoff_date
     )
-    count = old_docs.count()
-
-    for doc in old_docs:
-        try:
-            # Delete file from storage
-            if doc.file:
-                doc.file.delete(save=False)
-            doc.hard_delete()
-        except Exception as e:
-            logger.error(f"Failed to purge document {doc.id}: {e}")
-
-    return count
+    return run_batched_purge('retention:documents', old_docs, file_fields=('file',)).deleted
 
 
 def _purge_old_analyses(cutoff_date):
     """Purge old AI analysis records."""
+    from .purge import run_batched_purge
+
     try:
         from agents.models import AgentInteraction, DecisionLetterAnalysis, DenialDecoding
+    except ImportError:
+        logger.warning("agents app not available for analysis purge")
+        return 0
 
-        # Delete old denial decodings first (depends on analysis)
-        old_decodings = DenialDecoding.objects.filter(
-            analysis__created_at__lt=cutoff_date
-        )
-        decoding_count = old_decodings.count()
-        old_decodings.delete()
+    # Delete old denial decodings first (depends on analysis)
+    decoding_count = run_batched_purge(
+        'retention:denial_decodings',
+        DenialDecoding.objects.filter(analysis__created_at__lt=cutoff_date),
+    ).deleted
 
-        # Delete old analyses
-        old_analyses = DecisionLetterAnalysis.objects.filter(
-            created_at__lt=cutoff_date
-        )
-        analysis_count = old_analyses.count()
-        old_analyses.delete()
+    # Delete old analyses
+    analysis_count = run_batched_purge(
+        'retention:decision_letter_analyses',
+        DecisionLetterAnalysis.objects.filter(created_at__lt=cutoff_date),
+    ).deleted
 
-        # Delete old agent interactions
-        old_interactions = AgentInteraction.objects.filter(
-            created_at__lt=cutoff_date
-        )
-        interaction_count = old_interactions.count()
-        old_interactions.delete()
+    # Delete old agent interactions
+    interaction_count = run_batched_purge(
+        'retention:agent_interactions',
+        AgentInteraction.objects.filter(created_at__lt=cutoff_date),
+    ).deleted
 
-        return decoding_count + analysis_count + interaction_count
-
-    except ImportError:
-        logger.warning("agents app not available for analysis purge")
-        return 0
+    return decoding_count + analysis_count + interaction_count
 
 
 def _purge_session_data(cutoff_date):
@@ -559,26 +586,57 @@ def _send_document_analysis_email(document) -> bool:
 # HEALTH MONITORING TASKS
 # =============================================================================
 
+@shared_task
+def refresh_health_snapshot():
+    """
+    Recompute the cached health snapshot served by /health/?full=1.
+
+    Scheduled via Celery Beat every HEALTH_SNAPSHOT_INTERVAL seconds.
+    """
+    from .health import refresh_health_snapshot as refresh
+
+    try:
+        health = refresh()
+        return {
+            'status': health['status'],
+            'timestamp': health['timestamp'],
+        }
+    except Exception as e:
+        logger.error(f"Failed to refresh health snapshot: {e}")
+        return {'error': str(e)}
+
+
 @shared_task
 def record_health_metrics():
     """
     Record system health metrics for historical tracking.
 
+    Also rolls closed buckets up into minute/hour/day summaries
+    (core.metric_rollups).
     Should be scheduled via Celery Beat (e.g., every 5 minutes).
     """
     from .health import record_metrics
+    from .metric_rollups import rollup_health_metrics
 
     try:
         health = record_metrics()
         logger.info(f"Recorded health metrics: status={health['status']}")
-        return {
-            'status': health['status'],
-            'timestamp': health['timestamp'],
-        }
     except Exception as e:
         logger.error(f"Failed to record health metrics: {e}")
         return {'error': str(e)}
 
+    try:
+        rollups = rollup_health_metrics()
+    except Exception as e:
+        logger.error(f"Failed to roll up health metrics: {e}")
+        rollups = {'error': str(e)}
+
+    return {
+        'status': health['status'],
+        'timestamp': health['timestamp'],
+        'rollups': rollups,
+    }
+
 
 @shared_task
 def check_processing_health():
@@ -654,18 +712,23 @@ def cleanup_old_health_metrics():
     """
     Clean up old health metrics to prevent database bloat.
 
-    Keeps last 30 days of metrics.
+    Keeps last 30 days of raw metrics; their history stays in the rollups,
+    which are brought up to date first and pruned per resolution.
     Should be scheduled via Celery Beat (e.g., daily).
     """
+    from .metric_rollups import prune_rollups, rollup_health_metrics
     from .models import SystemHealthMetric
 
+    rollup_health_metrics()
+
     threshold = timezone.now() - timezone.timedelta(days=30)
     deleted, _ = SystemHealthMetric.objects.filter(
         timestamp__lt=threshold
     ).delete()
+    pruned = prune_rollups()
 
-    logger.info(f"Cleaned up {deleted} old health metrics")
-    return f"Deleted {deleted} old metrics"
+    logger.info(f"Cleaned up {deleted} old health metrics and {pruned} expired rollups")
+    return f"Deleted {deleted} old metrics and {pruned} expired rollups"
 
 
 @shared_task
@@ -706,6 +769,8 @@ def check_download_anomalies_task(hours: int = 1):
     - Multiple users from same IP
     - Unusual download patterns
 
+    Downloads are already checked as they happen (core.download_monitor);
+    this reconciles from the same sliding-window counters.
     Should be scheduled via Celery Beat (e.g., hourly).
     """
     from core.alerting import check_download_anomalies
@@ -721,6 +786,14 @@ def check_download_anomalies_task(hours: int = 1):
     }
 
 
+@shared_task
+def send_download_alert(title: str, message: str, severity: str, details: dict):
+    """Send a download anomaly alert found inline by core.download_monitor."""
+    from core.alerting import AlertSeverity, send_alert
+
+    return send_alert(title=title, message=message, severity=AlertSeverity(severity), details=details)
+
+
 # =============================================================================
 # PILOT USER DATA RETENTION
 # =============================================================================
@@ -736,16 +809,18 @@ def enforce_pilot_data_retention():
     - Prevent accumulation of test data
 
     This task:
-    1. Identifies pilot users (via is_pilot_user property)
-    2. Soft-deletes their documents older than PILOT_DATA_RETENTION_DAYS
-    3. Deletes their AI analyses older than retention period
+    1. Selects pilot users with a single queryset (User.objects.pilot_users())
+    2. Soft-deletes their documents older than PILOT_DATA_RETENTION_DAYS,
+       one UPDATE per batch
+    3. Deletes their AI analyses and personal statements older than the
+       retention period (batched purges, see core.purge)
     4. Logs all retention actions for audit
 
+    Work scales with the number of affected rows, not the number of users.
+
     Should be scheduled via Celery Beat (e.g., daily at 3 AM).
     """
     from accounts.models import User
-    from claims.models import Document
-    from .models import AuditLog
 
     retention_days = getattr(settings, 'PILOT_DATA_RETENTION_DAYS', 30)
 
@@ -763,79 +838,105 @@ def enforce_pilot_data_retention():
         'errors': [],
     }
 
-    # Get all users and check if they're pilot users
-    # Note: We check is_pilot_user property which considers:
-    # - PILOT_PREMIUM_ACCESS setting
-    # - PILOT_PREMIUM_EMAILS list
-    # - PILOT_PREMIUM_DOMAINS list
-    users = User.objects.all()
+    # Pilot membership (PILOT_PREMIUM_ACCESS, PILOT_PREMIUM_EMAILS,
+    # PILOT_PREMIUM_DOMAINS) as a queryset, used as a subquery below
+    pilot_users = User.objects.pilot_users()
+    results['pilot_users_checked'] = pilot_users.count()
+
+    if results['pilot_users_checked']:
+        steps = [
+            ('documents_soft_deleted', _soft_delete_pilot_documents,
+             (pilot_users, cutoff_date, retention_days)),
+            ('analyses_deleted', _purge_pilot_analyses, (pilot_users, cutoff_date)),
+            ('statements_deleted', _purge_pilot_statements, (pilot_users, cutoff_date)),
+        ]
+        for key, step, args in steps:
+            try:
+                results[key] = step(*args)
+            except Exception as e:
+                error_msg = f"Error in pilot retention ({key}): {e}"
+                logger.error(error_msg)
+                results['errors'].append(error_msg)
 
-    for user in users:
-        try:
-            # Check if user is a pilot user
-            if not getattr(user, 'is_pilot_user', False):
-                continue
+    # Log summary
+    logger.info(
+        f"Pilot data retention complete: "
+        f"{results['pilot_users_checked']} users checked, "
+        f"{results['documents_soft_deleted']} documents soft-deleted, "
+        f"{results['analyses_deleted']} analyses deleted, "
+        f"{results['statements_deleted']} statements deleted"
+    )
+
+    return results
 
-            results['pilot_users_checked'] += 1
 
-            # Soft-delete old documents for this pilot user
-            old_docs = Document.objects.filter(
-                user=user,
-                is_deleted=False,
-                created_at__lt=cutoff_date
-            )
+def _soft_delete_pilot_documents(pilot_users, cutoff_date, retention_days) -> int:
+    """
+    Soft-delete pilot users' documents created before cutoff date.
+
+    Runs one UPDATE per batch of PURGE_BATCH_SIZE documents (keyset paginated
+    by pk) with one bulk-created audit entry per affected user and batch.
+    Returns count of soft-deleted documents.
+    """
+    from collections import Counter
 
-            doc_count = old_docs.count()
-            if doc_count > 0:
-                for doc in old_docs:
-                    doc.soft_delete()
+    from django.db import transaction
 
-                results['documents_soft_deleted'] += doc_count
+    from claims.models import Document
+    from .models import AuditLog
+    from .purge import DEFAULT_BATCH_SIZE
 
-                # Log the retention action
-                AuditLog.objects.create(
-                    user=user,
+    batch_size = getattr(settings, 'PURGE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    old_docs = Document.objects.filter(
+        user__in=pilot_users,
+        created_at__lt=cutoff_date
+    ).order_by('pk')
+
+    total = 0
+    last_pk = None
+    while True:
+        page = old_docs if last_pk is None else old_docs.filter(pk__gt=last_pk)
+        batch = list(page.values_list('pk', 'user_id')[:batch_size])
+        if not batch:
+            break
+
+        pks = [pk for pk, _ in batch]
+        per_user = Counter(user_id for _, user_id in batch)
+        with transaction.atomic():
+            # Default manager skips anything soft-deleted since the batch was read
+            updated = Document.objects.filter(pk__in=pks).update(
+                is_deleted=True,
+                deleted_at=timezone.now()
+            )
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    user_id=user_id,
                     action='pilot_retention_documents',
                     resource_type='document',
                     details={
-                        'count': doc_count,
+                        'count': count,
                         'retention_days': retention_days,
                         'reason': 'pilot_data_retention',
                     }
                 )
+                for user_id, count in per_user.items()
+            ])
 
-            # Delete old AI analyses for this pilot user
-            analysis_count = _purge_pilot_user_analyses(user, cutoff_date)
-            results['analyses_deleted'] += analysis_count
-
-            # Delete old personal statements for this pilot user
-            statement_count = _purge_pilot_user_statements(user, cutoff_date)
-            results['statements_deleted'] += statement_count
-
-        except Exception as e:
-            error_msg = f"Error processing pilot retention for user {user.id}: {e}"
-            logger.error(error_msg)
-            results['errors'].append(error_msg)
-
-    # Log summary
-    logger.info(
-        f"Pilot data retention complete: "
-        f"{results['pilot_users_checked']} users checked, "
-        f"{results['documents_soft_deleted']} documents soft-deleted, "
-        f"{results['analyses_deleted']} analyses deleted, "
-        f"{results['statements_deleted']} statements deleted"
-    )
+        total += updated
+        last_pk = pks[-1]
+        if len(batch) < batch_size:
+            break
 
-    return results
+    return total
 
 
-def _purge_pilot_user_analyses(user, cutoff_date) -> int:
+def _purge_pilot_analyses(pilot_users, cutoff_date) -> int:
     """
-    Delete AI analyses for a specific pilot user older than cutoff date.
+    Delete pilot users' AI analyses older than cutoff date.
 
     Returns count of deleted records.
     """
-    total_deleted = 0
+    from .purge import run_batched_purge
 
     try:
         from agents.models import (
@@ -843,53 +944,43 @@ def _purge_pilot_user_analyses(user, cutoff_date) -> int:
             DecisionLetterAnalysis,
             EvidenceGapAnalysis,
         )
-
-        # Delete decision letter analyses
-        dla_deleted, _ = DecisionLetterAnalysis.objects.filter(
-            user=user,
-            created_at__lt=cutoff_date
-        ).delete()
-        total_deleted += dla_deleted
-
-        # Delete evidence gap analyses
-        ega_deleted, _ = EvidenceGapAnalysis.objects.filter(
-            user=user,
-            created_at__lt=cutoff_date
-        ).delete()
-        total_deleted += ega_deleted
-
-        # Delete agent interactions
-        ai_deleted, _ = AgentInteraction.objects.filter(
-            user=user,
-            created_at__lt=cutoff_date
-        ).delete()
-        total_deleted += ai_deleted
-
     except ImportError:
         logger.warning("agents app not available for pilot analysis purge")
+        return 0
+
+    total_deleted = 0
+    for name, model in [
+        ('pilot_retention:decision_letter_analyses', DecisionLetterAnalysis),
+        ('pilot_retention:evidence_gap_analyses', EvidenceGapAnalysis),
+        ('pilot_retention:agent_interactions', AgentInteraction),
+    ]:
+        total_deleted += run_batched_purge(
+            name,
+            model.objects.filter(user__in=pilot_users, created_at__lt=cutoff_date),
+        ).deleted
 
     return total_deleted
 
 
-def _purge_pilot_user_statements(user, cutoff_date) -> int:
+def _purge_pilot_statements(pilot_users, cutoff_date) -> int:
     """
-    Delete personal statements for a specific pilot user older than cutoff date.
+    Delete pilot users' personal statements older than cutoff date.
 
     Returns count of deleted records.
     """
+    from .purge import run_batched_purge
+
     try:
         from agents.models import PersonalStatement
-
-        deleted, _ = PersonalStatement.objects.filter(
-            user=user,
-            created_at__lt=cutoff_date
-        ).delete()
-        return deleted
-
     except ImportError:
         logger.warning("agents app not available for pilot statement purge")
         return 0
 
+    return run_batched_purge(
+        'pilot_retention:personal_statements',
+        PersonalStatement.objects.filter(user__in=pilot_users, created_at__lt=cutoff_date),
+    ).deleted
+
 
 @shared_task(acks_late=True)
 def notify_pilot_users_before_retention():
@@ -14,12 +14,13 @@ Covers:
 - HTMX endpoints for journey features
 """
 
+import json
 import pytest
 from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
 
-from django.test import TestCase, Client, RequestFactory
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -512,6 +513,374 @@ class TestAuditLogModel(TestCase):
         self.assertEqual(failure_log.error_message, "Invalid credentials")
 
 
+# =============================================================================
+# BUFFERED AUDIT WRITER TESTS
+# =============================================================================
+
+class TestBufferedAuditWriter(TestCase):
+    """Tests for AuditLog.enqueue and the core.audit buffer."""
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        from core.audit import audit_buffer
+
+        self.user = User.objects.create_user(
+            email="buffered@example.com",
+            password="TestPass123!"
+        )
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            AUDIT_BUFFER_ENABLED=True,
+            AUDIT_BUFFER_SIZE=1000,
+            AUDIT_BUFFER_FLUSH_INTERVAL=60,
+            AUDIT_SPOOL_PATH=f'{self.spool_dir.name}/audit_spool.jsonl',
+            AUDIT_DEAD_LETTER_PATH=f'{self.spool_dir.name}/audit_dead_letter.jsonl',
+        )
+        self.settings_override.enable()
+        self.buffer = audit_buffer
+        self.buffer.flush()
+
+    def tearDown(self):
+        self.buffer.flush()
+        self.settings_override.disable()
+        self.spool_dir.cleanup()
+
+    def test_enqueue_does_not_touch_database(self):
+        """Queued entries are not written in the request path."""
+        with self.assertNumQueries(0):
+            entry = AuditLog.enqueue('document_view', user=self.user, resource_id=7)
+
+        self.assertIsNone(entry.pk)
+        self.assertEqual(entry.user_email, self.user.email)
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_enqueue_saves_immediately_when_disabled(self):
+        """Without buffering, enqueue behaves like log()."""
+        with self.settings(AUDIT_BUFFER_ENABLED=False):
+            entry = AuditLog.enqueue('document_view', user=self.user)
+        self.assertIsNotNone(entry.pk)
+
+    def test_flush_bulk_creates_and_keeps_event_time(self):
+        """Flushing writes every entry with the time it was queued."""
+        entries = [AuditLog.enqueue('document_view', user=self.user, resource_id=i) for i in range(5)]
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.buffer.flush(), 5)
+        # One INSERT (the savepoint around it only appears inside TestCase's transaction)
+        self.assertEqual([q['sql'].split()[0] for q in queries].count('INSERT'), 1)
+
+        saved = AuditLog.objects.order_by('resource_id')
+        self.assertEqual([log.resource_id for log in saved], list(range(5)))
+        self.assertEqual(saved[0].timestamp, entries[0].timestamp)
+
+    def test_request_finished_flushes_when_full(self):
+        """The end of a request flushes once the size threshold is reached."""
+        from core.audit import flush_on_request_finished
+
+        with self.settings(AUDIT_BUFFER_SIZE=3):
+            AuditLog.enqueue('login', user=self.user)
+            flush_on_request_finished(sender=None)
+            self.assertEqual(AuditLog.objects.count(), 0)
+
+            AuditLog.enqueue('login', user=self.user)
+            AuditLog.enqueue('login', user=self.user)
+            flush_on_request_finished(sender=None)
+            self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_request_finished_flushes_when_old(self):
+        """The end of a request flushes once the oldest entry reaches the interval."""
+        from core.audit import flush_on_request_finished
+
+        with self.settings(AUDIT_BUFFER_FLUSH_INTERVAL=0):
+            AuditLog.enqueue('login', user=self.user)
+            flush_on_request_finished(sender=None)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_no_entries_lost_on_graceful_shutdown(self):
+        """Entries queued concurrently are all written by the shutdown hook."""
+        import threading
+        from core.audit import flush_on_shutdown
+
+        def worker(offset):
+            for i in range(50):
+                AuditLog.enqueue('document_download', resource_type='Document', resource_id=offset + i)
+
+        threads = [threading.Thread(target=worker, args=(n * 50,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(AuditLog.objects.count(), 0)
+        flush_on_shutdown()
+
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(
+            sorted(AuditLog.objects.values_list('resource_id', flat=True)),
+            list(range(400)),
+        )
+
+    def test_celery_worker_shutdown_flushes(self):
+        """Celery's worker_process_shutdown signal flushes the buffer."""
+        from celery.signals import worker_process_shutdown
+
+        AuditLog.enqueue('ai_analysis', user=self.user)
+        worker_process_shutdown.send(sender=None, pid=0, exitcode=0)
+        self.assertEqual(AuditLog.objects.filter(action='ai_analysis').count(), 1)
+
+    def test_database_failure_spools_and_replays(self):
+        """Entries that can't be written are spooled and replayed later."""
+        from django.db import OperationalError
+        from core.audit import spool_path
+
+        for i in range(3):
+            AuditLog.enqueue('document_view', user=self.user, resource_id=i, details={'n': i})
+
+        with patch.object(AuditLog.objects, 'bulk_create', side_effect=OperationalError('down')):
+            self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(len(spool_path().read_text().splitlines()), 3)
+        self.assertFalse(AuditLog.objects.exists())
+
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertFalse(spool_path().exists())
+        replayed = AuditLog.objects.get(resource_id=2)
+        self.assertEqual(replayed.details, {'n': 2})
+        self.assertEqual(replayed.user, self.user)
+
+    def test_rejected_entry_is_dead_lettered_not_replayed(self):
+        """An entry failing its FK check doesn't hold back the rest of its batch."""
+        from django.db import IntegrityError, OperationalError
+        from core.audit import dead_letter_path, spool_path
+
+        gone = User.objects.create_user(email="gone@example.com", password="TestPass123!")
+        AuditLog.enqueue('document_view', user=self.user, resource_id=1)
+        AuditLog.enqueue('document_view', user=gone, resource_id=2)
+        AuditLog.enqueue('document_view', user=self.user, resource_id=3)
+        gone_id = gone.pk
+        gone.delete()
+
+        real_bulk_create = AuditLog.objects.bulk_create
+
+        def bulk_create(entries, *args, **kwargs):
+            # SQLite defers FK checks to the commit, which TestCase never reaches
+            if any(entry.user_id == gone_id for entry in entries):
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            return real_bulk_create(entries, *args, **kwargs)
+
+        # Spooled during an outage, then replayed with the bad entry in the batch
+        with patch.object(AuditLog.objects, 'bulk_create', side_effect=OperationalError('down')):
+            self.assertEqual(self.buffer.flush(), 0)
+        with patch.object(AuditLog.objects, 'bulk_create', side_effect=bulk_create):
+            self.assertEqual(self.buffer.flush(), 2)
+
+        self.assertFalse(spool_path().exists())
+        self.assertEqual(sorted(AuditLog.objects.values_list('resource_id', flat=True)), [1, 3])
+        dead = [json.loads(line) for line in dead_letter_path().read_text().splitlines()]
+        self.assertEqual([entry['resource_id'] for entry in dead], [2])
+
+        # Later flushes aren't blocked by it
+        AuditLog.enqueue('document_view', user=self.user, resource_id=4)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(len(dead_letter_path().read_text().splitlines()), 1)
+
+    def test_unserialisable_entry_is_not_lost_with_its_batch(self):
+        """A non-database error writes the rest and dead-letters the bad entry."""
+        from core.audit import dead_letter_path, spool_path
+
+        AuditLog.enqueue('document_view', user=self.user, resource_id=1)
+        AuditLog.enqueue('document_view', user=self.user, resource_id=2, details={'bad': object()})
+        AuditLog.enqueue('document_view', user=self.user, resource_id=3)
+
+        self.assertEqual(self.buffer.flush(), 2)
+
+        self.assertEqual(len(self.buffer), 0)
+        self.assertFalse(spool_path().exists())
+        self.assertEqual(sorted(AuditLog.objects.values_list('resource_id', flat=True)), [1, 3])
+        dead = json.loads(dead_letter_path().read_text())
+        self.assertEqual(dead['resource_id'], 2)
+
+    def test_shutdown_spools_when_database_unavailable(self):
+        """The shutdown hook spools instead of touching a blocked database."""
+        from core.audit import flush_on_shutdown, spool_path
+
+        AuditLog.enqueue('login', user=self.user)
+        with patch('core.audit._database_available', return_value=False), \
+                patch.object(AuditLog.objects, 'bulk_create') as bulk_create:
+            flush_on_shutdown()
+
+        bulk_create.assert_not_called()
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(len(spool_path().read_text().splitlines()), 1)
+
+    def test_middleware_queues_document_views(self):
+        """AuditMiddleware queues entries instead of saving them."""
+        from core.middleware import AuditMiddleware
+
+        request = RequestFactory().get('/claims/document/42/')
+        request.user = self.user
+        request._skip_audit = False
+
+        middleware = AuditMiddleware(lambda r: None)
+        with self.assertNumQueries(0):
+            middleware.process_response(request, MagicMock(status_code=200))
+
+        self.assertEqual(len(self.buffer), 1)
+        self.buffer.flush()
+        self.assertTrue(AuditLog.objects.filter(action='document_view', resource_id=42).exists())
+
+
+# =============================================================================
+# AUDIT LOG PARTITIONING TESTS
+# =============================================================================
+
+class TestAuditLogPartitionHelpers(TestCase):
+    """Tests for core.partitioning helpers and the plain-table fallback."""
+
+    def test_month_arithmetic(self):
+        """Month boundaries are computed in UTC and roll over years."""
+        from datetime import datetime, timezone as dt_timezone
+        from core.partitioning import add_months, month_start, monthly_partition_name
+
+        start = month_start(datetime(2026, 12, 17, 15, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(start, datetime(2026, 12, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(add_months(start, 1), datetime(2027, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(add_months(start, 14), datetime(2028, 2, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(monthly_partition_name(start), 'core_auditlog_p2026_12')
+
+    def test_plain_table_fallback(self):
+        """Without partitioning, maintenance is a no-op and retention deletes rows."""
+        from django.db import connection
+        from core.partitioning import (
+            drop_audit_log_partitions_before,
+            ensure_audit_log_partitions,
+            is_audit_log_partitioned,
+        )
+        from core.tasks import _purge_audit_logs
+
+        if connection.vendor == 'postgresql':
+            self.skipTest('Plain-table fallback only')
+
+        self.assertFalse(is_audit_log_partitioned())
+        self.assertEqual(ensure_audit_log_partitions(), [])
+        self.assertEqual(drop_audit_log_partitions_before(timezone.now()), 0)
+
+        AuditLog.objects.create(action='login', timestamp=timezone.now() - timedelta(days=100))
+        AuditLog.objects.create(action='login')
+        self.assertEqual(_purge_audit_logs(timezone.now() - timedelta(days=30)), 1)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_maintenance_failure_alerts(self):
+        """A failed partition run alerts, as new rows would pile into DEFAULT."""
+        from core.tasks import maintain_audit_log_partitions
+
+        with patch('core.partitioning.ensure_audit_log_partitions',
+                   side_effect=RuntimeError('partition constraint violated')), \
+                patch('core.alerting.send_alert') as send_alert:
+            with self.assertRaises(RuntimeError):
+                maintain_audit_log_partitions()
+
+        send_alert.assert_called_once()
+        self.assertEqual(send_alert.call_args.kwargs['details'], {'error': 'partition constraint violated'})
+
+
+class TestAuditLogPartitionsPostgres(TestCase):
+    """Partition maintenance and retention on PostgreSQL (skipped elsewhere)."""
+
+    def setUp(self):
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            self.skipTest('Requires PostgreSQL')
+
+    def test_migration_partitions_table(self):
+        """Migration 0011 leaves a partitioned table with a default partition."""
+        from core.partitioning import (
+            DEFAULT_PARTITION,
+            LEGACY_PARTITION,
+            is_audit_log_partitioned,
+            list_audit_log_partitions,
+        )
+
+        self.assertTrue(is_audit_log_partitioned())
+        names = [p.name for p in list_audit_log_partitions()]
+        self.assertIn(LEGACY_PARTITION, names)
+        self.assertIn(DEFAULT_PARTITION, names)
+
+    def test_ensure_creates_future_months(self):
+        """Missing months ahead are created once."""
+        from core.partitioning import (
+            add_months,
+            ensure_audit_log_partitions,
+            list_audit_log_partitions,
+            month_start,
+            monthly_partition_name,
+        )
+
+        now = timezone.now()
+        created = ensure_audit_log_partitions(months_ahead=6, now=now)
+        expected = monthly_partition_name(add_months(month_start(now), 6))
+        self.assertIn(expected, created)
+        self.assertIn(expected, [p.name for p in list_audit_log_partitions()])
+        self.assertEqual(ensure_audit_log_partitions(months_ahead=6, now=now), [])
+
+    def test_retention_drops_old_partitions(self):
+        """Partitions entirely before the cutoff are dropped, newer rows kept."""
+        from core.partitioning import (
+            add_months,
+            ensure_audit_log_partitions,
+            list_audit_log_partitions,
+            month_start,
+        )
+        from core.tasks import _purge_audit_logs
+
+        now = timezone.now()
+        ensure_audit_log_partitions(months_ahead=3, now=now)
+        future_month = add_months(month_start(now), 2)
+        AuditLog.objects.create(action='login', timestamp=future_month + timedelta(days=1))
+        AuditLog.objects.create(action='login', timestamp=future_month + timedelta(days=40))
+
+        _purge_audit_logs(add_months(future_month, 1))
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        remaining = [p for p in list_audit_log_partitions() if not p.is_default]
+        self.assertTrue(all(p.upper is None or p.upper > add_months(future_month, 1) for p in remaining))
+
+    def test_rows_in_default_partition_get_their_month(self):
+        """Months stranded in DEFAULT get a partition and their rows move into it."""
+        from django.db import connection
+        from core.partitioning import (
+            DEFAULT_PARTITION,
+            add_months,
+            ensure_audit_log_partitions,
+            month_start,
+            monthly_partition_name,
+        )
+
+        now = timezone.now()
+        ensure_audit_log_partitions(months_ahead=3, now=now)
+        stranded = add_months(month_start(now), 8)
+        AuditLog.objects.create(action='login', timestamp=stranded + timedelta(days=1))
+        AuditLog.objects.create(action='login', timestamp=stranded + timedelta(days=2))
+
+        created = ensure_audit_log_partitions(months_ahead=3, now=now)
+
+        name = monthly_partition_name(stranded)
+        self.assertEqual(created, [name])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{name}"')
+            self.assertEqual(cursor.fetchone()[0], 2)
+            cursor.execute(f'SELECT COUNT(*) FROM "{DEFAULT_PARTITION}"')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(AuditLog.objects.count(), 2)
+        self.assertEqual(ensure_audit_log_partitions(months_ahead=3, now=now), [])
+
+
 # =============================================================================
 # DATA RETENTION POLICY MODEL TESTS
 # =============================================================================
@@ -1696,6 +2065,25 @@ class TestSignedURLViews:
         response = client.get(f'/claims/document/s/{token}/view/')
         assert response.status_code == 200
 
+    def test_signed_download_counts_towards_download_window(self, client, user, document_with_file):
+        """Signed downloads are counted against the document owner."""
+        from core.download_monitor import active_counts, memory_windows
+        from core.signed_urls import get_signed_url_generator
+
+        memory_windows.clear()
+        token = get_signed_url_generator().generate_token(
+            resource_type='document',
+            resource_id=document_with_file.pk,
+            user_id=document_with_file.user_id,
+            action='download',
+        )
+
+        client.get(f'/claims/document/s/{token}/download/')
+
+        user_counts, ip_counts = active_counts()
+        assert user_counts == {str(user.pk): 1}
+        assert ip_counts == {'127.0.0.1': (1, 1)}
+
     def test_signed_download_with_expired_token(self, client, document_with_file):
         """Expired token returns forbidden."""
         from core.signed_urls import get_signed_url_generator
@@ -1838,3 +2226,470 @@ class TestDocumentModelSignedURLMethods(TestCase):
 
         # URLs should be different due to different expiration timestamps
         self.assertNotEqual(url_5min, url_60min)
+
+
+# =============================================================================
+# FIELD ENCRYPTION KEY RING TESTS
+# =============================================================================
+
+class TestFieldEncryptionKeyRing(TestCase):
+    """Tests for the cached key ring and bulk helpers in core.encryption."""
+
+    def setUp(self):
+        from cryptography.fernet import Fernet
+        from core.encryption import FieldEncryption
+
+        self.old_key = Fernet.generate_key().decode()
+        self.new_key = Fernet.generate_key().decode()
+        FieldEncryption.reset()
+        self.addCleanup(FieldEncryption.reset)
+
+    def test_round_trip_and_empty_values(self):
+        """encrypt/decrypt round-trip; empty values stay empty."""
+        from core.encryption import FieldEncryption
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key):
+            encrypted = FieldEncryption.encrypt('123-45-6789')
+            self.assertNotEqual(encrypted, '123-45-6789')
+            self.assertEqual(FieldEncryption.decrypt(encrypted), '123-45-6789')
+            self.assertEqual(FieldEncryption.encrypt(''), '')
+            self.assertEqual(FieldEncryption.decrypt(''), '')
+
+    def test_key_ring_is_cached(self):
+        """The key is read and validated once, not per value."""
+        from core import encryption
+        from core.encryption import FieldEncryption
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key):
+            with patch.object(encryption, '_get_encryption_key', wraps=encryption._get_encryption_key) as get_key:
+                for _ in range(10):
+                    FieldEncryption.decrypt(FieldEncryption.encrypt('value'))
+            self.assertEqual(get_key.call_count, 1)
+
+    def test_key_change_rebuilds_key_ring(self):
+        """Changing FIELD_ENCRYPTION_KEY takes effect without a reset."""
+        from core.encryption import FieldEncryption
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.old_key):
+            encrypted = FieldEncryption.encrypt('value')
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key):
+            self.assertEqual(FieldEncryption.decrypt(encrypted), '')
+
+    def test_retired_key_still_decrypts(self):
+        """Values encrypted with a retired key decrypt; new values use the primary key."""
+        from cryptography.fernet import Fernet
+        import base64
+        from core.encryption import FieldEncryption
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.old_key):
+            old_value = FieldEncryption.encrypt('old secret')
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key, FIELD_ENCRYPTION_RETIRED_KEYS=[self.old_key]):
+            self.assertEqual(FieldEncryption.decrypt(old_value), 'old secret')
+            new_value = FieldEncryption.encrypt('new secret')
+
+        token = base64.urlsafe_b64decode(new_value)
+        self.assertEqual(Fernet(self.new_key).decrypt(token), b'new secret')
+
+    def test_invalid_retired_key_rejected(self):
+        """A malformed retired key is reported like a malformed primary key."""
+        from core.encryption import FieldEncryption
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key, FIELD_ENCRYPTION_RETIRED_KEYS=['not-a-key']):
+            with self.assertRaisesMessage(ValueError, 'FIELD_ENCRYPTION_RETIRED_KEYS'):
+                FieldEncryption.encrypt('value')
+
+    def test_encrypt_many_and_decrypt_many(self):
+        """Bulk helpers match the single-value ones, including empty and bad values."""
+        from core.encryption import FieldEncryption
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key):
+            values = ['a', '', 'b' * 500, 'ünïcode']
+            encrypted = FieldEncryption.encrypt_many(values)
+            self.assertEqual(encrypted[1], '')
+            self.assertEqual(FieldEncryption.decrypt_many(encrypted), values)
+            self.assertEqual(FieldEncryption.decrypt_many(['not encrypted', None]), ['', ''])
+
+
+class TestLazyDecryption(TestCase):
+    """Tests for lazy decryption of EncryptedJSONField / EncryptedTextField values."""
+
+    def setUp(self):
+        from claims.models import Document
+
+        self.user = User.objects.create_user(email="lazy@example.com", password="TestPass123!")
+        self.summary = {'summary': 'knee injury in service', 'key_findings': ['nexus']}
+        self.document = Document.objects.create(
+            user=self.user, file_name="lazy.pdf", status="completed", ai_summary=self.summary,
+        )
+
+    def _raw_ai_summary(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ai_summary FROM claims_document WHERE id = %s", [self.document.pk])
+            return cursor.fetchone()[0]
+
+    def test_decrypts_only_on_first_access(self):
+        """Loading rows doesn't decrypt; the first access does, once."""
+        from claims.models import Document
+        from core.encryption import FieldEncryption
+
+        with patch.object(FieldEncryption, 'decrypt', wraps=FieldEncryption.decrypt) as decrypt:
+            document = Document.objects.get(pk=self.document.pk)
+            list(Document.objects.filter(user=self.user))
+            self.assertEqual(decrypt.call_count, 0)
+
+            self.assertEqual(document.ai_summary, self.summary)
+            self.assertIsInstance(document.ai_summary, dict)
+            self.assertEqual(decrypt.call_count, 1)
+
+    def test_saving_unread_value_keeps_ciphertext(self):
+        """Saving an instance without reading the field writes the stored ciphertext back."""
+        from claims.models import Document
+
+        stored = self._raw_ai_summary()
+        document = Document.objects.get(pk=self.document.pk)
+        document.file_name = "renamed.pdf"
+        document.save()
+
+        self.assertEqual(self._raw_ai_summary(), stored)
+        self.assertEqual(Document.objects.get(pk=self.document.pk).ai_summary, self.summary)
+
+    def test_assigning_new_value_encrypts_it(self):
+        """A value assigned after loading is encrypted on save as before."""
+        from claims.models import Document
+
+        document = Document.objects.get(pk=self.document.pk)
+        document.ai_summary = {'summary': 'updated'}
+        document.save(update_fields=['ai_summary'])
+
+        self.assertNotIn('updated', self._raw_ai_summary())
+        self.assertEqual(Document.objects.get(pk=self.document.pk).ai_summary, {'summary': 'updated'})
+
+    def test_values_list_compares_equal_to_plaintext(self):
+        """values_list() returns lazy values that compare equal to the plaintext."""
+        from claims.models import Document
+
+        value = Document.objects.values_list('ai_summary', flat=True).get(pk=self.document.pk)
+        self.assertEqual(value, self.summary)
+        self.assertEqual(value['summary'], self.summary['summary'])
+        self.assertEqual(value.value, self.summary)
+
+    def test_pickled_unread_value_holds_no_plaintext(self):
+        """Pickling an instance (e.g. into a cache) keeps an unread value encrypted."""
+        import pickle
+        from claims.models import Document
+
+        data = pickle.dumps(Document.objects.get(pk=self.document.pk))
+
+        self.assertNotIn(b'knee injury', data)
+        self.assertEqual(pickle.loads(data).ai_summary, self.summary)
+
+
+# =============================================================================
+# KEY ROTATION TESTS
+# =============================================================================
+
+class TestKeyRotation(TestCase):
+    """Tests for batched, resumable re-encryption (core.key_rotation, rotate_encryption_key)."""
+
+    def setUp(self):
+        from cryptography.fernet import Fernet
+        from claims.models import Document
+        from core.encryption import FieldEncryption
+
+        self.old_key = Fernet.generate_key().decode()
+        self.new_key = Fernet.generate_key().decode()
+        FieldEncryption.reset()
+        self.addCleanup(FieldEncryption.reset)
+
+        self.user = User.objects.create_user(email="rotate@example.com", password="TestPass123!")
+        with self.settings(FIELD_ENCRYPTION_KEY=self.old_key):
+            self.documents = [
+                Document.objects.create(
+                    user=self.user, file_name=f"doc{i}.pdf", status="completed",
+                    ai_summary={'summary': f'summary {i}'},
+                )
+                for i in range(5)
+            ]
+
+    def _raw_summaries(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, ai_summary FROM claims_document ORDER BY id")
+            return dict(cursor.fetchall())
+
+    def _summaries_with(self, key, **extra):
+        from claims.models import Document
+
+        with self.settings(FIELD_ENCRYPTION_KEY=key, **extra):
+            return [d.ai_summary for d in Document.objects.order_by('id')]
+
+    def _rotate(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('rotate_encryption_key', *args, stdout=out)
+        return out.getvalue()
+
+    def test_rotates_in_batches(self):
+        """Every value is re-encrypted with the new key; a rerun skips them all."""
+        output = self._rotate('--old-key', self.old_key, '--new-key', self.new_key,
+                              '--execute', '--batch-size', '2')
+
+        self.assertIn('5 rotated', output)
+        self.assertIn('rows/s', output)
+        self.assertEqual(self._summaries_with(self.new_key), [{'summary': f'summary {i}'} for i in range(5)])
+
+        output = self._rotate('--old-key', self.old_key, '--new-key', self.new_key, '--execute')
+        self.assertIn('0 rotated, 5 skipped', output)
+
+    def test_dry_run_writes_nothing(self):
+        """Without --execute nothing changes and no checkpoints are left."""
+        from core.models import KeyRotationCheckpoint
+
+        before = self._raw_summaries()
+        output = self._rotate('--old-key', self.old_key, '--new-key', self.new_key)
+
+        self.assertIn('5 would rotate', output)
+        self.assertEqual(self._raw_summaries(), before)
+        self.assertFalse(KeyRotationCheckpoint.objects.exists())
+
+    def test_keys_default_to_key_ring_settings(self):
+        """With no key options the settings key ring is used (online rotation)."""
+        with self.settings(FIELD_ENCRYPTION_KEY=self.new_key, FIELD_ENCRYPTION_RETIRED_KEYS=[self.old_key]):
+            output = self._rotate('--execute')
+
+        self.assertIn('5 rotated', output)
+        self.assertEqual(self._summaries_with(self.new_key)[0], {'summary': 'summary 0'})
+
+    def test_resumes_from_checkpoint(self):
+        """An interrupted run resumes after the checkpointed primary key."""
+        from core.key_rotation import key_fingerprint
+        from core.models import KeyRotationCheckpoint
+
+        KeyRotationCheckpoint.objects.create(
+            name='claims_document.ai_summary', last_pk=self.documents[2].pk,
+            key_fingerprint=key_fingerprint(self.new_key),
+        )
+
+        output = self._rotate('--old-key', self.old_key, '--new-key', self.new_key, '--execute')
+
+        self.assertIn('2 rotated', output)
+        self.assertFalse(KeyRotationCheckpoint.objects.exists())
+        self.assertEqual(self._summaries_with(self.new_key)[3:], [{'summary': 'summary 3'}, {'summary': 'summary 4'}])
+
+    def test_checkpoint_for_other_key_requires_restart(self):
+        """Checkpoints from a rotation to another key aren't silently resumed."""
+        from django.core.management.base import CommandError
+        from core.models import KeyRotationCheckpoint
+
+        KeyRotationCheckpoint.objects.create(
+            name='claims_document.ai_summary', last_pk=self.documents[2].pk, key_fingerprint='other',
+        )
+
+        with self.assertRaises(CommandError):
+            self._rotate('--old-key', self.old_key, '--new-key', self.new_key, '--execute')
+
+        output = self._rotate('--old-key', self.old_key, '--new-key', self.new_key, '--execute', '--restart')
+        self.assertIn('5 rotated', output)
+
+    def test_values_rewritten_during_rotation_are_kept(self):
+        """A row the application rewrites mid-batch isn't overwritten by the rotation."""
+        from django.db import connection
+        from core.key_rotation import Reencryptor, reencrypt_column
+
+        target = self.documents[1].pk
+        rotate = Reencryptor(self.new_key, [self.old_key])
+
+        def rotate_while_app_writes(raw_value):
+            if raw_value == self._raw_summaries()[target]:
+                with connection.cursor() as cursor:
+                    cursor.execute("UPDATE claims_document SET ai_summary = %s WHERE id = %s", ['rewritten', target])
+            return rotate(raw_value)
+
+        stats = reencrypt_column('claims_document', 'id', 'ai_summary', rotate_while_app_writes)
+
+        self.assertEqual(stats.rotated, 5)
+        self.assertEqual(self._raw_summaries()[target], 'rewritten')
+
+    def test_split_pk_range_covers_all_rows(self):
+        """PK ranges are contiguous, open-ended and cover every row."""
+        from core.key_rotation import split_pk_range
+
+        ranges = split_pk_range('claims_document', 'id', 'ai_summary', 3)
+
+        self.assertEqual(len(ranges), 3)
+        self.assertIsNone(ranges[0][0])
+        self.assertIsNone(ranges[-1][1])
+        for (_, upper), (lower, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(upper, lower)
+        for document in self.documents:
+            self.assertEqual(
+                sum(1 for lo, hi in ranges if (lo is None or document.pk > lo) and (hi is None or document.pk <= hi)),
+                1,
+            )
+
+    def test_encrypt_existing_data_encrypts_plaintext(self):
+        """encrypt_existing_data encrypts plaintext values and leaves encrypted ones."""
+        from django.db import connection
+        from claims.models import Document
+        from core.encryption import encrypt_existing_data
+
+        target = self.documents[0].pk
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE claims_document SET ai_summary = %s WHERE id = %s", ['{"summary": "plain"}', target])
+
+        with self.settings(FIELD_ENCRYPTION_KEY=self.old_key):
+            self.assertEqual(encrypt_existing_data(Document, 'ai_summary', dry_run=True), 1)
+            self.assertEqual(encrypt_existing_data(Document, 'ai_summary', dry_run=False), 1)
+            self.assertEqual(Document.objects.get(pk=target).ai_summary, {'summary': 'plain'})
+
+
+# =============================================================================
+# DOWNLOAD MONITOR TESTS
+# =============================================================================
+
+@override_settings(
+    DOWNLOAD_MONITOR_WINDOW=3600,
+    ALERT_THRESHOLDS={'downloads_per_hour_warning': 3, 'downloads_per_hour_critical': 5},
+)
+class TestDownloadMonitor(TestCase):
+    """Tests for the sliding-window download counters and inline alerting."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from core.download_monitor import memory_windows
+
+        memory_windows.clear()
+        cache.clear()
+        self.user = User.objects.create_user(email='downloader@example.com', password='testpass123')
+
+    def test_window_slides(self):
+        """Downloads older than the window stop counting."""
+        from core.download_monitor import MemoryWindows
+
+        windows = MemoryWindows()
+        for second in (0, 10, 20):
+            windows.record(1, '10.0.0.1', 1000.0 + second, 60)
+
+        self.assertEqual(windows.record(1, '10.0.0.1', 1065.0, 60).user_downloads, 3)
+        self.assertEqual(windows.active_counts(1100.0, 60), ({'1': 1}, {'10.0.0.1': (1, 1)}))
+        self.assertEqual(windows.active_counts(2000.0, 60), ({}, {}))
+
+    def test_counts_distinct_users_per_ip(self):
+        """Each IP counts downloads and the distinct users behind them."""
+        from core.download_monitor import MemoryWindows
+
+        windows = MemoryWindows()
+        for user_id in (1, 2, 2, 3):
+            counts = windows.record(user_id, '10.0.0.1', 1000.0, 60)
+
+        self.assertEqual((counts.ip_downloads, counts.ip_users), (4, 3))
+
+    def test_redis_windows_use_shared_client_and_prefixed_keys(self):
+        """Redis counters come from core.shared_redis and are namespaced like cache keys."""
+        from core.download_monitor import RedisWindows, get_windows
+        from core.shared_redis import redis_key
+
+        client = MagicMock()
+        pipe = client.pipeline.return_value
+        pipe.execute.return_value = [1, 0, 2, True, 1, 1, 0, 5, True, 1, 0, 3, True, 1]
+        with patch('core.download_monitor.get_redis_client', return_value=client):
+            windows = get_windows()
+            counts = windows.record(7, '10.0.0.1', 1000.0, 60)
+
+        self.assertIsInstance(windows, RedisWindows)
+        self.assertEqual((counts.user_downloads, counts.ip_downloads, counts.ip_users), (2, 5, 3))
+        keys = {call.args[0] for call in pipe.zadd.call_args_list}
+        self.assertEqual(keys, {
+            redis_key('downloads:user:7'),
+            redis_key('downloads:active_users'),
+            redis_key('downloads:ip:10.0.0.1'),
+            redis_key('downloads:ip_users:10.0.0.1'),
+            redis_key('downloads:active_ips'),
+        })
+
+    @patch('core.tasks.send_download_alert.delay')
+    def test_alerts_inline_once_per_severity(self, delay):
+        """Crossing a threshold queues one alert per severity within the window."""
+        from core.download_monitor import record_download
+
+        for _ in range(7):
+            record_download(self.user, '10.0.0.1')
+
+        severities = [call.args[2] for call in delay.call_args_list]
+        self.assertEqual(severities, ['warning', 'critical'])
+        self.assertEqual(delay.call_args_list[1].args[3]['download_count'], 5)
+
+    @patch('core.tasks.send_download_alert.delay', side_effect=Exception('broker down'))
+    @patch('core.alerting.send_alert')
+    def test_reconciliation_resends_alert_that_failed_to_queue(self, send_alert, delay):
+        """An alert that couldn't be queued is sent by the next reconciliation."""
+        from core.alerting import check_download_anomalies
+        from core.download_monitor import record_download
+
+        for _ in range(3):
+            record_download(self.user, '10.0.0.1')
+
+        with patch('core.download_monitor.counters_shared', return_value=True):
+            anomalies = check_download_anomalies(hours=1)
+            check_download_anomalies(hours=1)
+
+        self.assertEqual([a['type'] for a in anomalies], ['elevated_download_volume'])
+        self.assertEqual(anomalies[0]['user_email'], 'downloader@example.com')
+        send_alert.assert_called_once()
+
+    @patch('core.tasks.send_download_alert.delay')
+    @patch('core.alerting.send_alert')
+    def test_reconciliation_reads_counters_not_audit_log(self, send_alert, delay):
+        """With shared counters the periodic check doesn't aggregate the audit log."""
+        from core.alerting import check_download_anomalies
+        from core.download_monitor import record_download
+
+        for _ in range(3):
+            record_download(self.user, '10.0.0.1')
+
+        with patch('core.download_monitor.counters_shared', return_value=True), \
+                patch('core.alerting._download_counts_from_audit_log') as from_audit_log:
+            anomalies = check_download_anomalies(hours=1)
+
+        from_audit_log.assert_not_called()
+        self.assertEqual(len(anomalies), 1)
+        # Already alerted inline
+        send_alert.assert_not_called()
+
+    @patch('core.alerting.send_alert')
+    def test_reconciliation_falls_back_to_audit_log(self, send_alert):
+        """Without shared counters the audit log is aggregated as before."""
+        from core.alerting import check_download_anomalies
+
+        AuditLog.objects.bulk_create([
+            AuditLog(action='document_download', user=self.user, ip_address=f'10.0.0.{i % 5}')
+            for i in range(5)
+        ])
+        others = [
+            User.objects.create_user(email=f'shared{i}@example.com', password='testpass123')
+            for i in range(4)
+        ]
+        AuditLog.objects.bulk_create([
+            AuditLog(action='document_download', user=other, ip_address='10.0.0.99')
+            for other in others
+        ])
+
+        anomalies = check_download_anomalies(hours=1)
+
+        self.assertEqual(
+            sorted(a['type'] for a in anomalies), ['high_download_volume', 'multi_user_ip']
+        )
+        self.assertEqual(send_alert.call_count, 2)
+
+    def test_counter_failure_does_not_break_download(self):
+        """record_download logs and returns None if the counters fail."""
+        from core.download_monitor import record_download
+
+        with patch('core.download_monitor.get_windows', side_effect=ConnectionError('redis down')):
+            self.assertIsNone(record_download(self.user, '10.0.0.1'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examprep", "0004_add_shared_calculation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedratingcalculation",
+            name="rate_table_version",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Compensation rate table the estimate was computed with",
+                max_length=20,
+                verbose_name="Rate Table Version",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sharedcalculation",
+            name="rate_table_version",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Compensation rate table the estimate was computed with",
+                max_length=20,
+                verbose_name="Rate Table Version",
+            ),
+        ),
+    ]
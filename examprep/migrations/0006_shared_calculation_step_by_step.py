@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examprep", "0005_rating_rate_table_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sharedcalculation",
+            name="step_by_step",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Step-by-step breakdown shown on the shared page",
+                verbose_name="Calculation Steps",
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:07
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def infer_rate_years(apps, schema_editor):
+    """
+    Record the rate year existing estimates were computed with.
+
+    The year wasn't stored before, so it is inferred as the latest year whose
+    rates reproduce the stored estimate. Rows matching the latest year, or no
+    year at all, stay blank and follow the latest year as new ones are added.
+    """
+    from examprep.va_math import AVAILABLE_RATE_YEARS, estimate_monthly_compensation
+
+    for model_name in ('SavedRatingCalculation', 'SharedCalculation'):
+        model = apps.get_model('examprep', model_name)
+        rows = (
+            model.objects
+            .filter(rate_year__isnull=True)
+            .only('id', 'combined_rounded', 'has_spouse', 'children_under_18',
+                  'dependent_parents', 'estimated_monthly')
+            .order_by('id')
+        )
+
+        batch = []
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            for year in AVAILABLE_RATE_YEARS:
+                estimate = estimate_monthly_compensation(
+                    row.combined_rounded,
+                    spouse=row.has_spouse,
+                    children_under_18=row.children_under_18,
+                    dependent_parents=row.dependent_parents,
+                    year=year,
+                )
+                if abs(estimate - row.estimated_monthly) < 0.005:
+                    if year != AVAILABLE_RATE_YEARS[0]:
+                        row.rate_year = year
+                        batch.append(row)
+                    break
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ['rate_year'])
+                batch = []
+
+        if batch:
+            model.objects.bulk_update(batch, ['rate_year'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examprep", "0006_shared_calculation_step_by_step"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedratingcalculation",
+            name="rate_year",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Compensation rate year of the estimate (blank means the latest year)",
+                null=True,
+                verbose_name="Rate Year",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sharedcalculation",
+            name="rate_year",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Compensation rate year of the estimate (blank means the latest year)",
+                null=True,
+                verbose_name="Rate Year",
+            ),
+        ),
+        migrations.RunPython(infer_rate_years, migrations.RunPython.noop),
+    ]
@@ -304,6 +304,19 @@ class SavedRatingCalculation(TimeStampedModel):
 
     # Estimated compensation
     estimated_monthly = models.FloatField('Estimated Monthly', default=0)
+    rate_table_version = models.CharField(
+        'Rate Table Version',
+        max_length=20,
+        blank=True,
+        db_index=True,
+        help_text='Compensation rate table the estimate was computed with'
+    )
+    rate_year = models.PositiveSmallIntegerField(
+        'Rate Year',
+        null=True,
+        blank=True,
+        help_text='Compensation rate year of the estimate (blank means the latest year)'
+    )
 
     # Notes
     notes = models.TextField('Notes', blank=True)
@@ -319,11 +332,17 @@ class SavedRatingCalculation(TimeStampedModel):
     def recalculate(self):
         """Recalculate combined rating from stored ratings"""
         from .va_math import (
+            AVAILABLE_RATE_YEARS,
+            COMPENSATION_RATE_TABLE_VERSION,
             DisabilityRating,
             calculate_combined_rating,
             estimate_monthly_compensation
         )
 
+        self.rate_table_version = COMPENSATION_RATE_TABLE_VERSION
+        if self.rate_year not in AVAILABLE_RATE_YEARS:
+            self.rate_year = None
+
         if not self.ratings:
             self.combined_raw = 0
             self.combined_rounded = 0
@@ -353,7 +372,8 @@ class SavedRatingCalculation(TimeStampedModel):
             self.combined_rounded,
             spouse=self.has_spouse,
             children_under_18=self.children_under_18,
-            dependent_parents=self.dependent_parents
+            dependent_parents=self.dependent_parents,
+            year=self.rate_year or AVAILABLE_RATE_YEARS[0]
         )
 
 
@@ -575,6 +595,27 @@ class SharedCalculation(TimeStampedModel):
 
     # Estimated compensation
     estimated_monthly = models.FloatField('Estimated Monthly', default=0)
+    rate_table_version = models.CharField(
+        'Rate Table Version',
+        max_length=20,
+        blank=True,
+        db_index=True,
+        help_text='Compensation rate table the estimate was computed with'
+    )
+    rate_year = models.PositiveSmallIntegerField(
+        'Rate Year',
+        null=True,
+        blank=True,
+        help_text='Compensation rate year of the estimate (blank means the latest year)'
+    )
+
+    # VA Math steps, stored at share time so page views don't recalculate
+    step_by_step = models.JSONField(
+        'Calculation Steps',
+        default=list,
+        blank=True,
+        help_text='Step-by-step breakdown shown on the shared page'
+    )
 
     # Expiration (optional - for cleanup)
     expires_at = models.DateTimeField(
@@ -600,10 +641,86 @@ class SharedCalculation(TimeStampedModel):
             import secrets
             self.share_token = secrets.token_urlsafe(16)
         super().save(*args, **kwargs)
+        self.invalidate_page_cache(self.share_token)
+
+    def delete(self, *args, **kwargs):
+        token = self.share_token
+        result = super().delete(*args, **kwargs)
+        self.invalidate_page_cache(token)
+        return result
 
     def get_absolute_url(self):
         return reverse('examprep:shared_calculation', kwargs={'token': self.share_token})
 
+    @staticmethod
+    def page_cache_key(token):
+        """Cache key of the shared page data for a token."""
+        return f'examprep:shared_page:{token}'
+
+    @classmethod
+    def invalidate_page_cache(cls, *tokens):
+        """Drop cached page data so the next view reads the row again."""
+        from django.core.cache import cache
+        cache.delete_many([cls.page_cache_key(token) for token in tokens])
+
+    @staticmethod
+    def build_step_by_step(ratings):
+        """VA Math steps for stored ratings (0% ratings are left out)."""
+        from .va_math import DisabilityRating, calculate_combined_rating
+
+        rating_objects = []
+        for r in ratings:
+            percentage = int(r.get('percentage', 0))
+            if percentage > 0:
+                rating_objects.append(DisabilityRating(
+                    percentage=percentage,
+                    description=r.get('description', ''),
+                    is_bilateral=r.get('is_bilateral', False)
+                ))
+
+        if not rating_objects:
+            return []
+        return calculate_combined_rating(rating_objects).step_by_step
+
+    def page_data(self):
+        """
+        Everything the shared page renders, as plain data for the page cache.
+
+        Includes a digest of the displayed calculation; the page's ETag
+        combines it with the current view count (see view_shared_calculation).
+        """
+        import hashlib
+        import json
+
+        # Rows shared before steps were stored are calculated on read
+        step_by_step = self.step_by_step or self.build_step_by_step(self.ratings)
+
+        data = {
+            'share_token': self.share_token,
+            'name': self.name,
+            'ratings': self.ratings,
+            'combined_raw': self.combined_raw,
+            'combined_rounded': self.combined_rounded,
+            'bilateral_factor': self.bilateral_factor,
+            'estimated_monthly': self.estimated_monthly,
+            'has_spouse': self.has_spouse,
+            'children_under_18': self.children_under_18,
+            'dependent_parents': self.dependent_parents,
+            'step_by_step': step_by_step,
+            'has_ratings': any(int(r.get('percentage', 0)) > 0 for r in self.ratings),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'expires_at': self.expires_at,
+            'view_count': self.view_count,
+        }
+
+        content = {k: v for k, v in data.items() if k not in ('view_count', 'created_at', 'updated_at')}
+        digest = hashlib.sha256(
+            json.dumps(content, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:32]
+        data['content_digest'] = digest
+        return data
+
     @property
     def is_expired(self):
         """Check if this share link has expired."""
@@ -632,15 +749,30 @@ class SharedCalculation(TimeStampedModel):
         user=None,
         saved_calculation=None,
         expires_in_days=30,
+        rate_table_version=None,
+        rate_year=None,
+        step_by_step=None,
     ):
         """
         Create a new shared calculation from calculation data.
         
         Args:
             expires_in_days: Number of days until link expires (None for no expiry)
+            rate_table_version: Rate table estimated_monthly was computed with
+                (defaults to the current table)
+            rate_year: Rate year estimated_monthly was computed with
+                (None for the latest year, following newer tables)
+            step_by_step: VA Math steps to store (calculated from ratings if None)
         """
         from django.utils import timezone
         from datetime import timedelta
+        from .va_math import COMPENSATION_RATE_TABLE_VERSION
+
+        if rate_table_version is None:
+            rate_table_version = COMPENSATION_RATE_TABLE_VERSION
+
+        if step_by_step is None:
+            step_by_step = cls.build_step_by_step(ratings)
 
         expires_at = None
         if expires_in_days:
@@ -658,5 +790,8 @@ class SharedCalculation(TimeStampedModel):
             has_spouse=has_spouse,
             children_under_18=children_under_18,
             dependent_parents=dependent_parents,
+            rate_table_version=rate_table_version,
+            rate_year=rate_year,
+            step_by_step=step_by_step,
             expires_at=expires_at,
         )
@@ -0,0 +1,234 @@
+"""
+"Next 10%" Rating Optimizer
+
+Answers the question veterans ask most often about their combined rating:
+which single increase or new claim gets them to the next combined bracket?
+
+Candidate changes are enumerated on top of va_math:
+- Increase one existing condition by one level (10%)
+- Add a new condition rated 10-70%
+- Mark an existing condition as bilateral (or not)
+
+Every candidate is evaluated through the calculator's shared combined-rating
+cache, which is keyed by the sorted multiset of ratings, so candidates that
+produce the same rating set (e.g. bumping either of two 30% conditions) are
+only combined once.
+
+References:
+- 38 CFR § 4.25 - Combined ratings table
+- 38 CFR § 4.26 - Bilateral factor
+"""
+
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from .va_math import DisabilityRating, combine_rating_set
+
+
+# New-condition ratings considered by the optimizer
+NEW_CONDITION_PERCENTAGES = (10, 20, 30, 40, 50, 60, 70)
+
+# Options returned per bracket
+DEFAULT_OPTIONS_PER_BRACKET = 3
+
+# Candidate kinds, in ranking order (cheapest to pursue first)
+CHANGE_INCREASE = 'increase'
+CHANGE_ADD = 'add'
+CHANGE_BILATERAL = 'bilateral'
+_KIND_ORDER = {CHANGE_INCREASE: 0, CHANGE_ADD: 1, CHANGE_BILATERAL: 2}
+
+
+@dataclass(frozen=True)
+class RatingChange:
+    """One candidate change to the current ratings"""
+    kind: str
+    description: str
+    from_percentage: int
+    to_percentage: int
+    is_bilateral: bool = False
+    index: Optional[int] = None  # Position of the existing condition changed, if any
+
+    @property
+    def points_added(self) -> int:
+        """Rating points the change asks VA to grant."""
+        return self.to_percentage - self.from_percentage
+
+    def to_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'description': self.description,
+            'from_percentage': self.from_percentage,
+            'to_percentage': self.to_percentage,
+            'is_bilateral': self.is_bilateral,
+            'index': self.index,
+        }
+
+
+@dataclass
+class BracketOption:
+    """A set of changes that reaches a combined bracket"""
+    changes: Tuple[RatingChange, ...]
+    combined_raw: float
+    combined_rounded: int
+
+    @property
+    def points_added(self) -> int:
+        return sum(change.points_added for change in self.changes)
+
+    def to_dict(self) -> dict:
+        return {
+            'changes': [change.to_dict() for change in self.changes],
+            'combined_raw': round(self.combined_raw, 2),
+            'combined_rounded': self.combined_rounded,
+            'points_added': self.points_added,
+        }
+
+
+@dataclass
+class OptimizationResult:
+    """Minimal changes reaching each combined bracket above the current one"""
+    current_raw: float
+    current_rounded: int
+    candidates_evaluated: int
+    brackets: Dict[int, List[BracketOption]] = field(default_factory=dict)
+
+    @property
+    def next_bracket(self) -> Optional[int]:
+        """Lowest bracket above the current rating that some change reaches."""
+        return min(self.brackets) if self.brackets else None
+
+    def to_dict(self) -> dict:
+        return {
+            'current_raw': round(self.current_raw, 2),
+            'current_rounded': self.current_rounded,
+            'next_bracket': self.next_bracket,
+            'candidates_evaluated': self.candidates_evaluated,
+            'brackets': {
+                str(bracket): [option.to_dict() for option in options]
+                for bracket, options in sorted(self.brackets.items())
+            },
+        }
+
+
+def combined_for(ratings: List[Tuple[int, bool]]) -> Tuple[float, int]:
+    """Combined (raw, rounded) rating for (percentage, is_bilateral) pairs."""
+    return combine_rating_set(ratings)
+
+
+def _candidate_changes(ratings: List[DisabilityRating]) -> List[RatingChange]:
+    """Enumerate single changes to the current ratings."""
+    changes = []
+
+    for index, rating in enumerate(ratings):
+        label = rating.description or f"Condition {index + 1}"
+        if rating.percentage < 100:
+            changes.append(RatingChange(
+                kind=CHANGE_INCREASE,
+                description=label,
+                from_percentage=rating.percentage,
+                to_percentage=min(100, rating.percentage + 10),
+                is_bilateral=rating.is_bilateral,
+                index=index,
+            ))
+        changes.append(RatingChange(
+            kind=CHANGE_BILATERAL,
+            description=label,
+            from_percentage=rating.percentage,
+            to_percentage=rating.percentage,
+            is_bilateral=not rating.is_bilateral,
+            index=index,
+        ))
+
+    for percentage in NEW_CONDITION_PERCENTAGES:
+        changes.append(RatingChange(
+            kind=CHANGE_ADD,
+            description=f"New condition at {percentage}%",
+            from_percentage=0,
+            to_percentage=percentage,
+        ))
+
+    return changes
+
+
+def _apply_changes(base: List[Tuple[int, bool]], changes: Tuple[RatingChange, ...]) -> List[Tuple[int, bool]]:
+    """Apply changes to (percentage, is_bilateral) pairs."""
+    ratings = list(base)
+    for change in changes:
+        if change.index is None:
+            ratings.append((change.to_percentage, change.is_bilateral))
+        else:
+            ratings[change.index] = (change.to_percentage, change.is_bilateral)
+    return ratings
+
+
+def _compatible(changes: Tuple[RatingChange, ...]) -> bool:
+    """A combination may change each existing condition at most once."""
+    indexes = [change.index for change in changes if change.index is not None]
+    return len(indexes) == len(set(indexes))
+
+
+def _option_sort_key(option: BracketOption):
+    # Kinds before points: a bilateral change adds no points but isn't free
+    return (
+        len(option.changes),
+        sorted(_KIND_ORDER[change.kind] for change in option.changes),
+        option.points_added,
+        -option.combined_raw,
+    )
+
+
+def find_next_bracket_changes(
+    ratings: List[DisabilityRating],
+    max_changes: int = 1,
+    options_per_bracket: int = DEFAULT_OPTIONS_PER_BRACKET,
+) -> OptimizationResult:
+    """
+    Find the minimal changes that lift the combined rating into each higher bracket.
+
+    Options are ranked by number of changes, then by kind (increases before
+    new claims before bilateral changes), then by rating points added (a
+    new 10% condition is easier to obtain than a new 40% one).
+
+    Args:
+        ratings: Current disability ratings
+        max_changes: Largest number of changes combined in one option (1 or 2)
+        options_per_bracket: Options kept for each bracket
+
+    Returns:
+        OptimizationResult keyed by combined bracket (e.g. 70, 80, ...)
+    """
+    if max_changes not in (1, 2):
+        raise ValueError("max_changes must be 1 or 2")
+
+    base = [(r.percentage, r.is_bilateral) for r in ratings]
+    current_raw, current_rounded = combined_for(base)
+
+    candidates = _candidate_changes(ratings)
+    improving: List[BracketOption] = []
+    evaluated = 0
+
+    for size in range(1, max_changes + 1):
+        for changes in combinations(candidates, size):
+            if size > 1 and not _compatible(changes):
+                continue
+            raw, rounded = combined_for(_apply_changes(base, changes))
+            evaluated += 1
+            if rounded > current_rounded:
+                improving.append(BracketOption(changes=changes, combined_raw=raw, combined_rounded=rounded))
+
+    improving.sort(key=_option_sort_key)
+
+    # An option reaching 80% also crosses the 70% threshold
+    brackets = {}
+    for bracket in range(current_rounded + 10, 101, 10):
+        options = [o for o in improving if o.combined_rounded >= bracket][:options_per_bracket]
+        if options:
+            brackets[bracket] = options
+
+    return OptimizationResult(
+        current_raw=current_raw,
+        current_rounded=current_rounded,
+        candidates_evaluated=evaluated,
+        brackets=brackets,
+    )
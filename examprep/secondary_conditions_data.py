@@ -9,7 +9,10 @@ Reference: 38 CFR 3.310 - Disabilities that are proximately due to, or aggravate
 service-connected disease or injury.
 """
 
-from typing import List, Dict, Any, Optional
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 
 
@@ -682,6 +685,181 @@ SECONDARY_CONDITIONS_DATA: List[Dict[str, Any]] = [
 ]
 
 
+# =============================================================================
+# LOOKUP INDEXES
+# =============================================================================
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Distinct search queries whose results are kept
+SEARCH_CACHE_SIZE = 512
+
+# Typeahead suggestions returned by default
+DEFAULT_SUGGESTION_LIMIT = 10
+
+# Identifies a condition name: (primary index, secondary index or None)
+EntryId = Tuple[int, Optional[int]]
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace for name lookups."""
+    return " ".join(text.lower().split())
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split a condition name or query into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SecondaryConditionsIndex:
+    """
+    Lookup structures over SECONDARY_CONDITIONS_DATA, built once at import.
+
+    Every primary and secondary condition name is an entry, identified by
+    (primary_index, secondary_index) with secondary_index None for the
+    primary itself. The inverted index maps each name token, and every
+    prefix of it, to the entries whose name contains it.
+    """
+
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+        self.primary_names = tuple(_normalize(p["condition"]) for p in data)
+
+        # An exact name resolves to the first condition containing it, the
+        # same answer the substring match in get_primary_condition gives
+        self.primary_by_name = {
+            name: self.find_primary(name) for name in self.primary_names
+        }
+
+        by_category = defaultdict(list)
+        for primary in data:
+            by_category[primary["category"]].append(primary)
+        self.by_category = dict(by_category)
+        self.categories = tuple(sorted(self.by_category))
+
+        self.entry_names: Dict[EntryId, str] = {}
+        tokens = defaultdict(set)
+        prefixes = defaultdict(set)
+        for p_index, primary in enumerate(data):
+            entries = [((p_index, None), primary["condition"])]
+            entries += [
+                ((p_index, s_index), secondary["condition"])
+                for s_index, secondary in enumerate(primary["secondary_conditions"])
+            ]
+            for entry_id, name in entries:
+                self.entry_names[entry_id] = name
+                for token in _tokenize(name):
+                    tokens[token].add(entry_id)
+                    for end in range(1, len(token) + 1):
+                        prefixes[token[:end]].add(entry_id)
+
+        self.token_index = {token: frozenset(ids) for token, ids in tokens.items()}
+        self.prefix_index = {prefix: frozenset(ids) for prefix, ids in prefixes.items()}
+
+        self.counts = {
+            "primary_conditions": len(data),
+            "secondary_relationships": sum(len(c["secondary_conditions"]) for c in data),
+            "categories": len(self.categories),
+        }
+
+    def find_primary(self, name: str) -> Optional[Dict[str, Any]]:
+        """First primary condition whose name contains name (already normalized)."""
+        for primary, primary_name in zip(self.data, self.primary_names):
+            if name in primary_name:
+                return primary
+        return None
+
+    def match(self, terms: Tuple[str, ...], text: str = "") -> Dict[EntryId, int]:
+        """
+        Entries whose names match every query term, with a relevance score.
+
+        A term matches a name if it is a prefix of one of its words;
+        whole-word matches score 2 and prefix-only matches 1. When no name
+        matches that way, names containing text (the normalized query) as a
+        substring match with score 1, so input typed mid-word ("pnea")
+        still finds "Sleep Apnea".
+        """
+        postings = [self.prefix_index.get(term) for term in terms]
+        if terms and all(postings):
+            matches = frozenset.intersection(*sorted(postings, key=len))
+            return {
+                entry_id: sum(
+                    2 if entry_id in self.token_index.get(term, ()) else 1 for term in terms
+                )
+                for entry_id in matches
+            }
+
+        if not text:
+            return {}
+        return {
+            entry_id: 1 for entry_id, name in self.entry_names.items() if text in name.lower()
+        }
+
+    def search(self, terms: Tuple[str, ...], text: str = "") -> List[Dict[str, Any]]:
+        """Ranked search results for a query (see search_secondary_conditions)."""
+        scores = self.match(terms, text)
+
+        ranked = []
+        for p_index, primary in enumerate(self.data):
+            primary_score = scores.get((p_index, None), 0)
+            secondary_scores = sorted(
+                (-scores[(p_index, s_index)], s_index)
+                for s_index in range(len(primary["secondary_conditions"]))
+                if (p_index, s_index) in scores
+            )
+            if not primary_score and not secondary_scores:
+                continue
+
+            result = dict(primary)
+            if secondary_scores:
+                # Best-matching secondaries first, data order on ties
+                result["matching_secondaries"] = [
+                    primary["secondary_conditions"][s_index] for _, s_index in secondary_scores
+                ]
+            best_secondary = -secondary_scores[0][0] if secondary_scores else 0
+            sort_key = (-primary_score, -best_secondary, -len(secondary_scores), p_index)
+            ranked.append((sort_key, result))
+
+        ranked.sort(key=lambda item: item[0])
+        return [result for _, result in ranked]
+
+    def suggest(self, terms: Tuple[str, ...], limit: int, text: str = "") -> List[str]:
+        """Distinct matching condition names, best matches and primaries first."""
+        scores = self.match(terms, text)
+        ranked = sorted(
+            scores,
+            key=lambda entry_id: (
+                -scores[entry_id],
+                entry_id[1] is not None,
+                self.entry_names[entry_id].lower(),
+            ),
+        )
+
+        suggestions = []
+        seen = set()
+        for entry_id in ranked:
+            name = self.entry_names[entry_id]
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                suggestions.append(name)
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+
+SECONDARY_CONDITIONS_INDEX = SecondaryConditionsIndex(SECONDARY_CONDITIONS_DATA)
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _find_primary(name: str) -> Optional[Dict[str, Any]]:
+    return SECONDARY_CONDITIONS_INDEX.find_primary(name)
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _search(terms: Tuple[str, ...], text: str) -> Tuple[Dict[str, Any], ...]:
+    return tuple(SECONDARY_CONDITIONS_INDEX.search(terms, text))
+
+
 def get_all_primary_conditions() -> List[Dict[str, Any]]:
     """
     Get all primary conditions with their secondary conditions.
@@ -693,53 +871,59 @@ def get_all_primary_conditions() -> List[Dict[str, Any]]:
 def get_primary_condition(condition_name: str) -> Optional[Dict[str, Any]]:
     """
     Get a specific primary condition by name.
+
+    Matches the first condition whose name contains condition_name
+    (case-insensitive); exact names are a dictionary lookup.
     """
-    condition_lower = condition_name.lower()
-    for condition in SECONDARY_CONDITIONS_DATA:
-        if condition_lower in condition["condition"].lower():
-            return condition
-    return None
+    name = _normalize(condition_name)
+    if name in SECONDARY_CONDITIONS_INDEX.primary_by_name:
+        return SECONDARY_CONDITIONS_INDEX.primary_by_name[name]
+    return _find_primary(name)
 
 
 def get_categories() -> List[str]:
     """
-    Get all unique categories.
+    Get all unique categories, sorted by name.
     """
-    return list(set(c["category"] for c in SECONDARY_CONDITIONS_DATA))
+    return list(SECONDARY_CONDITIONS_INDEX.categories)
 
 
 def get_conditions_by_category(category: str) -> List[Dict[str, Any]]:
     """
     Get all conditions in a specific category.
     """
-    return [c for c in SECONDARY_CONDITIONS_DATA if c["category"] == category]
+    return list(SECONDARY_CONDITIONS_INDEX.by_category.get(category, ()))
 
 
 def search_secondary_conditions(query: str) -> List[Dict[str, Any]]:
     """
-    Search for conditions by name or description.
+    Search for conditions by name.
     Returns matching primary conditions with highlighted secondaries.
-    """
-    query_lower = query.lower()
-    results = []
 
-    for primary in SECONDARY_CONDITIONS_DATA:
-        # Check if query matches primary condition
-        primary_match = query_lower in primary["condition"].lower()
+    Every word of the query must start a word of a primary or secondary
+    condition name, so partial input ("sle apn") works for typeahead. If no
+    name matches that way, names containing the query as a substring
+    ("pnea") are returned instead. Primaries whose own name matches rank
+    first, then those with the best and most matching secondaries. Results
+    are shared between calls and must not be modified.
+    """
+    terms = tuple(_tokenize(query))
+    if not terms:
+        return []
+    return list(_search(terms, _normalize(query)))
 
-        # Check if query matches any secondary condition
-        matching_secondaries = []
-        for secondary in primary["secondary_conditions"]:
-            if query_lower in secondary["condition"].lower():
-                matching_secondaries.append(secondary)
 
-        if primary_match or matching_secondaries:
-            result = primary.copy()
-            if matching_secondaries:
-                result["matching_secondaries"] = matching_secondaries
-            results.append(result)
+def suggest_conditions(prefix: str, limit: int = DEFAULT_SUGGESTION_LIMIT) -> List[str]:
+    """
+    Condition names (primary and secondary) matching partially typed input.
 
-    return results
+    Names are matched like search_secondary_conditions, ranked by match
+    quality, primaries before secondaries, and returned once each.
+    """
+    terms = tuple(_tokenize(prefix))
+    if not terms or limit <= 0:
+        return []
+    return SECONDARY_CONDITIONS_INDEX.suggest(terms, limit, _normalize(prefix))
 
 
 def get_secondary_conditions_for(primary_condition: str) -> List[Dict[str, Any]]:
@@ -756,12 +940,5 @@ def get_conditions_count() -> Dict[str, int]:
     """
     Get count statistics for display.
     """
-    total_primary = len(SECONDARY_CONDITIONS_DATA)
-    total_secondary = sum(len(c["secondary_conditions"]) for c in SECONDARY_CONDITIONS_DATA)
-    total_categories = len(get_categories())
-
-    return {
-        "primary_conditions": total_primary,
-        "secondary_relationships": total_secondary,
-        "categories": total_categories
-    }
+    return dict(SECONDARY_CONDITIONS_INDEX.counts)
+
@@ -3,15 +3,23 @@ PDF Generator for VA Rating Calculations
 
 Generates professional PDF exports of rating calculations
 with VA Math breakdown and compensation estimates.
+
+Styles and static table styles are built once per process and shared by
+every document. Rendered documents are cached by a hash of their content,
+so downloading the same calculation again skips ReportLab entirely.
 """
 
+import hashlib
 import io
+import json
 from datetime import date
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 
+from django.core.cache import cache
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.platypus import (
     SimpleDocTemplate,
@@ -20,10 +28,242 @@ from reportlab.platypus import (
     Table,
     TableStyle,
     HRFlowable,
+    PageBreak,
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 
+# Bump when the document layout changes so cached PDFs are re-rendered
+PDF_LAYOUT_VERSION = 2
+
+PDF_CACHE_PREFIX = 'examprep:pdf:'
+PDF_CACHE_TIMEOUT = 24 * 60 * 60  # Cache keys include the date, so a day is enough
+
+# Documents larger than this are rendered but not cached
+PDF_CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_pdf_styles() -> StyleSheet1:
+    """Sample stylesheet plus the app's custom paragraph styles, built once."""
+    styles = getSampleStyleSheet()
+
+    styles.add(ParagraphStyle(
+        name='VATitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=12,
+        textColor=colors.HexColor('#1e3a8a'),  # blue-900
+        alignment=TA_CENTER,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='VASectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceBefore=16,
+        spaceAfter=8,
+        textColor=colors.HexColor('#1e3a8a'),
+    ))
+
+    styles.add(ParagraphStyle(
+        name='VASubHeader',
+        parent=styles['Heading3'],
+        fontSize=11,
+        spaceBefore=8,
+        spaceAfter=4,
+        textColor=colors.HexColor('#374151'),  # gray-700
+    ))
+
+    styles.add(ParagraphStyle(
+        name='VABodyText',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='VADisclaimer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.HexColor('#6b7280'),  # gray-500
+        spaceBefore=12,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='VAResultLarge',
+        parent=styles['Normal'],
+        fontSize=24,
+        textColor=colors.HexColor('#059669'),  # green-600
+        alignment=TA_CENTER,
+        spaceBefore=8,
+        spaceAfter=8,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CenteredSmall',
+        parent=styles['Normal'],
+        fontSize=9,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#6b7280'),
+    ))
+
+    return styles
+
+
+COMPENSATION_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#059669')),
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+RATINGS_TABLE_STYLE = TableStyle([
+    # Header row
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('TOPPADDING', (0, 0), (-1, 0), 8),
+
+    # Data rows
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+
+    # Alternating row colors
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')]),
+])
+
+STEPS_TABLE_STYLE = TableStyle([
+    # Header
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+
+    # Data
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+    ('ALIGN', (2, 1), (2, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+    ('TOPPADDING', (0, 1), (-1, -1), 4),
+
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+])
+
+GRID_TABLE_STYLE_COMMANDS = [
+    # Header
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+]
+
+DISCLAIMER_TEMPLATE = (
+    "<b>Disclaimer:</b> This calculation is for informational purposes only and does not "
+    "constitute legal or financial advice. Actual VA disability compensation may vary based "
+    "on individual circumstances, effective dates, and current VA compensation rates. "
+    "{rates_used} For official determinations, "
+    "consult with a VA-accredited representative or the Department of Veterans Affairs. "
+    "This document was generated by VA Benefits Navigator."
+)
+
+
+def disclaimer_text(rate_years: List[int]) -> str:
+    """Legal disclaimer naming the compensation rate years the document's estimates use."""
+    years = [str(year) for year in sorted(set(rate_years))]
+    if len(years) > 1:
+        rates_used = (
+            f"The calculations use {', '.join(years[:-1])} and {years[-1]} VA compensation rates."
+        )
+    else:
+        rates_used = f"The calculation uses {years[0]} VA compensation rates."
+    return DISCLAIMER_TEMPLATE.format(rates_used=rates_used)
+
+
+def _render(story: list) -> bytes:
+    """Lay out flowables on letter pages and return the PDF bytes."""
+    buffer = io.BytesIO()
+
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.75 * inch,
+        leftMargin=0.75 * inch,
+        topMargin=0.75 * inch,
+        bottomMargin=0.75 * inch,
+    )
+    doc.build(story)
+
+    # Get the PDF bytes
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+
+    return pdf_bytes
+
+
+def _header_story(name: str) -> list:
+    styles = get_pdf_styles()
+    return [
+        Paragraph("VA Benefits Navigator", styles['VATitle']),
+        Paragraph(name, styles['VASectionHeader']),
+        Paragraph(f"Generated: {date.today().strftime('%B %d, %Y')}", styles['VABodyText']),
+        Spacer(1, 12),
+        # Horizontal line
+        HRFlowable(
+            width="100%",
+            thickness=1,
+            color=colors.HexColor('#d1d5db'),
+            spaceBefore=6,
+            spaceAfter=12
+        ),
+    ]
+
+
+def _footer_story(rate_years: List[int]) -> list:
+    styles = get_pdf_styles()
+    return [
+        Spacer(1, 16),
+        # Legal Disclaimer
+        HRFlowable(
+            width="100%",
+            thickness=0.5,
+            color=colors.HexColor('#d1d5db'),
+            spaceBefore=12,
+            spaceAfter=8
+        ),
+        Paragraph(disclaimer_text(rate_years), styles['VADisclaimer']),
+        # Reference
+        Paragraph(
+            "VA Math formula based on 38 CFR 4.25. Compensation rates from VA.gov.",
+            styles['VADisclaimer']
+        ),
+    ]
+
+
 class RatingCalculationPDF:
     """
     Generate a PDF document for a VA disability rating calculation.
@@ -42,7 +282,11 @@ class RatingCalculationPDF:
         children_under_18: int = 0,
         dependent_parents: int = 0,
         calculation_name: Optional[str] = None,
+        compensation_grid: Optional[Dict[str, Any]] = None,
+        rate_year: Optional[int] = None,
     ):
+        from examprep.va_math import AVAILABLE_RATE_YEARS
+
         self.ratings = ratings
         self.combined_raw = combined_raw
         self.combined_rounded = combined_rounded
@@ -54,99 +298,28 @@ class RatingCalculationPDF:
         self.children_under_18 = children_under_18
         self.dependent_parents = dependent_parents
         self.calculation_name = calculation_name or "VA Rating Calculation"
+        self.compensation_grid = compensation_grid
 
-        # Set up styles
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-
-    def _setup_custom_styles(self):
-        """Create custom paragraph styles."""
-        self.styles.add(ParagraphStyle(
-            name='VATitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=12,
-            textColor=colors.HexColor('#1e3a8a'),  # blue-900
-            alignment=TA_CENTER,
-        ))
-
-        self.styles.add(ParagraphStyle(
-            name='VASectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceBefore=16,
-            spaceAfter=8,
-            textColor=colors.HexColor('#1e3a8a'),
-        ))
-
-        self.styles.add(ParagraphStyle(
-            name='VASubHeader',
-            parent=self.styles['Heading3'],
-            fontSize=11,
-            spaceBefore=8,
-            spaceAfter=4,
-            textColor=colors.HexColor('#374151'),  # gray-700
-        ))
-
-        self.styles.add(ParagraphStyle(
-            name='VABodyText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6,
-        ))
-
-        self.styles.add(ParagraphStyle(
-            name='VADisclaimer',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.HexColor('#6b7280'),  # gray-500
-            spaceBefore=12,
-        ))
-
-        self.styles.add(ParagraphStyle(
-            name='VAResultLarge',
-            parent=self.styles['Normal'],
-            fontSize=24,
-            textColor=colors.HexColor('#059669'),  # green-600
-            alignment=TA_CENTER,
-            spaceBefore=8,
-            spaceAfter=8,
-        ))
+        # Year of the estimate; falls back to the grid's year, then the latest
+        if rate_year is None:
+            rate_year = compensation_grid['year'] if compensation_grid else AVAILABLE_RATE_YEARS[0]
+        self.rate_year = rate_year
+
+        # Shared, process-wide styles
+        self.styles = get_pdf_styles()
 
     def generate(self) -> bytes:
         """Generate the PDF and return as bytes."""
-        buffer = io.BytesIO()
-
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=0.75 * inch,
-            leftMargin=0.75 * inch,
-            topMargin=0.75 * inch,
-            bottomMargin=0.75 * inch,
+        return _render(
+            _header_story(self.calculation_name)
+            + self.calculation_story()
+            + _footer_story([self.rate_year])
         )
 
-        # Build the document content
+    def calculation_story(self) -> list:
+        """Flowables for this calculation, without the page header and disclaimer."""
         story = []
 
-        # Header
-        story.append(Paragraph("VA Benefits Navigator", self.styles['VATitle']))
-        story.append(Paragraph(self.calculation_name, self.styles['VASectionHeader']))
-        story.append(Paragraph(
-            f"Generated: {date.today().strftime('%B %d, %Y')}",
-            self.styles['VABodyText']
-        ))
-        story.append(Spacer(1, 12))
-
-        # Horizontal line
-        story.append(HRFlowable(
-            width="100%",
-            thickness=1,
-            color=colors.HexColor('#d1d5db'),
-            spaceBefore=6,
-            spaceAfter=12
-        ))
-
         # Combined Rating Result
         story.append(Paragraph("Combined VA Disability Rating", self.styles['VASectionHeader']))
         story.append(Paragraph(f"{self.combined_rounded}%", self.styles['VAResultLarge']))
@@ -154,13 +327,7 @@ class RatingCalculationPDF:
         if self.combined_raw != self.combined_rounded:
             story.append(Paragraph(
                 f"(Calculated: {self.combined_raw:.2f}%, rounded to {self.combined_rounded}%)",
-                ParagraphStyle(
-                    'CenteredSmall',
-                    parent=self.styles['Normal'],
-                    fontSize=9,
-                    alignment=TA_CENTER,
-                    textColor=colors.HexColor('#6b7280'),
-                )
+                self.styles['CenteredSmall']
             ))
 
         story.append(Spacer(1, 12))
@@ -174,15 +341,7 @@ class RatingCalculationPDF:
         ]
 
         comp_table = Table(comp_data, colWidths=[2 * inch, 2 * inch])
-        comp_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#059669')),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        comp_table.setStyle(COMPENSATION_TABLE_STYLE)
         story.append(comp_table)
 
         # Dependents info
@@ -224,29 +383,7 @@ class RatingCalculationPDF:
                 ratings_data,
                 colWidths=[3.5 * inch, 1.25 * inch, 1.25 * inch]
             )
-            ratings_table.setStyle(TableStyle([
-                # Header row
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-
-                # Data rows
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-
-                # Alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')]),
-            ]))
+            ratings_table.setStyle(RATINGS_TABLE_STYLE)
             story.append(ratings_table)
         else:
             story.append(Paragraph("No ratings entered.", self.styles['VABodyText']))
@@ -284,64 +421,65 @@ class RatingCalculationPDF:
                 steps_data,
                 colWidths=[0.5 * inch, 4.5 * inch, 1 * inch]
             )
-            steps_table.setStyle(TableStyle([
-                # Header
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-
-                # Data
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-                ('ALIGN', (2, 1), (2, -1), 'CENTER'),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-                ('TOPPADDING', (0, 1), (-1, -1), 4),
-
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
+            steps_table.setStyle(STEPS_TABLE_STYLE)
             story.append(steps_table)
 
-        story.append(Spacer(1, 16))
+        # Compensation by rating and dependents
+        if self.compensation_grid:
+            story.append(Paragraph(
+                f"{self.compensation_grid['year']} Monthly Compensation by Rating",
+                self.styles['VASectionHeader']
+            ))
 
-        # Legal Disclaimer
-        story.append(HRFlowable(
-            width="100%",
-            thickness=0.5,
-            color=colors.HexColor('#d1d5db'),
-            spaceBefore=12,
-            spaceAfter=8
-        ))
-
-        disclaimer_text = (
-            "<b>Disclaimer:</b> This calculation is for informational purposes only and does not "
-            "constitute legal or financial advice. Actual VA disability compensation may vary based "
-            "on individual circumstances, effective dates, and current VA compensation rates. "
-            "The calculation uses 2024 VA compensation rates. For official determinations, "
-            "consult with a VA-accredited representative or the Department of Veterans Affairs. "
-            "This document was generated by VA Benefits Navigator."
-        )
-        story.append(Paragraph(disclaimer_text, self.styles['VADisclaimer']))
+            configurations = self.compensation_grid['configurations']
+            grid_data = [['Rating'] + [c['label'] for c in configurations]]
+            for row in self.compensation_grid['rows']:
+                grid_data.append(
+                    [f"{row['rating']}%"] + [f"${amount:,.2f}" for amount in row['amounts']]
+                )
+
+            column_width = 5 * inch / max(1, len(configurations))
+            grid_table = Table(grid_data, colWidths=[1 * inch] + [column_width] * len(configurations))
+            grid_table.setStyle(TableStyle(GRID_TABLE_STYLE_COMMANDS + [
+                # Highlight the calculated rating
+                ('FONTNAME', (0, i), (-1, i), 'Helvetica-Bold')
+                for i, row in enumerate(self.compensation_grid['rows'], 1)
+                if row['rating'] == self.combined_rounded
+            ]))
+            story.append(grid_table)
+
+        return story
 
-        # Reference
-        story.append(Paragraph(
-            "VA Math formula based on 38 CFR 4.25. Compensation rates from VA.gov.",
-            self.styles['VADisclaimer']
-        ))
 
-        # Build PDF
-        doc.build(story)
+# =============================================================================
+# CACHED RENDERING
+# =============================================================================
 
-        # Get the PDF bytes
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
+def pdf_cache_key(payload: Any) -> str:
+    """
+    Cache key for a document, derived from everything that affects its content.
+
+    The layout version and today's date (printed in the header) are part of
+    the hash, so layout changes and the next day's "Generated" line both
+    produce new keys.
+    """
+    document = {
+        'layout': PDF_LAYOUT_VERSION,
+        'date': date.today().isoformat(),
+        'content': payload,
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(',', ':'), default=str)
+    return PDF_CACHE_PREFIX + hashlib.sha256(encoded.encode('utf-8')).hexdigest()
 
-        return pdf_bytes
+
+def _cached_render(payload: Any, render) -> bytes:
+    key = pdf_cache_key(payload)
+    pdf_bytes = cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = render()
+        if len(pdf_bytes) <= PDF_CACHE_MAX_BYTES:
+            cache.set(key, pdf_bytes, PDF_CACHE_TIMEOUT)
+    return pdf_bytes
 
 
 def generate_rating_pdf(
@@ -356,6 +494,9 @@ def generate_rating_pdf(
     children_under_18: int = 0,
     dependent_parents: int = 0,
     calculation_name: Optional[str] = None,
+    compensation_grid: Optional[Dict[str, Any]] = None,
+    rate_year: Optional[int] = None,
+    use_cache: bool = True,
 ) -> bytes:
     """
     Generate a PDF for a rating calculation.
@@ -372,11 +513,16 @@ def generate_rating_pdf(
         children_under_18: Number of children under 18
         dependent_parents: Number of dependent parents
         calculation_name: Optional name for the calculation
+        compensation_grid: Optional va_math.compensation_grid() output to
+            include as a rating-by-dependents table
+        rate_year: Rate year of the estimate, named in the disclaimer
+            (defaults to the grid's year, or the latest year)
+        use_cache: Return a cached copy of an identical document if available
 
     Returns:
         PDF file as bytes
     """
-    generator = RatingCalculationPDF(
+    calculation = dict(
         ratings=ratings,
         combined_raw=combined_raw,
         combined_rounded=combined_rounded,
@@ -388,6 +534,89 @@ def generate_rating_pdf(
         children_under_18=children_under_18,
         dependent_parents=dependent_parents,
         calculation_name=calculation_name,
+        compensation_grid=compensation_grid,
+        rate_year=rate_year,
     )
 
-    return generator.generate()
+    def render():
+        return RatingCalculationPDF(**calculation).generate()
+
+    if not use_cache:
+        return render()
+    return _cached_render(calculation, render)
+
+
+def generate_multi_rating_pdf(
+    calculations: List[Dict[str, Any]],
+    title: str = "Saved Rating Calculations",
+    use_cache: bool = True,
+) -> bytes:
+    """
+    Generate one PDF containing several rating calculations, one per page.
+
+    Args:
+        calculations: generate_rating_pdf() keyword arguments for each calculation
+        title: Document title shown in the header
+        use_cache: Return a cached copy of an identical document if available
+
+    Returns:
+        PDF file as bytes
+    """
+    def render():
+        styles = get_pdf_styles()
+        story = _header_story(title)
+        rate_years = []
+        for i, calculation in enumerate(calculations):
+            generator = RatingCalculationPDF(**calculation)
+            if i:
+                story.append(PageBreak())
+            story.append(Paragraph(generator.calculation_name, styles['VATitle']))
+            story.extend(generator.calculation_story())
+            rate_years.append(generator.rate_year)
+        return _render(story + _footer_story(rate_years))
+
+    if not use_cache:
+        return render()
+    return _cached_render({'title': title, 'calculations': calculations}, render)
+
+
+def saved_calculation_pdf_data(calculation) -> Dict[str, Any]:
+    """
+    generate_rating_pdf() keyword arguments for a SavedRatingCalculation.
+
+    Step-by-step data isn't stored, so it is recalculated from the saved
+    ratings (0% ratings are left out of the steps, as on the calculator).
+    """
+    from examprep.va_math import (
+        AVAILABLE_RATE_YEARS,
+        DisabilityRating,
+        calculate_combined_rating,
+        format_currency,
+    )
+
+    ratings = []
+    for r in calculation.ratings:
+        percentage = int(r.get('percentage', 0))
+        if percentage > 0:
+            ratings.append(DisabilityRating(
+                percentage=percentage,
+                description=r.get('description', ''),
+                is_bilateral=r.get('is_bilateral', False)
+            ))
+
+    step_by_step = calculate_combined_rating(ratings).step_by_step if ratings else []
+
+    return dict(
+        ratings=calculation.ratings,
+        combined_raw=calculation.combined_raw,
+        combined_rounded=calculation.combined_rounded,
+        bilateral_factor=calculation.bilateral_factor,
+        monthly_compensation=format_currency(calculation.estimated_monthly),
+        annual_compensation=format_currency(calculation.estimated_monthly * 12),
+        step_by_step=step_by_step,
+        has_spouse=calculation.has_spouse,
+        children_under_18=calculation.children_under_18,
+        dependent_parents=calculation.dependent_parents,
+        calculation_name=calculation.name,
+        rate_year=calculation.rate_year or AVAILABLE_RATE_YEARS[0],
+    )
@@ -0,0 +1,439 @@
+"""
+Celery tasks for the exam prep app.
+
+Tasks:
+- Bulk recalculation of saved and shared rating calculations after the
+  compensation rate table changes
+- Background rendering of multi-calculation PDF exports
+- Flushing buffered shared-calculation view counts
+"""
+
+import logging
+import time
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Value, When
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+import numpy as np
+
+from examprep.models import SavedRatingCalculation, SharedCalculation
+from examprep.view_counters import claim_pending_views, release_claimed_views
+from examprep.va_math import (
+    AVAILABLE_RATE_YEARS,
+    BATCH_PAD,
+    COMPENSATION_RATE_TABLE_VERSION,
+    calculate_combined_ratings_batch,
+    estimate_monthly_compensation_array,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Rows recalculated per query / bulk_update
+RATE_RECALC_CHUNK_SIZE = 1000
+
+# Pause between chunks so the recalculation never saturates the database
+RATE_RECALC_THROTTLE_SECONDS = 0.05
+
+# Work done per task run before re-queueing (kept under CELERY_TASK_SOFT_TIME_LIMIT)
+RATE_RECALC_TIME_BUDGET_SECONDS = 20 * 60
+
+# Progress checkpoints survive worker restarts for a week
+RATE_RECALC_CHECKPOINT_TIMEOUT = 7 * 24 * 60 * 60
+
+RATE_RECALC_LOCK_KEY = 'examprep:rate_recalc:lock'
+
+_RECALC_INPUT_FIELDS = ('id', 'ratings', 'has_spouse', 'children_under_18', 'dependent_parents', 'rate_year')
+_RECALC_OUTPUT_FIELDS = [
+    'combined_raw', 'combined_rounded', 'bilateral_factor', 'estimated_monthly', 'rate_table_version',
+    'rate_year',
+]
+
+
+def _recalc_targets():
+    """
+    (label, queryset, result decimal places) for each model to recalculate.
+
+    Shared calculations store results rounded to 2 places when created;
+    saved calculations store them unrounded (see SavedRatingCalculation.recalculate).
+    Expired share links are never served again, so they are skipped.
+    """
+    return [
+        ('saved_calculations', SavedRatingCalculation.objects.all(), None),
+        (
+            'shared_calculations',
+            SharedCalculation.objects.filter(
+                Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+            ),
+            2,
+        ),
+    ]
+
+
+def _checkpoint_key(queryset, version: str) -> str:
+    return f'examprep:rate_recalc:{queryset.model._meta.label_lower}:{version}'
+
+
+def _parse_stored_ratings(ratings):
+    """
+    (percentages, bilateral flags) from a stored ratings list, or None if the
+    data can't be calculated.
+    """
+    if not isinstance(ratings, list):
+        return None
+    percentages, bilateral = [], []
+    for rating in ratings:
+        if not isinstance(rating, dict):
+            return None
+        try:
+            percentage = int(rating.get('percentage', 0))
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= percentage <= 100:
+            return None
+        percentages.append(percentage)
+        bilateral.append(bool(rating.get('is_bilateral', False)))
+    return percentages, bilateral
+
+
+def _recalculate_rows(rows, version: str, digits=None) -> tuple:
+    """
+    Recalculate a chunk of rows in place with the batch engine.
+
+    Each row's estimate uses its own rate_year; rows without one use the
+    latest year, and a year no longer in the rate table is cleared so the
+    row follows the latest year too, as SavedRatingCalculation.recalculate does.
+
+    Args:
+        rows: Model instances with the input fields loaded
+        version: Rate table version to stamp on recalculated rows
+        digits: Decimal places to round combined_raw/bilateral_factor to
+
+    Returns:
+        Tuple of (recalculated rows, rows with unusable stored ratings)
+    """
+    valid_rows, invalid_rows, scenarios = [], [], []
+    for row in rows:
+        parsed = _parse_stored_ratings(row.ratings)
+        if parsed is None:
+            logger.warning(f"Skipping {row._meta.label} {row.pk}: invalid stored ratings")
+            invalid_rows.append(row)
+            continue
+        valid_rows.append(row)
+        scenarios.append(parsed)
+
+    if not valid_rows:
+        return [], invalid_rows
+
+    width = max(len(percentages) for percentages, _ in scenarios)
+    ratings = np.full((len(scenarios), width), BATCH_PAD, dtype=np.int64)
+    bilateral = np.zeros((len(scenarios), width), dtype=bool)
+    for i, (percentages, flags) in enumerate(scenarios):
+        ratings[i, :len(percentages)] = percentages
+        bilateral[i, :len(flags)] = flags
+
+    result = calculate_combined_ratings_batch(ratings, bilateral)
+
+    for row in valid_rows:
+        if row.rate_year not in AVAILABLE_RATE_YEARS:
+            row.rate_year = None
+    years = np.array([row.rate_year or AVAILABLE_RATE_YEARS[0] for row in valid_rows])
+    spouse = np.array([row.has_spouse for row in valid_rows], dtype=bool)
+    children = np.array([row.children_under_18 for row in valid_rows])
+    parents = np.array([row.dependent_parents for row in valid_rows])
+
+    monthly = np.zeros(len(valid_rows))
+    for year in np.unique(years).tolist():
+        mask = years == year
+        monthly[mask] = estimate_monthly_compensation_array(
+            result.combined_rounded[mask],
+            spouse=spouse[mask],
+            children_under_18=children[mask],
+            dependent_parents=parents[mask],
+            year=year,
+        )
+
+    combined_raw = result.combined_raw.tolist()
+    combined_rounded = result.combined_rounded.tolist()
+    bilateral_factor = result.bilateral_factor_applied.tolist()
+    monthly = monthly.tolist()
+
+    for i, row in enumerate(valid_rows):
+        raw, factor = combined_raw[i], bilateral_factor[i]
+        if digits is not None:
+            raw, factor = round(raw, digits), round(factor, digits)
+        row.combined_raw = raw
+        row.combined_rounded = combined_rounded[i]
+        row.bilateral_factor = factor
+        row.estimated_monthly = monthly[i]
+        row.rate_table_version = version
+
+    return valid_rows, invalid_rows
+
+
+def _recalculate_stale_rows(queryset, version, digits, chunk_size, throttle_seconds, deadline) -> dict:
+    """
+    Walk stale rows in primary-key order, one chunk at a time.
+
+    Only one chunk is held in memory. The last processed primary key is
+    checkpointed in the cache, so an interrupted run resumes where it
+    stopped instead of rescanning finished rows.
+
+    Returns:
+        Dict with 'finished', 'updated', 'skipped' and 'chunks'
+    """
+    model = queryset.model
+    checkpoint_key = _checkpoint_key(queryset, version)
+    last_pk = cache.get(checkpoint_key, 0)
+
+    # Shared pages are cached per token and must be dropped once recalculated
+    is_shared = model is SharedCalculation
+    fields = _RECALC_INPUT_FIELDS + (('share_token',) if is_shared else ())
+    stale = queryset.exclude(rate_table_version=version).order_by('pk').only(*fields)
+
+    updated = skipped = chunks = 0
+    while True:
+        rows = list(stale.filter(pk__gt=last_pk)[:chunk_size])
+        if not rows:
+            cache.delete(checkpoint_key)
+            return {'finished': True, 'updated': updated, 'skipped': skipped, 'chunks': chunks}
+
+        recalculated, invalid = _recalculate_rows(rows, version, digits)
+        model.objects.bulk_update(recalculated, _RECALC_OUTPUT_FIELDS, batch_size=chunk_size)
+        if invalid:
+            # Stamped as processed so later runs don't rescan (and re-log) them
+            model.objects.filter(pk__in=[row.pk for row in invalid]).update(rate_table_version=version)
+        if is_shared and recalculated:
+            SharedCalculation.invalidate_page_cache(*[row.share_token for row in recalculated])
+
+        updated += len(recalculated)
+        skipped += len(invalid)
+        chunks += 1
+        last_pk = rows[-1].pk
+        cache.set(checkpoint_key, last_pk, RATE_RECALC_CHECKPOINT_TIMEOUT)
+
+        if time.monotonic() >= deadline:
+            return {'finished': False, 'updated': updated, 'skipped': skipped, 'chunks': chunks}
+        if throttle_seconds:
+            time.sleep(throttle_seconds)
+
+
+@shared_task(acks_late=True)
+def recalculate_stale_rating_calculations(
+    chunk_size: int = RATE_RECALC_CHUNK_SIZE,
+    throttle_seconds: float = RATE_RECALC_THROTTLE_SECONDS,
+    time_budget_seconds: float = RATE_RECALC_TIME_BUDGET_SECONDS,
+):
+    """
+    Recalculate saved and shared calculations computed with an older rate table.
+
+    Rows whose rate_table_version differs from the current
+    COMPENSATION_RATE_TABLE_VERSION are recalculated with the batch
+    combined-rating engine and each row's own rate year, then written back with
+    bulk_update. Runs are resumable (cache checkpoints), throttled between
+    chunks, and re-queue themselves when the time budget runs out, so
+    millions of rows are processed without holding them in memory or
+    exceeding the task time limit.
+
+    Args:
+        chunk_size: Rows per query and bulk_update
+        throttle_seconds: Sleep between chunks
+        time_budget_seconds: Work per run before re-queueing the remainder
+    """
+    version = COMPENSATION_RATE_TABLE_VERSION
+
+    # One run at a time; the lock expires in case a worker dies mid-run
+    if not cache.add(RATE_RECALC_LOCK_KEY, True, int(time_budget_seconds) + 300):
+        logger.info("Rate recalculation already running, skipping")
+        return {'status': 'skipped', 'reason': 'already_running'}
+
+    deadline = time.monotonic() + time_budget_seconds
+    results = {}
+    finished = True
+    try:
+        for label, queryset, digits in _recalc_targets():
+            results[label] = _recalculate_stale_rows(
+                queryset, version, digits, chunk_size, throttle_seconds, deadline
+            )
+            logger.info(
+                f"Rate recalculation ({label}): {results[label]['updated']} updated, "
+                f"{results[label]['skipped']} skipped"
+            )
+            if not results[label]['finished']:
+                finished = False
+                break
+    finally:
+        cache.delete(RATE_RECALC_LOCK_KEY)
+
+    if not finished:
+        recalculate_stale_rating_calculations.apply_async(
+            kwargs={
+                'chunk_size': chunk_size,
+                'throttle_seconds': throttle_seconds,
+                'time_budget_seconds': time_budget_seconds,
+            },
+            countdown=max(1, int(throttle_seconds)),
+        )
+
+    return {
+        'status': 'success' if finished else 'partial',
+        'rate_table_version': version,
+        **results,
+    }
+
+
+# =============================================================================
+# PDF EXPORTS
+# =============================================================================
+
+PDF_EXPORT_JOB_PREFIX = 'examprep:pdf_export:'
+
+# Finished exports stay downloadable for a day
+PDF_EXPORT_JOB_TIMEOUT = 24 * 60 * 60
+
+
+def pdf_export_job_key(job_id: str) -> str:
+    """Cache key of an export job's status record."""
+    return f'{PDF_EXPORT_JOB_PREFIX}{job_id}'
+
+
+def pdf_export_file_key(job_id: str) -> str:
+    """Cache key of an export job's rendered PDF bytes."""
+    return f'{PDF_EXPORT_JOB_PREFIX}{job_id}:pdf'
+
+
+@shared_task(acks_late=True)
+def render_saved_calculations_pdf(job_id: str, user_id: int, calculation_ids: list):
+    """
+    Render several saved calculations into one PDF in the background.
+
+    The bytes and a 'ready' status are stored in the cache under the job
+    ID for the download view, then the user is emailed a download link.
+
+    Args:
+        job_id: Export job ID created by the export view
+        user_id: Owner of the calculations
+        calculation_ids: SavedRatingCalculation IDs to include
+    """
+    from examprep.services.pdf_generator import generate_multi_rating_pdf, saved_calculation_pdf_data
+
+    job_key = pdf_export_job_key(job_id)
+    job = {'user_id': user_id, 'status': 'pending'}
+
+    try:
+        calculations = SavedRatingCalculation.objects.filter(
+            user_id=user_id, pk__in=calculation_ids
+        ).select_related('user').order_by('-updated_at')
+        calculations = list(calculations)
+        if not calculations:
+            raise ValueError("No saved calculations to export")
+
+        pdf_bytes = generate_multi_rating_pdf([saved_calculation_pdf_data(c) for c in calculations])
+        cache.set(pdf_export_file_key(job_id), pdf_bytes, PDF_EXPORT_JOB_TIMEOUT)
+    except Exception as e:
+        logger.error(f"PDF export {job_id} failed for user_id={user_id}: {e}", exc_info=True)
+        cache.set(job_key, {**job, 'status': 'failed'}, PDF_EXPORT_JOB_TIMEOUT)
+        return {'status': 'failed', 'job_id': job_id}
+
+    cache.set(job_key, {**job, 'status': 'ready', 'count': len(calculations)}, PDF_EXPORT_JOB_TIMEOUT)
+    logger.info(f"PDF export {job_id} ready for user_id={user_id} ({len(calculations)} calculations)")
+
+    emailed = _send_pdf_export_ready_email(calculations[0].user, job_id, len(calculations))
+
+    return {'status': 'ready', 'job_id': job_id, 'calculations': len(calculations), 'emailed': emailed}
+
+
+def _send_pdf_export_ready_email(user, job_id: str, count: int) -> bool:
+    """
+    Email the user a link to their finished export.
+
+    Returns True if email was sent, False if disabled or sending failed.
+    """
+    from accounts.models import NotificationPreferences
+
+    try:
+        if not user.notification_preferences.email_enabled:
+            return False
+    except NotificationPreferences.DoesNotExist:
+        pass
+
+    site_url = getattr(settings, 'SITE_URL', 'https://benefitsnavigator.com')
+    context = {
+        'user': user,
+        'count': count,
+        'download_url': site_url + reverse('examprep:download_pdf_export', kwargs={'job_id': job_id}),
+        'site_name': getattr(settings, 'SITE_NAME', 'Benefits Navigator'),
+        'site_url': site_url,
+    }
+
+    try:
+        send_mail(
+            subject="Your Rating Calculations PDF is Ready",
+            message=render_to_string('emails/pdf_export_ready.txt', context),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[user.email],
+            html_message=render_to_string('emails/pdf_export_ready.html', context),
+            fail_silently=False,
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Failed to send PDF export email to user_id={user.id}: {e}")
+        return False
+
+
+# =============================================================================
+# SHARED CALCULATION VIEW COUNTS
+# =============================================================================
+
+# Tokens per UPDATE when flushing view counts
+VIEW_FLUSH_BATCH_SIZE = 500
+
+VIEW_FLUSH_LOCK_KEY = 'examprep:shared_views:flush_lock'
+
+
+@shared_task
+def flush_shared_calculation_views():
+    """
+    Add buffered shared-page view counts to SharedCalculation.view_count.
+
+    Counts come from examprep.view_counters; each batch of tokens is written
+    with a single UPDATE (view_count + CASE share_token ... END). Cached page
+    data for flushed tokens is dropped so the next view shows the new total.
+    If the update fails, the claimed counts are kept and retried next run.
+    """
+    if not cache.add(VIEW_FLUSH_LOCK_KEY, True, 5 * 60):
+        return {'status': 'skipped', 'reason': 'already_running'}
+
+    try:
+        counts = claim_pending_views()
+        if not counts:
+            return {'status': 'success', 'tokens': 0, 'views': 0}
+
+        tokens = list(counts)
+        with transaction.atomic():
+            for start in range(0, len(tokens), VIEW_FLUSH_BATCH_SIZE):
+                batch = tokens[start:start + VIEW_FLUSH_BATCH_SIZE]
+                SharedCalculation.objects.filter(share_token__in=batch).update(
+                    view_count=F('view_count') + Case(
+                        *[When(share_token=token, then=Value(counts[token])) for token in batch],
+                        default=Value(0),
+                        output_field=PositiveIntegerField(),
+                    )
+                )
+
+        release_claimed_views()
+        SharedCalculation.invalidate_page_cache(*tokens)
+    finally:
+        cache.delete(VIEW_FLUSH_LOCK_KEY)
+
+    views = sum(counts.values())
+    logger.info(f"Flushed {views} shared calculation views for {len(tokens)} links")
+
+    return {'status': 'success', 'tokens': len(tokens), 'views': views}
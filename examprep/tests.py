@@ -553,6 +553,70 @@ class TestEstimateMonthlyCompensation(TestCase):
         self.assertEqual(result, round(result, 2))
 
 
+class TestCompensationRateTable(TestCase):
+    """Tests for the dense compensation rate arrays and grid helpers."""
+
+    def test_table_matches_published_rates(self):
+        """Dense arrays hold the same amounts as the per-year dicts."""
+        from examprep.va_math import COMPENSATION_RATE_TABLE, DEPENDENT_RATES_2024
+
+        y = COMPENSATION_RATE_TABLE.year_index(2024)
+        self.assertEqual(COMPENSATION_RATE_TABLE.rates[y, 10, 0], VA_COMPENSATION_RATES_2024[100])
+        self.assertEqual(COMPENSATION_RATE_TABLE.rates[y, 7, 1], DEPENDENT_RATES_2024['spouse'][70])
+        # No dependent additions below 30%
+        self.assertEqual(COMPENSATION_RATE_TABLE.rates[y, 2, 1:].tolist(), [0.0, 0.0, 0.0])
+
+    def test_table_version_exposed(self):
+        """Rate table version comes from the data file."""
+        from examprep.va_math import COMPENSATION_RATE_TABLE_VERSION, _load_compensation_rates
+
+        self.assertEqual(COMPENSATION_RATE_TABLE_VERSION, _load_compensation_rates()['version'])
+
+    def test_array_matches_scalar(self):
+        """Vectorised estimates equal the scalar function for every combination."""
+        import numpy as np
+        from examprep.va_math import AVAILABLE_RATE_YEARS, estimate_monthly_compensation_array
+
+        ratings = np.array([0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 15, 110])
+        for year in AVAILABLE_RATE_YEARS + [2019]:
+            for spouse in (False, True):
+                for children in range(4):
+                    for parents in range(4):
+                        amounts = estimate_monthly_compensation_array(
+                            ratings, spouse, children, parents, year=year
+                        )
+                        expected = [
+                            estimate_monthly_compensation(int(r), spouse, children, parents, year=year)
+                            for r in ratings
+                        ]
+                        self.assertEqual(amounts.tolist(), expected)
+
+    def test_grid_shape_and_values(self):
+        """compensation_grid returns ratings x configurations amounts."""
+        from examprep.va_math import compensation_grid
+
+        grid = compensation_grid(2024, [(False, 0, 0), (True, 2, 1)])
+        self.assertEqual(grid['ratings'], [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+        self.assertEqual(len(grid['amounts']), 11)
+        self.assertEqual(len(grid['amounts'][0]), 2)
+        self.assertEqual(grid['amounts'][10][0], VA_COMPENSATION_RATES_2024[100])
+        self.assertEqual(
+            grid['amounts'][7][1],
+            estimate_monthly_compensation(70, spouse=True, children_under_18=2, dependent_parents=1, year=2024)
+        )
+        self.assertEqual(grid['configurations'][0]['label'], 'Veteran alone')
+        self.assertEqual(grid['configurations'][1]['label'], 'Spouse + 2 children + 1 parent')
+        self.assertEqual(grid['rows'][10], {'rating': 100, 'amounts': grid['amounts'][10]})
+
+    def test_grid_default_configurations(self):
+        """Default grid covers veteran alone through spouse and three children."""
+        from examprep.va_math import compensation_grid
+
+        grid = compensation_grid(2026)
+        self.assertEqual(len(grid['configurations']), 5)
+        self.assertEqual(grid['amounts'][10][0], estimate_monthly_compensation(100, year=2026))
+
+
 class TestFormatCurrency(TestCase):
     """Tests for format_currency helper function."""
 
@@ -725,6 +789,241 @@ class TestVAMathEdgeCases(TestCase):
         self.assertIn("My Back Pain", descriptions)
 
 
+class TestCalculateCombinedRatingsBatch(TestCase):
+    """Vectorised batch path must match the scalar calculator exactly."""
+
+    def _random_scenarios(self, count, seed=0):
+        import random
+
+        rng = random.Random(seed)
+        return [
+            [
+                DisabilityRating(percentage=rng.randrange(0, 110, 10), is_bilateral=rng.random() < 0.3)
+                for _ in range(rng.randint(0, 8))
+            ]
+            for _ in range(count)
+        ]
+
+    def test_exact_equality_with_scalar_path(self):
+        """Raw, rounded and bilateral values are bit-identical to calculate_combined_rating."""
+        from examprep.va_math import calculate_combined_ratings_batch, scenarios_to_arrays
+
+        scenarios = self._random_scenarios(5000)
+        result = calculate_combined_ratings_batch(*scenarios_to_arrays(scenarios))
+
+        for i, scenario in enumerate(scenarios):
+            expected = calculate_combined_rating(scenario)
+            self.assertEqual(result.combined_raw[i], expected.combined_raw, scenario)
+            self.assertEqual(result.combined_rounded[i], expected.combined_rounded, scenario)
+            self.assertEqual(result.bilateral_factor_applied[i], expected.bilateral_factor_applied, scenario)
+
+    def test_known_scenarios(self):
+        """Padding is ignored and bilateral ratings get the 10% factor."""
+        from examprep.va_math import BATCH_PAD, calculate_combined_ratings_batch
+
+        ratings = [
+            [50, 30, BATCH_PAD],
+            [70, 70, 50],
+            [BATCH_PAD, BATCH_PAD, BATCH_PAD],
+            [20, 20, 10],
+        ]
+        bilateral = [
+            [False, False, False],
+            [False, False, False],
+            [False, False, False],
+            [True, True, False],
+        ]
+
+        result = calculate_combined_ratings_batch(ratings, bilateral)
+
+        self.assertEqual(result.combined_rounded.tolist(), [70, 100, 0, 50])
+        self.assertEqual(result.bilateral_factor_applied[0], 0.0)
+        self.assertAlmostEqual(result.bilateral_factor_applied[3], 3.6)
+        self.assertEqual(len(result), 4)
+
+    def test_step_by_step_is_lazy(self):
+        """Steps for a single scenario are built on request from the scalar path."""
+        from examprep.va_math import calculate_combined_ratings_batch, scenarios_to_arrays
+
+        scenario = [
+            DisabilityRating(percentage=20, is_bilateral=True),
+            DisabilityRating(percentage=20, is_bilateral=True),
+            DisabilityRating(percentage=50),
+        ]
+        result = calculate_combined_ratings_batch(*scenarios_to_arrays([scenario]))
+
+        self.assertEqual(result.step_by_step(0), calculate_combined_rating(scenario).step_by_step)
+        self.assertEqual(result.result(0).combined_rounded, result.combined_rounded[0])
+
+    def test_scalar_without_steps_matches(self):
+        """include_steps=False skips explanations but not accuracy."""
+        for scenario in self._random_scenarios(500, seed=1):
+            full = calculate_combined_rating(scenario)
+            fast = calculate_combined_rating(scenario, include_steps=False)
+            self.assertEqual(fast.combined_raw, full.combined_raw)
+            self.assertEqual(fast.combined_rounded, full.combined_rounded)
+            self.assertEqual(fast.step_by_step, [])
+
+    def test_rejects_mismatched_shapes(self):
+        """Bad input shapes raise ValueError."""
+        from examprep.va_math import calculate_combined_ratings_batch
+
+        with self.assertRaises(ValueError):
+            calculate_combined_ratings_batch([50, 30])
+        with self.assertRaises(ValueError):
+            calculate_combined_ratings_batch([[50, 30]], [[True]])
+
+
+class TestNextBracketOptimizer(TestCase):
+    """Tests for the "Next 10%" optimizer."""
+
+    def test_single_increase_preferred(self):
+        """A one-level increase is ranked ahead of larger new claims."""
+        from examprep.rating_optimizer import find_next_bracket_changes
+
+        ratings = [
+            DisabilityRating(percentage=50, description="PTSD"),
+            DisabilityRating(percentage=20, description="Back"),
+        ]
+        result = find_next_bracket_changes(ratings)
+
+        self.assertEqual(result.current_rounded, 60)
+        self.assertEqual(result.next_bracket, 70)
+        best = result.brackets[70][0]
+        self.assertEqual(len(best.changes), 1)
+        self.assertEqual(best.changes[0].kind, 'increase')
+        self.assertEqual(best.points_added, 10)
+
+    def test_bilateral_toggle_ranked_after_increases_and_new_claims(self):
+        """A bilateral change adds no points but still ranks behind the other kinds."""
+        from examprep.rating_optimizer import find_next_bracket_changes
+
+        ratings = [
+            DisabilityRating(percentage=30, description="Knee L"),
+            DisabilityRating(percentage=20, description="Knee R"),
+        ]
+        result = find_next_bracket_changes(ratings, options_per_bracket=10)
+
+        options = result.brackets[result.next_bracket]
+        kinds = [option.changes[0].kind for option in options]
+        self.assertEqual(kinds[:2], ['increase', 'increase'])
+        self.assertEqual(kinds[-1], 'bilateral')
+        self.assertEqual(set(kinds[2:-1]), {'add'})
+        adds = [option.points_added for option in options[2:-1]]
+        self.assertEqual(adds, sorted(adds))
+
+        top = find_next_bracket_changes(ratings).brackets[result.next_bracket]
+        self.assertNotIn('bilateral', [option.changes[0].kind for option in top])
+
+    def test_options_really_reach_their_bracket(self):
+        """Every option, applied to the ratings, reaches at least its bracket."""
+        from examprep.rating_optimizer import find_next_bracket_changes
+
+        ratings = [
+            DisabilityRating(percentage=40, description="Knee L", is_bilateral=True),
+            DisabilityRating(percentage=30, description="Knee R", is_bilateral=True),
+            DisabilityRating(percentage=10, description="Tinnitus"),
+        ]
+        result = find_next_bracket_changes(ratings, max_changes=2)
+
+        self.assertTrue(result.brackets)
+        for bracket, options in result.brackets.items():
+            self.assertLessEqual(len(options), 3)
+            for option in options:
+                changed = list(ratings)
+                for change in option.changes:
+                    rating = DisabilityRating(percentage=change.to_percentage, is_bilateral=change.is_bilateral)
+                    if change.index is None:
+                        changed.append(rating)
+                    else:
+                        changed[change.index] = rating
+                combined = calculate_combined_rating(changed)
+                self.assertEqual(combined.combined_rounded, option.combined_rounded)
+                self.assertGreaterEqual(combined.combined_rounded, bracket)
+
+    def test_no_ratings_and_max_rating(self):
+        """Empty ratings suggest new claims; 100% has nowhere to go."""
+        from examprep.rating_optimizer import find_next_bracket_changes
+
+        empty = find_next_bracket_changes([])
+        self.assertEqual(empty.next_bracket, 10)
+        self.assertEqual(empty.brackets[10][0].changes[0].kind, 'add')
+
+        full = find_next_bracket_changes([DisabilityRating(percentage=100)])
+        self.assertEqual(full.brackets, {})
+        self.assertIsNone(full.next_bracket)
+
+    def test_rejects_large_combinations(self):
+        """Only single changes and pairs are supported."""
+        from examprep.rating_optimizer import find_next_bracket_changes
+
+        with self.assertRaises(ValueError):
+            find_next_bracket_changes([], max_changes=3)
+
+
+class TestCombinedRatingCache(TestCase):
+    """Tests for the shared memoised combined-rating core."""
+
+    def setUp(self):
+        from examprep.va_math import clear_combined_rating_cache
+        clear_combined_rating_cache()
+
+    def test_combined_ratings_table_matches_formula(self):
+        """The precomputed § 4.25 table holds exactly the formula values."""
+        from examprep.va_math import COMBINED_RATINGS_TABLE
+
+        for a in (0, 37, 65, 100):
+            for b in (0, 10, 33, 50, 100):
+                self.assertEqual(COMBINED_RATINGS_TABLE[a][b], combine_two_ratings(a, b))
+
+    def test_rating_order_shares_cache_entry(self):
+        """Re-ordered ratings hit the same entry and count as cache hits."""
+        from examprep.va_math import combined_rating_cache_stats
+
+        first = [
+            DisabilityRating(percentage=30, description="Back"),
+            DisabilityRating(percentage=50, description="PTSD"),
+            DisabilityRating(percentage=20, description="Knee", is_bilateral=True),
+        ]
+        second = [first[2], first[1], first[0]]
+
+        a = calculate_combined_rating(first)
+        b = calculate_combined_rating(second)
+
+        stats = combined_rating_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(a.combined_raw, b.combined_raw)
+        # Descriptions and input order still come from each caller's ratings
+        self.assertEqual(b.ratings_used, second)
+
+    def test_returned_steps_are_copies(self):
+        """Mutating a result's steps does not corrupt later results."""
+        ratings = [DisabilityRating(percentage=50), DisabilityRating(percentage=30)]
+
+        first = calculate_combined_rating(ratings)
+        first.step_by_step[-1]['steps'][0]['rating'] = 999
+        _, steps = combine_multiple_ratings([50, 30])
+        steps[0]['rating'] = 999
+
+        again = calculate_combined_rating(ratings)
+        self.assertEqual(again.step_by_step[-1]['steps'][0]['rating'], 50)
+        self.assertEqual(combine_multiple_ratings([30, 50])[1][0]['rating'], 50)
+
+    def test_cache_is_bounded(self):
+        """The cache never grows past its configured size."""
+        from examprep.va_math import COMBINED_RATING_CACHE_SIZE, combine_rating_set, combined_rating_cache_stats
+
+        for a in range(0, 101, 10):
+            for b in range(0, 101, 10):
+                combine_rating_set([(a, False), (b, True)])
+
+        stats = combined_rating_cache_stats()
+        self.assertLessEqual(stats['size'], COMBINED_RATING_CACHE_SIZE)
+        self.assertEqual(stats['maxsize'], COMBINED_RATING_CACHE_SIZE)
+
+
 # =============================================================================
 # EXAM GUIDANCE MODEL TESTS
 # =============================================================================
@@ -1493,6 +1792,16 @@ class TestRatingCalculatorPageIntegration(TestCase):
         rates = response.context['compensation_rates']
         self.assertEqual(rates[100], VA_COMPENSATION_RATES_2024[100])
 
+    def test_calculator_page_contains_compensation_grid(self):
+        """Calculator page includes the current year's rate grid with dependent columns."""
+        from examprep.va_math import AVAILABLE_RATE_YEARS
+
+        response = self.client.get(reverse('examprep:rating_calculator'))
+        grid = response.context['compensation_grid']
+        self.assertEqual(grid['year'], AVAILABLE_RATE_YEARS[0])
+        self.assertEqual(len(grid['configurations']), 3)
+        self.assertContains(response, 'Spouse + 1 child')
+
     def test_calculator_page_no_saved_calculations_anonymous(self):
         """Anonymous users have no saved calculations."""
         response = self.client.get(reverse('examprep:rating_calculator'))
@@ -1752,6 +2061,154 @@ class TestCalculateRatingHTMXEndpoint(TestCase):
         self.assertIn('step_by_step', response.context)
 
 
+class TestNextBracketEndpoint(TestCase):
+    """Integration tests for the next_bracket_json endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('examprep:next_bracket_json')
+
+    def test_get_not_allowed(self):
+        """GET requests are not allowed."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_returns_brackets_with_compensation(self):
+        """Each reachable bracket lists options and the monthly increase."""
+        response = self.client.post(self.url, {
+            'ratings': json.dumps([
+                {"percentage": 50, "description": "PTSD", "is_bilateral": False},
+                {"percentage": 20, "description": "Back", "is_bilateral": False},
+            ]),
+            'has_spouse': 'false',
+            'children_under_18': '0',
+            'dependent_parents': '0',
+            'rate_year': '2024',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['current_rounded'], 60)
+        self.assertEqual(data['next_bracket'], 70)
+        bracket = data['brackets']['70']
+        self.assertEqual(bracket['options'][0]['changes'][0]['description'], 'PTSD')
+        self.assertEqual(bracket['monthly_compensation'], '$1,716.28')
+        self.assertEqual(bracket['monthly_increase'], '$354.40')
+
+    def test_invalid_json_returns_400(self):
+        """Malformed ratings are rejected."""
+        response = self.client.post(self.url, {'ratings': 'not json'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_too_many_ratings(self):
+        """Scenarios are capped at MAX_SCENARIO_RATINGS ratings."""
+        from examprep.views import MAX_SCENARIO_RATINGS
+
+        ratings = [{"percentage": 10}] * (MAX_SCENARIO_RATINGS + 1)
+        response = self.client.post(self.url, {'ratings': json.dumps(ratings), 'max_changes': '2'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(MAX_SCENARIO_RATINGS), response.json()['error'])
+
+    @override_settings(RATELIMIT_ENABLE=True)
+    def test_rate_limited(self):
+        """Anonymous callers are rate limited by IP."""
+        from django.core.cache import cache
+
+        cache.clear()
+        data = {'ratings': json.dumps([{"percentage": 50}])}
+        statuses = [self.client.post(self.url, data).status_code for _ in range(31)]
+        cache.clear()
+
+        self.assertEqual(statuses[:30], [200] * 30)
+        self.assertEqual(statuses[30], 403)
+
+
+class TestCalculateRatingsBatchEndpoint(TestCase):
+    """Integration tests for the calculate_ratings_batch_json endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('examprep:calculate_ratings_batch_json')
+        self.scenarios = [
+            {
+                'ratings': [{"percentage": 50, "description": "PTSD"}, {"percentage": 30}],
+                'has_spouse': True,
+                'children_under_18': 1,
+                'dependent_parents': 0,
+                'rate_year': 2025,
+            },
+            {
+                'ratings': [
+                    {"percentage": 20, "is_bilateral": True},
+                    {"percentage": 10, "is_bilateral": True},
+                ],
+                'rate_year': 2024,
+            },
+            {'ratings': []},
+        ]
+
+    def _post_json(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_results_match_single_scenario_endpoint(self):
+        """Each batch result equals the calculate_rating_json response for that scenario."""
+        response = self._post_json({'scenarios': self.scenarios})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+
+        for scenario, result in zip(self.scenarios, results):
+            single = self.client.post(reverse('examprep:calculate_rating_json'), {
+                'ratings': json.dumps(scenario['ratings']),
+                'has_spouse': 'true' if scenario.get('has_spouse') else 'false',
+                'children_under_18': scenario.get('children_under_18', 0),
+                'dependent_parents': scenario.get('dependent_parents', 0),
+                'rate_year': scenario.get('rate_year', 2024),
+            })
+            self.assertEqual(result, single.json())
+
+        self.assertEqual(results[0]['combined_rounded'], 70)
+        self.assertFalse(results[2]['has_ratings'])
+
+    def test_accepts_form_field(self):
+        """Scenarios may also be sent as a JSON form field."""
+        response = self.client.post(self.url, {'scenarios': json.dumps(self.scenarios[:1])})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['rate_year'], 2025)
+
+    def test_rejects_too_many_scenarios(self):
+        """Batches are capped at MAX_BATCH_SCENARIOS."""
+        from examprep.views import MAX_BATCH_SCENARIOS
+
+        response = self._post_json({'scenarios': [self.scenarios[0]] * (MAX_BATCH_SCENARIOS + 1)})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_scenario_with_too_many_ratings(self):
+        """Each scenario in a batch is capped at MAX_SCENARIO_RATINGS ratings."""
+        from examprep.views import MAX_SCENARIO_RATINGS
+
+        oversized = {'ratings': [{"percentage": 10}] * (MAX_SCENARIO_RATINGS + 1)}
+        response = self._post_json({'scenarios': [self.scenarios[0], oversized]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Scenario 2', response.json()['error'])
+
+    def test_invalid_scenario_reports_position(self):
+        """A malformed scenario fails the batch and names its position."""
+        response = self._post_json({'scenarios': [self.scenarios[0], {'ratings': [{"percentage": "abc"}]}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Scenario 2', response.json()['error'])
+
+    def test_get_not_allowed(self):
+        """GET requests are not allowed."""
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
 @override_settings(PILOT_PREMIUM_ACCESS=True)
 class TestSaveCalculationIntegration(TestCase):
     """Integration tests for saving rating calculations."""
@@ -1807,6 +2264,41 @@ class TestSaveCalculationIntegration(TestCase):
         self.assertEqual(calc.children_under_18, 2)
         self.assertEqual(calc.notes, 'Test notes')
 
+    def test_save_stores_rate_year(self):
+        """The selected rate year is stored and used for the estimate."""
+        self.client.login(email="saveuser@example.com", password="TestPass123!")
+
+        self.client.post(self.url, {
+            'name': '2024 rates',
+            'ratings': json.dumps([{"percentage": 70}]),
+            'has_spouse': 'true',
+            'rate_year': '2024',
+        })
+
+        calc = SavedRatingCalculation.objects.get(user=self.user)
+        self.assertEqual(calc.rate_year, 2024)
+        self.assertEqual(calc.estimated_monthly, estimate_monthly_compensation(70, spouse=True, year=2024))
+
+    def test_save_leaves_latest_rate_year_blank(self):
+        """Estimates at the latest year store no year, so they follow newer tables."""
+        from examprep.va_math import AVAILABLE_RATE_YEARS
+
+        self.client.login(email="saveuser@example.com", password="TestPass123!")
+
+        self.client.post(self.url, {
+            'name': 'Latest rates',
+            'ratings': json.dumps([{"percentage": 70}]),
+            'has_spouse': 'true',
+            'rate_year': str(AVAILABLE_RATE_YEARS[0]),
+        })
+
+        calc = SavedRatingCalculation.objects.get(user=self.user)
+        self.assertIsNone(calc.rate_year)
+        self.assertEqual(
+            calc.estimated_monthly,
+            estimate_monthly_compensation(70, spouse=True, year=AVAILABLE_RATE_YEARS[0]),
+        )
+
     def test_save_calculates_combined_rating(self):
         """Saved calculation includes calculated values."""
         self.client.login(email="saveuser@example.com", password="TestPass123!")
@@ -2701,6 +3193,26 @@ class TestPDFGeneratorService(TestCase):
         self.assertIsInstance(pdf_bytes, bytes)
         self.assertTrue(pdf_bytes.startswith(b'%PDF'))
 
+    def test_generate_rating_pdf_with_compensation_grid(self):
+        """generate_rating_pdf renders an optional compensation grid."""
+        from examprep.services.pdf_generator import generate_rating_pdf
+        from examprep.va_math import compensation_grid
+
+        pdf_bytes = generate_rating_pdf(
+            ratings=[
+                {"percentage": 50, "description": "PTSD", "is_bilateral": False},
+            ],
+            combined_raw=50.0,
+            combined_rounded=50,
+            bilateral_factor=0,
+            monthly_compensation="$1,075.16",
+            annual_compensation="$12,901.92",
+            step_by_step=[],
+            compensation_grid=compensation_grid(2024, [(False, 0, 0), (True, 1, 0)]),
+        )
+        self.assertIsInstance(pdf_bytes, bytes)
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+
     def test_generate_rating_pdf_with_empty_step_by_step(self):
         """generate_rating_pdf handles empty step_by_step list."""
         from examprep.services.pdf_generator import generate_rating_pdf
@@ -2744,6 +3256,217 @@ class TestPDFGeneratorService(TestCase):
         self.assertTrue(pdf_bytes.startswith(b'%PDF'))
 
 
+class TestCachedPDFRendering(TestCase):
+    """Tests for shared PDF styles and the content-hash PDF cache."""
+
+    PDF_KWARGS = dict(
+        ratings=[{"percentage": 50, "description": "PTSD", "is_bilateral": False}],
+        combined_raw=50.0,
+        combined_rounded=50,
+        bilateral_factor=0,
+        monthly_compensation="$1,075.16",
+        annual_compensation="$12,901.92",
+        step_by_step=[],
+    )
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_styles_shared_between_documents(self):
+        """Generators reuse one process-wide stylesheet."""
+        from examprep.services.pdf_generator import RatingCalculationPDF, get_pdf_styles
+
+        first = RatingCalculationPDF(**self.PDF_KWARGS)
+        second = RatingCalculationPDF(**self.PDF_KWARGS)
+        self.assertIs(first.styles, second.styles)
+        self.assertIs(first.styles, get_pdf_styles())
+        self.assertIn('VAResultLarge', first.styles)
+
+    def test_identical_document_served_from_cache(self):
+        """A second request for the same content does not re-render."""
+        from examprep.services import pdf_generator
+
+        with patch.object(pdf_generator, '_render', wraps=pdf_generator._render) as render:
+            first = pdf_generator.generate_rating_pdf(**self.PDF_KWARGS)
+            second = pdf_generator.generate_rating_pdf(**self.PDF_KWARGS)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_different_content_renders_again(self):
+        """Any change to the content produces a new cache key."""
+        from examprep.services import pdf_generator
+
+        changed = {**self.PDF_KWARGS, 'has_spouse': True}
+        self.assertNotEqual(
+            pdf_generator.pdf_cache_key(self.PDF_KWARGS),
+            pdf_generator.pdf_cache_key(changed),
+        )
+        with patch.object(pdf_generator, '_render', wraps=pdf_generator._render) as render:
+            pdf_generator.generate_rating_pdf(**self.PDF_KWARGS)
+            pdf_generator.generate_rating_pdf(**changed)
+        self.assertEqual(render.call_count, 2)
+
+    def test_use_cache_false_always_renders(self):
+        """use_cache=False bypasses the cache."""
+        from examprep.services import pdf_generator
+
+        with patch.object(pdf_generator, '_render', wraps=pdf_generator._render) as render:
+            pdf_generator.generate_rating_pdf(**self.PDF_KWARGS, use_cache=False)
+            pdf_generator.generate_rating_pdf(**self.PDF_KWARGS, use_cache=False)
+        self.assertEqual(render.call_count, 2)
+
+    def test_generate_multi_rating_pdf(self):
+        """Several calculations render into one PDF."""
+        from examprep.services.pdf_generator import generate_multi_rating_pdf
+
+        pdf_bytes = generate_multi_rating_pdf([
+            {**self.PDF_KWARGS, 'calculation_name': 'Current'},
+            {**self.PDF_KWARGS, 'calculation_name': 'With knee', 'combined_rounded': 60},
+        ])
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+
+    def test_disclaimer_names_rate_year_used(self):
+        """The disclaimer names the estimate's rate year, or the grid's, or the latest."""
+        from examprep.services import pdf_generator
+        from examprep.va_math import AVAILABLE_RATE_YEARS, compensation_grid
+
+        grid = compensation_grid(2024, [(False, 0, 0)])
+        cases = [
+            ({'rate_year': 2025, 'compensation_grid': grid}, [2025]),
+            ({'compensation_grid': grid}, [2024]),
+            ({}, [AVAILABLE_RATE_YEARS[0]]),
+        ]
+        for extra, years in cases:
+            with patch.object(
+                pdf_generator, 'disclaimer_text', wraps=pdf_generator.disclaimer_text
+            ) as disclaimer:
+                pdf_generator.generate_rating_pdf(**self.PDF_KWARGS, **extra, use_cache=False)
+            disclaimer.assert_called_once_with(years)
+
+        self.assertIn(
+            "The calculation uses 2025 VA compensation rates.",
+            pdf_generator.disclaimer_text([2025]),
+        )
+        self.assertIn(
+            "The calculations use 2024 and 2026 VA compensation rates.",
+            pdf_generator.disclaimer_text([2026, 2024, 2026]),
+        )
+
+
+class TestSavedCalculationsPDFExport(TestCase):
+    """Tests for exporting several saved calculations, inline and in Celery."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            email="exporter@example.com",
+            password="TestPass123!"
+        )
+        self.other_user = User.objects.create_user(
+            email="other-exporter@example.com",
+            password="TestPass123!"
+        )
+        self.client.login(email="exporter@example.com", password="TestPass123!")
+
+    def _create_calculations(self, count, user=None):
+        calcs = []
+        for i in range(count):
+            calc = SavedRatingCalculation.objects.create(
+                user=user or self.user,
+                name=f"Scenario {i + 1}",
+                ratings=[{"percentage": 10 * (i + 1), "description": "Knee", "is_bilateral": False}],
+            )
+            calc.recalculate()
+            calc.save()
+            calcs.append(calc)
+        return calcs
+
+    def test_small_export_returns_pdf(self):
+        """Exports at or under the inline limit return the PDF directly."""
+        self._create_calculations(2)
+        response = self.client.post(reverse('examprep:export_saved_calculations_pdf'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+    def test_export_requires_post(self):
+        """GET is not allowed."""
+        response = self.client.get(reverse('examprep:export_saved_calculations_pdf'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_export_without_calculations(self):
+        """Exporting with no saved calculations is a 400."""
+        response = self.client.post(reverse('examprep:export_saved_calculations_pdf'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_large_export_queued(self):
+        """Larger exports are queued and return a status URL."""
+        calcs = self._create_calculations(5)
+        with patch('examprep.tasks.render_saved_calculations_pdf.delay') as delay:
+            response = self.client.post(reverse('examprep:export_saved_calculations_pdf'))
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['status'], 'pending')
+        job_id, user_id, ids = delay.call_args[0]
+        self.assertEqual(job_id, data['job_id'])
+        self.assertEqual(user_id, self.user.id)
+        self.assertEqual(sorted(ids), sorted(c.pk for c in calcs))
+
+        status = self.client.get(data['status_url'])
+        self.assertEqual(status.json()['status'], 'pending')
+
+    def test_background_render_notifies_and_downloads(self):
+        """The task stores the PDF, marks the job ready and emails the user."""
+        from django.core import mail
+        from examprep.tasks import render_saved_calculations_pdf
+
+        calcs = self._create_calculations(5)
+        with patch('examprep.tasks.render_saved_calculations_pdf.delay') as delay:
+            data = self.client.post(reverse('examprep:export_saved_calculations_pdf')).json()
+        result = render_saved_calculations_pdf(*delay.call_args[0])
+
+        self.assertEqual(result['status'], 'ready')
+        self.assertEqual(result['calculations'], len(calcs))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(data['job_id'], mail.outbox[0].body)
+
+        status = self.client.get(data['status_url']).json()
+        self.assertEqual(status['status'], 'ready')
+        download = self.client.get(status['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(download.content.startswith(b'%PDF'))
+
+    def test_export_job_private_to_owner(self):
+        """Other users can't see or download an export."""
+        from examprep.tasks import render_saved_calculations_pdf
+
+        self._create_calculations(5)
+        with patch('examprep.tasks.render_saved_calculations_pdf.delay') as delay:
+            data = self.client.post(reverse('examprep:export_saved_calculations_pdf')).json()
+        render_saved_calculations_pdf(*delay.call_args[0])
+
+        self.client.login(email="other-exporter@example.com", password="TestPass123!")
+        self.assertEqual(self.client.get(data['status_url']).status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse('examprep:download_pdf_export', kwargs={'job_id': data['job_id']})).status_code,
+            404
+        )
+
+    def test_background_render_failure_marks_job_failed(self):
+        """A job with nothing to render is marked failed."""
+        from django.core.cache import cache
+        from examprep.tasks import pdf_export_job_key, render_saved_calculations_pdf
+
+        result = render_saved_calculations_pdf('job-x', self.user.id, [])
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(cache.get(pdf_export_job_key('job-x'))['status'], 'failed')
+
+
 # =============================================================================
 # SHARE CALCULATION TESTS
 # =============================================================================
@@ -2804,6 +3527,8 @@ class TestShareCalculation(TestCase):
         shared = SharedCalculation.objects.filter(share_token=data['token']).first()
         self.assertIsNotNone(shared)
         self.assertEqual(shared.combined_rounded, 50)
+        # No year picked: the share follows the latest rate year
+        self.assertIsNone(shared.rate_year)
 
     def test_share_calculation_returns_json(self):
         """Share endpoint returns JSON response."""
@@ -2928,6 +3653,10 @@ class TestShareCalculation(TestCase):
             reverse('examprep:shared_calculation', kwargs={'token': shared.share_token})
         )
 
+        # Views are buffered and saved by the periodic flush
+        from examprep.tasks import flush_shared_calculation_views
+        flush_shared_calculation_views()
+
         shared.refresh_from_db()
         self.assertEqual(shared.view_count, initial_views + 1)
 
@@ -2964,6 +3693,215 @@ class TestShareCalculation(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+# =============================================================================
+# SHARED CALCULATION PAGE CACHING TESTS
+# =============================================================================
+
+
+def cache_make_key(key):
+    from django.core.cache import cache
+    return cache.make_key(key)
+
+
+class FakeRedisHashes:
+    """Just enough of a Redis client for the shared view counters."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.deleted = []
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        return {field.encode(): str(count).encode() for field, count in self.hashes.get(key, {}).items()}
+
+    def exists(self, key):
+        return int(key in self.hashes)
+
+    def renamenx(self, src, dst):
+        if dst in self.hashes:
+            return 0
+        self.hashes[dst] = self.hashes.pop(src)
+        return 1
+
+    def delete(self, key):
+        self.deleted.append(key)
+        self.hashes.pop(key, None)
+
+
+class TestSharedCalculationPageCache(TestCase):
+    """Tests for cached shared pages and buffered view counters."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def _create_shared(self, **kwargs):
+        from examprep.models import SharedCalculation
+
+        data = dict(
+            ratings=[
+                {"percentage": 50, "description": "PTSD", "is_bilateral": False},
+                {"percentage": 30, "description": "Knee", "is_bilateral": False},
+            ],
+            combined_raw=65.0,
+            combined_rounded=70,
+            bilateral_factor=0.0,
+            estimated_monthly=1716.28,
+        )
+        data.update(kwargs)
+        return SharedCalculation.create_from_data(**data)
+
+    def _url(self, shared):
+        return reverse('examprep:shared_calculation', kwargs={'token': shared.share_token})
+
+    def test_create_from_data_stores_step_by_step(self):
+        """Steps are computed once when the calculation is shared."""
+        shared = self._create_shared()
+
+        steps = shared.step_by_step[-1]['steps']
+        self.assertEqual([step['rating'] for step in steps], [50, 30])
+
+    def test_share_view_stores_step_by_step(self):
+        """The share endpoint persists the calculator's steps."""
+        from examprep.models import SharedCalculation
+
+        response = self.client.post(
+            reverse('examprep:share_calculation'),
+            {'ratings': json.dumps([
+                {"percentage": 50, "description": "PTSD", "is_bilateral": False},
+                {"percentage": 30, "description": "Knee", "is_bilateral": False},
+            ])},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        shared = SharedCalculation.objects.get()
+        self.assertEqual(shared.step_by_step, SharedCalculation.build_step_by_step(shared.ratings))
+
+    def test_repeat_view_makes_no_queries(self):
+        """A cached page is served without touching the database."""
+        shared = self._create_shared()
+        self.client.get(self._url(shared))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self._url(shared))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'PTSD')
+
+    def test_etag_returns_not_modified(self):
+        """A matching If-None-Match returns 304."""
+        shared = self._create_shared()
+        response = self.client.get(self._url(shared))
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self._url(shared), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_save_invalidates_cached_page(self):
+        """Editing a shared calculation refreshes the cached page."""
+        shared = self._create_shared()
+        etag = self.client.get(self._url(shared))['ETag']
+
+        shared.name = 'Updated Name'
+        shared.save()
+
+        response = self.client.get(self._url(shared), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Updated Name')
+
+    def test_views_buffered_until_flush(self):
+        """With Redis, views are counted once per session and saved in bulk by the flush."""
+        from examprep.tasks import flush_shared_calculation_views
+        from examprep.view_counters import pending_views
+
+        first = self._create_shared()
+        second = self._create_shared()
+        redis = FakeRedisHashes()
+
+        with patch('examprep.view_counters.get_redis_client', return_value=redis):
+            self.client.get(self._url(first))
+            self.client.get(self._url(first))
+            self.client.get(self._url(second))
+            self.client_class().get(self._url(first))
+
+            first.refresh_from_db()
+            self.assertEqual(first.view_count, 0)
+            self.assertEqual(pending_views(first.share_token), 2)
+
+            result = flush_shared_calculation_views()
+            self.assertEqual(result['status'], 'success')
+            self.assertEqual(result['views'], 3)
+
+            first.refresh_from_db()
+            second.refresh_from_db()
+            self.assertEqual(first.view_count, 2)
+            self.assertEqual(second.view_count, 1)
+            self.assertEqual(pending_views(first.share_token), 0)
+
+        # Raw keys carry the cache key prefix and version
+        self.assertEqual(redis.deleted, [cache_make_key('examprep:shared_views:flushing')])
+
+    def test_views_written_directly_without_redis(self):
+        """Without a shared Redis, each new session's view is saved straight away."""
+        from examprep.tasks import flush_shared_calculation_views
+        from examprep.view_counters import pending_views
+
+        shared = self._create_shared()
+        self.client.get(self._url(shared))
+        self.client.get(self._url(shared))
+        response = self.client_class().get(self._url(shared))
+
+        shared.refresh_from_db()
+        self.assertEqual(shared.view_count, 2)
+        self.assertEqual(pending_views(shared.share_token), 0)
+        self.assertEqual(response.context['shared']['view_count'], 2)
+        self.assertEqual(flush_shared_calculation_views()['views'], 0)
+
+    def test_etag_changes_with_view_count(self):
+        """A new view changes the ETag, so a 304 can't show a stale count."""
+        shared = self._create_shared()
+        etag = self.client.get(self._url(shared))['ETag']
+
+        response = self.client_class().get(self._url(shared), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_flush_with_no_views(self):
+        """Flushing with nothing buffered does nothing."""
+        from examprep.tasks import flush_shared_calculation_views
+
+        result = flush_shared_calculation_views()
+        self.assertEqual(result['views'], 0)
+
+    def test_missing_token_cached_as_404(self):
+        """Unknown tokens 404 without repeating the lookup."""
+        url = reverse('examprep:shared_calculation', kwargs={'token': 'missing-token'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_cached_page_respects_expiry(self):
+        """A cached page still shows as expired once expires_at passes."""
+        from datetime import timedelta
+        from unittest.mock import patch
+        from django.utils import timezone
+
+        shared = self._create_shared(expires_in_days=1)
+        self.client.get(self._url(shared))
+
+        later = timezone.now() + timedelta(days=2)
+        with patch('django.utils.timezone.now', return_value=later):
+            response = self.client.get(self._url(shared))
+        self.assertContains(response, 'expired')
+
+
 class TestSharedCalculationModel(TestCase):
     """Tests for SharedCalculation model."""
 
@@ -3060,6 +3998,244 @@ class TestSharedCalculationModel(TestCase):
         self.assertIn(shared.share_token, url)
         self.assertIn('shared', url)
 
+    def test_create_from_data_stamps_rate_table_version(self):
+        """create_from_data records the current rate table version by default."""
+        from examprep.models import SharedCalculation
+        from examprep.va_math import COMPENSATION_RATE_TABLE_VERSION
+
+        shared = SharedCalculation.create_from_data(
+            ratings=[{"percentage": 50, "description": "PTSD", "is_bilateral": False}],
+            combined_raw=50.0,
+            combined_rounded=50,
+            bilateral_factor=0.0,
+            estimated_monthly=1041.82,
+        )
+        self.assertEqual(shared.rate_table_version, COMPENSATION_RATE_TABLE_VERSION)
+
+
+# =============================================================================
+# RATE TABLE RECALCULATION TESTS
+# =============================================================================
+
+class TestRecalculateStaleRatingCalculations(TestCase):
+    """Tests for the bulk recalculation task run after rate table changes."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="recalc@example.com",
+            password="TestPass123!"
+        )
+
+    def _saved(self, ratings, version='', **kwargs):
+        return SavedRatingCalculation.objects.create(
+            user=self.user,
+            name="Scenario",
+            ratings=ratings,
+            estimated_monthly=1.0,
+            rate_table_version=version,
+            **kwargs
+        )
+
+    def _run(self, **kwargs):
+        from examprep.tasks import recalculate_stale_rating_calculations
+
+        kwargs.setdefault('throttle_seconds', 0)
+        return recalculate_stale_rating_calculations(**kwargs)
+
+    def test_recalculate_stamps_current_version(self):
+        """SavedRatingCalculation.recalculate records the rate table version."""
+        from examprep.va_math import COMPENSATION_RATE_TABLE_VERSION
+
+        calc = self._saved([{"percentage": 50, "is_bilateral": False}])
+        calc.recalculate()
+        self.assertEqual(calc.rate_table_version, COMPENSATION_RATE_TABLE_VERSION)
+
+    def test_stale_saved_rows_match_recalculate(self):
+        """Bulk results equal SavedRatingCalculation.recalculate for each row."""
+        from examprep.va_math import COMPENSATION_RATE_TABLE_VERSION
+
+        scenarios = [
+            ([], {}),
+            ([{"percentage": 70, "is_bilateral": False}], {'has_spouse': True, 'children_under_18': 2}),
+            ([{"percentage": 30, "is_bilateral": True}, {"percentage": 20, "is_bilateral": True},
+              {"percentage": 50, "is_bilateral": False}], {'dependent_parents': 3}),
+            ([{"percentage": 10, "is_bilateral": False}, {"percentage": 10, "is_bilateral": False}], {}),
+        ]
+        calcs = [self._saved(ratings, **kwargs) for ratings, kwargs in scenarios]
+
+        result = self._run()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['saved_calculations']['updated'], len(calcs))
+
+        for calc in calcs:
+            stored = SavedRatingCalculation.objects.get(pk=calc.pk)
+            calc.recalculate()
+            self.assertEqual(stored.rate_table_version, COMPENSATION_RATE_TABLE_VERSION)
+            self.assertEqual(stored.combined_raw, calc.combined_raw)
+            self.assertEqual(stored.combined_rounded, calc.combined_rounded)
+            self.assertEqual(stored.bilateral_factor, calc.bilateral_factor)
+            self.assertEqual(stored.estimated_monthly, calc.estimated_monthly)
+
+    def test_current_rows_untouched(self):
+        """Rows already on the current rate table are not rewritten."""
+        from examprep.va_math import COMPENSATION_RATE_TABLE_VERSION
+
+        calc = self._saved([{"percentage": 50}], version=COMPENSATION_RATE_TABLE_VERSION)
+        result = self._run()
+        self.assertEqual(result['saved_calculations']['updated'], 0)
+        self.assertEqual(SavedRatingCalculation.objects.get(pk=calc.pk).estimated_monthly, 1.0)
+
+    def test_shared_rows_rounded_and_expired_skipped(self):
+        """Shared rows are recalculated with 2dp results; expired links are skipped."""
+        from django.utils import timezone
+        from examprep.models import SharedCalculation
+
+        ratings = [{"percentage": 40, "is_bilateral": True}, {"percentage": 30, "is_bilateral": True}]
+        live = SharedCalculation.create_from_data(
+            ratings=ratings, combined_raw=0, combined_rounded=0, bilateral_factor=0,
+            estimated_monthly=1.0, rate_table_version='old',
+        )
+        expired = SharedCalculation.create_from_data(
+            ratings=ratings, combined_raw=0, combined_rounded=0, bilateral_factor=0,
+            estimated_monthly=1.0, rate_table_version='old',
+        )
+        SharedCalculation.objects.filter(pk=expired.pk).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        result = self._run()
+        self.assertEqual(result['shared_calculations']['updated'], 1)
+
+        live.refresh_from_db()
+        expected = calculate_combined_rating([
+            DisabilityRating(40, is_bilateral=True), DisabilityRating(30, is_bilateral=True),
+        ])
+        self.assertEqual(live.combined_raw, round(expected.combined_raw, 2))
+        self.assertEqual(live.bilateral_factor, round(expected.bilateral_factor_applied, 2))
+        self.assertEqual(live.estimated_monthly, estimate_monthly_compensation(expected.combined_rounded))
+        self.assertEqual(SharedCalculation.objects.get(pk=expired.pk).rate_table_version, 'old')
+
+    def test_invalid_ratings_skipped(self):
+        """Rows with unusable stored ratings are skipped, stamped and not rescanned."""
+        from examprep.va_math import COMPENSATION_RATE_TABLE_VERSION
+
+        bad = self._saved([{"percentage": "abc"}])
+        good = self._saved([{"percentage": 30}])
+
+        result = self._run()
+        self.assertEqual(result['saved_calculations']['updated'], 1)
+        self.assertEqual(result['saved_calculations']['skipped'], 1)
+        bad.refresh_from_db()
+        self.assertEqual(bad.rate_table_version, COMPENSATION_RATE_TABLE_VERSION)
+        self.assertEqual(bad.estimated_monthly, 1.0)
+        self.assertNotEqual(SavedRatingCalculation.objects.get(pk=good.pk).rate_table_version, '')
+
+        result = self._run()
+        self.assertEqual(result['saved_calculations']['skipped'], 0)
+
+    def test_rows_keep_their_rate_year(self):
+        """Estimates are recalculated with each row's rate year, not the latest."""
+        from examprep.models import SharedCalculation
+        from examprep.va_math import AVAILABLE_RATE_YEARS
+
+        older_year = AVAILABLE_RATE_YEARS[-1]
+        saved = self._saved([{"percentage": 70}], has_spouse=True, rate_year=older_year)
+        # Saved at the latest year of an older table: follows the new latest year
+        legacy = self._saved([{"percentage": 70}], has_spouse=True)
+        shared = SharedCalculation.create_from_data(
+            ratings=[{"percentage": 70}], combined_raw=0, combined_rounded=0, bilateral_factor=0,
+            estimated_monthly=1.0, has_spouse=True, rate_table_version='old', rate_year=older_year,
+        )
+
+        self._run()
+
+        older = estimate_monthly_compensation(70, spouse=True, year=older_year)
+        latest = estimate_monthly_compensation(70, spouse=True, year=AVAILABLE_RATE_YEARS[0])
+        self.assertNotEqual(older, latest)
+        saved.refresh_from_db()
+        self.assertEqual((saved.rate_year, saved.estimated_monthly), (older_year, older))
+        shared.refresh_from_db()
+        self.assertEqual((shared.rate_year, shared.estimated_monthly), (older_year, older))
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.rate_year, legacy.estimated_monthly), (None, latest))
+
+    def test_unavailable_rate_year_is_cleared(self):
+        """A year dropped from the rate table is cleared and the latest year used."""
+        from examprep.va_math import AVAILABLE_RATE_YEARS
+
+        calc = self._saved([{"percentage": 70}], has_spouse=True, rate_year=1999)
+
+        self._run()
+
+        calc.refresh_from_db()
+        self.assertIsNone(calc.rate_year)
+        self.assertEqual(
+            calc.estimated_monthly,
+            estimate_monthly_compensation(70, spouse=True, year=AVAILABLE_RATE_YEARS[0]),
+        )
+
+    def test_migration_infers_rate_year_of_existing_rows(self):
+        """Rows saved before rate_year existed get the earlier year matching their estimate."""
+        from importlib import import_module
+        from django.apps import apps
+        from examprep.va_math import AVAILABLE_RATE_YEARS
+
+        older_year = AVAILABLE_RATE_YEARS[-1]
+        matched = self._saved([{"percentage": 50}])
+        latest = self._saved([{"percentage": 50}])
+        unmatched = self._saved([{"percentage": 50}])
+        SavedRatingCalculation.objects.filter(pk=matched.pk).update(
+            combined_rounded=50,
+            estimated_monthly=estimate_monthly_compensation(50, year=older_year),
+        )
+        SavedRatingCalculation.objects.filter(pk=latest.pk).update(
+            combined_rounded=50,
+            estimated_monthly=estimate_monthly_compensation(50, year=AVAILABLE_RATE_YEARS[0]),
+        )
+
+        migration = import_module('examprep.migrations.0007_rating_rate_year')
+        migration.infer_rate_years(apps, None)
+
+        self.assertEqual(SavedRatingCalculation.objects.get(pk=matched.pk).rate_year, older_year)
+        self.assertIsNone(SavedRatingCalculation.objects.get(pk=latest.pk).rate_year)
+        self.assertIsNone(SavedRatingCalculation.objects.get(pk=unmatched.pk).rate_year)
+
+    def test_time_budget_requeues_and_resumes(self):
+        """An exhausted time budget checkpoints progress and re-queues the rest."""
+        from examprep.tasks import recalculate_stale_rating_calculations
+
+        calcs = [self._saved([{"percentage": 10 * (i + 1)}]) for i in range(5)]
+
+        with patch.object(recalculate_stale_rating_calculations, 'apply_async') as requeue:
+            result = self._run(chunk_size=2, time_budget_seconds=0)
+        self.assertEqual(result['status'], 'partial')
+        self.assertEqual(result['saved_calculations']['updated'], 2)
+        requeue.assert_called_once()
+
+        # A later run picks up from the checkpoint
+        result = self._run(chunk_size=2)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['saved_calculations']['updated'], 3)
+        self.assertEqual(
+            SavedRatingCalculation.objects.filter(pk__in=[c.pk for c in calcs], rate_table_version='').count(),
+            0
+        )
+
+    def test_concurrent_run_skipped(self):
+        """A second run while one holds the lock does nothing."""
+        from django.core.cache import cache
+        from examprep.tasks import RATE_RECALC_LOCK_KEY
+
+        self._saved([{"percentage": 50}])
+        cache.add(RATE_RECALC_LOCK_KEY, True, 60)
+
+        result = self._run()
+        self.assertEqual(result['status'], 'skipped')
+        self.assertEqual(SavedRatingCalculation.objects.filter(rate_table_version='').count(), 1)
+
 
 # =============================================================================
 # TDIU BOUNDARY TESTS — 38 CFR § 4.16
@@ -3214,3 +4390,127 @@ class TestSMCBoundaryEligibility(TestCase):
         ])
         result = self.check_smc(conditions)
         self.assertNotIn(self.SMCLevel.S, result.levels)
+
+
+# =============================================================================
+# SECONDARY CONDITIONS INDEX TESTS
+# =============================================================================
+
+class TestSecondaryConditionsIndex(TestCase):
+    """Tests for the indexed secondary conditions lookups."""
+
+    def test_get_primary_condition_matches_substring_scan(self):
+        """Indexed lookups return the same condition as a linear scan."""
+        from examprep.secondary_conditions_data import (
+            SECONDARY_CONDITIONS_DATA,
+            get_primary_condition,
+        )
+
+        def scan(name):
+            for condition in SECONDARY_CONDITIONS_DATA:
+                if name.lower() in condition["condition"].lower():
+                    return condition
+            return None
+
+        queries = [c["condition"] for c in SECONDARY_CONDITIONS_DATA]
+        queries += ["ptsd", "KNEE", "apnea", "(tbi)", "not a condition"]
+        for query in queries:
+            self.assertIs(get_primary_condition(query), scan(query), query)
+
+    def test_categories_and_counts(self):
+        """Category buckets cover every condition."""
+        from examprep.secondary_conditions_data import (
+            SECONDARY_CONDITIONS_DATA,
+            get_categories,
+            get_conditions_by_category,
+            get_conditions_count,
+        )
+
+        categories = get_categories()
+        self.assertEqual(categories, sorted(set(c["category"] for c in SECONDARY_CONDITIONS_DATA)))
+        self.assertEqual(
+            sum(len(get_conditions_by_category(c)) for c in categories),
+            len(SECONDARY_CONDITIONS_DATA),
+        )
+        self.assertEqual(get_conditions_by_category("Unknown"), [])
+        self.assertEqual(get_conditions_count()["categories"], len(categories))
+
+    def test_search_ranks_primary_name_first(self):
+        """A primary whose own name matches ranks above secondary-only matches."""
+        from examprep.secondary_conditions_data import search_secondary_conditions
+
+        results = search_secondary_conditions("sleep apnea")
+        self.assertEqual(results[0]["condition"], "Sleep Apnea")
+        self.assertNotIn("matching_secondaries", results[0])
+        self.assertTrue(all(
+            any("Sleep Apnea" in s["condition"] for s in r["matching_secondaries"])
+            for r in results[1:]
+        ))
+
+    def test_search_multi_word_prefixes(self):
+        """Every query word must start a word of the same condition name."""
+        from examprep.secondary_conditions_data import search_secondary_conditions
+
+        self.assertEqual(
+            [r["condition"] for r in search_secondary_conditions("sle apn")],
+            [r["condition"] for r in search_secondary_conditions("sleep apnea")],
+        )
+        self.assertEqual(search_secondary_conditions("sleep knee"), [])
+        self.assertEqual(search_secondary_conditions("  "), [])
+
+    def test_search_falls_back_to_substring(self):
+        """Input that starts no word still matches names containing it."""
+        from examprep.secondary_conditions_data import (
+            search_secondary_conditions,
+            suggest_conditions,
+        )
+
+        self.assertEqual(search_secondary_conditions("pnea")[0]["condition"], "Sleep Apnea")
+        self.assertEqual(
+            [r["condition"] for r in search_secondary_conditions("eep apn")],
+            [r["condition"] for r in search_secondary_conditions("sleep apnea")],
+        )
+        self.assertIn("Sleep Apnea", suggest_conditions("pnea"))
+
+    def test_search_does_not_modify_data(self):
+        """Search results are copies; the source data is untouched."""
+        from examprep.secondary_conditions_data import (
+            SECONDARY_CONDITIONS_DATA,
+            search_secondary_conditions,
+        )
+
+        search_secondary_conditions("depression")
+        self.assertTrue(all("matching_secondaries" not in c for c in SECONDARY_CONDITIONS_DATA))
+
+    def test_suggest_conditions(self):
+        """Typeahead returns distinct names, primaries first."""
+        from examprep.secondary_conditions_data import suggest_conditions
+
+        suggestions = suggest_conditions("sl")
+        self.assertEqual(suggestions[0], "Sleep Apnea")
+        self.assertEqual(len(suggestions), len(set(suggestions)))
+        self.assertEqual(len(suggest_conditions("d", limit=2)), 2)
+        self.assertEqual(suggest_conditions(""), [])
+
+    def test_hub_search_view(self):
+        """The hub and live search use the indexed search."""
+        response = self.client.get(reverse('examprep:secondary_conditions_hub'), {'q': 'tinnitus'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Tinnitus')
+
+        response = self.client.get(reverse('examprep:secondary_conditions_search'), {'q': 'migr'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Migraines')
+
+    def test_suggest_view(self):
+        """The hub search box is wired to the typeahead endpoint."""
+        response = self.client.get(reverse('examprep:secondary_conditions_hub'))
+        self.assertContains(response, reverse('examprep:secondary_conditions_suggest'))
+
+        response = self.client.get(reverse('examprep:secondary_conditions_suggest'), {'q': 'sle'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Sleep Apnea')
+        self.assertContains(response, '?q=Sleep%20Apnea')
+
+        response = self.client.get(reverse('examprep:secondary_conditions_suggest'), {'q': 's'})
+        self.assertEqual(response.content, b'')
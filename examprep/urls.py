@@ -30,12 +30,17 @@ urlpatterns = [
     path('rating-calculator/', views.rating_calculator, name='rating_calculator'),
     path('rating-calculator/calculate/', views.calculate_rating_htmx, name='calculate_rating'),
     path('rating-calculator/calculate-json/', views.calculate_rating_json, name='calculate_rating_json'),
+    path('rating-calculator/calculate-batch/', views.calculate_ratings_batch_json, name='calculate_ratings_batch_json'),
+    path('rating-calculator/next-bracket/', views.next_bracket_json, name='next_bracket_json'),
     path('rating-calculator/save/', views.save_calculation, name='save_calculation'),
     path('rating-calculator/saved/', views.saved_calculations, name='saved_calculations'),
     path('rating-calculator/saved/<int:pk>/delete/', views.delete_calculation, name='delete_calculation'),
     path('rating-calculator/saved/<int:pk>/load/', views.load_calculation, name='load_calculation'),
     path('rating-calculator/export-pdf/', views.export_rating_pdf, name='export_rating_pdf'),
     path('rating-calculator/saved/<int:pk>/export-pdf/', views.export_saved_rating_pdf, name='export_saved_rating_pdf'),
+    path('rating-calculator/saved/export-pdf/', views.export_saved_calculations_pdf, name='export_saved_calculations_pdf'),
+    path('rating-calculator/pdf-exports/<str:job_id>/', views.pdf_export_status, name='pdf_export_status'),
+    path('rating-calculator/pdf-exports/<str:job_id>/download/', views.download_pdf_export, name='download_pdf_export'),
 
     # Evidence Checklists
     path('evidence-checklist/', views.evidence_checklist_list, name='evidence_checklist_list'),
@@ -56,6 +61,7 @@ urlpatterns = [
     # Secondary Conditions Hub
     path('secondary-conditions/', views.secondary_conditions_hub, name='secondary_conditions_hub'),
     path('secondary-conditions/search/', views.secondary_conditions_search, name='secondary_conditions_search'),
+    path('secondary-conditions/suggest/', views.secondary_conditions_suggest, name='secondary_conditions_suggest'),
     path('secondary-conditions/<slug:condition_slug>/', views.secondary_condition_detail, name='secondary_condition_detail'),
 
     # Share Calculation
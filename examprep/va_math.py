@@ -9,10 +9,15 @@ References:
 - 38 CFR § 4.26 - Bilateral factor
 """
 
+import json
 from decimal import Decimal, ROUND_HALF_UP
-from typing import List, Tuple, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Tuple, Optional, Sequence
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class DisabilityRating:
@@ -62,12 +67,23 @@ def combine_two_ratings(rating1: int, rating2: int) -> float:
     return combined * 100
 
 
-def combine_multiple_ratings(ratings: List[int]) -> Tuple[float, List[dict]]:
-    """
-    Combine multiple disability ratings in order from highest to lowest.
+# 38 CFR § 4.25 combined ratings table: COMBINED_RATINGS_TABLE[a][b] is the
+# unrounded result of combining a whole-number rating a with rating b
+COMBINED_RATINGS_TABLE = tuple(
+    tuple(combine_two_ratings(a, b) for b in range(101))
+    for a in range(101)
+)
 
-    Returns the combined percentage (not rounded) and step-by-step calculations.
-    """
+
+def _combine_pair(rating1: int, rating2: int) -> float:
+    """combine_two_ratings() served from the precomputed table."""
+    if 0 <= rating1 <= 100 and 0 <= rating2 <= 100:
+        return COMBINED_RATINGS_TABLE[rating1][rating2]
+    return combine_two_ratings(rating1, rating2)
+
+
+def _combine_with_steps(ratings: List[int]) -> Tuple[float, List[dict]]:
+    """Combine ratings highest to lowest, recording each step."""
     if not ratings:
         return 0.0, []
 
@@ -96,7 +112,7 @@ def combine_multiple_ratings(ratings: List[int]) -> Tuple[float, List[dict]]:
 
     for i, rating in enumerate(sorted_ratings[1:], start=2):
         before = combined
-        combined = combine_two_ratings(int(round(combined)), rating)
+        combined = _combine_pair(int(round(combined)), rating)
 
         remaining = 100 - before
         contribution = rating * remaining / 100
@@ -117,6 +133,98 @@ def combine_multiple_ratings(ratings: List[int]) -> Tuple[float, List[dict]]:
     return combined, steps
 
 
+# Entries kept by the shared combined-rating cache (one per distinct rating set)
+COMBINED_RATING_CACHE_SIZE = 4096
+
+
+class _CombinedRating(NamedTuple):
+    """Cached combination of one canonical rating set"""
+    bilateral_combined: float
+    bilateral_factor: float
+    bilateral_steps: Tuple[dict, ...]
+    bilateral_total: Optional[int]  # Bilateral result as a single whole rating
+    combined_raw: float
+    combined_rounded: int
+    final_steps: Tuple[dict, ...]
+
+
+def _rating_key(ratings: Iterable[Tuple[int, bool]]) -> Tuple[Tuple[int, bool], ...]:
+    """Canonical cache key: (percentage, is_bilateral) pairs, highest first."""
+    return tuple(sorted(((int(p), bool(b)) for p, b in ratings), reverse=True))
+
+
+@lru_cache(maxsize=COMBINED_RATING_CACHE_SIZE)
+def _combined_rating(key: Tuple[Tuple[int, bool], ...]) -> _CombinedRating:
+    """
+    Combine a canonical rating set (see _rating_key).
+
+    Shared by every caller in the process: the HTMX calculator, saved and
+    shared calculations, rating imports and the optimizer all re-submit the
+    same few rating sets, so results are computed once and reused.
+    """
+    bilateral = [p for p, is_bilateral in key if is_bilateral]
+    other = [p for p, is_bilateral in key if not is_bilateral]
+
+    bilateral_combined, bilateral_steps = _combine_with_steps(bilateral)
+    bilateral_factor = bilateral_combined * 0.10
+    bilateral_total = int(round(bilateral_combined + bilateral_factor)) if bilateral else None
+
+    final_ratings = ([bilateral_total] if bilateral else []) + other
+    combined_raw, final_steps = _combine_with_steps(final_ratings)
+
+    return _CombinedRating(
+        bilateral_combined=bilateral_combined,
+        bilateral_factor=bilateral_factor,
+        bilateral_steps=tuple(bilateral_steps),
+        bilateral_total=bilateral_total,
+        combined_raw=combined_raw,
+        combined_rounded=round_to_nearest_10(combined_raw),
+        final_steps=tuple(final_steps),
+    )
+
+
+def combined_rating_cache_stats() -> dict:
+    """Hit-rate statistics for the shared combined-rating cache."""
+    info = _combined_rating.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+    }
+
+
+def clear_combined_rating_cache():
+    """Empty the shared combined-rating cache and reset its statistics."""
+    _combined_rating.cache_clear()
+
+
+def combine_rating_set(ratings: Iterable[Tuple[int, bool]]) -> Tuple[float, int]:
+    """
+    Combined (raw, rounded) rating for (percentage, is_bilateral) pairs.
+
+    Lightweight entry point for callers that evaluate many rating sets and
+    only need the numbers.
+    """
+    result = _combined_rating(_rating_key(ratings))
+    return result.combined_raw, result.combined_rounded
+
+
+def combine_multiple_ratings(ratings: List[int]) -> Tuple[float, List[dict]]:
+    """
+    Combine multiple disability ratings in order from highest to lowest.
+
+    Returns the combined percentage (not rounded) and step-by-step calculations.
+    """
+    if not ratings:
+        return 0.0, []
+
+    result = _combined_rating(_rating_key((p, False) for p in ratings))
+    return result.combined_raw, [dict(step) for step in result.final_steps]
+
+
 def calculate_bilateral_factor(bilateral_ratings: List[int]) -> Tuple[float, float]:
     """
     Calculate the bilateral factor for paired extremity conditions.
@@ -158,7 +266,10 @@ def round_to_nearest_10(value: float) -> int:
     return min(100, max(0, rounded))
 
 
-def calculate_combined_rating(ratings: List[DisabilityRating]) -> CalculationResult:
+def calculate_combined_rating(
+    ratings: List[DisabilityRating],
+    include_steps: bool = True
+) -> CalculationResult:
     """
     Calculate combined VA disability rating with full bilateral factor support.
 
@@ -167,6 +278,11 @@ def calculate_combined_rating(ratings: List[DisabilityRating]) -> CalculationRes
     2. Combine bilateral ratings and add 10% bilateral factor
     3. Combine bilateral result with non-bilateral ratings
     4. Round to nearest 10%
+
+    Args:
+        ratings: Disability ratings to combine
+        include_steps: Build the step_by_step explanation. Callers that only
+            need the numbers can pass False; step_by_step is then empty.
     """
     if not ratings:
         return CalculationResult(
@@ -177,246 +293,335 @@ def calculate_combined_rating(ratings: List[DisabilityRating]) -> CalculationRes
             ratings_used=[]
         )
 
-    # Separate bilateral and non-bilateral ratings
-    bilateral_ratings = [r for r in ratings if r.is_bilateral]
-    non_bilateral_ratings = [r for r in ratings if not r.is_bilateral]
+    result = _combined_rating(_rating_key((r.percentage, r.is_bilateral) for r in ratings))
 
     all_steps = []
-    bilateral_factor_bonus = 0.0
-
-    # Process bilateral ratings if any
-    bilateral_combined = 0.0
-    if bilateral_ratings:
-        bilateral_percentages = [r.percentage for r in bilateral_ratings]
-        bilateral_combined, bilateral_steps = combine_multiple_ratings(bilateral_percentages)
-
-        # Add bilateral factor (10% of combined bilateral)
-        bilateral_factor_bonus = bilateral_combined * 0.10
-        bilateral_with_factor = bilateral_combined + bilateral_factor_bonus
-
-        all_steps.append({
-            'phase': 'bilateral',
-            'description': 'Bilateral Conditions (paired extremities)',
-            'ratings': bilateral_percentages,
-            'combined': bilateral_combined,
-            'bilateral_factor': bilateral_factor_bonus,
-            'total_with_factor': bilateral_with_factor,
-            'steps': bilateral_steps
-        })
-
-        # The bilateral total (with factor) is treated as one rating
-        all_percentages = [bilateral_with_factor] + [r.percentage for r in non_bilateral_ratings]
-    else:
-        all_percentages = [r.percentage for r in non_bilateral_ratings]
-
-    # Combine all ratings
-    if all_percentages:
-        # Convert to integers for combination (bilateral total might be float)
-        int_percentages = [int(round(p)) for p in all_percentages]
-        final_combined, final_steps = combine_multiple_ratings(int_percentages)
+    if include_steps:
+        # Step lists are shared with the cache; hand out copies
+        bilateral_percentages = [r.percentage for r in ratings if r.is_bilateral]
+        other_percentages = [r.percentage for r in ratings if not r.is_bilateral]
+
+        if bilateral_percentages:
+            all_steps.append({
+                'phase': 'bilateral',
+                'description': 'Bilateral Conditions (paired extremities)',
+                'ratings': bilateral_percentages,
+                'combined': result.bilateral_combined,
+                'bilateral_factor': result.bilateral_factor,
+                'total_with_factor': result.bilateral_combined + result.bilateral_factor,
+                'steps': [dict(step) for step in result.bilateral_steps]
+            })
+            # The bilateral total (with factor) is treated as one rating
+            final_percentages = [result.bilateral_total] + other_percentages
+        else:
+            final_percentages = other_percentages
 
         all_steps.append({
             'phase': 'final',
             'description': 'Final Combination',
-            'ratings': int_percentages,
-            'combined_raw': final_combined,
-            'steps': final_steps
+            'ratings': final_percentages,
+            'combined_raw': result.combined_raw,
+            'steps': [dict(step) for step in result.final_steps]
         })
-    else:
-        final_combined = 0.0
-
-    # Round to nearest 10%
-    rounded = round_to_nearest_10(final_combined)
 
     return CalculationResult(
-        combined_raw=final_combined,
-        combined_rounded=rounded,
-        bilateral_factor_applied=bilateral_factor_bonus,
+        combined_raw=result.combined_raw,
+        combined_rounded=result.combined_rounded,
+        bilateral_factor_applied=result.bilateral_factor,
         step_by_step=all_steps,
         ratings_used=ratings
     )
 
 
-# 2026 VA Compensation Rates (effective December 1, 2025)
-# 2.8% COLA increase from 2025
-VA_COMPENSATION_RATES_2026 = {
-    0: 0.00,
-    10: 180.42,
-    20: 356.66,
-    30: 552.47,
-    40: 795.84,
-    50: 1132.90,
-    60: 1435.02,
-    70: 1808.45,
-    80: 2102.15,
-    90: 2362.30,
-    100: 3938.58,
-}
+# Padding value for unused slots in a batch ratings matrix
+BATCH_PAD = -1
 
-# Additional amounts for dependents at 30%+ rating (2026)
-DEPENDENT_RATES_2026 = {
-    'spouse': {
-        30: 63.74, 40: 85.33, 50: 106.91, 60: 128.50,
-        70: 150.09, 80: 170.65, 90: 192.24, 100: 214.21
-    },
-    'child_under_18': {
-        30: 31.87, 40: 42.15, 50: 53.46, 60: 63.74,
-        70: 74.02, 80: 85.33, 90: 95.61, 100: 106.45
-    },
-    'parent_one': {
-        30: 55.51, 40: 73.00, 50: 91.51, 60: 110.00,
-        70: 128.50, 80: 147.00, 90: 165.51, 100: 183.64
-    }
-}
 
-# 2025 VA Compensation Rates (effective December 1, 2024)
-# 2.5% COLA increase from 2024
-VA_COMPENSATION_RATES_2025 = {
-    0: 0.00,
-    10: 175.51,
-    20: 346.95,
-    30: 537.42,
-    40: 774.16,
-    50: 1102.04,
-    60: 1395.93,
-    70: 1759.19,
-    80: 2044.89,
-    90: 2297.96,
-    100: 3831.30,
-}
+@dataclass
+class BatchCalculationResult:
+    """
+    Combined ratings for many scenarios, one array element per scenario.
 
-# Additional amounts for dependents at 30%+ rating (2025)
-DEPENDENT_RATES_2025 = {
-    'spouse': {
-        30: 63.55, 40: 85.08, 50: 106.60, 60: 128.13,
-        70: 149.65, 80: 170.15, 90: 191.68, 100: 213.59
-    },
-    'child_under_18': {
-        30: 31.78, 40: 42.03, 50: 53.30, 60: 63.55,
-        70: 73.80, 80: 85.08, 90: 95.33, 100: 106.14
-    },
-    'parent_one': {
-        30: 55.35, 40: 72.78, 50: 91.23, 60: 109.68,
-        70: 128.13, 80: 146.58, 90: 165.03, 100: 183.10
-    }
-}
+    Step-by-step explanations are not computed up front; call
+    step_by_step(i) or result(i) for the scenarios that need them.
+    """
+    combined_raw: np.ndarray
+    combined_rounded: np.ndarray
+    bilateral_factor_applied: np.ndarray
+    ratings: np.ndarray
+    bilateral: np.ndarray
 
-# 2024 VA Compensation Rates (effective December 1, 2023)
-# These are monthly rates for veterans with no dependents
-VA_COMPENSATION_RATES_2024 = {
-    0: 0.00,
-    10: 171.23,
-    20: 338.49,
-    30: 524.31,
-    40: 755.28,
-    50: 1075.16,
-    60: 1361.88,
-    70: 1716.28,
-    80: 1995.01,
-    90: 2241.91,
-    100: 3737.85,
-}
+    def __len__(self) -> int:
+        return len(self.combined_raw)
 
-# Additional amounts for dependents at 30%+ rating
-DEPENDENT_RATES_2024 = {
-    'spouse': {
-        30: 62.00, 40: 83.00, 50: 104.00, 60: 125.00,
-        70: 146.00, 80: 166.00, 90: 187.00, 100: 208.38
-    },
-    'child_under_18': {
-        30: 31.00, 40: 41.00, 50: 52.00, 60: 62.00,
-        70: 72.00, 80: 83.00, 90: 93.00, 100: 103.55
-    },
-    'parent_one': {
-        30: 54.00, 40: 71.00, 50: 89.00, 60: 107.00,
-        70: 125.00, 80: 143.00, 90: 161.00, 100: 178.63
-    }
-}
+    def ratings_for(self, index: int) -> List[DisabilityRating]:
+        """DisabilityRating list for one scenario (padding removed)."""
+        return [
+            DisabilityRating(percentage=int(pct), is_bilateral=bool(bil))
+            for pct, bil in zip(self.ratings[index], self.bilateral[index])
+            if pct != BATCH_PAD
+        ]
 
-# 2023 VA Compensation Rates (effective December 1, 2022)
-# 8.7% COLA increase from 2022
-VA_COMPENSATION_RATES_2023 = {
-    0: 0.00,
-    10: 165.92,
-    20: 327.99,
-    30: 508.05,
-    40: 731.86,
-    50: 1041.82,
-    60: 1319.65,
-    70: 1663.06,
-    80: 1933.15,
-    90: 2172.39,
-    100: 3621.95,
-}
+    def result(self, index: int) -> CalculationResult:
+        """Full scalar CalculationResult (with steps) for one scenario."""
+        return calculate_combined_rating(self.ratings_for(index))
 
-# 2022 VA Compensation Rates (effective December 1, 2021)
-# 5.9% COLA increase from 2021
-VA_COMPENSATION_RATES_2022 = {
-    0: 0.00,
-    10: 152.64,
-    20: 301.74,
-    30: 467.39,
-    40: 673.28,
-    50: 958.44,
-    60: 1214.03,
-    70: 1529.95,
-    80: 1778.43,
-    90: 1998.52,
-    100: 3332.06,
-}
+    def step_by_step(self, index: int) -> List[dict]:
+        """Step-by-step explanation for one scenario."""
+        return self.result(index).step_by_step
 
-# 2021 VA Compensation Rates (effective December 1, 2020)
-# 1.3% COLA increase from 2020
-VA_COMPENSATION_RATES_2021 = {
-    0: 0.00,
-    10: 144.14,
-    20: 284.93,
-    30: 441.35,
-    40: 635.77,
-    50: 905.04,
-    60: 1146.39,
-    70: 1444.71,
-    80: 1679.35,
-    90: 1887.18,
-    100: 3146.42,
-}
 
-# 2020 VA Compensation Rates (effective December 1, 2019)
-# 1.6% COLA increase from 2019
-VA_COMPENSATION_RATES_2020 = {
-    0: 0.00,
-    10: 142.29,
-    20: 281.27,
-    30: 435.69,
-    40: 627.61,
-    50: 893.43,
-    60: 1131.68,
-    70: 1426.17,
-    80: 1657.80,
-    90: 1862.96,
-    100: 3106.04,
-}
+def scenarios_to_arrays(scenarios: Sequence[Sequence[DisabilityRating]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack lists of DisabilityRating into a padded ratings matrix and bilateral mask.
+
+    Returns:
+        (ratings, bilateral) arrays of shape (n_scenarios, max_ratings);
+        unused slots hold BATCH_PAD and False.
+    """
+    width = max((len(s) for s in scenarios), default=0)
+    ratings = np.full((len(scenarios), width), BATCH_PAD, dtype=np.int64)
+    bilateral = np.zeros((len(scenarios), width), dtype=bool)
+    for i, scenario in enumerate(scenarios):
+        for j, rating in enumerate(scenario):
+            ratings[i, j] = rating.percentage
+            bilateral[i, j] = rating.is_bilateral
+    return ratings, bilateral
+
+
+def _combine_rows(ratings: np.ndarray) -> np.ndarray:
+    """
+    Row-wise combine_multiple_ratings() over a padded ratings matrix.
+
+    Each column step applies the same float operations as the scalar path
+    (round the running total, then A + B(1-A)), so results are bit-identical.
+    """
+    combined = np.zeros(len(ratings), dtype=np.float64)
+    if ratings.shape[1] == 0:
+        return combined
+
+    # Highest to lowest; padding (-1) sorts to the end
+    ordered = -np.sort(-ratings, axis=1)
+    present = ordered[:, 0] != BATCH_PAD
+    combined[present] = ordered[present, 0]
+
+    for column in ordered.T[1:]:
+        active = column != BATCH_PAD
+        if not active.any():
+            break
+        a = np.round(combined[active]) / 100.0
+        b = column[active] / 100.0
+        combined[active] = (a + b * (1 - a)) * 100
+
+    return combined
+
+
+def _round_to_nearest_10_array(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorised round_to_nearest_10() (half-up, clamped to 0-100).
+
+    Compares against the exact midpoint rather than adding 0.5, so results
+    match the Decimal-based scalar rounding for every float input.
+    """
+    tens = np.floor(values / 10)
+    rounded = (tens + (values >= tens * 10 + 5)) * 10
+    return np.clip(rounded, 0, 100).astype(np.int64)
+
+
+def calculate_combined_ratings_batch(ratings, bilateral=None) -> BatchCalculationResult:
+    """
+    Calculate combined ratings for many scenarios at once.
+
+    Vectorised equivalent of calling calculate_combined_rating() per
+    scenario; results are exactly equal to the scalar path.
+
+    Args:
+        ratings: (n_scenarios, max_ratings) array-like of percentages,
+            padded with BATCH_PAD for unused slots
+        bilateral: Boolean mask of the same shape marking bilateral ratings
+            (no bilateral ratings if None)
+
+    Returns:
+        BatchCalculationResult with combined_raw, combined_rounded and
+        bilateral_factor_applied vectors
+    """
+    ratings = np.asarray(ratings, dtype=np.int64)
+    if ratings.ndim != 2:
+        raise ValueError("ratings must be a 2-D (scenarios x ratings) array")
+
+    if bilateral is None:
+        bilateral = np.zeros(ratings.shape, dtype=bool)
+    else:
+        bilateral = np.asarray(bilateral, dtype=bool)
+        if bilateral.shape != ratings.shape:
+            raise ValueError("bilateral mask must have the same shape as ratings")
+
+    present = ratings != BATCH_PAD
+    bilateral = bilateral & present
+
+    # Bilateral conditions combine first and get a 10% factor (38 CFR § 4.26)
+    bilateral_combined = _combine_rows(np.where(bilateral, ratings, BATCH_PAD))
+    bilateral_factor = bilateral_combined * 0.10
+    has_bilateral = bilateral.any(axis=1)
+    bilateral_total = np.where(
+        has_bilateral,
+        np.round(bilateral_combined + bilateral_factor),
+        BATCH_PAD,
+    ).astype(np.int64)
+
+    # The bilateral total then counts as a single rating
+    final_ratings = np.column_stack([
+        bilateral_total,
+        np.where(present & ~bilateral, ratings, BATCH_PAD),
+    ])
+    combined_raw = _combine_rows(final_ratings)
+
+    return BatchCalculationResult(
+        combined_raw=combined_raw,
+        combined_rounded=_round_to_nearest_10_array(combined_raw),
+        bilateral_factor_applied=np.where(has_bilateral, bilateral_factor, 0.0),
+        ratings=ratings,
+        bilateral=bilateral,
+    )
+
+
+# =============================================================================
+# COMPENSATION RATES
+# =============================================================================
+# Rates live in data/compensation_rates.json (one entry per rate year). The
+# file's "version" changes whenever any amount changes, so stored estimates
+# can tell which table they were computed against.
+
+COMPENSATION_RATES_FILE = Path(__file__).resolve().parent / 'data' / 'compensation_rates.json'
+
+# Rating levels, in rate-array column order (column = rating // 10)
+RATING_LEVELS = tuple(range(0, 101, 10))
 
-# Master lookup for all years
+# Dependent additions start at a 30% combined rating
+DEPENDENT_MINIMUM_RATING = 30
+
+# Rate components, in the order of the last rate-array axis
+RATE_COMPONENTS = ('base', 'spouse', 'child_under_18', 'parent_one')
+
+# Dependent parents counted toward compensation
+MAX_DEPENDENT_PARENTS = 2
+
+
+def _load_compensation_rates(path: Path = COMPENSATION_RATES_FILE) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class CompensationRateTable:
+    """
+    Dense compensation rate arrays indexed by (year, rating, component).
+
+    rates[y, r] holds the base amount and the per-dependent additions for
+    rate year index y and rating column r (rating // 10), so the amount for
+    any dependent configuration is one dot product:
+
+        base + spouse * s + child_under_18 * children + parent_one * parents
+
+    Ratings below 30% and years without published dependent rates carry
+    zero dependent additions.
+    """
+
+    def __init__(self, data: dict):
+        self.version = data['version']
+        self.years = tuple(sorted((int(y) for y in data['years']), reverse=True))
+        self.latest_year = self.years[0]
+        self._year_index = {year: i for i, year in enumerate(self.years)}
+
+        self.rates = np.zeros((len(self.years), len(RATING_LEVELS), len(RATE_COMPONENTS)))
+        self.has_dependent_rates = np.zeros(len(self.years), dtype=bool)
+
+        for year in self.years:
+            y = self._year_index[year]
+            entry = data['years'][str(year)]
+            for rating, amount in entry['base'].items():
+                self.rates[y, int(rating) // 10, 0] = amount
+            if entry.get('dependents'):
+                self.has_dependent_rates[y] = True
+                for component, kind in enumerate(RATE_COMPONENTS[1:], start=1):
+                    for rating, amount in entry['dependents'][kind].items():
+                        self.rates[y, int(rating) // 10, component] = amount
+
+        self.rates[:, :DEPENDENT_MINIMUM_RATING // 10, 1:] = 0.0
+
+        # Plain-float rows for scalar lookups (cheaper than numpy scalars)
+        self._rows = self.rates.tolist()
+        self._base_only_rows = [[row[0], 0.0, 0.0, 0.0] for row in self._rows[0]]
+
+    def year_index(self, year: int) -> Optional[int]:
+        """Array index of a rate year, or None if the year is unknown."""
+        return self._year_index.get(year)
+
+    def base_rates(self, year: int) -> dict:
+        """{rating: base monthly amount} for a year."""
+        row = self.rates[self._year_index[year], :, 0]
+        return {rating: float(row[i]) for i, rating in enumerate(RATING_LEVELS)}
+
+    def dependent_rates(self, year: int) -> Optional[dict]:
+        """{kind: {rating: addition}} for a year, or None if not published."""
+        y = self._year_index[year]
+        if not self.has_dependent_rates[y]:
+            return None
+        first = DEPENDENT_MINIMUM_RATING // 10
+        return {
+            kind: {
+                rating: float(self.rates[y, i, component])
+                for i, rating in enumerate(RATING_LEVELS) if i >= first
+            }
+            for component, kind in enumerate(RATE_COMPONENTS[1:], start=1)
+        }
+
+    def row(self, year: int, combined_rating: int) -> Optional[List[float]]:
+        """
+        [base, spouse, child, parent] amounts for one rating, or None if the
+        rating is not a valid level. Unknown years use the latest base rates
+        without dependent additions.
+        """
+        if combined_rating not in _RATING_COLUMNS:
+            return None
+        y = self._year_index.get(year)
+        if y is None:
+            return self._base_only_rows[_RATING_COLUMNS[combined_rating]]
+        return self._rows[y][_RATING_COLUMNS[combined_rating]]
+
+
+_RATING_COLUMNS = {rating: i for i, rating in enumerate(RATING_LEVELS)}
+
+COMPENSATION_RATE_TABLE = CompensationRateTable(_load_compensation_rates())
+
+# Identifies the rate table estimates were computed against
+COMPENSATION_RATE_TABLE_VERSION = COMPENSATION_RATE_TABLE.version
+
+# Master lookup for all years: {year: {rating: base monthly amount}}
 VA_COMPENSATION_RATES_BY_YEAR = {
-    2026: VA_COMPENSATION_RATES_2026,
-    2025: VA_COMPENSATION_RATES_2025,
-    2024: VA_COMPENSATION_RATES_2024,
-    2023: VA_COMPENSATION_RATES_2023,
-    2022: VA_COMPENSATION_RATES_2022,
-    2021: VA_COMPENSATION_RATES_2021,
-    2020: VA_COMPENSATION_RATES_2020,
+    year: COMPENSATION_RATE_TABLE.base_rates(year) for year in COMPENSATION_RATE_TABLE.years
 }
 
-# Dependent rates by year
+# Dependent rates by year (only years with published dependent tables)
 DEPENDENT_RATES_BY_YEAR = {
-    2026: DEPENDENT_RATES_2026,
-    2025: DEPENDENT_RATES_2025,
-    2024: DEPENDENT_RATES_2024,
+    year: COMPENSATION_RATE_TABLE.dependent_rates(year)
+    for year in COMPENSATION_RATE_TABLE.years
+    if COMPENSATION_RATE_TABLE.dependent_rates(year) is not None
 }
 
 # Available rate years (most recent first)
-AVAILABLE_RATE_YEARS = [2026, 2025, 2024, 2023, 2022, 2021, 2020]
+AVAILABLE_RATE_YEARS = list(COMPENSATION_RATE_TABLE.years)
+
+# Per-year names kept for existing imports
+VA_COMPENSATION_RATES_2026 = VA_COMPENSATION_RATES_BY_YEAR[2026]
+VA_COMPENSATION_RATES_2025 = VA_COMPENSATION_RATES_BY_YEAR[2025]
+VA_COMPENSATION_RATES_2024 = VA_COMPENSATION_RATES_BY_YEAR[2024]
+VA_COMPENSATION_RATES_2023 = VA_COMPENSATION_RATES_BY_YEAR[2023]
+VA_COMPENSATION_RATES_2022 = VA_COMPENSATION_RATES_BY_YEAR[2022]
+VA_COMPENSATION_RATES_2021 = VA_COMPENSATION_RATES_BY_YEAR[2021]
+VA_COMPENSATION_RATES_2020 = VA_COMPENSATION_RATES_BY_YEAR[2020]
+DEPENDENT_RATES_2026 = DEPENDENT_RATES_BY_YEAR[2026]
+DEPENDENT_RATES_2025 = DEPENDENT_RATES_BY_YEAR[2025]
+DEPENDENT_RATES_2024 = DEPENDENT_RATES_BY_YEAR[2024]
 
 
 def estimate_monthly_compensation(
@@ -441,30 +646,120 @@ def estimate_monthly_compensation(
     Dependent rates are available for 2024-2026; for earlier years,
     only base rates are applied.
     """
-    # Get rates for the specified year, fallback to 2026
-    rates = VA_COMPENSATION_RATES_BY_YEAR.get(year, VA_COMPENSATION_RATES_2026)
-
-    if combined_rating not in rates:
+    row = COMPENSATION_RATE_TABLE.row(year, combined_rating)
+    if row is None:
         return 0.0
 
-    base = rates[combined_rating]
-    total = base
+    base, spouse_rate, child_rate, parent_rate = row
+    total = (
+        base
+        + (spouse_rate if spouse else 0.0)
+        + child_rate * max(0, children_under_18)
+        + parent_rate * min(MAX_DEPENDENT_PARENTS, max(0, dependent_parents))
+    )
+    return round(total, 2)
 
-    # Dependents only add to 30%+ ratings
-    dep_rates = DEPENDENT_RATES_BY_YEAR.get(year)
-    if combined_rating >= 30 and dep_rates:
-        if spouse and combined_rating in dep_rates['spouse']:
-            total += dep_rates['spouse'][combined_rating]
 
-        for _ in range(children_under_18):
-            if combined_rating in dep_rates['child_under_18']:
-                total += dep_rates['child_under_18'][combined_rating]
+def estimate_monthly_compensation_array(
+    combined_ratings,
+    spouse=False,
+    children_under_18=0,
+    dependent_parents=0,
+    year: int = 2026
+) -> np.ndarray:
+    """
+    Vectorised estimate_monthly_compensation() for arrays of ratings.
 
-        for _ in range(min(2, dependent_parents)):  # Max 2 parents
-            if combined_rating in dep_rates['parent_one']:
-                total += dep_rates['parent_one'][combined_rating]
+    All arguments broadcast against each other (e.g. a ratings column
+    against a row of dependent configurations). Invalid ratings give 0.0.
 
-    return round(total, 2)
+    Returns:
+        Float array of monthly amounts, rounded to cents
+    """
+    ratings = np.asarray(combined_ratings, dtype=np.int64)
+    valid = (ratings >= 0) & (ratings <= 100) & (ratings % 10 == 0)
+    columns = np.where(valid, ratings // 10, 0)
+
+    y = COMPENSATION_RATE_TABLE.year_index(year)
+    if y is None:
+        rates = COMPENSATION_RATE_TABLE.rates[0].copy()
+        rates[:, 1:] = 0.0
+    else:
+        rates = COMPENSATION_RATE_TABLE.rates[y]
+
+    row = rates[columns]
+    total = (
+        row[..., 0]
+        + row[..., 1] * np.asarray(spouse, dtype=bool)
+        + row[..., 2] * np.maximum(0, np.asarray(children_under_18))
+        + row[..., 3] * np.clip(np.asarray(dependent_parents), 0, MAX_DEPENDENT_PARENTS)
+    )
+    return np.where(valid, np.round(total, 2), 0.0)
+
+
+def compensation_grid(
+    year: int = 2026,
+    configurations: Optional[Sequence[Tuple[bool, int, int]]] = None
+) -> dict:
+    """
+    Monthly compensation for every rating level under several dependent
+    configurations, in one vectorised call.
+
+    Args:
+        year: Rate year
+        configurations: (spouse, children_under_18, dependent_parents)
+            tuples; defaults to veteran alone, with spouse, and with spouse
+            and one to three children
+
+    Returns:
+        Dict with 'year', 'ratings', 'configurations' (list of dicts with a
+        display 'label'), 'amounts' (len(ratings) x len(configurations)
+        nested list) and 'rows' ([{'rating', 'amounts'}] for templates)
+    """
+    if configurations is None:
+        configurations = [(False, 0, 0), (True, 0, 0), (True, 1, 0), (True, 2, 0), (True, 3, 0)]
+
+    spouse, children, parents = (np.array(values) for values in zip(*configurations))
+    amounts = estimate_monthly_compensation_array(
+        np.array(RATING_LEVELS)[:, None],
+        spouse=spouse[None, :],
+        children_under_18=children[None, :],
+        dependent_parents=parents[None, :],
+        year=year,
+    )
+
+    amounts = amounts.tolist()
+
+    return {
+        'year': year,
+        'ratings': list(RATING_LEVELS),
+        'configurations': [
+            {
+                'spouse': bool(s),
+                'children_under_18': int(c),
+                'dependent_parents': int(p),
+                'label': _configuration_label(bool(s), int(c), int(p)),
+            }
+            for s, c, p in configurations
+        ],
+        'amounts': amounts,
+        'rows': [
+            {'rating': rating, 'amounts': row}
+            for rating, row in zip(RATING_LEVELS, amounts)
+        ],
+    }
+
+
+def _configuration_label(spouse: bool, children: int, parents: int) -> str:
+    """Short column label for a dependent configuration."""
+    parts = []
+    if spouse:
+        parts.append('Spouse')
+    if children:
+        parts.append(f"{children} child" if children == 1 else f"{children} children")
+    if parents:
+        parts.append(f"{parents} parent" if parents == 1 else f"{parents} parents")
+    return ' + '.join(parts) if parts else 'Veteran alone'
 
 
 def format_currency(amount: float) -> str:
@@ -0,0 +1,83 @@
+"""
+Buffered view counters for shared calculation pages.
+
+Page views are counted in a Redis hash (one field per share token) instead
+of an UPDATE per view. flush_shared_calculation_views moves the counts into
+SharedCalculation.view_count in bulk.
+
+Flushing claims the hash by renaming it, so views recorded while a flush
+runs go into a fresh hash. A claimed hash is only deleted after the
+database update succeeds, and a leftover one from a crashed flush is
+processed first on the next run.
+
+When the default cache isn't Redis (local development, tests) there is no
+store shared with the Celery flush, so each view is written straight to the
+database with view_count = view_count + 1 instead of being buffered.
+"""
+
+from typing import Dict
+
+from django.db.models import F
+
+from core.shared_redis import get_redis_client, redis_key
+
+PENDING_VIEWS_KEY = 'examprep:shared_views'
+CLAIMED_VIEWS_KEY = 'examprep:shared_views:flushing'
+
+
+def _decode(counts) -> Dict[str, int]:
+    return {
+        (token.decode() if isinstance(token, bytes) else token): int(count)
+        for token, count in counts.items()
+    }
+
+
+def record_view(token: str):
+    """Count one page view for a share token."""
+    client = get_redis_client()
+    if client is not None:
+        client.hincrby(redis_key(PENDING_VIEWS_KEY), token, 1)
+        return
+
+    from .models import SharedCalculation
+
+    SharedCalculation.objects.filter(share_token=token).update(view_count=F('view_count') + 1)
+    SharedCalculation.invalidate_page_cache(token)
+
+
+def pending_views(token: str) -> int:
+    """Views recorded for a token but not yet flushed to the database."""
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    pending = client.hget(redis_key(PENDING_VIEWS_KEY), token)
+    claimed = client.hget(redis_key(CLAIMED_VIEWS_KEY), token)
+    return int(pending or 0) + int(claimed or 0)
+
+
+def claim_pending_views() -> Dict[str, int]:
+    """
+    Take the buffered counts for flushing.
+
+    Returns the claimed {token: views}; call release_claimed_views() once
+    they are saved. An unreleased claim is returned again by the next call.
+    """
+    client = get_redis_client()
+    if client is None:
+        return {}
+
+    pending_key, claimed_key = redis_key(PENDING_VIEWS_KEY), redis_key(CLAIMED_VIEWS_KEY)
+    if not client.exists(claimed_key):
+        if not client.exists(pending_key):
+            return {}
+        # RENAMENX fails (0) only if another flush claimed in between
+        client.renamenx(pending_key, claimed_key)
+    return _decode(client.hgetall(claimed_key))
+
+
+def release_claimed_views():
+    """Discard counts returned by claim_pending_views() after they are saved."""
+    client = get_redis_client()
+    if client is not None:
+        client.delete(redis_key(CLAIMED_VIEWS_KEY))
@@ -7,6 +7,9 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import HttpResponse, JsonResponse
 from django.db.models import Q
+from django.core.cache import cache
+from django.urls import reverse
+from django_ratelimit.decorators import ratelimit
 
 from .models import ExamGuidance, GlossaryTerm, ExamChecklist, SavedRatingCalculation, EvidenceChecklist, SharedCalculation
 from .forms import ExamChecklistForm
@@ -17,8 +20,10 @@ from .va_math import (
     VA_COMPENSATION_RATES_2024,
     VA_COMPENSATION_RATES_BY_YEAR,
     AVAILABLE_RATE_YEARS,
+    compensation_grid,
     format_currency,
 )
+from .rating_optimizer import find_next_bracket_changes
 from .va_special_compensation import (
     SMCCondition,
     SMCLevel,
@@ -33,9 +38,11 @@ from .secondary_conditions_data import (
     get_categories,
     get_conditions_by_category,
     search_secondary_conditions,
+    suggest_conditions,
     get_conditions_count,
 )
 import json
+import secrets
 
 
 def guide_list(request):
@@ -308,6 +315,135 @@ def checklist_toggle_task(request, pk):
 # RATING CALCULATOR VIEWS
 # =============================================================================
 
+# Most scenarios accepted by one batch calculation request
+MAX_BATCH_SCENARIOS = 20
+
+# Most ratings accepted in one scenario; bounds optimizer and batch cost
+MAX_SCENARIO_RATINGS = 20
+
+# Dependent columns of the calculator's rate table: (spouse, children, parents)
+CALCULATOR_GRID_CONFIGURATIONS = [(False, 0, 0), (True, 0, 0), (True, 1, 0)]
+
+
+def _parse_rate_year(data, default_year=2024):
+    """Rate year from form data or a JSON object; unknown years use default_year."""
+    rate_year = int(data.get('rate_year', default_year))
+    if rate_year not in AVAILABLE_RATE_YEARS:
+        rate_year = default_year
+    return rate_year
+
+
+def _stored_rate_year(rate_year):
+    """
+    Rate year to store with a saved or shared estimate.
+
+    The latest year is stored blank so the estimate follows the rate table
+    when a newer year is added; an earlier year the user picked is kept.
+    """
+    return None if rate_year == AVAILABLE_RATE_YEARS[0] else rate_year
+
+
+def _parse_rating_scenario(data, default_year=2024):
+    """
+    Parse one calculator scenario from form data or a JSON object.
+
+    'ratings' may be a JSON string (form posts) or a list (JSON bodies).
+    Ratings of 0% are dropped, as in the calculator UI.
+
+    Args:
+        data: request.POST or a dict from a JSON body
+        default_year: Rate year used when none (or an unknown one) is given
+
+    Returns:
+        Dict with ratings_data, ratings (DisabilityRating list), has_spouse,
+        children, parents and rate_year
+
+    Raises:
+        json.JSONDecodeError, ValueError, TypeError or AttributeError for
+        malformed input, or more than MAX_SCENARIO_RATINGS ratings
+    """
+    ratings_data = data.get('ratings', '[]')
+    if isinstance(ratings_data, str):
+        ratings_data = json.loads(ratings_data)
+    if not isinstance(ratings_data, list):
+        raise TypeError("ratings must be a list")
+    if len(ratings_data) > MAX_SCENARIO_RATINGS:
+        raise ValueError(f"At most {MAX_SCENARIO_RATINGS} ratings per scenario")
+
+    rate_year = _parse_rate_year(data, default_year)
+
+    ratings = []
+    for r in ratings_data:
+        percentage = int(r.get('percentage', 0))
+        if percentage > 0:
+            ratings.append(DisabilityRating(
+                percentage=percentage,
+                description=r.get('description', ''),
+                is_bilateral=r.get('is_bilateral', False)
+            ))
+
+    return {
+        'ratings_data': ratings_data,
+        'ratings': ratings,
+        'has_spouse': data.get('has_spouse') in (True, 'true'),
+        'children': int(data.get('children_under_18', 0)),
+        'parents': int(data.get('dependent_parents', 0)),
+        'rate_year': rate_year,
+    }
+
+
+def _calculate_rating_scenario(scenario, include_steps=True):
+    """
+    Combined rating and monthly compensation for a parsed scenario.
+
+    Returns:
+        Tuple of (CalculationResult, monthly); the result is None when the
+        scenario has no ratings
+    """
+    if not scenario['ratings']:
+        return None, 0.0
+
+    result = calculate_combined_rating(scenario['ratings'], include_steps=include_steps)
+    monthly = estimate_monthly_compensation(
+        result.combined_rounded,
+        spouse=scenario['has_spouse'],
+        children_under_18=scenario['children'],
+        dependent_parents=scenario['parents'],
+        year=scenario['rate_year']
+    )
+    return result, monthly
+
+
+def _rating_result_data(scenario, include_steps=False):
+    """Calculator result fields shared by the HTMX partial and JSON endpoints."""
+    result, monthly = _calculate_rating_scenario(scenario, include_steps=include_steps)
+
+    if result is None:
+        data = {
+            'combined_raw': 0,
+            'combined_rounded': 0,
+            'bilateral_factor': 0,
+            'monthly_compensation': '$0.00',
+            'annual_compensation': '$0.00',
+            'has_ratings': False,
+            'rate_year': scenario['rate_year'],
+        }
+    else:
+        data = {
+            'combined_raw': round(result.combined_raw, 2),
+            'combined_rounded': result.combined_rounded,
+            'bilateral_factor': round(result.bilateral_factor_applied, 2),
+            'monthly_compensation': format_currency(monthly),
+            'annual_compensation': format_currency(monthly * 12),
+            'has_ratings': True,
+            'rate_year': scenario['rate_year'],
+        }
+
+    if include_steps:
+        data['step_by_step'] = result.step_by_step if result else []
+    return data
+
+
 def rating_calculator(request):
     """
     VA Disability Rating Calculator
@@ -325,8 +461,11 @@ def rating_calculator(request):
 
     context = {
         'compensation_rates': VA_COMPENSATION_RATES_2024,
+        'compensation_grid': compensation_grid(AVAILABLE_RATE_YEARS[0], CALCULATOR_GRID_CONFIGURATIONS),
         'compensation_rates_by_year': VA_COMPENSATION_RATES_BY_YEAR,
         'available_rate_years': AVAILABLE_RATE_YEARS,
+        'max_batch_scenarios': MAX_BATCH_SCENARIOS,
+        'max_scenario_ratings': MAX_SCENARIO_RATINGS,
         'saved_calculations': saved_calculations,
         'imported_ratings': json.dumps(imported_ratings) if imported_ratings else None,
     }
@@ -342,71 +481,12 @@ def calculate_rating_htmx(request):
         return HttpResponse(status=405)
 
     try:
-        # Parse ratings from form data
-        ratings_json = request.POST.get('ratings', '[]')
-        ratings_data = json.loads(ratings_json)
-
-        # Parse dependent info
-        has_spouse = request.POST.get('has_spouse') == 'true'
-        children = int(request.POST.get('children_under_18', 0))
-        parents = int(request.POST.get('dependent_parents', 0))
-
-        # Parse rate year (default to 2024)
-        rate_year = int(request.POST.get('rate_year', 2024))
-        if rate_year not in AVAILABLE_RATE_YEARS:
-            rate_year = 2024
-
-        # Convert to DisabilityRating objects
-        ratings = []
-        for r in ratings_data:
-            percentage = int(r.get('percentage', 0))
-            if percentage > 0:
-                ratings.append(DisabilityRating(
-                    percentage=percentage,
-                    description=r.get('description', ''),
-                    is_bilateral=r.get('is_bilateral', False)
-                ))
-
-        if not ratings:
-            context = {
-                'combined_raw': 0,
-                'combined_rounded': 0,
-                'bilateral_factor': 0,
-                'monthly_compensation': '$0.00',
-                'annual_compensation': '$0.00',
-                'step_by_step': [],
-                'ratings': [],
-                'has_ratings': False,
-                'rate_year': rate_year,
-            }
-            return render(request, 'examprep/partials/rating_result.html', context)
-
-        # Calculate combined rating
-        result = calculate_combined_rating(ratings)
-
-        # Calculate compensation using the specified year
-        monthly = estimate_monthly_compensation(
-            result.combined_rounded,
-            spouse=has_spouse,
-            children_under_18=children,
-            dependent_parents=parents,
-            year=rate_year
-        )
-
-        context = {
-            'combined_raw': round(result.combined_raw, 2),
-            'combined_rounded': result.combined_rounded,
-            'bilateral_factor': round(result.bilateral_factor_applied, 2),
-            'monthly_compensation': format_currency(monthly),
-            'annual_compensation': format_currency(monthly * 12),
-            'step_by_step': result.step_by_step,
-            'ratings': ratings_data,
-            'has_ratings': True,
-            'rate_year': rate_year,
-        }
+        scenario = _parse_rating_scenario(request.POST)
+        context = _rating_result_data(scenario, include_steps=True)
+        context['ratings'] = scenario['ratings_data'] if context['has_ratings'] else []
         return render(request, 'examprep/partials/rating_result.html', context)
 
-    except (json.JSONDecodeError, ValueError, TypeError) as e:
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
         return HttpResponse(f"Error: {str(e)}", status=400)
 
 
@@ -419,65 +499,98 @@ def calculate_rating_json(request):
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
     try:
-        # Parse ratings from form data
-        ratings_json = request.POST.get('ratings', '[]')
-        ratings_data = json.loads(ratings_json)
+        scenario = _parse_rating_scenario(request.POST)
+        return JsonResponse(_rating_result_data(scenario))
 
-        # Parse dependent info
-        has_spouse = request.POST.get('has_spouse') == 'true'
-        children = int(request.POST.get('children_under_18', 0))
-        parents = int(request.POST.get('dependent_parents', 0))
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-        # Parse rate year (default to 2024)
-        rate_year = int(request.POST.get('rate_year', 2024))
-        if rate_year not in AVAILABLE_RATE_YEARS:
-            rate_year = 2024
-
-        # Convert to DisabilityRating objects
-        ratings = []
-        for r in ratings_data:
-            percentage = int(r.get('percentage', 0))
-            if percentage > 0:
-                ratings.append(DisabilityRating(
-                    percentage=percentage,
-                    description=r.get('description', ''),
-                    is_bilateral=r.get('is_bilateral', False)
-                ))
 
-        if not ratings:
-            return JsonResponse({
-                'combined_raw': 0,
-                'combined_rounded': 0,
-                'bilateral_factor': 0,
-                'monthly_compensation': '$0.00',
-                'annual_compensation': '$0.00',
-                'has_ratings': False,
-                'rate_year': rate_year,
-            })
+@ratelimit(key='user_or_ip', rate='60/m', method='POST', block=True)
+def calculate_ratings_batch_json(request):
+    """
+    JSON endpoint calculating several Compare Scenarios in one request.
 
-        # Calculate combined rating
-        result = calculate_combined_rating(ratings)
+    Accepts a JSON body (or a 'scenarios' form field) of the form
+    {"scenarios": [{"ratings": [...], "has_spouse": true,
+    "children_under_18": 0, "dependent_parents": 0, "rate_year": 2026}, ...]}
+    and returns {"results": [...]} in the same order, each shaped like the
+    calculate_rating_json response.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
 
-        # Calculate compensation using the specified year
-        monthly = estimate_monthly_compensation(
-            result.combined_rounded,
-            spouse=has_spouse,
-            children_under_18=children,
-            dependent_parents=parents,
-            year=rate_year
-        )
+    try:
+        if request.content_type == 'application/json':
+            payload = json.loads(request.body or b'{}')
+            scenarios_data = payload.get('scenarios', [])
+        else:
+            scenarios_data = json.loads(request.POST.get('scenarios', '[]'))
+
+        if not isinstance(scenarios_data, list):
+            raise TypeError("scenarios must be a list")
+        if len(scenarios_data) > MAX_BATCH_SCENARIOS:
+            return JsonResponse(
+                {'error': f'At most {MAX_BATCH_SCENARIOS} scenarios per request'},
+                status=400
+            )
 
-        return JsonResponse({
-            'combined_raw': round(result.combined_raw, 2),
-            'combined_rounded': result.combined_rounded,
-            'bilateral_factor': round(result.bilateral_factor_applied, 2),
-            'monthly_compensation': format_currency(monthly),
-            'annual_compensation': format_currency(monthly * 12),
-            'has_ratings': True,
-            'rate_year': rate_year,
-        })
+        results = []
+        for index, scenario_data in enumerate(scenarios_data):
+            try:
+                scenario = _parse_rating_scenario(scenario_data)
+            except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
+                return JsonResponse({'error': f'Scenario {index + 1}: {str(e)}'}, status=400)
+            results.append(_rating_result_data(scenario))
 
-    except (json.JSONDecodeError, ValueError, TypeError) as e:
+        return JsonResponse({'results': results})
+
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@ratelimit(key='user_or_ip', rate='30/m', method='POST', block=True)
+def next_bracket_json(request):
+    """
+    JSON endpoint for the "Next 10%" optimizer.
+    Returns the smallest changes (one level increase, new condition, or
+    bilateral toggle) that lift the combined rating into each higher bracket.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        scenario = _parse_rating_scenario(request.POST)
+
+        # Combinations of two changes are opt-in (many more candidates)
+        max_changes = 2 if request.POST.get('max_changes') == '2' else 1
+
+        result = find_next_bracket_changes(scenario['ratings'], max_changes=max_changes)
+
+        def monthly_for(rating):
+            return estimate_monthly_compensation(
+                rating,
+                spouse=scenario['has_spouse'],
+                children_under_18=scenario['children'],
+                dependent_parents=scenario['parents'],
+                year=scenario['rate_year']
+            )
+
+        current_monthly = monthly_for(result.current_rounded)
+        data = result.to_dict()
+        data['rate_year'] = scenario['rate_year']
+        data['monthly_compensation'] = format_currency(current_monthly)
+        for bracket, options in data['brackets'].items():
+            monthly = monthly_for(int(bracket))
+            data['brackets'][bracket] = {
+                'monthly_compensation': format_currency(monthly),
+                'monthly_increase': format_currency(monthly - current_monthly),
+                'options': options,
+            }
+
+        return JsonResponse(data)
+
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
         return JsonResponse({'error': str(e)}, status=400)
 
 
@@ -515,6 +628,7 @@ def save_calculation(request):
         has_spouse = request.POST.get('has_spouse') == 'true'
         children = int(request.POST.get('children_under_18', 0))
         parents = int(request.POST.get('dependent_parents', 0))
+        rate_year = _parse_rate_year(request.POST, default_year=AVAILABLE_RATE_YEARS[0])
         notes = request.POST.get('notes', '')
 
         # Create saved calculation
@@ -525,6 +639,7 @@ def save_calculation(request):
             has_spouse=has_spouse,
             children_under_18=children,
             dependent_parents=parents,
+            rate_year=_stored_rate_year(rate_year),
             notes=notes
         )
 
@@ -605,6 +720,7 @@ def load_calculation(request, pk):
         'has_spouse': calc.has_spouse,
         'children_under_18': calc.children_under_18,
         'dependent_parents': calc.dependent_parents,
+        'rate_year': calc.rate_year or AVAILABLE_RATE_YEARS[0],
         'name': calc.name,
         'notes': calc.notes,
     })
@@ -1079,6 +1195,22 @@ def secondary_conditions_search(request):
     return render(request, 'examprep/partials/secondary_conditions_results.html', context)
 
 
+def secondary_conditions_suggest(request):
+    """
+    HTMX endpoint for typeahead suggestions in the hub search box.
+    """
+    query = request.GET.get('q', '').strip()
+
+    if len(query) < 2:
+        return HttpResponse('')
+
+    context = {
+        'suggestions': suggest_conditions(query),
+        'query': query,
+    }
+    return render(request, 'examprep/partials/secondary_conditions_suggestions.html', context)
+
+
 # =============================================================================
 # PDF EXPORT VIEWS
 # =============================================================================
@@ -1094,53 +1226,34 @@ def export_rating_pdf(request):
     try:
         from .services.pdf_generator import generate_rating_pdf
 
-        # Parse ratings from form data
-        ratings_json = request.POST.get('ratings', '[]')
-        ratings_data = json.loads(ratings_json)
-
-        # Parse dependent info
-        has_spouse = request.POST.get('has_spouse') == 'true'
-        children = int(request.POST.get('children_under_18', 0))
-        parents = int(request.POST.get('dependent_parents', 0))
+        # PDFs use the current rate year unless one is sent
+        scenario = _parse_rating_scenario(request.POST, default_year=AVAILABLE_RATE_YEARS[0])
+        result, monthly = _calculate_rating_scenario(scenario)
 
-        # Convert to DisabilityRating objects and calculate
-        ratings = []
-        for r in ratings_data:
-            percentage = int(r.get('percentage', 0))
-            if percentage > 0:
-                ratings.append(DisabilityRating(
-                    percentage=percentage,
-                    description=r.get('description', ''),
-                    is_bilateral=r.get('is_bilateral', False)
-                ))
-
-        if not ratings:
+        if result is None:
             return HttpResponse("No ratings to export", status=400)
 
-        # Calculate combined rating
-        result = calculate_combined_rating(ratings)
-
-        # Calculate compensation
-        monthly = estimate_monthly_compensation(
-            result.combined_rounded,
-            spouse=has_spouse,
-            children_under_18=children,
-            dependent_parents=parents
-        )
+        # Rate grid for the veteran alone and with their own dependents
+        configurations = [(False, 0, 0)]
+        own = (scenario['has_spouse'], scenario['children'], scenario['parents'])
+        if own != (False, 0, 0):
+            configurations.append(own)
 
         # Generate PDF
         pdf_bytes = generate_rating_pdf(
-            ratings=ratings_data,
+            ratings=scenario['ratings_data'],
             combined_raw=round(result.combined_raw, 2),
             combined_rounded=result.combined_rounded,
             bilateral_factor=round(result.bilateral_factor_applied, 2),
             monthly_compensation=format_currency(monthly),
             annual_compensation=format_currency(monthly * 12),
             step_by_step=result.step_by_step,
-            has_spouse=has_spouse,
-            children_under_18=children,
-            dependent_parents=parents,
+            has_spouse=scenario['has_spouse'],
+            children_under_18=scenario['children'],
+            dependent_parents=scenario['parents'],
             calculation_name=request.POST.get('name', 'VA Rating Calculation'),
+            compensation_grid=compensation_grid(scenario['rate_year'], configurations),
+            rate_year=scenario['rate_year'],
         )
 
         # Create response
@@ -1148,7 +1261,7 @@ def export_rating_pdf(request):
         response['Content-Disposition'] = 'attachment; filename="va-rating-calculation.pdf"'
         return response
 
-    except (json.JSONDecodeError, ValueError, TypeError) as e:
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
         return HttpResponse(f"Error generating PDF: {str(e)}", status=400)
     except Exception as e:
         return HttpResponse(f"Error generating PDF: {str(e)}", status=500)
@@ -1167,39 +1280,10 @@ def export_saved_rating_pdf(request, pk):
     )
 
     try:
-        from .services.pdf_generator import generate_rating_pdf
+        from .services.pdf_generator import generate_rating_pdf, saved_calculation_pdf_data
 
-        # Recalculate to get step_by_step data
-        ratings = []
-        for r in calculation.ratings:
-            percentage = int(r.get('percentage', 0))
-            if percentage > 0:
-                ratings.append(DisabilityRating(
-                    percentage=percentage,
-                    description=r.get('description', ''),
-                    is_bilateral=r.get('is_bilateral', False)
-                ))
-
-        if ratings:
-            result = calculate_combined_rating(ratings)
-            step_by_step = result.step_by_step
-        else:
-            step_by_step = []
-
-        # Generate PDF
-        pdf_bytes = generate_rating_pdf(
-            ratings=calculation.ratings,
-            combined_raw=calculation.combined_raw,
-            combined_rounded=calculation.combined_rounded,
-            bilateral_factor=calculation.bilateral_factor,
-            monthly_compensation=format_currency(calculation.estimated_monthly),
-            annual_compensation=format_currency(calculation.estimated_monthly * 12),
-            step_by_step=step_by_step,
-            has_spouse=calculation.has_spouse,
-            children_under_18=calculation.children_under_18,
-            dependent_parents=calculation.dependent_parents,
-            calculation_name=calculation.name,
-        )
+        # Step-by-step data is recalculated; identical documents come from the PDF cache
+        pdf_bytes = generate_rating_pdf(**saved_calculation_pdf_data(calculation))
 
         # Create response
         filename = f"va-rating-{calculation.name.lower().replace(' ', '-')}.pdf"
@@ -1212,6 +1296,104 @@ def export_saved_rating_pdf(request, pk):
         return redirect('examprep:rating_calculator')
 
 
+# Exports with more saved calculations than this render in Celery
+PDF_SYNC_MAX_CALCULATIONS = 3
+
+
+@login_required
+def export_saved_calculations_pdf(request):
+    """
+    Export several saved calculations as one PDF.
+
+    POST with optional 'ids' (defaults to all of the user's calculations).
+    Small exports are returned directly; larger ones are rendered in the
+    background and return 202 with a status URL, and the user is emailed
+    when the download is ready.
+    """
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+
+    from .services.pdf_generator import generate_multi_rating_pdf, saved_calculation_pdf_data
+    from .tasks import PDF_EXPORT_JOB_TIMEOUT, pdf_export_job_key, render_saved_calculations_pdf
+
+    calculations = SavedRatingCalculation.objects.filter(user=request.user).order_by('-updated_at')
+    ids = request.POST.getlist('ids')
+    if ids:
+        try:
+            calculations = calculations.filter(pk__in=[int(pk) for pk in ids])
+        except ValueError:
+            return JsonResponse({'error': 'Invalid calculation IDs'}, status=400)
+    calculations = list(calculations)
+
+    if not calculations:
+        return JsonResponse({'error': 'No saved calculations to export'}, status=400)
+
+    if len(calculations) <= PDF_SYNC_MAX_CALCULATIONS:
+        pdf_bytes = generate_multi_rating_pdf([saved_calculation_pdf_data(c) for c in calculations])
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename="va-rating-calculations.pdf"'
+        return response
+
+    job_id = secrets.token_urlsafe(16)
+    cache.set(
+        pdf_export_job_key(job_id),
+        {'user_id': request.user.id, 'status': 'pending'},
+        PDF_EXPORT_JOB_TIMEOUT,
+    )
+    render_saved_calculations_pdf.delay(job_id, request.user.id, [c.pk for c in calculations])
+
+    return JsonResponse({
+        'job_id': job_id,
+        'status': 'pending',
+        'status_url': reverse('examprep:pdf_export_status', kwargs={'job_id': job_id}),
+    }, status=202)
+
+
+def _get_pdf_export_job(request, job_id):
+    """Export job record if it exists and belongs to the requesting user."""
+    from .tasks import pdf_export_job_key
+
+    job = cache.get(pdf_export_job_key(job_id))
+    if not job or job.get('user_id') != request.user.id:
+        return None
+    return job
+
+
+@login_required
+def pdf_export_status(request, job_id):
+    """
+    Status of a background PDF export, polled by the saved calculations page.
+    """
+    job = _get_pdf_export_job(request, job_id)
+    if job is None:
+        return JsonResponse({'error': 'Export not found'}, status=404)
+
+    data = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'ready':
+        data['download_url'] = reverse('examprep:download_pdf_export', kwargs={'job_id': job_id})
+    return JsonResponse(data)
+
+
+@login_required
+def download_pdf_export(request, job_id):
+    """
+    Download a finished background PDF export.
+    """
+    from .tasks import pdf_export_file_key
+
+    job = _get_pdf_export_job(request, job_id)
+    if job is None or job['status'] != 'ready':
+        return HttpResponse("Export not found", status=404)
+
+    pdf_bytes = cache.get(pdf_export_file_key(job_id))
+    if pdf_bytes is None:
+        return HttpResponse("This export has expired. Please export again.", status=410)
+
+    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response['Content-Disposition'] = 'attachment; filename="va-rating-calculations.pdf"'
+    return response
+
+
 # =============================================================================
 # SHARE CALCULATION VIEWS
 # =============================================================================
@@ -1226,55 +1408,31 @@ def share_calculation(request):
         return HttpResponse(status=405)
 
     try:
-        # Parse ratings from form data
-        ratings_json = request.POST.get('ratings', '[]')
-        ratings_data = json.loads(ratings_json)
-
-        # Parse dependent info
-        has_spouse = request.POST.get('has_spouse') == 'true'
-        children = int(request.POST.get('children_under_18', 0))
-        parents = int(request.POST.get('dependent_parents', 0))
+        # Shares use the current rate year unless one is sent
+        scenario = _parse_rating_scenario(request.POST, default_year=AVAILABLE_RATE_YEARS[0])
         name = request.POST.get('name', 'Shared VA Rating Calculation')
 
-        # Convert to DisabilityRating objects and calculate
-        ratings = []
-        for r in ratings_data:
-            percentage = int(r.get('percentage', 0))
-            if percentage > 0:
-                ratings.append(DisabilityRating(
-                    percentage=percentage,
-                    description=r.get('description', ''),
-                    is_bilateral=r.get('is_bilateral', False)
-                ))
+        result, monthly = _calculate_rating_scenario(scenario)
 
-        if not ratings:
+        if result is None:
             return JsonResponse({'error': 'No ratings to share'}, status=400)
 
-        # Calculate combined rating
-        result = calculate_combined_rating(ratings)
-
-        # Calculate compensation
-        monthly = estimate_monthly_compensation(
-            result.combined_rounded,
-            spouse=has_spouse,
-            children_under_18=children,
-            dependent_parents=parents
-        )
-
         # Create shared calculation
         user = request.user if request.user.is_authenticated else None
         shared = SharedCalculation.create_from_data(
-            ratings=ratings_data,
+            ratings=scenario['ratings_data'],
             combined_raw=round(result.combined_raw, 2),
             combined_rounded=result.combined_rounded,
             bilateral_factor=round(result.bilateral_factor_applied, 2),
             estimated_monthly=monthly,
-            has_spouse=has_spouse,
-            children_under_18=children,
-            dependent_parents=parents,
+            has_spouse=scenario['has_spouse'],
+            children_under_18=scenario['children'],
+            dependent_parents=scenario['parents'],
             name=name,
             user=user,
             expires_in_days=30,
+            rate_year=_stored_rate_year(scenario['rate_year']),
+            step_by_step=result.step_by_step,
         )
 
         # Build the share URL
@@ -1287,7 +1445,7 @@ def share_calculation(request):
             'expires_in_days': 30,
         })
 
-    except (json.JSONDecodeError, ValueError, TypeError) as e:
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
         return JsonResponse({'error': f'Invalid data: {str(e)}'}, status=400)
     except Exception as e:
         return JsonResponse({'error': f'Error creating share link: {str(e)}'}, status=500)
@@ -1335,6 +1493,8 @@ def share_saved_calculation(request, pk):
         user=request.user,
         saved_calculation=calculation,
         expires_in_days=None,  # Saved calculation shares don't expire
+        rate_table_version=calculation.rate_table_version,
+        rate_year=calculation.rate_year,
     )
 
     share_url = request.build_absolute_uri(shared.get_absolute_url())
@@ -1347,58 +1507,102 @@ def share_saved_calculation(request, pk):
     })
 
 
+# Shared page data stays cached until the row changes or views are flushed
+SHARED_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Unknown tokens are cached briefly so link scanners don't hit the database
+SHARED_PAGE_MISSING_TIMEOUT = 5 * 60
+
+
+def _get_shared_page_data(token):
+    """
+    Cached SharedCalculation.page_data() for a token, or None if it doesn't exist.
+    """
+    key = SharedCalculation.page_cache_key(token)
+    data = cache.get(key)
+    if data is not None:
+        return data or None
+
+    shared = SharedCalculation.objects.filter(share_token=token).first()
+    if shared is None:
+        cache.set(key, {}, SHARED_PAGE_MISSING_TIMEOUT)
+        return None
+
+    data = shared.page_data()
+    cache.set(key, data, SHARED_PAGE_CACHE_TIMEOUT)
+    return data
+
+
 def view_shared_calculation(request, token):
     """
     View a shared calculation by its token.
     Public view - no login required.
+
+    Served from a per-token cache entry with ETag/Last-Modified, and views
+    are counted in buffered counters (see examprep.view_counters), so a
+    repeat view makes no database queries or writes.
     """
-    shared = get_object_or_404(SharedCalculation, share_token=token)
+    from django.http import Http404
+    from django.utils import timezone
+    from django.utils.cache import get_conditional_response
+    from django.utils.http import http_date
+    from .view_counters import pending_views, record_view
+
+    page = _get_shared_page_data(token)
+    if page is None:
+        raise Http404("Shared calculation not found")
 
     # Check if expired
-    if shared.is_expired:
+    if page['expires_at'] and timezone.now() > page['expires_at']:
         return render(request, 'examprep/shared_calculation_expired.html', {
             'expired': True,
         })
 
-    # Increment view count (only once per session)
+    # Count the view (only once per session)
     session_key = f'viewed_share_{token}'
     if not request.session.get(session_key):
-        shared.increment_views()
+        record_view(token)
         request.session[session_key] = True
-
-    # Recalculate step-by-step for display
-    ratings = []
-    for r in shared.ratings:
-        percentage = int(r.get('percentage', 0))
-        if percentage > 0:
-            ratings.append(DisabilityRating(
-                percentage=percentage,
-                description=r.get('description', ''),
-                is_bilateral=r.get('is_bilateral', False)
-            ))
-
-    step_by_step = []
-    if ratings:
-        result = calculate_combined_rating(ratings)
-        step_by_step = result.step_by_step
+        # Without Redis the view is written straight away and the cached page dropped
+        page = _get_shared_page_data(token) or page
+
+    # The page shows the view count, so the ETag covers it as well as the
+    # calculation; a 304 never leaves the browser showing a stale count.
+    # (updated_at doesn't change when views are flushed, so Last-Modified is
+    # sent for information but not used to validate.)
+    view_count = page['view_count'] + pending_views(token)
+    etag = f'W/"{page["content_digest"]}-{view_count}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    shared = {
+        'name': page['name'],
+        'created_at': page['created_at'],
+        'combined_rounded': page['combined_rounded'],
+        'view_count': view_count,
+    }
 
     context = {
         'shared': shared,
-        'ratings': shared.ratings,
-        'combined_raw': shared.combined_raw,
-        'combined_rounded': shared.combined_rounded,
-        'bilateral_factor': shared.bilateral_factor,
-        'monthly_compensation': format_currency(shared.estimated_monthly),
-        'annual_compensation': format_currency(shared.estimated_monthly * 12),
-        'has_spouse': shared.has_spouse,
-        'children_under_18': shared.children_under_18,
-        'dependent_parents': shared.dependent_parents,
-        'step_by_step': step_by_step,
+        'ratings': page['ratings'],
+        'combined_raw': page['combined_raw'],
+        'combined_rounded': page['combined_rounded'],
+        'bilateral_factor': page['bilateral_factor'],
+        'monthly_compensation': format_currency(page['estimated_monthly']),
+        'annual_compensation': format_currency(page['estimated_monthly'] * 12),
+        'has_spouse': page['has_spouse'],
+        'children_under_18': page['children_under_18'],
+        'dependent_parents': page['dependent_parents'],
+        'step_by_step': page['step_by_step'],
         'share_url': request.build_absolute_uri(),
-        'has_ratings': bool(ratings),
+        'has_ratings': page['has_ratings'],
     }
 
-    return render(request, 'examprep/shared_calculation.html', context)
+    response = render(request, 'examprep/shared_calculation.html', context)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(int(page['updated_at'].timestamp()))
+    return response
 
 
 # =============================================================================
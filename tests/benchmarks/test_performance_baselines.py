@@ -138,6 +138,33 @@ startxref
         print(f"\nDocument list page load: {results['mean']*1000:.2f}ms (mean)")
         assert results['mean'] < 0.5, f"Document list load too slow: {results['mean']}s"
 
+    def test_document_list_500_documents(self, authenticated_client, benchmark_user):
+        """Measure the document list with 500 analysed documents (encrypted ai_summary)."""
+        from claims.models import Document
+
+        summary = {
+            'summary': 'Service treatment records show in-service knee injury. ' * 20,
+            'key_findings': [f'Finding {i}' for i in range(20)],
+        }
+        for i in range(500):
+            Document.objects.create(
+                user=benchmark_user,
+                file_name=f'analysed_{i}.pdf',
+                document_type='medical_records',
+                status='completed',
+                ai_summary=summary,
+            )
+
+        def load_list():
+            response = authenticated_client.get(reverse('claims:document_list'))
+            assert response.status_code == 200
+
+        results = benchmark(load_list)
+        record_benchmark('document_list_500_documents', results['mean'])
+
+        print(f"\nDocument list page load (500 documents): {results['mean']*1000:.2f}ms (mean)")
+        assert results['mean'] < 2.0, f"Document list with 500 documents too slow: {results['mean']}s"
+
 
 # =============================================================================
 # Agent View Benchmarks
@@ -289,3 +316,354 @@ class TestExamPrepPerformance:
 
         print(f"\nGlossary list page load: {results['mean']*1000:.2f}ms (mean)")
         assert results['mean'] < 0.5, f"Glossary list load too slow: {results['mean']}s"
+
+    def test_calculate_rating_p99(self):
+        """Measure p99 latency of the HTMX calculator endpoint while typing."""
+        import json
+        from django.test import Client
+        client = Client()
+
+        # Each request re-sends the whole list, as the calculator does per keystroke
+        scenarios = [
+            [{'percentage': 70, 'description': 'PTSD'}],
+            [{'percentage': 70, 'description': 'PTSD'}, {'percentage': 30, 'description': 'Back'}],
+            [{'percentage': 70, 'description': 'PTSD'}, {'percentage': 30, 'description': 'Back'},
+             {'percentage': 20, 'description': 'Left knee', 'is_bilateral': True}],
+            [{'percentage': 70, 'description': 'PTSD'}, {'percentage': 30, 'description': 'Back'},
+             {'percentage': 20, 'description': 'Left knee', 'is_bilateral': True},
+             {'percentage': 10, 'description': 'Right knee', 'is_bilateral': True}],
+            [{'percentage': 70, 'description': 'PTSD'}, {'percentage': 30, 'description': 'Back'},
+             {'percentage': 20, 'description': 'Left knee', 'is_bilateral': True},
+             {'percentage': 10, 'description': 'Right knee', 'is_bilateral': True},
+             {'percentage': 10, 'description': 'Tinnitus'}],
+        ]
+        payloads = [
+            {
+                'ratings': json.dumps(ratings),
+                'has_spouse': 'true',
+                'children_under_18': '1',
+                'dependent_parents': '0',
+                'rate_year': '2026',
+            }
+            for ratings in scenarios
+        ]
+
+        for payload in payloads:  # warm-up
+            client.post('/exam-prep/rating-calculator/calculate/', payload)
+
+        times = []
+        for i in range(300):
+            start = time.perf_counter()
+            response = client.post('/exam-prep/rating-calculator/calculate/', payloads[i % len(payloads)])
+            times.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+        times.sort()
+        p99 = times[int(len(times) * 0.99) - 1]
+        record_benchmark('rating_calculator_calculate_p99', p99)
+
+        print(f"\nRating calculator calculate: {mean(times)*1000:.2f}ms (mean), {p99*1000:.2f}ms (p99)")
+        assert p99 < 0.25, f"Rating calculator p99 too slow: {p99}s"
+
+    def test_rating_pdf_render(self):
+        """Measure rating PDF render time, uncached vs. served from the PDF cache."""
+        from django.core.cache import cache
+        from examprep.services.pdf_generator import generate_rating_pdf
+        from examprep.va_math import DisabilityRating, calculate_combined_rating, compensation_grid
+
+        ratings = [
+            {'percentage': 70, 'description': 'PTSD', 'is_bilateral': False},
+            {'percentage': 30, 'description': 'Left knee', 'is_bilateral': True},
+            {'percentage': 20, 'description': 'Right knee', 'is_bilateral': True},
+            {'percentage': 10, 'description': 'Tinnitus', 'is_bilateral': False},
+        ]
+        result = calculate_combined_rating([
+            DisabilityRating(r['percentage'], r['description'], r['is_bilateral']) for r in ratings
+        ])
+        kwargs = dict(
+            ratings=ratings,
+            combined_raw=round(result.combined_raw, 2),
+            combined_rounded=result.combined_rounded,
+            bilateral_factor=round(result.bilateral_factor_applied, 2),
+            monthly_compensation='$2,000.00',
+            annual_compensation='$24,000.00',
+            step_by_step=result.step_by_step,
+            has_spouse=True,
+            children_under_18=2,
+            compensation_grid=compensation_grid(),
+        )
+
+        uncached = benchmark(lambda: generate_rating_pdf(**kwargs, use_cache=False), iterations=10)
+        cache.clear()
+        generate_rating_pdf(**kwargs)
+        cached = benchmark(lambda: generate_rating_pdf(**kwargs), iterations=50)
+        record_benchmark('rating_pdf_render_uncached', uncached['mean'])
+        record_benchmark('rating_pdf_render_cached', cached['mean'])
+
+        print(f"\nRating PDF render: {uncached['mean']*1000:.2f}ms (uncached), "
+              f"{cached['mean']*1000:.3f}ms (cached)")
+        assert uncached['mean'] < 1.0, f"Rating PDF render too slow: {uncached['mean']}s"
+        assert cached['mean'] < uncached['mean'], "Cached PDF should be faster than rendering"
+
+
+# =============================================================================
+# VA Math Benchmarks
+# =============================================================================
+
+class TestVAMathPerformance:
+    """Benchmark combined-rating calculations over many scenarios."""
+
+    def test_combined_ratings_batch_100k(self):
+        """Measure the vectorised batch calculator over 100k scenarios."""
+        import numpy as np
+        from examprep.va_math import BATCH_PAD, calculate_combined_ratings_batch
+
+        rng = np.random.default_rng(0)
+        ratings = rng.integers(0, 11, size=(100_000, 8)) * 10
+        counts = rng.integers(1, 9, size=100_000)
+        ratings[np.arange(8) >= counts[:, None]] = BATCH_PAD
+        bilateral = rng.random(ratings.shape) < 0.2
+
+        results = benchmark(lambda: calculate_combined_ratings_batch(ratings, bilateral), iterations=3)
+        record_benchmark('va_math_batch_100k_scenarios', results['mean'])
+
+        print(f"\nCombined ratings batch (100k scenarios): {results['mean']*1000:.2f}ms (mean)")
+        assert results['mean'] < 1.0, f"Batch combined ratings too slow: {results['mean']}s"
+
+    def test_combined_rating_p99(self):
+        """Measure p99 latency of a single combined-rating calculation."""
+        from examprep.va_math import DisabilityRating, calculate_combined_rating
+
+        scenarios = [
+            [DisabilityRating(70)],
+            [DisabilityRating(70), DisabilityRating(30)],
+            [DisabilityRating(70), DisabilityRating(30), DisabilityRating(20, is_bilateral=True)],
+            [DisabilityRating(70), DisabilityRating(30), DisabilityRating(20, is_bilateral=True),
+             DisabilityRating(10, is_bilateral=True)],
+            [DisabilityRating(70), DisabilityRating(30), DisabilityRating(20, is_bilateral=True),
+             DisabilityRating(10, is_bilateral=True), DisabilityRating(10)],
+        ]
+
+        times = []
+        for i in range(20000):
+            start = time.perf_counter()
+            calculate_combined_rating(scenarios[i % len(scenarios)])
+            times.append(time.perf_counter() - start)
+
+        times.sort()
+        p99 = times[int(len(times) * 0.99) - 1]
+        record_benchmark('va_math_combined_rating_p99', p99)
+
+        print(f"\nCombined rating: {mean(times)*1e6:.1f}us (mean), {p99*1e6:.1f}us (p99)")
+        assert p99 < 0.001, f"Combined rating p99 too slow: {p99}s"
+
+    def test_compensation_grid_all_years(self):
+        """Measure full rating x dependent-configuration grids for every rate year."""
+        from examprep.va_math import AVAILABLE_RATE_YEARS, compensation_grid
+
+        configurations = [
+            (spouse, children, parents)
+            for spouse in (False, True)
+            for children in range(4)
+            for parents in range(3)
+        ]
+
+        results = benchmark(
+            lambda: [compensation_grid(year, configurations) for year in AVAILABLE_RATE_YEARS],
+            iterations=50,
+        )
+        record_benchmark('va_math_compensation_grid_all_years', results['mean'])
+
+        print(f"\nCompensation grids ({len(AVAILABLE_RATE_YEARS)} years x 24 configs): "
+              f"{results['mean']*1000:.2f}ms (mean)")
+        assert results['mean'] < 0.05, f"Compensation grids too slow: {results['mean']}s"
+
+    def test_rate_recalculation_10k_rows(self):
+        """Measure in-memory recalculation of 10k stored calculations (no DB I/O)."""
+        import random
+        from examprep.models import SavedRatingCalculation
+        from examprep.tasks import _recalculate_rows
+
+        rng = random.Random(0)
+        rows = [
+            SavedRatingCalculation(
+                pk=i + 1,
+                ratings=[
+                    {'percentage': rng.randrange(0, 101, 10), 'is_bilateral': rng.random() < 0.2}
+                    for _ in range(rng.randint(1, 8))
+                ],
+                has_spouse=rng.random() < 0.5,
+                children_under_18=rng.randint(0, 3),
+                dependent_parents=rng.randint(0, 2),
+            )
+            for i in range(10_000)
+        ]
+
+        results = benchmark(lambda: _recalculate_rows(rows, 'bench'), iterations=5)
+        record_benchmark('examprep_rate_recalc_10k_rows', results['mean'])
+
+        print(f"\nRate recalculation (10k rows): {results['mean']*1000:.2f}ms (mean)")
+        assert results['mean'] < 2.0, f"Rate recalculation too slow: {results['mean']}s"
+
+
+# =============================================================================
+# Secondary Conditions Benchmarks
+# =============================================================================
+
+class TestSecondaryConditionsPerformance:
+    """Benchmarks for the secondary conditions lookup indexes."""
+
+    def test_typeahead_search_all_prefixes(self):
+        """Measure uncached ranked search for every prefix of every condition name."""
+        from examprep.secondary_conditions_data import (
+            SECONDARY_CONDITIONS_INDEX,
+            _tokenize,
+        )
+
+        names = list(SECONDARY_CONDITIONS_INDEX.entry_names.values())
+        queries = sorted({
+            tuple(_tokenize(name[:end]))
+            for name in names
+            for end in range(2, len(name) + 1)
+        } - {()})
+
+        results = benchmark(
+            lambda: [SECONDARY_CONDITIONS_INDEX.search(terms) for terms in queries],
+            iterations=10,
+        )
+        per_query = results['mean'] / len(queries)
+        record_benchmark('secondary_conditions_typeahead_search', per_query)
+
+        print(f"\nSecondary conditions search ({len(queries)} typeahead queries): "
+              f"{per_query*1_000_000:.1f}us per query (mean)")
+        assert per_query < 0.001, f"Secondary conditions search too slow: {per_query}s"
+
+    def test_primary_and_category_lookups(self):
+        """Measure detail-page and category lookups."""
+        from examprep.secondary_conditions_data import (
+            SECONDARY_CONDITIONS_DATA,
+            get_categories,
+            get_conditions_by_category,
+            get_primary_condition,
+        )
+
+        names = [c['condition'] for c in SECONDARY_CONDITIONS_DATA]
+
+        def lookups():
+            for _ in range(1000):
+                for name in names:
+                    get_primary_condition(name)
+                for category in get_categories():
+                    get_conditions_by_category(category)
+
+        results = benchmark(lookups, iterations=5)
+        record_benchmark('secondary_conditions_lookups_1k', results['mean'])
+
+        print(f"\nSecondary conditions lookups (1k rounds): {results['mean']*1000:.2f}ms (mean)")
+        assert results['mean'] < 0.1, f"Secondary conditions lookups too slow: {results['mean']}s"
+
+
+# =============================================================================
+# Field Encryption Benchmarks
+# =============================================================================
+
+ENCRYPTION_OPERATIONS = 100_000
+
+
+class TestFieldEncryptionPerformance:
+    """Benchmarks for field-level encryption (core.encryption)."""
+
+    def test_encrypt_decrypt_100k(self):
+        """Measure 100k single-value encrypt + decrypt round trips."""
+        from core.encryption import FieldEncryption
+
+        values = [f'C-{i:08d}' for i in range(1000)]
+        rounds = ENCRYPTION_OPERATIONS // len(values)
+
+        def round_trips():
+            for _ in range(rounds):
+                for value in values:
+                    FieldEncryption.decrypt(FieldEncryption.encrypt(value))
+
+        results = benchmark(round_trips, iterations=1)
+        per_op = results['mean'] / (ENCRYPTION_OPERATIONS * 2)
+        record_benchmark('field_encryption_round_trip_100k', results['mean'])
+
+        print(f"\nField encryption (100k encrypt + 100k decrypt): {results['mean']:.2f}s "
+              f"({per_op*1_000_000:.1f}us per operation)")
+        assert per_op < 0.0002, f"Field encryption too slow: {per_op}s per operation"
+
+    def test_encrypt_many_decrypt_many_100k(self):
+        """Measure the bulk helpers over 100k values."""
+        from core.encryption import FieldEncryption
+
+        values = [f'C-{i:08d}' for i in range(ENCRYPTION_OPERATIONS)]
+
+        results = benchmark(
+            lambda: FieldEncryption.decrypt_many(FieldEncryption.encrypt_many(values)),
+            iterations=1,
+        )
+        per_op = results['mean'] / (ENCRYPTION_OPERATIONS * 2)
+        record_benchmark('field_encryption_bulk_100k', results['mean'])
+
+        print(f"\nField encryption bulk (100k encrypt_many + decrypt_many): {results['mean']:.2f}s "
+              f"({per_op*1_000_000:.1f}us per operation)")
+        assert per_op < 0.0002, f"Bulk field encryption too slow: {per_op}s per operation"
+
+
+# =============================================================================
+# M21 Task Benchmarks
+# =============================================================================
+
+M21_FIXTURE_SECTIONS = 5000
+
+
+@pytest.fixture
+def m21_sections(db):
+    """Seed a 5k-section M21 corpus with a realistic keyword mix."""
+    from agents.models import M21ManualSection
+
+    phrases = [
+        'Establishing service connection requires a nexus between the disability and service.',
+        'The rating activity assigns an evaluation under the appropriate diagnostic code.',
+        'Weighing evidence includes lay evidence and buddy statement credibility.',
+        'Request a C&P examination and a medical opinion from the examiner.',
+        'The effective date is generally the date of claim.',
+        'TDIU applies when the Veteran is unable to secure substantially gainful employment.',
+        'Special monthly compensation covers aid and attendance and housebound rates.',
+        'General administrative procedures for claims processing.',
+    ]
+    filler = ' '.join(['Routine procedural text for claims processors.'] * 60)
+
+    M21ManualSection.objects.bulk_create(
+        [
+            M21ManualSection(
+                part='V',
+                part_number=5,
+                subpart='ii',
+                chapter=str(i // 26),
+                section=str(i % 26),
+                reference=f'M21-1.BENCH.{i}',
+                title=f'Benchmark Section {i}',
+                overview=phrases[i % len(phrases)],
+                content=f'{filler} {phrases[(i * 3) % len(phrases)]}',
+            )
+            for i in range(M21_FIXTURE_SECTIONS)
+        ],
+        batch_size=1000,
+    )
+
+
+@pytest.mark.django_db
+class TestM21TaskPerformance:
+    """Benchmark M21 maintenance tasks over a large section corpus."""
+
+    def test_build_topic_indices_5k_sections(self, m21_sections):
+        """Measure a full topic index rebuild over 5k sections."""
+        from agents.tasks import build_m21_topic_indices
+
+        results = benchmark(build_m21_topic_indices, iterations=3)
+        record_benchmark('m21_build_topic_indices_5k', results['mean'])
+
+        print(f"\nM21 topic index rebuild (5k sections): {results['mean']*1000:.2f}ms (mean)")
+        assert results['mean'] < 10.0, f"Topic index rebuild too slow: {results['mean']}s"
@@ -3,10 +3,13 @@ Tests for core Celery tasks — data retention, health monitoring, and pilot not
 
 Covers:
 - enforce_data_retention: Purges data per active retention policies
+- run_batched_purge: Batched, checkpointed deletes behind the retention purges
 - enforce_pilot_data_retention: Purges pilot user data per PILOT_DATA_RETENTION_DAYS
 - notify_pilot_users_before_retention: Warns pilot users before deletion
 - cleanup_old_health_metrics: Removes health metrics older than 30 days
+- rollup_health_metrics: Minute/hour/day summaries of health metrics
 - check_processing_health: Detects stuck documents and high failure rates
+- refresh_health_snapshot: Caches the full health status served by the endpoints
 """
 
 import pytest
@@ -104,6 +107,134 @@ class TestEnforceDataRetention:
         assert policy.last_cleanup is not None
 
 
+# =============================================================================
+# run_batched_purge
+# =============================================================================
+
+@pytest.mark.django_db
+class TestBatchedPurge:
+    """Tests for the keyset-paginated purge engine used by retention."""
+
+    def _soft_deleted_docs(self, count, days_ago=100):
+        from claims.models import Document
+
+        user = User.objects.create_user(email="purge@example.com", password="TestPass123!")
+        docs = []
+        for i in range(count):
+            doc = Document.objects.create(
+                user=user, file_name=f"doc{i}.pdf", file_size=100,
+                document_type='other', status='completed',
+            )
+            doc.file.name = f"documents/doc{i}.pdf"
+            doc.is_deleted = True
+            doc.deleted_at = timezone.now() - timedelta(days=days_ago)
+            doc.save()
+            docs.append(doc)
+        return docs
+
+    def _old_docs(self):
+        from claims.models import Document
+
+        return Document.all_objects.filter(
+            is_deleted=True, deleted_at__lt=timezone.now() - timedelta(days=90)
+        )
+
+    @patch('core.purge._delete_stored_file')
+    def test_deletes_in_batches_with_files(self, mock_delete_file):
+        """Should delete every row in pk-ordered batches and each stored file once."""
+        from claims.models import Document
+        from core.models import PurgeCheckpoint
+        from core.purge import run_batched_purge
+
+        docs = self._soft_deleted_docs(5)
+
+        result = run_batched_purge('test:documents', self._old_docs(), file_fields=('file',), batch_size=2, sleep_seconds=0)
+
+        assert result.deleted == 5
+        assert result.batches == 3
+        assert result.files_deleted == 5
+        assert result.resumed_after is None
+        assert not Document.all_objects.filter(pk__in=[d.pk for d in docs]).exists()
+        assert sorted(c.args[0].name for c in mock_delete_file.call_args_list) == sorted(
+            d.file.name for d in docs
+        )
+        assert not PurgeCheckpoint.objects.filter(name='test:documents').exists()
+
+    @patch('core.purge._delete_stored_file')
+    def test_killed_run_resumes_from_checkpoint(self, mock_delete_file):
+        """A run interrupted after a batch should leave a checkpoint the next run resumes from."""
+        from claims.models import Document
+        from core import purge
+        from core.models import PurgeCheckpoint
+
+        docs = self._soft_deleted_docs(5)
+        real_delete_rows = purge._delete_rows
+        calls = []
+
+        def delete_then_die(model, pks):
+            calls.append(pks)
+            if len(calls) > 1:
+                raise RuntimeError("worker killed")
+            return real_delete_rows(model, pks)
+
+        with patch('core.purge._delete_rows', side_effect=delete_then_die):
+            with pytest.raises(RuntimeError):
+                purge.run_batched_purge('test:documents', self._old_docs(), file_fields=('file',), batch_size=2, sleep_seconds=0)
+
+        checkpoint = PurgeCheckpoint.objects.get(name='test:documents')
+        assert checkpoint.last_pk == str(docs[1].pk)
+        assert checkpoint.rows_deleted == 2
+        assert Document.all_objects.filter(pk__in=[d.pk for d in docs]).count() == 3
+
+        result = purge.run_batched_purge('test:documents', self._old_docs(), file_fields=('file',), batch_size=2, sleep_seconds=0)
+
+        assert result.resumed_after == str(docs[1].pk)
+        assert result.deleted == 3
+        assert not Document.all_objects.filter(pk__in=[d.pk for d in docs]).exists()
+        assert not PurgeCheckpoint.objects.filter(name='test:documents').exists()
+
+    @patch('core.purge._delete_stored_file')
+    def test_keeps_rows_whose_files_fail_to_delete(self, mock_delete_file):
+        """Rows are kept for the next run when their stored file can't be deleted."""
+        from claims.models import Document
+        from core.purge import run_batched_purge
+
+        docs = self._soft_deleted_docs(3)
+
+        def fail_for_second(field_file):
+            if field_file.name == docs[1].file.name:
+                raise OSError("denied")
+
+        mock_delete_file.side_effect = fail_for_second
+
+        result = run_batched_purge('test:documents', self._old_docs(), file_fields=('file',))
+
+        assert result.deleted == 2
+        assert result.failed == 1
+        assert list(Document.all_objects.filter(pk__in=[d.pk for d in docs]).values_list('pk', flat=True)) == [docs[1].pk]
+
+    @patch('core.purge._delete_stored_file')
+    def test_documents_policy_purges_soft_deleted_documents(self, mock_delete_file):
+        """The documents policy should find soft-deleted documents past retention."""
+        from claims.models import Document
+        from core.models import DataRetentionPolicy
+        from core.tasks import enforce_data_retention
+
+        DataRetentionPolicy.objects.create(data_type='documents', retention_days=30, is_active=True)
+        old = self._soft_deleted_docs(2)
+        recent = Document.objects.create(
+            user=old[0].user, file_name="recent.pdf", file_size=100,
+            document_type='other', status='completed',
+        )
+        recent.delete()
+
+        result = enforce_data_retention()
+
+        assert result['documents'] == 2
+        assert not Document.all_objects.filter(pk__in=[d.pk for d in old]).exists()
+        assert Document.all_objects.filter(pk=recent.pk).exists()
+
+
 # =============================================================================
 # enforce_pilot_data_retention
 # =============================================================================
@@ -175,6 +306,57 @@ class TestEnforcePilotDataRetention:
         old_doc.refresh_from_db()
         assert old_doc.is_deleted is False
 
+    @override_settings(PILOT_DATA_RETENTION_DAYS=30, PILOT_PREMIUM_DOMAINS=['pilot.example.com'])
+    def test_set_based_soft_delete_with_bulk_audit(self):
+        """Should soft-delete every old pilot document and write one audit entry per user."""
+        from claims.models import Document
+        from core.models import AuditLog
+        from core.tasks import enforce_pilot_data_retention
+
+        pilots = [
+            User.objects.create_user(email=f"p{i}@pilot.example.com", password="TestPass123!")
+            for i in range(2)
+        ]
+        other = User.objects.create_user(email="other@example.com", password="TestPass123!")
+        for user in pilots + [other]:
+            for i in range(2):
+                Document.objects.create(
+                    user=user, file_name=f"old{i}.pdf", file_size=100,
+                    document_type='other', status='completed',
+                )
+        Document.objects.update(created_at=timezone.now() - timedelta(days=60))
+
+        result = enforce_pilot_data_retention()
+
+        assert result['pilot_users_checked'] == 2
+        assert result['documents_soft_deleted'] == 4
+        assert result['errors'] == []
+        assert Document.all_objects.filter(user__in=pilots, is_deleted=True).count() == 4
+        assert Document.objects.filter(user=other).count() == 2
+        entries = AuditLog.objects.filter(action='pilot_retention_documents')
+        assert sorted(entries.values_list('user_id', 'details__count')) == sorted(
+            (user.pk, 2) for user in pilots
+        )
+
+    @override_settings(PILOT_DATA_RETENTION_DAYS=30, PILOT_PREMIUM_EMAILS=['pilot@example.com'])
+    def test_query_count_independent_of_user_count(self):
+        """Non-pilot users should not add queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.tasks import enforce_pilot_data_retention
+
+        User.objects.create_user(email="pilot@example.com", password="TestPass123!")
+        User.objects.create_user(email="other0@example.com", password="TestPass123!")
+        with CaptureQueriesContext(connection) as few_users:
+            enforce_pilot_data_retention()
+
+        for i in range(1, 20):
+            User.objects.create_user(email=f"other{i}@example.com", password="TestPass123!")
+        with CaptureQueriesContext(connection) as many_users:
+            enforce_pilot_data_retention()
+
+        assert len(many_users) == len(few_users)
+
 
 # =============================================================================
 # notify_pilot_users_before_retention
@@ -262,6 +444,100 @@ class TestCleanupOldHealthMetrics:
         assert SystemHealthMetric.objects.filter(pk=recent.pk).exists()
 
 
+# =============================================================================
+# rollup_health_metrics
+# =============================================================================
+
+def _record_metric(metric_type, value, at):
+    from core.models import SystemHealthMetric
+
+    metric = SystemHealthMetric.objects.create(metric_type=metric_type, value=value)
+    SystemHealthMetric.objects.filter(pk=metric.pk).update(timestamp=at)
+    return metric
+
+
+@pytest.mark.django_db
+class TestHealthMetricRollups:
+    """Tests for the minute/hour/day rollups of SystemHealthMetric."""
+
+    def test_rolls_up_closed_buckets(self):
+        """Closed buckets get count/min/max/avg/p95; the open one is left alone."""
+        from datetime import datetime, timezone as dt_timezone
+        from core.metric_rollups import rollup_health_metrics
+        from core.models import SystemHealthMetricRollup
+
+        now = datetime(2026, 3, 10, 12, 30, 45, tzinfo=dt_timezone.utc)
+        hour = datetime(2026, 3, 10, 11, 0, tzinfo=dt_timezone.utc)
+        for i in range(1, 21):
+            _record_metric('celery_queue', float(i), hour + timedelta(minutes=i))
+        _record_metric('celery_queue', 99.0, now - timedelta(seconds=10))
+
+        written = rollup_health_metrics(now=now)
+
+        assert written['minute'] == 20
+        assert written['hour'] == 1
+        assert written['day'] == 0  # the day hasn't closed yet
+        rollup = SystemHealthMetricRollup.objects.get(resolution='hour', bucket_start=hour)
+        assert rollup.count == 20
+        assert rollup.min_value == 1.0
+        assert rollup.max_value == 20.0
+        assert rollup.avg_value == pytest.approx(10.5)
+        assert rollup.p95_value == 19.0
+        assert not SystemHealthMetricRollup.objects.filter(max_value=99.0).exists()
+
+    def test_incremental_runs_only_read_new_buckets(self):
+        """A rerun should only summarise buckets closed since the last one."""
+        from datetime import datetime, timezone as dt_timezone
+        from core.metric_rollups import rollup_resolution
+        from core.models import SystemHealthMetricRollup
+
+        start = datetime(2026, 3, 10, 9, 0, tzinfo=dt_timezone.utc)
+        _record_metric('celery_workers', 2.0, start + timedelta(minutes=5))
+        assert rollup_resolution('hour', now=start + timedelta(hours=1, minutes=1)) == 1
+
+        _record_metric('celery_workers', 4.0, start + timedelta(hours=1, minutes=5))
+        assert rollup_resolution('hour', now=start + timedelta(hours=1, minutes=2)) == 0
+        assert rollup_resolution('hour', now=start + timedelta(hours=2, minutes=1)) == 1
+
+        assert list(
+            SystemHealthMetricRollup.objects.filter(resolution='hour')
+            .order_by('bucket_start').values_list('avg_value', flat=True)
+        ) == [2.0, 4.0]
+
+    def test_series_picks_resolution_for_window(self):
+        """Short windows use minute rollups, long windows coarser ones."""
+        from core.metric_rollups import choose_resolution, get_metric_series, rollup_health_metrics
+
+        now = timezone.now()
+        for minutes in (90, 60, 30):
+            _record_metric('document_processing', 95.0 + minutes / 30, now - timedelta(minutes=minutes))
+        rollup_health_metrics(now=now)
+
+        assert choose_resolution(now - timedelta(hours=2), now, now=now) == 'minute'
+        assert choose_resolution(now - timedelta(days=14), now, now=now) == 'hour'
+        assert choose_resolution(now - timedelta(days=365), now, now=now) == 'day'
+
+        series = get_metric_series('document_processing', now - timedelta(hours=2), now)
+        assert series.resolution == 'minute'
+        assert [p['avg_value'] for p in series.points] == [98.0, 97.0, 96.0]
+
+    def test_cleanup_keeps_history_in_rollups(self):
+        """Raw rows past retention are deleted only after they are rolled up."""
+        from core.models import SystemHealthMetric, SystemHealthMetricRollup
+        from core.tasks import cleanup_old_health_metrics
+
+        old = _record_metric('celery_queue', 7.0, timezone.now() - timedelta(days=45))
+
+        cleanup_old_health_metrics()
+
+        assert not SystemHealthMetric.objects.filter(pk=old.pk).exists()
+        day = SystemHealthMetricRollup.objects.get(resolution='day', metric_type='celery_queue')
+        assert day.avg_value == 7.0
+        assert SystemHealthMetricRollup.objects.filter(resolution='hour').exists()
+        # Minute rollups that old are past their retention
+        assert not SystemHealthMetricRollup.objects.filter(resolution='minute').exists()
+
+
 # =============================================================================
 # check_processing_health
 # =============================================================================
@@ -328,3 +604,162 @@ class TestCheckProcessingHealth:
 
         assert result['failure_stats']['total'] >= 5
         assert len(result['alerts']) >= 1
+
+
+# =============================================================================
+# refresh_health_snapshot and the health endpoints
+# =============================================================================
+
+HEALTHY_CELERY = {'status': 'healthy', 'workers': 1, 'active_tasks': 0, 'queue_length': 0}
+HEALTH_TOKEN = 'monitoring-token'
+
+
+@pytest.mark.django_db
+class TestHealthSnapshot:
+    """Tests for the cached health snapshot and liveness/readiness probes."""
+
+    @pytest.fixture(autouse=True)
+    def clear_snapshot(self, settings):
+        from django.core.cache import cache
+        from core.health import REFRESH_LOCK_KEY, SNAPSHOT_CACHE_KEY
+
+        settings.HEALTH_CHECK_TOKEN = HEALTH_TOKEN
+        cache.delete_many([SNAPSHOT_CACHE_KEY, REFRESH_LOCK_KEY])
+        yield
+        cache.delete_many([SNAPSHOT_CACHE_KEY, REFRESH_LOCK_KEY])
+
+    @staticmethod
+    def get_full(client, **extra):
+        return client.get('/health/?full=1', HTTP_X_HEALTH_TOKEN=HEALTH_TOKEN, **extra)
+
+    def test_task_caches_snapshot(self):
+        """The task should store the full status for the endpoint to serve."""
+        from core.health import get_health_snapshot
+        from core.tasks import refresh_health_snapshot
+
+        with patch('core.health.check_celery', return_value=HEALTHY_CELERY):
+            result = refresh_health_snapshot()
+
+        snapshot = get_health_snapshot()
+        assert result['status'] == 'healthy'
+        assert snapshot['status'] == 'healthy'
+        assert snapshot['checks']['celery']['workers'] == 1
+        assert snapshot['age_seconds'] < 5
+        assert snapshot['stale'] is False
+
+    def test_full_endpoint_serves_snapshot_without_running_checks(self, client):
+        """?full=1 should serve the cached snapshot and not run any check."""
+        from core.health import refresh_health_snapshot
+
+        with patch('core.health.check_celery', return_value=HEALTHY_CELERY):
+            refresh_health_snapshot()
+
+        with patch('core.health.get_full_health_status') as full_status:
+            response = self.get_full(client)
+
+        full_status.assert_not_called()
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'healthy'
+        assert 'age_seconds' in data
+
+    def test_stale_snapshot_is_503_and_refreshed(self, client):
+        """A snapshot past HEALTH_SNAPSHOT_MAX_AGE should be reported stale and refreshed."""
+        from django.core.cache import cache
+        from core.health import SNAPSHOT_CACHE_KEY, refresh_health_snapshot
+
+        with patch('core.health.check_celery', return_value=HEALTHY_CELERY):
+            refresh_health_snapshot()
+        cached = cache.get(SNAPSHOT_CACHE_KEY)
+        cached['computed_at'] -= 300
+        cache.set(SNAPSHOT_CACHE_KEY, cached)
+
+        with override_settings(HEALTH_SNAPSHOT_MAX_AGE=120), \
+                patch('core.health.start_background_refresh') as start_refresh:
+            response = self.get_full(client)
+
+        assert response.status_code == 503
+        assert response.json()['stale'] is True
+        start_refresh.assert_called_once()
+
+    def test_missing_snapshot_is_503_and_refreshed(self, client):
+        """Before the first refresh, ?full=1 should answer at once with status unknown."""
+        with patch('core.health.start_background_refresh') as start_refresh:
+            response = self.get_full(client)
+
+        assert response.status_code == 503
+        assert response.json()['status'] == 'unknown'
+        start_refresh.assert_called_once()
+
+    def test_full_endpoint_requires_token_or_staff(self, client):
+        """Anonymous callers get no snapshot and can't start refreshes."""
+        with patch('core.health.start_background_refresh') as start_refresh:
+            assert client.get('/health/?full=1').status_code == 403
+            response = client.get('/health/?full=1', HTTP_X_HEALTH_TOKEN='wrong')
+            assert response.status_code == 403
+        start_refresh.assert_not_called()
+
+        staff = User.objects.create_user(
+            email="healthstaff@example.com", password="TestPass123!", is_staff=True
+        )
+        client.force_login(staff)
+        with patch('core.health.start_background_refresh'):
+            response = client.get('/health/?full=1')
+        assert response.status_code == 503
+        assert response.json()['status'] == 'unknown'
+
+    def test_full_endpoint_token_unset_is_staff_only(self, client, settings):
+        """An empty HEALTH_CHECK_TOKEN must not match an empty header."""
+        settings.HEALTH_CHECK_TOKEN = ''
+        response = client.get('/health/?full=1', HTTP_X_HEALTH_TOKEN='')
+        assert response.status_code == 403
+
+    def test_full_endpoint_checks_allowed_hosts(self, client):
+        """Only the probes bypass ALLOWED_HOSTS; the snapshot does not."""
+        client.raise_request_exception = False
+        assert client.get('/health/', HTTP_HOST='10.244.0.5').status_code == 200
+        assert client.get('/health/ready/', HTTP_HOST='10.244.0.5').status_code == 200
+        with patch('core.health.snapshot_response') as snapshot:
+            response = self.get_full(client, HTTP_HOST='10.244.0.5')
+        assert response.status_code >= 400
+        snapshot.assert_not_called()
+
+    def test_background_refresh_is_single_flight(self):
+        """Only one background refresh should run at a time."""
+        from django.core.cache import cache
+        from core.health import REFRESH_LOCK_KEY, start_background_refresh
+
+        cache.add(REFRESH_LOCK_KEY, 1, 60)
+        with patch('core.health.threading.Thread') as thread:
+            assert start_background_refresh() is False
+        thread.assert_not_called()
+
+    def test_liveness_does_not_touch_backing_services(self, client):
+        """Liveness probes should answer without database or cache access."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            for path in ('/health/', '/health/live/'):
+                response = client.get(path)
+                assert response.status_code == 200
+                assert response.json()['status'] == 'ok'
+        assert len(queries) == 0
+
+    def test_readiness_checks_database_and_cache_only(self, client):
+        """Readiness should not depend on Celery workers."""
+        with patch('core.health.check_celery') as celery_check:
+            response = client.get('/health/ready/')
+
+        celery_check.assert_not_called()
+        assert response.status_code == 200
+        assert set(response.json()['checks']) == {'database', 'redis'}
+
+    def test_readiness_fails_when_database_down(self, client):
+        """Readiness should return 503 when the database can't be reached."""
+        unhealthy = {'status': 'unhealthy', 'message': 'connection refused'}
+        with patch('core.health.check_database', return_value=unhealthy):
+            response = client.get('/health/ready/')
+
+        assert response.status_code == 503
+        assert response.json()['status'] == 'not_ready'
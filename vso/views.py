@@ -446,14 +446,10 @@ def _export_cases_csv(cases, request=None, org=None):
 
     # Audit log the export
     if request and request.user.is_authenticated:
-        AuditLog.objects.create(
-            user=request.user,
+        AuditLog.enqueue(
             action='vso_case_export',
+            request=request,
             resource_type='VeteranCase',
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
-            request_path=request.path,
-            request_method=request.method,
             details={
                 'case_count': len(case_ids),
                 'case_ids': case_ids[:100],  # Limit to first 100 for storage